@@ -0,0 +1,151 @@
+"""Microbenchmark: the compiled-timeline animation runner vs the previous one.
+
+Runs ``N_ANIMS`` looping animations at once for ``TICKS`` game ticks of 10 ms
+each, through ``Animation.update_all``. ``LegacyAnimation`` below is the
+previous runner, verbatim in behaviour: it walks a ``FrameSequence`` frame by
+frame with a float residual, prints the residual on every frame advance, and
+loops by calling ``start()`` again (its output goes to a null device here; its
+ids are made unique so all of them really run). The current
+:class:`src.animation.Animation` seeks a compiled :class:`~src.animation.Timeline`
+and only wakes, through the runner's timer wheel, at its frame boundaries.
+
+The old runner writes straight into a real :class:`~src.game_loop.LaserBay`;
+the current one draws into compositor layers, so its ticks also compose the
+word once, as ``Game.render`` does. It prints the cost per tick of all the
+animations together and exits non-zero if the compiled runner is not faster. Run from repo root:
+
+    python3 scratch/bench_animation.py
+"""
+import contextlib
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], "-s"]
+
+from src.animation import Animation, Compositor, Frame, FrameSequence, Timeline
+from src.config import config
+from src.game_loop import LaserBay
+
+
+N_ANIMS = 50
+TICKS = 5000
+
+
+class StubGame:
+    profiler = None
+    def __init__(self):
+        self.lasers = LaserBay()
+        self.compositor = Compositor()
+        self.mixer = None
+
+
+class LegacyAnimation:
+    """The pre-timeline runner's playback loop."""
+    currently_running = {}
+    finished = {}
+    game = None
+
+    def __init__(self, frames, loops=0, anim_id=0):
+        self.frames = frames
+        self.epsilon = 1000 / config.FPS / 2
+        self._loops = loops
+        self.loops = loops
+        self.anim_id = anim_id
+
+    @classmethod
+    def update_all(cls, dt):
+        for anim_id, animation in cls.currently_running.items():
+            animation.update(dt)
+        for anim_id in set(cls.finished):
+            cls.currently_running.pop(anim_id)
+        cls.finished = {}
+
+    def start(self):
+        print('animation started with id:', self.anim_id)
+        self.t = 0
+        self.tick_no = 0
+        self.frame_no = 0
+        self.time_left_in_frame = self.frames.timing_track[0]
+        self.__class__.currently_running[self.anim_id] = self
+
+    def advance_frame(self):
+        residual = self.time_left_in_frame
+        print(f'residual:{residual:.1f}')
+        self.frame_no += 1
+        if self.frame_no > self.frames.last_frame_index:
+            return self.finish()
+        self.frame_length = self.frames.timing_track[self.frame_no]
+        self.time_left_in_frame = self.frame_length + residual
+
+    def frame_ready(self):
+        if self.time_left_in_frame < self.epsilon:
+            return True
+
+    def update(self, dt):
+        self.tick_no += 1
+        self.t += dt
+        self.time_left_in_frame -= dt
+        if self.frame_ready():
+            self.play_frame()
+            self.advance_frame()
+
+    def finish(self):
+        if self.loops == -1:
+            return self.start()
+        self.loops = self._loops
+        self.__class__.finished[self.anim_id] = self
+
+    def play_frame(self):
+        frame = self.frames[self.frame_no]
+        if self.frames.func:
+            frame = self.frames.func(frame)
+        if frame.word is not None:
+            self.game.lasers.set_word(frame.word)
+
+
+def words(i):
+    n = config.N_PORTS
+    return [1 << ((i + j) % n) for j in range(2 * n - 2)]
+
+
+def setup(runner, make, compose=False):
+    """Start ``N_ANIMS`` animations on ``runner``; return a timed run of its ticks."""
+    runner.game = StubGame()
+    runner.currently_running = {}
+    runner.finished = {}
+    with open(os.devnull, 'w') as null, contextlib.redirect_stdout(null):
+        for i in range(N_ANIMS):
+            make(i).start()
+    game = runner.game
+    def run():
+        with open(os.devnull, 'w') as null, contextlib.redirect_stdout(null):
+            for _ in range(TICKS):
+                runner.update_all(10.0)
+                if compose:
+                    game.compositor.compose(game.lasers.word)
+    return run
+
+
+def main():
+    fps = 20
+    runs = {
+        "old": setup(LegacyAnimation, lambda i: LegacyAnimation(
+            FrameSequence.by_fps(Frame.from_list(words=words(i)), fps), loops=-1, anim_id=i)),
+        "new": setup(Animation, lambda i: Animation(
+            Timeline(words(i), [1000 / fps] * len(words(i))), loops=-1), compose=True),
+    }
+    best = {name: float('inf') for name in runs}
+    for _ in range(7):  # interleaved, so a noisy stretch hits both
+        for name, run in runs.items():
+            best[name] = min(best[name], timeit.timeit(run, number=1))
+    old, new = (best[name] * 1e9 / TICKS for name in ("old", "new"))
+    Animation.kill_all()
+    print(f"{N_ANIMS} looping animations, per 10 ms tick:   previous runner {old / 1000:7.1f} us   "
+          f"compiled timeline {new / 1000:7.1f} us   ({old / new:.1f}x)")
+    return 0 if new < old else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
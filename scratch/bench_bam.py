@@ -0,0 +1,70 @@
+"""Microbenchmark: achievable BAM refresh rate on the fake GPIO backend.
+
+Times one output tick of :class:`src.bam.BamEngine` -- a slot-table lookup
+plus one ``OutputShiftRegister.push_word`` on :class:`src.fake_gpio.FakeGPIO`
+-- against a naive software-PWM tick that recomputes the word from the levels
+every time. From the tick cost it derives the highest refresh rate each
+scheme could sustain at 4..8 bits: BAM needs ``bits`` ticks per period, PWM
+``2**bits - 1``. It then runs the real engine thread flat out (a tiny
+period) and reports the periods per second it actually completes.
+
+FakeGPIO does more Python work per call than ``RPi.GPIO``'s C calls, so these
+rates are a floor for the bit-banged driver on the same CPU. Exits non-zero
+if the precomputed tick is not faster than the naive one. Run from repo root:
+
+    python3 scratch/bench_bam.py
+"""
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], "-s"]
+
+from src.bam import BamEngine, slot_table
+from src.fake_gpio import FakeGPIO
+from src.shift_register import OutputShiftRegister
+
+
+TICKS = 2000
+LEVELS = [(i * 37) % 256 for i in range(14)]
+
+
+def tick_us(fn):
+    """Best-of-5 microseconds per call of ``fn(i)``."""
+    def run():
+        for i in range(TICKS):
+            fn(i)
+    return min(timeit.repeat(run, number=1, repeat=5)) / TICKS * 1e6
+
+
+def main():
+    sipo = OutputShiftRegister(gpio=FakeGPIO())
+    push = sipo.push_word
+    table = slot_table(0x3FFF, LEVELS, 8, 10_000_000)
+    n_slots = len(table)
+    def bam_tick(i):
+        push(table[i % n_slots][0])
+    def pwm_tick(i):
+        phase = i % 255
+        push(sum(1 << p for p in range(14) if LEVELS[p] > phase))
+    bam, pwm = tick_us(bam_tick), tick_us(pwm_tick)
+    print(f"tick: BAM lookup + push {bam:6.1f} us   naive PWM {pwm:6.1f} us")
+    for bits in range(4, 9):
+        print(f"  {bits} bits: BAM up to {1e6 / (bits * bam):7.0f} Hz   "
+              f"PWM up to {1e6 / ((2 ** bits - 1) * pwm):7.0f} Hz")
+
+    engine = BamEngine(OutputShiftRegister(gpio=FakeGPIO()), bits=8, refresh_hz=1_000_000)
+    engine.set_levels(LEVELS)
+    engine.push_word(0x3FFF)
+    engine.start()
+    time.sleep(0.5)
+    cycles = engine.cycles
+    engine.stop()
+    print(f"engine thread flat out, 8 bits: {cycles / 0.5:.0f} periods/s")
+    return 0 if bam < pwm else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""Microbenchmark: one frame's register I/O, separate drivers vs the duplex driver.
+
+Runs a frame's worth of register work on :class:`src.fake_gpio.FakeGPIO`:
+
+* separate: ``InputShiftRegister.read_word`` + ``OutputShiftRegister.push_word``
+  (two passes, each with its own clock pulses);
+* duplex: ``DuplexShiftRegister.push_word`` + ``read_stamped`` (one interleaved
+  pass; the read reuses the push's sample).
+
+Prints the GPIO calls and the time per frame for each. On the Pi every call
+is a trip through ``RPi.GPIO``, so the call count is what matters. Exits
+non-zero if the duplex frame is not cheaper on both counts. Run from repo
+root:
+
+    python3 scratch/bench_duplex.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], "-s"]
+
+from src.fake_gpio import FakeGPIO
+from src.shift_register import DuplexShiftRegister, InputShiftRegister, OutputShiftRegister
+
+
+FRAMES = 2000
+
+
+def measure(frame, gpio):
+    """GPIO calls per frame and best-of-5 microseconds per frame."""
+    gpio.reset_counts()
+    frame(0x1234)
+    calls = gpio.calls["output"] + gpio.calls["input"]
+    def run():
+        for w in range(FRAMES):
+            frame(w)
+    us = min(timeit.repeat(run, number=1, repeat=5)) / FRAMES * 1e6
+    return calls, us
+
+
+def main():
+    gpio = FakeGPIO()
+    inp, out = InputShiftRegister(gpio=gpio), OutputShiftRegister(gpio=gpio)
+    def separate(word):
+        inp.read_word()
+        out.push_word(word)
+    old = measure(separate, gpio)
+
+    gpio = FakeGPIO()
+    duplex = DuplexShiftRegister(gpio=gpio)
+    def combined(word):
+        duplex.push_word(word)
+        duplex.read_stamped()
+    new = measure(combined, gpio)
+
+    print(f"separate: {old[0]:3d} GPIO calls  {old[1]:7.1f} us/frame")
+    print(f"duplex:   {new[0]:3d} GPIO calls  {new[1]:7.1f} us/frame   "
+          f"({old[0] / new[0]:.1f}x fewer calls, {old[1] / new[1]:.1f}x faster)")
+    return 0 if new[0] < old[0] and new[1] < old[1] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""Microbenchmark: per-event cost of the event queue, old vs current.
+
+Replays the game loop's traffic pattern -- a frame's worth of input events put
+by the input manager, then drained by the active program -- through:
+
+* ``LegacyEventLoop``: the previous ``queue.Queue`` implementation, verbatim in
+  behaviour (``put`` takes the queue lock, ``get`` is a generator calling
+  ``qsize()`` and ``get_nowait()`` per event) with the old kwargs-only events;
+* :class:`src.event_loop.EventLoop` with the ``__slots__`` events.
+
+Also times the empty-frame drain (the common case: most frames carry no input)
+and ``put_threadsafe``. Prints ns per event and the speed-up; exits non-zero if
+the current queue is not faster. Run from repo root:
+
+    python3 scratch/bench_event_loop.py
+"""
+import os
+import sys
+import timeit
+from collections import deque
+from queue import Queue, Empty
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], "-s"]
+
+from src.event_loop import EventLoop, EventType, ButtonDownEvent, ButtonUpEvent
+
+
+class LegacyEvent:
+    type = EventType.DEFAULT
+    def __init__(self, **kwargs):
+        self.has_callback = False
+        for name, attr in kwargs.items():
+            setattr(self, name, attr)
+
+class LegacyButtonDown(LegacyEvent):
+    type = EventType.BUTTON_DOWN
+
+class LegacyButtonUp(LegacyEvent):
+    type = EventType.BUTTON_UP
+
+
+class LegacyEventLoop:
+    HISTORY_SIZE = 500
+    def __init__(self):
+        self.q = Queue()
+        self.history = deque(maxlen=self.HISTORY_SIZE)
+    def put(self, event):
+        self.q.put(event)
+        self.history.append(event)
+    def get(self):
+        for i in range(self.q.qsize()):
+            try:
+                event = self.q.get_nowait()
+            except Empty:
+                return
+            yield event
+
+
+PER_FRAME = 4       # a busy frame: two presses + two releases
+FRAMES = 20000
+
+
+def frame_traffic(loop, down_cls, up_cls):
+    """One busy frame: construct + put PER_FRAME events, then drain them."""
+    def run():
+        for _ in range(FRAMES):
+            for key in range(PER_FRAME // 2):
+                loop.put(down_cls(key=key, state=0, t_ns=0))
+                loop.put(up_cls(key=key, state=0, t_ns=0))
+            for event in loop.get():
+                if event.type == EventType.BUTTON_DOWN:
+                    pass
+    return run
+
+
+def empty_frames(loop):
+    def run():
+        for _ in range(FRAMES):
+            for event in loop.get():
+                pass
+    return run
+
+
+def best_ns(fn, per):
+    """Best-of-5 wall time of ``fn``, in ns per unit of work."""
+    return min(timeit.repeat(fn, number=1, repeat=5)) * 1e9 / per
+
+
+def main():
+    n_events = FRAMES * PER_FRAME
+    old = best_ns(frame_traffic(LegacyEventLoop(), LegacyButtonDown, LegacyButtonUp), n_events)
+    new = best_ns(frame_traffic(EventLoop(), ButtonDownEvent, ButtonUpEvent), n_events)
+    old_idle = best_ns(empty_frames(LegacyEventLoop()), FRAMES)
+    new_idle = best_ns(empty_frames(EventLoop()), FRAMES)
+
+    loop = EventLoop()
+    event = ButtonDownEvent(key=0, state=0, t_ns=0)
+    def threadsafe():
+        for _ in range(FRAMES):
+            loop.put_threadsafe(event)
+            loop.get()
+    handoff = best_ns(threadsafe, FRAMES)
+
+    print(f"put + drain, per event:   queue.Queue {old:8.0f} ns   EventLoop {new:8.0f} ns   "
+          f"({old / new:.1f}x)")
+    print(f"empty-frame drain:        queue.Queue {old_idle:8.0f} ns   EventLoop {new_idle:8.0f} ns   "
+          f"({old_idle / new_idle:.1f}x)")
+    print(f"put_threadsafe + drain:   {handoff:8.0f} ns per event")
+    return 0 if new < old and new_idle < old_idle else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Microbenchmark: words per second, ``RPi.GPIO`` drivers vs the mmap drivers.
+
+Times ``push_word`` and ``read_word`` of :mod:`src.shift_register`'s
+``RPi.GPIO`` drivers against the ``Mmap*`` drivers.
+
+On the Pi (``RPi.GPIO`` importable and ``/dev/gpiomem`` present), both run
+against the real hardware. The output and input chips see real edges, so run
+it with the box idle.
+
+Off the Pi, the mmap drivers store into a plain mapped file page, which is
+their true Python cost minus the bus. The ``RPi.GPIO`` drivers run against
+``CBuiltinGPIO``, whose ``output``/``input`` are zero-work C builtins. That
+is a lower bound for the real module, which does more work per call in C, so
+off-Pi speed-ups understate the real ones.
+
+Prints words/s for each path and the speed-up. Exits non-zero if the mmap
+path is not faster. Run from repo root:
+
+    python3 scratch/bench_gpio_backends.py
+"""
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+on_pi = os.path.exists("/dev/gpiomem") and "-s" not in sys.argv
+if not on_pi:
+    sys.argv = [sys.argv[0], "-s"]
+
+from src import shift_register
+from src.gpio_mmap import GpioMem
+from src.shift_register import (InputShiftRegister, OutputShiftRegister,
+                                MmapInputShiftRegister, MmapOutputShiftRegister)
+
+
+class CBuiltinGPIO:
+    """``RPi.GPIO`` stand-in whose per-edge calls are C builtins doing nothing useful."""
+    BCM = 11
+    OUT = 0
+    IN = 1
+    LOW = 0
+    HIGH = 1
+    setmode = staticmethod(id)
+    output = staticmethod(max)      # output(pin, level): one C call, like RPi.GPIO's
+    input = staticmethod(abs)       # input(pin): returns an int
+    def setup(self, *args, **kwargs):
+        pass
+
+
+WORDS = 2000
+
+
+def words_per_s(fn):
+    """Best-of-5 rate of ``fn`` (which moves WORDS words)."""
+    return WORDS / min(timeit.repeat(fn, number=1, repeat=5))
+
+
+def rates(out, inp):
+    def push():
+        for w in range(WORDS):
+            out.push_word(w)
+    def read():
+        for _ in range(WORDS):
+            inp.read_word()
+    return words_per_s(push), words_per_s(read)
+
+
+def main():
+    if on_pi:
+        gpio = shift_register.GPIO
+        mem = GpioMem()
+        label = "RPi.GPIO"
+    else:
+        gpio = CBuiltinGPIO()
+        fd, path = tempfile.mkstemp()
+        os.ftruncate(fd, 4096)
+        os.close(fd)
+        mem = GpioMem(path)
+        os.remove(path)
+        label = "RPi.GPIO (C-builtin stand-in)"
+    old = rates(OutputShiftRegister(gpio=gpio), InputShiftRegister(gpio=gpio))
+    new = rates(MmapOutputShiftRegister(mem=mem), MmapInputShiftRegister(mem=mem))
+    for name, o, n in (("push_word", old[0], new[0]), ("read_word", old[1], new[1])):
+        print(f"{name}:  {label} {o:9.0f} words/s   mmap {n:9.0f} words/s   ({n / o:.1f}x)")
+    return 0 if new[0] > old[0] and new[1] > old[1] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""Microbenchmark: per-frame word operations at 16-, 32- and 64-bit port words.
+
+For each width the config is set to ``width - N_TOGGLES`` ports and the real
+code is timed on it:
+
+* ``InputManager.poll`` + ``generate_events`` on a busy press/release cycle
+  (debounce, interned ``State`` lookup, event decode), from a scripted register;
+* a frame of ``LaserBay`` writes (per-port and mask ops) plus the
+  ``OutputManager`` push of the result to a null register;
+* one ``OutputShiftRegister.push_word`` on :class:`src.fake_gpio.FakeGPIO`, for
+  contrast: bit-banging is one clock per bit of the chain, so it grows with
+  the width however the words are handled.
+
+It prints ns per operation at each width and exits non-zero if either word
+path at 64 bits costs more than twice what it does at 16. Run from repo root:
+
+    python3 scratch/bench_port_width.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], "-s"]
+
+from src.config import config
+from src.event_loop import events
+from src.fake_gpio import FakeGPIO
+from src.game_loop import LaserBay
+from src.io_managers import InputManager, OutputManager
+from src.programs.base import State
+from src.shift_register import OutputShiftRegister
+
+
+FRAMES = 20000
+WIDTHS = (16, 32, 64)
+
+
+class ScriptedPISO:
+    def __init__(self, words):
+        self.words = words
+        self.i = 0
+    def read_word(self):
+        word = self.words[self.i % len(self.words)]
+        self.i += 1
+        return word
+
+
+class NullSIPO:
+    def push_word(self, word):
+        pass
+
+
+def best_ns(run, n):
+    return min(timeit.repeat(run, number=1, repeat=5)) * 1e9 / n
+
+
+def bench_width(width):
+    n = width - config.N_TOGGLES
+    config.N_PORTS = n
+    State.set_shape(n, config.N_TOGGLES)
+    top = 1 << (n - 1)  # the highest button, so the words really are this wide
+    toggle = 1 << (width - 1)
+    im = InputManager(register=ScriptedPISO([toggle, toggle | top, toggle | top | 8, toggle | 8]))
+    def poll():
+        for _ in range(FRAMES):
+            im.poll()
+            events.get()
+    poll_ns = best_ns(poll, FRAMES)
+
+    bay = LaserBay()
+    outputs = OutputManager(NullSIPO())
+    chase = [1 << (i % n) | 1 << ((i * 7) % n) for i in range(FRAMES)]
+    def frame():
+        for mask in chase:
+            bay.set_word(0)
+            bay.turn_on(n - 1)
+            bay.set_mask(mask)
+            bay.clear_mask(0b110)
+            outputs.push_word(bay.to_word())
+    frame_ns = best_ns(frame, FRAMES)
+
+    sipo = OutputShiftRegister(gpio=FakeGPIO())
+    def push():
+        for mask in chase[:2000]:
+            sipo.push_word(mask)
+    push_ns = best_ns(push, 2000)
+    return poll_ns, frame_ns, push_ns, sipo.n_outputs
+
+
+def main():
+    saved = config.N_PORTS, config.DEBOUNCE_RELEASE_MS
+    config.DEBOUNCE_RELEASE_MS = 0
+    try:
+        results = {width: bench_width(width) for width in WIDTHS}
+    finally:
+        config.N_PORTS, config.DEBOUNCE_RELEASE_MS = saved
+        State.set_shape(config.N_PORTS, config.N_TOGGLES)
+    for width, (poll_ns, frame_ns, push_ns, chain) in results.items():
+        print(f"{width:2d}-bit word: poll {poll_ns:6.0f} ns   laser frame {frame_ns:5.0f} ns   "
+              f"bit-banged push ({chain} bits) {push_ns / 1000:6.1f} us")
+    poll_x = results[64][0] / results[16][0]
+    frame_x = results[64][1] / results[16][1]
+    print(f"64 vs 16 bits: poll {poll_x:.2f}x   laser frame {frame_x:.2f}x")
+    return 0 if poll_x < 2 and frame_x < 2 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""Microbenchmark: ``InputManager.poll`` + ``generate_events``, old vs interned State.
+
+Drives a real :class:`src.io_managers.InputManager` from a scripted register
+through two traffic patterns:
+
+* idle frames -- the word never changes (what the loop does almost all day);
+* busy frames -- every frame presses or releases a button, so each poll diffs
+  and emits events.
+
+It runs each pattern once with ``LegacyState`` (the previous implementation: a
+new object per ``State(word)`` and per operator, with bit loops in every
+decode) swapped into ``src.io_managers``, and once with the current interned
+:class:`src.programs.base.State`. It prints ns per poll and the speed-up, and
+exits non-zero if the current code is not faster. Run from repo root:
+
+    python3 scratch/bench_state_decode.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], "-s"]
+
+from src import io_managers
+from src.event_loop import events
+from src.io_managers import InputManager
+from src.programs.base import State
+
+
+class LegacyState:
+    """The pre-interning ``State``, verbatim in behaviour."""
+    def __init__(self, word):
+        self.buttons = int(word) & (2**14-1)
+        self.toggles = (int(word) & (3 << 14)) >> 14
+        self.word = int(word)
+    def get_buttons_on(self):
+        return [i for i in range(14) if ((self.buttons & (1 << i)) >> i)]
+    def get_toggles_on(self):
+        return [i for i in range(2) if ((self.toggles & (1 << i)) >> i)]
+    # what generate_events reads now, mapped onto the old decoders
+    buttons_on = property(get_buttons_on)
+    toggles_on = property(get_toggles_on)
+    def __int__(self):
+        return self.word
+    def __or__(self, other):
+        if isinstance(other, LegacyState):
+            other = other.word
+        return LegacyState(self.word | other)
+    def __xor__(self, other):
+        if isinstance(other, LegacyState):
+            other = other.word
+        return LegacyState(self.word ^ other)
+    def __and__(self, other):
+        if isinstance(other, LegacyState):
+            other = other.word
+        return LegacyState(self.word & other)
+    def __eq__(self, other):
+        return self.word == int(other)
+
+
+class ScriptedPISO:
+    def __init__(self, words):
+        self.words = words
+        self.i = 0
+    def read_word(self):
+        word = self.words[self.i % len(self.words)]
+        self.i += 1
+        return word
+
+
+FRAMES = 20000
+IDLE = [1 << 15]                                     # a toggle on, nothing pressed
+BUSY = [1 << 15, (1 << 15) | (1 << 3), (1 << 15) | (1 << 3) | (1 << 9),
+        (1 << 15) | (1 << 9)]                        # press/release cycle
+
+
+def bench(state_cls, words):
+    io_managers.State = state_cls
+    try:
+        im = InputManager(register=ScriptedPISO(words))
+        im.state = im.prev_state = state_cls(0)
+        def run():
+            for _ in range(FRAMES):
+                im.poll()
+                events.get()
+        return min(timeit.repeat(run, number=1, repeat=5)) * 1e9 / FRAMES
+    finally:
+        io_managers.State = State
+
+
+def main():
+    results = {}
+    for name, words in (("idle", IDLE), ("busy", BUSY)):
+        old = bench(LegacyState, words)
+        new = bench(State, words)
+        results[name] = (old, new)
+        print(f"{name} frame, per poll:   old State {old:8.0f} ns   interned State {new:8.0f} ns   "
+              f"({old / new:.1f}x)")
+    return 0 if all(new < old for old, new in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""Microbenchmark: the timer wheel vs the previous per-program scheduler.
+
+``LegacyScheduler`` below is the previous ``Program`` bookkeeping, verbatim in
+behaviour: ``after`` pushes onto a heap, ``check_schedule`` pops and re-pushes
+the head every frame (printing on each call it runs; to a null device here),
+and ``check_cooldowns`` scans the whole cooldown dict every frame. A stale
+callback cannot be cancelled, so it stays in the heap and runs as a no-op.
+:class:`src.timer_wheel.TimerWheel` files the same work by deadline.
+
+Three workloads, each on a fresh scheduler holding ``PENDING`` timers and
+``COOLDOWNS`` running cooldowns, all due after the timed frames:
+
+* an idle frame: nothing is due;
+* a busy frame: a few callbacks fire, a few new ones are scheduled and some
+  earlier ones are superseded (cancelled on the wheel);
+* scheduling and cancelling a timer alone.
+
+It prints ns per frame (or per operation) for each and exits non-zero if the
+wheel is slower at an idle or busy frame. Run from repo root:
+
+    python3 scratch/bench_timer_wheel.py
+"""
+import contextlib
+import os
+import random
+import sys
+import time
+from heapq import heappush, heappop
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], "-s"]
+
+from src.timer_wheel import TimerWheel
+
+
+PENDING = 5000
+COOLDOWNS = 200
+FRAMES = 3000
+FRAME_MS = 1000 / 60
+
+
+class LegacyScheduler:
+    """The previous Program scheduler and cooldowns."""
+    def __init__(self):
+        self.scheduler = []
+        self.cooldowns = {}
+        self.schedule_id = 0
+        self.now_ms = 0.0
+
+    def after(self, ms, func, *args, **kwargs):
+        deadline = self.now_ms + ms
+        heappush(self.scheduler, (deadline, self.schedule_id, func, args, kwargs))
+        self.schedule_id += 1
+
+    def check_schedule(self):
+        if self.scheduler:
+            now = self.now_ms
+            while self.scheduler:
+                entry = heappop(self.scheduler)
+                nearest_deadline, sched_id, func, args, kwargs = entry
+                if now - nearest_deadline > 0:
+                    print('calling scheduled func with id #', sched_id)
+                    func(*args, **kwargs)
+                else:
+                    heappush(self.scheduler, entry)
+                    break
+
+    def start_cooldown(self, button_id, ms=250):
+        self.cooldowns[button_id] = self.now_ms + ms
+
+    def check_cooldowns(self):
+        to_free = []
+        for button_id, deadline_ms in self.cooldowns.items():
+            if self.now_ms - deadline_ms > 0:
+                to_free.append(button_id)
+        for button_id in to_free:
+            self.cooldowns.pop(button_id)
+
+
+class WheelScheduler:
+    """The same bookkeeping on a TimerWheel (as ``Program`` does it)."""
+    def __init__(self):
+        self.timers = TimerWheel()
+        self.cooldowns = {}
+        self.now_ms = 0.0
+
+    def after(self, ms, func, *args, **kwargs):
+        return self.timers.call_at(self.now_ms + ms, func, *args, **kwargs)
+
+    def check_schedule(self):
+        if self.timers.count:
+            self.timers.run_due(self.now_ms)
+
+    def start_cooldown(self, button_id, ms=250):
+        running = self.cooldowns.get(button_id)
+        if running is not None:
+            running.cancel()
+        self.cooldowns[button_id] = self.after(ms, self.cooldowns.pop, button_id, None)
+
+    def check_cooldowns(self):
+        pass
+
+
+def noop(*args):
+    pass
+
+
+SPAN_MS = FRAMES * FRAME_MS  # the timed stretch; the standing load is due after it
+
+
+def loaded(cls, seed):
+    """A scheduler holding PENDING callbacks and COOLDOWNS cooldowns."""
+    rng = random.Random(seed)
+    sched = cls()
+    for _ in range(PENDING):
+        sched.after(rng.uniform(SPAN_MS + 1000, SPAN_MS + 600_000), noop)
+    for button_id in range(COOLDOWNS):
+        sched.start_cooldown(button_id, ms=rng.uniform(SPAN_MS + 1000, SPAN_MS + 60_000))
+    return sched, rng
+
+
+def frames(sched, rng, busy):
+    """FRAMES frames; ``busy`` frames also schedule and supersede callbacks."""
+    handles = []
+    for _ in range(FRAMES):
+        sched.now_ms += FRAME_MS
+        sched.check_cooldowns()
+        sched.check_schedule()
+        if busy:
+            for _ in range(4):
+                handle = sched.after(rng.uniform(0, 2000), noop)
+                if handle is not None:
+                    handles.append(handle)
+            if len(handles) > 2:  # supersede one (the heap keeps it as a no-op)
+                handles.pop(0).cancel()
+
+
+def schedule(sched, rng):
+    """FRAMES callbacks scheduled, each cancelled at once (where it can be)."""
+    for _ in range(FRAMES):
+        handle = sched.after(rng.uniform(0, 60_000), noop)
+        if handle is not None:
+            handle.cancel()
+
+
+def best_ns(cls, work, **kwargs):
+    """Best of 5 ns per frame of ``work`` on a freshly loaded ``cls``."""
+    best = float('inf')
+    for seed in range(5):
+        sched, rng = loaded(cls, seed)
+        with open(os.devnull, 'w') as null, contextlib.redirect_stdout(null):
+            t0 = time.perf_counter()
+            work(sched, rng, **kwargs)
+            best = min(best, time.perf_counter() - t0)
+    return best * 1e9 / FRAMES
+
+
+def main():
+    results = {}
+    for name, cls in (("heap", LegacyScheduler), ("wheel", WheelScheduler)):
+        idle = best_ns(cls, frames, busy=False)
+        busy = best_ns(cls, frames, busy=True)
+        ops = best_ns(cls, schedule)
+        results[name] = idle, busy, ops
+        print(f"{name:5s}: idle frame {idle:7.0f} ns   busy frame {busy:7.0f} ns   "
+              f"schedule(+cancel) {ops:5.0f} ns   ({PENDING} pending, {COOLDOWNS} cooldowns)")
+    heap, wheel = results["heap"], results["wheel"]
+    print(f"wheel vs heap: idle {heap[0] / wheel[0]:.1f}x   busy {heap[1] / wheel[1]:.1f}x")
+    return 0 if wheel[0] < heap[0] and wheel[1] < heap[1] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
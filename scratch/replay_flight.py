@@ -0,0 +1,38 @@
+"""Replay a flight-recorder session headless and check it against the recording.
+
+Loads the newest session in the recorder ring (``config.RECORDER_DIR``, or the
+directory given), runs it through a real ``Game`` at full speed with
+:class:`src.flight_recorder.Replay`, and prints how fast it ran and whether
+the output words matched. Exits non-zero on a divergence, so a recording of
+a real session doubles as a regression check. Pass a single ``.lbr`` segment
+to replay just that segment. Run from repo root:
+
+    SDL_AUDIODRIVER=dummy SDL_VIDEODRIVER=dummy python3 scratch/replay_flight.py [DIR|SEGMENT]
+"""
+import os
+import sys
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+target = sys.argv[1] if len(sys.argv) > 1 else None
+sys.argv = [sys.argv[0], "-s"]  # '-s' => skip RPi.GPIO import
+
+from src.audio_utils import Mixer
+from src.flight_recorder import Replay, read_segment
+
+
+def main():
+    if target is not None and os.path.isfile(target):
+        replay = Replay(read_segment(target)[3])
+    else:
+        replay = Replay.from_dir(target)
+    mixer = Mixer()
+    mixer.play_effect = lambda name, **k: None  # full speed: no point in sound
+    result = replay.run(mixer=mixer)
+    print(result.report())
+    return 0 if result.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""Tests for adaptive (deadline-driven) pacing of the main loop.
+
+Pins the two promises the idle mode makes:
+
+* it actually idles -- sitting in GameSelect with nothing pending wakes the loop
+  at ``IDLE_POLL_HZ``, not ``FPS``, and an input edge snaps it back to full rate;
+* deadline semantics are **identical** to the fixed-rate loop -- an armed slot
+  expires at exactly the same ``now_ms`` either way, because idle wakes stay on
+  the same frame grid and land on the first frame past the deadline.
+
+Drives the real ``Game`` + ``GameClock`` off a deterministic ``FakeClock`` using
+the same update/render/tick sequence as ``Game.run``. Run from repo root:
+
+    SDL_AUDIODRIVER=dummy SDL_VIDEODRIVER=dummy python3 scratch/test_adaptive_pacing.py
+"""
+import os
+import sys
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], "-s"]
+
+from src import clock
+from src.game_loop import Game, GameClock
+from src.audio_utils import Mixer
+from src.event_loop import events
+from src.config import config
+
+
+class ScriptedPISO:
+    def __init__(self):
+        self.word = 0
+    def read_word(self):
+        return self.word
+
+
+class DummySIPO:
+    def __init__(self):
+        self.last = 0
+    def push_word(self, word):
+        self.last = word
+
+
+class FakeClock:
+    def __init__(self, t=1000.0):
+        self.t = t
+    def monotonic(self):
+        return self.t
+    def sleep(self, secs):
+        if secs > 0:
+            self.t += secs
+
+
+passed = []
+def check(label, cond):
+    passed.append(bool(cond))
+    print(("PASS" if cond else "FAIL"), "-", label)
+
+
+class Loop:
+    """``Game.run``'s frame sequence, steppable one wake at a time."""
+    def __init__(self, game):
+        self.game = game
+        game.clock = GameClock(config.FPS)
+        self.dt = 1000.0 / config.FPS
+        self.wakes = 0
+
+    def wake(self):
+        game = self.game
+        game.update(self.dt)
+        game.render()
+        self.dt = game.clock.tick(game.frames_until_wake())
+        self.wakes += 1
+
+
+def arm_and_wait(adaptive):
+    """Arm slot 0, release, then run until it expires. Returns (now_ms, wakes)."""
+    saved = config.ADAPTIVE_PACING
+    config.ADAPTIVE_PACING = adaptive
+    fake = FakeClock()
+    restore = clock.set_source(fake.monotonic, fake.sleep)
+    try:
+        game = Game(PISOreg=ScriptedPISO(), SIPOreg=DummySIPO(),
+                    mixer=Mixer(), events=events)
+        gs = game.state_machine.program
+        loop = Loop(game)
+        game.input_manager.register.word = 1 << 0
+        loop.wake()
+        game.input_manager.register.word = 0
+        armed_at = gs.arm_deadline
+        loop.wakes = 0
+        while gs.armed is not None and loop.wakes < 100000:
+            loop.wake()
+        return game.now_ms, armed_at, loop.wakes
+    finally:
+        restore()
+        config.ADAPTIVE_PACING = saved
+
+
+def test_tick_stays_on_the_frame_grid():
+    fake = FakeClock()
+    restore = clock.set_source(fake.monotonic, fake.sleep)
+    try:
+        gc = GameClock(100)
+        start = fake.t
+        gc.tick()
+        dt = gc.tick(frames=5)
+        check("a 5-frame idle tick reports ~50ms, not a clamped 10ms",
+              abs(dt - 50.0) < 1e-6)
+        check("idle tick wakes on the 10ms grid", abs((fake.t - start) - 0.060) < 1e-9)
+        check("an intended idle sleep is not a resync", gc.resyncs == 0)
+        dt = gc.tick()
+        check("full rate resumes on the next grid slot", abs(dt - 10.0) < 1e-6)
+    finally:
+        restore()
+
+
+def test_deadlines_identical_in_both_modes():
+    fixed_now, fixed_deadline, fixed_wakes = arm_and_wait(adaptive=False)
+    idle_now, idle_deadline, idle_wakes = arm_and_wait(adaptive=True)
+    check("both runs armed with the same deadline", abs(fixed_deadline - idle_deadline) < 1e-6)
+    check("arm expires at the same now_ms with adaptive pacing "
+          f"({fixed_now:.1f} vs {idle_now:.1f})", abs(fixed_now - idle_now) < 1e-6)
+    check("expiry is the first frame past the deadline", 0 < idle_now - idle_deadline <= 10.0 + 1e-6)
+    check(f"idle loop woke far less often ({idle_wakes} vs {fixed_wakes})",
+          idle_wakes * 3 < fixed_wakes)
+
+
+def test_input_edge_restores_full_rate():
+    fake = FakeClock()
+    restore = clock.set_source(fake.monotonic, fake.sleep)
+    try:
+        game = Game(PISOreg=ScriptedPISO(), SIPOreg=DummySIPO(),
+                    mixer=Mixer(), events=events)
+        loop = Loop(game)
+        for _ in range(400):  # settle past the boot-time busy window
+            loop.wake()
+        check("idle menu sleeps through frames",
+              game.frames_until_wake() == config.FPS // config.IDLE_POLL_HZ)
+        game.input_manager.register.word = 1 << 9  # an unassigned button
+        loop.wake()
+        check("an input edge snaps back to full rate", game.frames_until_wake() == 1)
+        game.input_manager.register.word = 0
+        loop.wake()
+        check("full rate holds through the busy window", game.frames_until_wake() == 1)
+    finally:
+        restore()
+
+
+def main():
+    test_tick_stays_on_the_frame_grid()
+    test_deadlines_identical_in_both_modes()
+    test_input_edge_restores_full_rate()
+
+    print()
+    if all(passed):
+        print(f"ALL {len(passed)} CHECKS PASSED")
+        return 0
+    print(f"{passed.count(False)} / {len(passed)} CHECKS FAILED")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,293 @@
+"""Tests for background sound loading.
+
+Covers :class:`src.asset_loader.AssetLoader` and the ``Mixer`` calls on it:
+
+* a load never blocks the caller; at most ``max_in_flight`` run at once and the
+  rest queue in order; a second request for a key joins the first;
+* results and errors are collected, and callbacks run, on the polling thread;
+  a bounded wait gives up in time, and a queued load waited for starts at once;
+* ``prefetch`` fills the cache on a later frame, pinned and at its volume
+  (unpinned if the program has switched meanwhile); a missing file is logged
+  and forgotten;
+* ``play_effect`` waits for an unloaded sound at most ``LOAD_WAIT_MS`` and
+  skips it if it is not ready; ``load_effect`` joins a pending load;
+* music lengths are measured on the loader and remembered;
+* ``use_patch`` keeps the current patch until a new one has loaded, and a
+  patch superseded meanwhile does not take over when it lands;
+* programs decode only what plays at once in ``start()``; WhackAMole's and
+  GameSelect's other sounds and Trivia's voice lines load in the background,
+  and ClueFinder's word banks are ready before a toggle switches to one.
+
+Run from repo root:
+
+    SDL_AUDIODRIVER=dummy SDL_VIDEODRIVER=dummy python3 scratch/test_asset_loader.py
+"""
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], "-s"]
+
+import pygame
+
+from src.asset_loader import AssetLoader
+from src.audio_utils import Mixer
+from src.config import config
+
+
+class ScriptedPISO:
+    def read_word(self):
+        return 0
+
+
+class NullSIPO:
+    def push_word(self, word):
+        pass
+
+
+passed = []
+def check(label, cond):
+    passed.append(bool(cond))
+    print(("PASS" if cond else "FAIL"), "-", label)
+
+
+def tone(ms):
+    """A silent mono 16-bit Sound lasting ``ms`` at 22050 Hz."""
+    return pygame.mixer.Sound(buffer=b"\0\0" * int(22050 * ms / 1000))
+
+
+def gated(gate, value):
+    """A load function that holds its worker until ``gate`` is set."""
+    def fn():
+        gate.wait(5)
+        return value
+    return fn
+
+
+def test_loader():
+    loader = AssetLoader(workers=2, max_in_flight=2)
+    gate = threading.Event()
+    done = []
+    t0 = time.monotonic()
+    loads = [loader.load(key, gated(gate, key.upper()), on_done=done.append) for key in "abcd"]
+    check("requesting loads does not block", time.monotonic() - t0 < 0.1)
+    check("at most max_in_flight run; the rest queue in order",
+          [load.key for load in loader.in_flight] == ["a", "b"]
+          and [load.key for load in loader.queued] == ["c", "d"])
+    check("a second request for a key joins the first",
+          loader.load("a", gated(gate, "other")) is loads[0] and len(loader) == 4)
+
+    t0 = time.monotonic()
+    ready = loader.wait(loads[3], timeout_ms=30)
+    waited = time.monotonic() - t0
+    check(f"a bounded wait gives up in time ({waited:.3f}s)", not ready and waited < 0.5)
+    check("and a queued load waited for starts past the cap",
+          loads[3].started and len(loader.in_flight) == 3 and not loads[2].started)
+
+    gate.set()
+    check("wait_all collects everything", loader.wait_all(timeout_ms=2000) and not loader.in_flight)
+    check("callbacks run once each, with the values",
+          sorted(load.value for load in done) == ["A", "B", "C", "D"])
+    check("callbacks run on the polling thread", all(load.done for load in loads))
+
+    def boom():
+        raise FileNotFoundError("nope")
+    failed = loader.load("x", boom)
+    loader.wait(failed)
+    check("a load that raises is done with its error",
+          failed.done and isinstance(failed.error, FileNotFoundError) and loader.failed == 1)
+
+    gate = threading.Event()
+    dropped = []
+    loader.load("y", gated(gate, 1), on_done=dropped.append)
+    loader.cancel_all()
+    gate.set()
+    loader.wait_all(timeout_ms=2000)
+    check("cancel_all runs no callbacks", not dropped and not loader.loads)
+
+    gate = threading.Event()
+    loader.load("z", gated(gate, 1))
+    loader.load("zz", gated(gate, 2))
+    queued = loader.load("zzz", gated(gate, 3))
+    loader.cancel_all()
+    t0 = time.monotonic()
+    check("waiting on a load cancelled while queued returns False at once",
+          not loader.wait(queued) and queued.cancelled and not queued.done
+          and time.monotonic() - t0 < 0.1)
+    gate.set()
+    loader.wait_all(timeout_ms=2000)
+    loader.shutdown()
+
+
+def settle(mixer, secs=2.0):
+    """Step the mixer (real time) until no load is pending."""
+    stop = time.monotonic() + secs
+    while mixer.loader.loads and time.monotonic() < stop:
+        time.sleep(0.005)
+        mixer.update(5)
+
+
+def test_mixer():
+    mixer = Mixer()
+    cache = mixer.effects
+    names = [config.Catch.ZAP_SOUND, config.Catch.INTRO_SOUND]
+    loads = mixer.prefetch(names, volume=0.5)
+    check("prefetch returns a handle per uncached effect and caches nothing yet",
+          len(loads) == 2 and not any(n in cache for n in names)
+          and all(mixer.has_effect(n) for n in names))
+    settle(mixer)
+    check("a later frame caches them, pinned and at their volume",
+          all(n in cache and n in cache.pinned for n in names)
+          and abs(cache[names[0]].get_volume() - 0.5) < 0.01)
+    check("prefetching cached effects starts nothing", mixer.prefetch(names) == [])
+
+    late = config.Catch.MISS_SOUND
+    mixer.prefetch([late])
+    mixer.release_program_sounds()          # a program switch while it loads
+    settle(mixer)
+    check("a load that lands after a switch is cached unpinned",
+          late in cache and late not in cache.pinned)
+
+    mixer.prefetch(["no/such.wav"])
+    settle(mixer)
+    check("a missing file is logged and forgotten",
+          not mixer.has_effect("no/such.wav") and mixer.play_effect("no/such.wav") is None)
+
+    gate = threading.Event()
+    slow = "slow.wav"
+    mixer.loader.load(slow, gated(gate, tone(100)),
+                      on_done=lambda load: mixer._effect_loaded(load, None, False))
+    t0 = time.monotonic()
+    skipped = mixer.play_effect(slow)
+    waited = time.monotonic() - t0
+    check(f"a play waits at most LOAD_WAIT_MS for its sound, then skips ({waited:.3f}s)",
+          skipped is None and waited < config.LOAD_WAIT_MS / 1000 + 0.2)
+    gate.set()
+    settle(mixer)
+    playback = mixer.play_effect(slow)
+    check("once it has loaded it plays", playback is not None and slow in cache)
+    mixer.stop_all()
+
+    gate = threading.Event()
+    sound = tone(100)
+    mixer.loader.load("joined.wav", gated(gate, sound),
+                      on_done=lambda load: mixer._effect_loaded(load, None, False))
+    threading.Timer(0.05, gate.set).start()
+    check("load_effect joins a pending load instead of decoding again",
+          mixer.load_effect("joined.wav") is sound and "joined.wav" in cache.pinned)
+
+    song = "GolfSong.wav"
+    measure = mixer.measure_music(song)
+    check("a music length is measured in the background", measure is not None and not measure.done)
+    secs = mixer.music_length(song)
+    check("then read and remembered", secs is not None and secs > 0
+          and mixer.measure_music(song) is None and mixer.music_length(song, wait_ms=0) == secs)
+    mixer.loader.shutdown()
+
+
+def test_patches():
+    mixer = Mixer()
+    numbers = mixer.patch
+    check("the first patch is loaded before the mixer is used",
+          numbers is not None and len(numbers) == 14)
+    t0 = time.monotonic()
+    mixer.use_patch("verbs")
+    check("use_patch returns at once; the current patch stays until the new one loads",
+          time.monotonic() - t0 < 0.05 and mixer.patch is numbers
+          and mixer.has_effect(("patch", "verbs")))
+    settle(mixer)
+    verbs = mixer.patch
+    check("then the loaded patch is active, pinned",
+          verbs is not numbers and len(verbs) == 14 and ("patch", "verbs") in mixer.effects.pinned)
+
+    mixer.use_patch("nouns")
+    mixer.use_patch("numbers")                 # cached: switches back at once
+    check("a cached patch switches at once", mixer.patch is numbers)
+    settle(mixer)
+    check("a patch superseded while loading is cached but does not take over",
+          mixer.patch is numbers and ("patch", "nouns") in mixer.effects)
+
+    mixer.use_patch("no_such_patch")
+    settle(mixer)
+    check("a patch that cannot load is logged; the current one stays", mixer.patch is numbers)
+    mixer.loader.shutdown()
+
+
+def test_programs():
+    from src.game_loop import Game
+    from src.event_loop import events
+    from src.programs.trivia_voice import PrebakedVoice
+
+    config.DEBOUNCE_RELEASE_MS = 0
+    game = Game(PISOreg=ScriptedPISO(), SIPOreg=NullSIPO(), mixer=Mixer(), events=events)
+    mixer = game.mixer
+    game.state_machine.launch_single_program("WhackAMole")
+    prog = game.state_machine.program
+    spoken = [prog.you_hit, prog.and_got, prog._num_clip(7)]
+    effects = [prog.hammer, prog.mole_hit, prog.popup, prog.congrats]
+    check("WhackAMole starts with only its welcome decoded, the rest loading",
+          prog.welcome in mixer.effects and all(mixer.has_effect(n) for n in spoken + effects)
+          and not any(n in mixer.effects for n in spoken + effects))
+    stop = time.monotonic() + 2
+    while mixer.loader.loads and time.monotonic() < stop:
+        time.sleep(0.005)
+        game.update(5)
+    check("the frames collect them into the cache, pinned and at their volume",
+          all(n in mixer.effects and n in mixer.effects.pinned for n in spoken + effects)
+          and abs(mixer.effects[prog.hammer].get_volume() - 0.7) < 0.01)
+    check("the celebration's length is read from the cached clip",
+          prog._congrats_dur is None and mixer.effect_length(prog.congrats, wait_ms=0) > 1)
+
+    game.state_machine.enter_game_select()
+    menu = game.state_machine.program
+    announcements = [menu._effect_path(a) for _, a in menu.menu.values()]
+    check("GameSelect decodes only its prompt on entry; announcements load behind it",
+          menu.choose_sound in mixer.effects and all(mixer.has_effect(n) for n in announcements))
+
+    game.state_machine.launch_single_program("ClueFinder")
+    stop = time.monotonic() + 2
+    while mixer.loader.loads and time.monotonic() < stop:
+        time.sleep(0.005)
+        game.update(5)
+    banks = [("patch", name) for name in game.state_machine.program.patch_map.values()]
+    check("ClueFinder's word banks all load in the background, pinned",
+          all(key in mixer.effects and key in mixer.effects.pinned for key in banks))
+    misses = mixer.effects.misses
+    mixer.use_patch("adverbs")                  # what a toggle flip does mid-play
+    check("so a toggle switch finds its bank cached",
+          mixer.patch is mixer.effects[("patch", "adverbs")] and mixer.effects.misses == misses)
+
+    game.state_machine.enter_game_select()
+    voice = PrebakedVoice(mixer, lambda ms, fn: None)
+    line = os.path.join(config.Trivia.EFFECT_DIR, PrebakedVoice.STATIC["lets_begin"])
+    check("PrebakedVoice starts its static lines loading", mixer.has_effect(line))
+    clips = voice._sounds(["q/zz/question.wav", PrebakedVoice.STATIC["wins"]])
+    check("an utterance's clips load in the background, resolved at their turn",
+          all(callable(c) for c in clips) and mixer.has_effect(
+              os.path.join(config.Trivia.EFFECT_DIR, PrebakedVoice.STATIC["wins"])))
+    check("a missing clip resolves to None", clips[0]() is None)
+    voice.release()
+    game.cleanup()
+    check("cleanup stops the loader's workers", mixer.loader._pool is None)
+
+
+def main():
+    test_loader()
+    test_mixer()
+    test_patches()
+    test_programs()
+
+    print()
+    if all(passed):
+        print(f"ALL {len(passed)} CHECKS PASSED")
+        return 0
+    print(f"{passed.count(False)} / {len(passed)} CHECKS FAILED")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""Tests for the BAM brightness engine and the LaserBay level/fade API.
+
+Covers :mod:`src.bam` and :class:`src.game_loop.LaserBay`:
+
+* the precomputed slot table lights every port for exactly
+  ``level / max_level`` of each period (4 and 8 bits), keeps unlit ports dark
+  and the spare bits solid, and collapses to one slot when nothing is dimmed;
+* the engine rejects bit depths outside 4..8, and its thread shows each level
+  at about the right duty (timed against the real clock, loose bounds) and
+  pushes only once while nothing is dimmed;
+* ``LaserBay`` levels clamp, fades step linearly with ``dt`` and end on
+  their target, and ``Game.render`` forwards levels only when they changed.
+
+Run from repo root:
+
+    SDL_AUDIODRIVER=dummy SDL_VIDEODRIVER=dummy python3 scratch/test_bam.py
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], "-s"]
+
+from src import clock
+from src.bam import BamEngine, slot_table
+from src.game_loop import Game
+from src.audio_utils import Mixer
+from src.event_loop import events
+
+
+class TimedSIPO:
+    """Output register that stamps every push."""
+    def __init__(self):
+        self.pushes = []
+    def push_word(self, word):
+        self.pushes.append((clock.monotonic_ns(), word))
+
+
+class LevelSIPO:
+    """Output register that also takes levels, like a BAM engine."""
+    def __init__(self):
+        self.levels = []
+    def push_word(self, word):
+        pass
+    def set_levels(self, levels):
+        self.levels.append(list(levels))
+
+
+passed = []
+def check(label, cond):
+    passed.append(bool(cond))
+    print(("PASS" if cond else "FAIL"), "-", label)
+
+
+def on_fraction(table, port):
+    period = sum(d for _, d in table)
+    return sum(d for w, d in table if w >> port & 1) / period
+
+
+def test_slot_table():
+    ok = True
+    for bits in (4, 8):
+        top = (1 << bits) - 1
+        for level in range(top + 1):
+            levels = [level] + [top - level] * 13
+            table = slot_table(0x3FFF, levels, bits, 10_000_000)
+            ok = ok and abs(sum(d for _, d in table) - 10_000_000) <= len(table)
+            ok = ok and abs(on_fraction(table, 0) - level / top) < 1e-6
+            ok = ok and abs(on_fraction(table, 5) - (top - level) / top) < 1e-6
+    check("each port is lit level/max of the period (4 and 8 bits)", ok)
+    table = slot_table(0b11 << 14 | 0b1, [7] * 14, 4, 10_000_000)
+    check("unlit ports stay dark, spare bits stay solid",
+          all(w >> 1 & 1 == 0 and w >> 14 == 0b11 for w, _ in table))
+    check("nothing dimmed: one slot", len(slot_table(0x1234, [15] * 14, 4, 10_000_000)) == 1
+          and len(slot_table(0, [5] * 14, 4, 10_000_000)) == 1)
+    check("a table has at most one push per bit",
+          max(len(slot_table(0x3FFF, list(range(14)), 4, 10_000_000)),
+              len(slot_table(0x3FFF, [i * 18 for i in range(14)], 8, 10_000_000))) <= 8)
+
+
+def test_engine():
+    raised = 0
+    for bits in (3, 9):
+        try:
+            BamEngine(TimedSIPO(), bits=bits)
+        except ValueError:
+            raised += 1
+    check("bit depths outside 4..8 are rejected", raised == 2)
+
+    sipo = TimedSIPO()
+    bam = BamEngine(sipo, bits=4, refresh_hz=100)
+    bam.set_levels([15, 8, 2] + [15] * 11)
+    bam.push_word(0b111)
+    bam.start()
+    try:
+        time.sleep(0.3)
+    finally:
+        bam.stop()
+    pushes = sipo.pushes[2:]
+    span = pushes[-1][0] - pushes[0][0]
+    duty = [sum(t2 - t1 for (t1, w), (t2, _) in zip(pushes, pushes[1:]) if w >> p & 1) / span
+            for p in range(3)]
+    print("  duty at levels 15, 8, 2:", [round(d, 2) for d in duty], f"({bam.cycles} periods)")
+    check("the thread shows each level at about its duty",
+          bam.cycles > 10 and duty[0] > 0.95 and abs(duty[1] - 8 / 15) < 0.15
+          and abs(duty[2] - 2 / 15) < 0.1)
+
+    sipo = TimedSIPO()
+    bam = BamEngine(sipo, bits=4, refresh_hz=1000)
+    bam.push_word(0b101)
+    bam.start()
+    try:
+        time.sleep(0.05)
+    finally:
+        bam.stop()
+    check("nothing dimmed: pushed once, then idle",
+          [w for _, w in sipo.pushes] == [0, 0b101, 0b101])
+
+
+def test_laserbay_and_render():
+    sipo = LevelSIPO()
+    game = Game(PISOreg=type("P", (), {"read_word": lambda self: 0})(), SIPOreg=sipo,
+                mixer=Mixer(), events=events)
+    bay = game.lasers
+    top = bay.max_level
+    check("levels start full", bay.levels() == [top] * 14)
+    bay.set_level(2, 99)
+    bay.set_level(3, -4)
+    check("levels clamp to 0..max", bay.level(2) == top and bay.level(3) == 0)
+    bay.set_level(3, top)
+    bay.fade(4, 0, 100)
+    seen = []
+    for _ in range(5):
+        bay.step_fades(25)
+        seen.append(bay.level(4))
+    check("a fade steps linearly and ends on its target",
+          seen == [round(top * 0.75), round(top * 0.5), round(top * 0.25), 0, 0] and not bay.fades)
+    bay.fade(5, 0, 100)
+    bay.step_fades(10)
+    bay.set_level(5, 7)
+    bay.step_fades(10)
+    check("set_level cancels a fade", bay.level(5) == 7 and not bay.fades)
+
+    del sipo.levels[:]
+    game.render()
+    game.render()
+    bay.set_level(6, 1)
+    game.render()
+    check("render forwards levels only when they change",
+          len(sipo.levels) == 2 and sipo.levels[-1][6] == 1)
+    bay.fade(6, top, 50)
+    game.update(10.0)
+    game.render()
+    check("Game.update advances fades", 1 < sipo.levels[-1][6] < top)
+
+
+def main():
+    test_slot_table()
+    test_engine()
+    test_laserbay_and_render()
+
+    print()
+    if all(passed):
+        print(f"ALL {len(passed)} CHECKS PASSED")
+        return 0
+    print(f"{passed.count(False)} / {len(passed)} CHECKS FAILED")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
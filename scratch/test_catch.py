@@ -22,6 +22,9 @@ from src.audio_utils import Mixer
 from src.event_loop import events
 from src.config import config
 
+# Scripted inputs are clean edges a frame apart: no contact bounce to filter.
+config.DEBOUNCE_RELEASE_MS = 0
+
 
 class ScriptedPISO:
     def __init__(self):
@@ -73,8 +76,8 @@ def main():
         """Force a clean CHASE at ``level`` with the blip parked at ``blip``."""
         step(0)  # release any held button so the next press is a real edge
         p = prog()
-        p.scheduler = []          # drop any pending scheduled transition
-        p.state = p.CHASE
+        p.timers.clear()          # drop any pending scheduled transition
+        p._start_chase()          # a fresh chase: earlier output is not judged
         p.level_index = level
         p.target = target     # pin the re-rolled target so the scripted press lands
         p.blip = blip
@@ -0,0 +1,159 @@
+"""Tests for the layered laser compositor.
+
+Covers :class:`src.animation.Compositor` and its use by animations and the menu:
+
+* each blend mode (replace, OR, XOR, AND-NOT) acts only inside its layer's
+  mask, and layers stack in ``z`` order (ties in the order added);
+* a dance plays over the program's base word without writing it, and the
+  base shows again, as the program left it, when the dance ends or is killed;
+* two animations on disjoint masks share the bay;
+* ``Game.render`` pushes the composed word;
+* GameSelect's volume bar is an overlay: the armed slot's laser is still
+  beneath it and shows again when the bar times out.
+
+Run from repo root:
+
+    SDL_AUDIODRIVER=dummy SDL_VIDEODRIVER=dummy python3 scratch/test_compositor.py
+"""
+import os
+import sys
+import tempfile
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], "-s"]
+
+from src.animation import Animation, Blend, Compositor, Layer, Timeline
+from src.config import config
+
+config.DEBOUNCE_RELEASE_MS = 0
+
+
+class ScriptedPISO:
+    def __init__(self):
+        self.word = 0
+    def read_word(self):
+        return self.word
+
+
+class DummySIPO:
+    def __init__(self):
+        self.last = None
+    def push_word(self, word):
+        self.last = word
+
+
+passed = []
+def check(label, cond):
+    passed.append(bool(cond))
+    print(("PASS" if cond else "FAIL"), "-", label)
+
+
+def layer(word, mask=None, blend=Blend.REPLACE, z=0):
+    lay = Layer(mask=mask, blend=blend, z=z)
+    lay.word = word
+    return lay
+
+
+def test_blends():
+    base = 0b1100
+    got = {}
+    for blend in (Blend.REPLACE, Blend.OR, Blend.XOR, Blend.AND_NOT):
+        comp = Compositor()
+        comp.add(layer(0b1010, mask=0b0111, blend=blend))
+        got[blend] = comp.compose(base)
+    check("each blend acts only inside the mask", got == {
+        Blend.REPLACE: 0b1010, Blend.OR: 0b1110, Blend.XOR: 0b1110, Blend.AND_NOT: 0b1100})
+    check("no layers: the base as-is", Compositor().compose(base) == base)
+
+    comp = Compositor()
+    top = layer(0b0001, z=1)
+    comp.add(top)
+    comp.add(layer(0b0010))
+    comp.add(layer(0b0100, blend=Blend.OR, z=1))
+    check("layers stack by z, ties in the order added", comp.compose(0) == 0b0101)
+    comp.remove(top)
+    comp.remove(top)
+    check("removing a layer (twice) uncovers what was beneath", comp.compose(0) == 0b0110
+          and not top.active and len(comp.layers) == 2)
+
+
+def new_game():
+    from src.game_loop import Game
+    from src.audio_utils import Mixer
+    from src.event_loop import events
+    config.Volume.STATE_PATH = os.path.join(tempfile.mkdtemp(), "system.json")
+    piso, sipo = ScriptedPISO(), DummySIPO()
+    game = Game(PISOreg=piso, SIPOreg=sipo, mixer=Mixer(), events=events)
+    dt = 1000 / config.FPS
+    def step(word=0, frames=1):
+        for _ in range(frames):
+            piso.word = word
+            game.update(dt)
+            game.render()
+    return game, sipo, step
+
+
+def test_animations(game, sipo):
+    Animation.kill_all()
+    game.lasers.set_word(0b11)
+    dance = Animation(Timeline([1 << 8, 1 << 9], [100, 100]))
+    dance.start()
+    Animation.update_all(10)
+    game.render()
+    check("a dance covers the base and render pushes the composed word",
+          sipo.last == 1 << 8 and game.lasers.to_word() == 0b11)
+    game.lasers.turn_on(5)
+    Animation.update_all(300)
+    check("when it ends, the base shows as the program left it",
+          game.laser_word() == 0b100011 and not dance.layer.active)
+
+    sweep = Animation(Timeline([1, 2], [100, 100]), loops=-1, layer=Layer(mask=0b11))
+    blink = Animation(Timeline([1 << 4, 0], [100, 100]), loops=-1,
+                      layer=Layer(mask=1 << 4, blend=Blend.XOR))
+    sweep.start()
+    blink.start()
+    Animation.update_all(10)
+    check("two animations share the bay on their own masks",
+          game.laser_word() == 0b110001)
+    sweep.kill()
+    blink.kill()
+    check("killed animations leave the base", game.laser_word() == 0b100011
+          and not game.compositor.layers)
+    game.lasers.set_word(0)
+
+
+def test_volume_bar(game, step):
+    gs = game.state_machine.program
+    step(1 << 0)                 # arm slot 0
+    step(0)
+    check("arming lights the slot", game.laser_word() == 1 << 0)
+    step(1 << 11)                # volume up: the bar overlays the arm display
+    step(0)
+    check("the volume bar covers the arm display, which is still beneath",
+          game.laser_word() == gs._volume_bar_word() and game.lasers.to_word() == 1 << 0)
+    step(0, frames=int(config.GameSelect.VOLUME_BAR_MS / (1000 / config.FPS)) + 2)
+    check("when the bar times out the armed slot shows again",
+          game.laser_word() == 1 << 0 and gs.armed == 0 and not game.compositor.layers)
+
+
+def main():
+    test_blends()
+    game, sipo, step = new_game()
+    try:
+        test_animations(game, sipo)
+        test_volume_bar(game, step)
+    finally:
+        Animation.kill_all()
+
+    print()
+    if all(passed):
+        print(f"ALL {len(passed)} CHECKS PASSED")
+        return 0
+    print(f"{passed.count(False)} / {len(passed)} CHECKS FAILED")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
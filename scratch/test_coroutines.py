@@ -0,0 +1,251 @@
+"""Tests for program coroutines on the game clock.
+
+Covers :mod:`src.coroutines` and the ``Program`` helpers built on it:
+
+* a spawned coroutine starts at the end of the frame; ``await sleep(ms)`` ends
+  on the frame an ``after(ms, ...)`` callback runs; a signal resolved before it
+  is awaited does not give up the frame, and one resolved later passes its value;
+* ``await press(...)`` takes only its buttons, times out to None, and judges a
+  late-handled press by when it happened, like the programs' own deadlines;
+* cancelling a task (or tearing the program down, even from inside the task)
+  runs its ``finally`` blocks and drops its timers and press waits;
+* awaiting anything but a sleep, press or signal is an error;
+* the same script over the same frames under the fake ``clock`` source gives
+  the same trace.
+
+Run from repo root:
+
+    SDL_AUDIODRIVER=dummy SDL_VIDEODRIVER=dummy python3 scratch/test_coroutines.py
+"""
+import asyncio
+import os
+import sys
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], "-s"]
+
+from src import clock
+from src.coroutines import TaskRunner
+from src.game_loop import Game
+from src.audio_utils import Mixer
+from src.event_loop import events, ButtonDownEvent
+from src.config import config
+
+
+class ScriptedPISO:
+    def read_word(self):
+        return 0
+
+
+class NullSIPO:
+    def push_word(self, word):
+        pass
+
+
+class FakeClock:
+    def __init__(self, t=1000.0):
+        self.t = t
+    def monotonic(self):
+        return self.t
+    def sleep(self, secs):
+        if secs > 0:
+            self.t += secs
+
+
+passed = []
+def check(label, cond):
+    passed.append(bool(cond))
+    print(("PASS" if cond else "FAIL"), "-", label)
+
+
+def new_game():
+    """A real Game, its GameSelect program with nothing pending, and a frame stepper."""
+    config.DEBOUNCE_RELEASE_MS = 0
+    game = Game(PISOreg=ScriptedPISO(), SIPOreg=NullSIPO(), mixer=Mixer(), events=events)
+    prog = game.state_machine.program
+    prog.teardown()
+    return game, prog, game.update
+
+
+def test_sleep_and_signal():
+    game, prog, step = new_game()
+    trace, ref = [], []
+
+    async def script():
+        trace.append(("start", prog.now_ms))
+        prog.after(100, lambda: ref.append(prog.now_ms))
+        await prog.sleep(100)
+        trace.append(("slept", prog.now_ms))
+        ready = prog.signal()
+        ready("now")
+        trace.append(("ready", await ready, prog.now_ms))
+        later = prog.signal()
+        prog.after(50, later, "later")
+        trace.append(("later", await later, prog.now_ms))
+
+    task = prog.spawn(script())
+    check("a spawned coroutine waits for the frame's driver", trace == [] and not task.done)
+    for _ in range(8):
+        step(30)
+    check("it starts at the end of the next frame", trace[0] == ("start", 30))
+    check("a sleep ends on the frame an after() with the same delay runs",
+          trace[1] == ("slept", ref[0]) and ref[0] == 150)
+    check("awaiting a resolved signal does not give up the frame", trace[2] == ("ready", "now", 150))
+    check("a signal resolved later resumes with its value, on that frame",
+          trace[3] == ("later", "later", 210) and task.done and len(prog.tasks) == 0)
+
+
+def test_press():
+    runner = TaskRunner()
+    got = []
+
+    async def wait_press(keys, deadline_ms):
+        got.append(await runner.press(keys, deadline_ms))
+
+    runner.spawn(wait_press({1, 2}, 100))
+    runner.run(0)
+    other, mine = ButtonDownEvent(key=5), ButtonDownEvent(key=2)
+    taken = runner.feed(other, 10), runner.feed(mine, 50)
+    runner.run(60)
+    check("a press wait takes only its buttons", taken == (False, True) and got == [mine])
+
+    got.clear()
+    runner.spawn(wait_press(None, 100))
+    runner.run(0)
+    runner.run(100)
+    check("a deadline equal to now has not passed", got == [])
+    runner.run(100.5)
+    check("a press wait times out to None", got == [None] and not runner.presses)
+
+    got.clear()
+    runner.spawn(wait_press(None, 100))
+    runner.spawn(wait_press(None, 100))
+    runner.run(0)
+    early, late = ButtonDownEvent(key=3), ButtonDownEvent(key=4)
+    runner.feed(early, 90)      # handled on a frame past the deadline,
+    runner.run(130)             # but it happened inside the window
+    runner.spawn(wait_press(None, 100))
+    runner.run(130)
+    runner.feed(late, 110)
+    runner.run(130)
+    check("a late-handled press counts by when it happened", got == [early, early, None])
+
+    game, prog, step = new_game()
+    got.clear()
+    async def buzz():
+        got.append(await prog.press(buttons=3, timeout_ms=200))
+    prog.spawn(buzz())
+    step(10)
+    event = ButtonDownEvent(key=3, t_ns=game.frame_t_ns)
+    check("Program.feed_press hands a press to the waiting coroutine",
+          prog.feed_press(event) and got == [])
+    step(10)
+    check("which resumes at the end of the frame", got == [event] and len(prog.tasks) == 0)
+
+
+def test_cancel():
+    game, prog, step = new_game()
+    log = []
+
+    async def guarded(name, wait):
+        try:
+            await wait()
+            log.append(name + " woke")
+        finally:
+            log.append(name + " cleanup")
+
+    task = prog.spawn(guarded("a", lambda: prog.sleep(10_000)))
+    step(10)
+    task.cancel()
+    task.cancel()
+    check("cancel runs the coroutine's finally and drops its sleep",
+          log == ["a cleanup"] and task.done and len(prog.timers) == 0)
+
+    log.clear()
+    prog.spawn(guarded("b", lambda: prog.sleep(10_000)))
+    prog.spawn(guarded("c", lambda: prog.press(timeout_ms=5000)))
+    prog.spawn(guarded("d", prog.signal))
+    step(10)
+    prog.teardown()
+    step(10_000)
+    check("teardown cancels every coroutine at once",
+          sorted(log) == ["b cleanup", "c cleanup", "d cleanup"] and len(prog.tasks) == 0
+          and not prog.tasks.presses and len(prog.timers) == 0)
+
+    log.clear()
+    async def quits():
+        try:
+            prog.teardown()          # what quit() ends up doing
+            log.append("torn down")
+            await prog.sleep(10)
+            log.append("never")
+        finally:
+            log.append("cleanup")
+    task = prog.spawn(quits())
+    step(10)
+    check("a coroutine can tear its own program down", log == ["torn down", "cleanup"]
+          and task.done and len(prog.timers) == 0)
+
+    async def foreign():
+        await asyncio.sleep(0)
+    task = prog.spawn(foreign())
+    try:
+        step(10)
+        raised = False
+    except TypeError:
+        raised = True
+    check("awaiting a foreign awaitable is an error", raised and task.done)
+
+
+def run_script():
+    """A script mixing sleeps and presses over fixed frames; returns its trace."""
+    fake = FakeClock()
+    restore = clock.set_source(fake.monotonic, fake.sleep)
+    try:
+        game, prog, step = new_game()
+        trace = []
+
+        async def script():
+            for ms in (35, 70, 5):
+                await prog.sleep(ms)
+                trace.append(("slept", ms, game.now_ms))
+            event = await prog.press(buttons=(1, 2), timeout_ms=100)
+            trace.append(("press", event and event.key, game.now_ms))
+            event = await prog.press(timeout_ms=50)
+            trace.append(("press", event, game.now_ms))
+
+        prog.spawn(script())
+        for frame in range(30):
+            fake.t += 0.010
+            step(10)
+            if frame == 15:
+                prog.feed_press(ButtonDownEvent(key=2, t_ns=clock.monotonic_ns()))
+        return trace
+    finally:
+        restore()
+
+
+def test_deterministic():
+    first, second = run_script(), run_script()
+    check(f"the same frames give the same trace ({len(first)} steps)",
+          first == second and len(first) == 5)
+
+
+def main():
+    test_sleep_and_signal()
+    test_press()
+    test_cancel()
+    test_deterministic()
+
+    print()
+    if all(passed):
+        print(f"ALL {len(passed)} CHECKS PASSED")
+        return 0
+    print(f"{passed.count(False)} / {len(passed)} CHECKS FAILED")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""Tests for the per-bit input debounce.
+
+Covers :class:`src.io_managers.Debouncer` and its use by ``InputManager``:
+
+* presses are accepted on the first sample, releases only after holding open
+  for ``DEBOUNCE_RELEASE_MS``;
+* contact bounce inside a hold produces no events at all;
+* an accepted change is stamped with the time of the raw edge, not the time
+  the hold ran out;
+* per-bit overrides apply to their bit only;
+* on the sampler path a release settles on a later poll with no new samples,
+  and ``settling`` keeps the loop at full rate until it does;
+* with the configured ``DEBOUNCE_RELEASE_MS``, a bouncing button swings Golf
+  once, counts once in SimonSays and plays one MusicMaker note -- the programs
+  no longer filter bounce themselves.
+
+Run from repo root:
+
+    SDL_AUDIODRIVER=dummy SDL_VIDEODRIVER=dummy python3 scratch/test_debounce.py
+"""
+import os
+import sys
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], "-s"]
+
+from src import clock
+from src.audio_utils import Mixer
+from src.event_loop import events, EventType
+from src.input_sampler import InputSampler
+from src.io_managers import Debouncer, InputManager, _hold_ns
+
+
+class ScriptedPISO:
+    def __init__(self):
+        self.word = 0
+    def read_word(self):
+        return self.word
+
+
+class NullSIPO:
+    def push_word(self, word):
+        pass
+
+
+class FakeClock:
+    def __init__(self, t=1000.0):
+        self.t = t
+    def monotonic(self):
+        return self.t
+    def sleep(self, secs):
+        if secs > 0:
+            self.t += secs
+    def advance(self, secs):
+        self.t += secs
+
+
+passed = []
+def check(label, cond):
+    passed.append(bool(cond))
+    print(("PASS" if cond else "FAIL"), "-", label)
+
+
+MS = 1_000_000
+
+
+def seen():
+    return [(e.type, e.key) for e in events.get()]
+
+
+def test_debouncer():
+    d = Debouncer(_hold_ns(0, {}), _hold_ns(20, {}))
+    check("press accepted at once", d.feed(1 << 2, 0) == (1 << 2, 0))
+    check("release held back", d.feed(0, 5 * MS) is None and d.unsettled == 1 << 2)
+    check("bounce back closed: nothing to report, nothing unsettled",
+          d.feed(1 << 2, 7 * MS) is None and d.unsettled == 0 and d.stable == 1 << 2)
+    d.feed(0, 10 * MS)
+    check("release not yet held long enough", d.feed(0, 29 * MS) is None)
+    check("release accepted after the hold, stamped at the edge",
+          d.feed(0, 30 * MS) == (0, 10 * MS) and d.unsettled == 0)
+
+    d = Debouncer(_hold_ns(0, {}), _hold_ns(20, {3: 50}))
+    d.feed((1 << 1) | (1 << 3), 0)
+    d.feed(0, 0)
+    check("per-bit override: default bit released first",
+          d.feed(0, 20 * MS) == (1 << 3, 0))
+    check("per-bit override: overridden bit waits its own hold",
+          d.feed(0, 49 * MS) is None and d.feed(0, 50 * MS) == (0, 0))
+
+    d = Debouncer(_hold_ns(5, {}), _hold_ns(0, {}))
+    check("press hold applies to presses", d.feed(1, 0) is None and d.feed(1, 5 * MS) == (1, 0))
+    check("zero release hold is instant", d.feed(0, 6 * MS) == (0, 6 * MS))
+
+
+def test_polled_bounce():
+    fake = FakeClock()
+    restore = clock.set_source(fake.monotonic, fake.sleep)
+    try:
+        piso = ScriptedPISO()
+        im = InputManager(register=piso, debouncer=Debouncer(_hold_ns(0, {}), _hold_ns(20, {})))
+        events.clear()
+        piso.word = 1 << 4
+        im.poll()
+        check("polled press -> one BUTTON_DOWN", seen() == [(EventType.BUTTON_DOWN, 4)])
+        for word in (0, 1 << 4, 0, 1 << 4):  # a chattering contact, 2 ms per read
+            fake.advance(0.002)
+            piso.word = word
+            im.poll()
+        check("bounce inside the hold -> no events", seen() == [] and not im.settling)
+        fake.advance(0.002)
+        piso.word = 0
+        im.poll()
+        t_edge = clock.monotonic_ns()
+        check("open contact is settling, not released", seen() == [] and im.settling)
+        fake.advance(0.025)
+        im.poll()
+        got = events.get()
+        check("release accepted once held, stamped at the edge",
+              [(e.type, e.key, e.t_ns) for e in got] == [(EventType.BUTTON_UP, 4, t_edge)]
+              and im.changed_state and not im.settling)
+    finally:
+        restore()
+
+
+def test_sampler_settles_without_new_samples():
+    fake = FakeClock()
+    restore = clock.set_source(fake.monotonic, fake.sleep)
+    try:
+        piso = ScriptedPISO()
+        sampler = InputSampler(piso)
+        im = InputManager(register=sampler, debouncer=Debouncer(_hold_ns(0, {}), _hold_ns(20, {})))
+        events.clear()
+        piso.word = 1 << 6
+        sampler.sample()
+        im.poll()
+        fake.advance(0.003)
+        piso.word = 0
+        sampler.sample()
+        im.poll()
+        check("sampler path: press through, release settling",
+              seen() == [(EventType.BUTTON_DOWN, 6)] and im.settling)
+        fake.advance(0.030)
+        im.poll()  # the sampler queued nothing new
+        check("release settles on a later poll with an empty queue",
+              seen() == [(EventType.BUTTON_UP, 6)] and not im.settling)
+    finally:
+        restore()
+
+
+def test_programs_with_release_hold():
+    from src.game_loop import Game
+
+    fake = FakeClock()
+    restore = clock.set_source(fake.monotonic, fake.sleep)
+    try:
+        piso = ScriptedPISO()
+        game = Game(PISOreg=piso, SIPOreg=NullSIPO(), mixer=Mixer(), events=events)
+        prog = lambda: game.state_machine.program
+
+        def frames(*words):
+            """One 5 ms frame per raw word (a chattering contact reads 0/1/0...)."""
+            for word in words:
+                piso.word = word
+                fake.advance(0.005)
+                game.update(5)
+
+        bounce = (1 << 2, 0, 1 << 2, 0, 1 << 2)      # press, with two 5 ms blips
+        release = (0,) * 6                           # open for 30 ms: accepted
+
+        game.state_machine.launch_single_program("Golf")
+        frames(0, 0)
+        frames(*bounce)
+        golf = prog()
+        check("Golf: a bouncing press starts one swing that blips do not end",
+              golf.swinging and not golf.rolling)
+        frames(1 << 2, 1 << 2, 0, 1 << 2)             # a blip mid-swing
+        check("Golf: a blip inside the hold is not a release", golf.swinging)
+        frames(*release)
+        check("Golf: a held release is the swing", not golf.swinging and golf.rolling)
+
+        game.state_machine.launch_single_program("SimonSays")
+        simon = prog()
+        simon.awaiting_start = False
+        simon.accepting_input = True
+        simon.pattern, simon.input_index = [2, 2], 0
+        played = []
+        game.mixer.play_by_id = lambda bank_id, duck=True: played.append(bank_id)
+        frames(*bounce)
+        check("SimonSays: a bouncing press echoes and counts once",
+              played == [2] and simon.input_index == 1)
+        frames(*release)
+
+        game.state_machine.launch_single_program("MusicMaker")
+        notes, fades = [], []
+        game.mixer.play_by_id = lambda bank_id, duck=True: notes.append(bank_id)
+        game.mixer.fadeout_by_id = lambda bank_id, ms=100: fades.append(bank_id)
+        frames(*bounce)
+        frames(*release)
+        check("MusicMaker: a bouncing press plays one note and fades it once",
+              notes == [2] and fades == [2])
+        game.mixer.stop_all()
+    finally:
+        restore()
+
+
+def main():
+    test_debouncer()
+    test_polled_bounce()
+    test_sampler_settles_without_new_samples()
+    test_programs_with_release_hold()
+
+    print()
+    if all(passed):
+        print(f"ALL {len(passed)} CHECKS PASSED")
+        return 0
+    print(f"{passed.count(False)} / {len(passed)} CHECKS FAILED")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
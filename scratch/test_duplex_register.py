@@ -0,0 +1,172 @@
+"""Tests for the combined full-duplex register driver, on the fake GPIO board.
+
+Covers :class:`src.shift_register.DuplexShiftRegister`:
+
+* one exchange latches the new output word and returns the input word, both
+  exactly as the separate drivers would on the same board;
+* it costs about half the GPIO calls of a separate read + push;
+* with a 595 chain longer than the 165 chain (spare outputs) both words still
+  come through intact;
+* the input word read by a push is handed to the next ``read_stamped`` once,
+  with its sample time; a read with no unread or only a stale sample runs its
+  own exchange, re-latching the unchanged output word;
+* in a running ``Game`` every frame is exactly one pass, whether the lasers
+  changed or not, and presses still become events (one frame later: the
+  sample is taken by the previous frame's render).
+
+Run from repo root:
+
+    SDL_AUDIODRIVER=dummy SDL_VIDEODRIVER=dummy python3 scratch/test_duplex_register.py
+"""
+import os
+import random
+import sys
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], "-s"]
+
+from src import clock
+from src.fake_gpio import FakeGPIO
+from src.shift_register import DuplexShiftRegister, InputShiftRegister, OutputShiftRegister
+from src.game_loop import Game
+from src.audio_utils import Mixer
+from src.event_loop import events, EventType
+
+
+class FakeClock:
+    def __init__(self, t=1000.0):
+        self.t = t
+    def monotonic(self):
+        return self.t
+    def sleep(self, secs):
+        if secs > 0:
+            self.t += secs
+    def advance(self, secs):
+        self.t += secs
+
+
+passed = []
+def check(label, cond):
+    passed.append(bool(cond))
+    print(("PASS" if cond else "FAIL"), "-", label)
+
+
+def gpio_calls(gpio):
+    return gpio.calls["output"] + gpio.calls["input"]
+
+
+def test_exchange_matches_separate_drivers():
+    rng = random.Random(3)
+    pairs = [(rng.getrandbits(16), rng.getrandbits(16)) for _ in range(40)] + [(0xFFFF, 0), (0, 0xFFFF)]
+    ref = FakeGPIO()
+    ref_in, ref_out = InputShiftRegister(gpio=ref), OutputShiftRegister(gpio=ref)
+    gpio = FakeGPIO()
+    duplex = DuplexShiftRegister(gpio=gpio)
+    ok = True
+    for out_word, in_word in pairs:
+        ref.set_inputs(in_word)
+        gpio.set_inputs(in_word)
+        expected_in = ref_in.read_word()
+        ref_out.push_word(out_word)
+        got_in = duplex.exchange(out_word)
+        ok = ok and got_in == expected_in == in_word and gpio.outputs == ref.outputs == out_word
+    check("exchange latches the output word and reads the inputs", ok)
+    check("one latch per exchange", gpio.latched[1:] == [o for o, _ in pairs])
+
+    ref.reset_counts()
+    ref_in.read_word()
+    ref_out.push_word(0x1234)
+    gpio.reset_counts()
+    duplex.exchange(0x1234)
+    separate, combined = gpio_calls(ref), gpio_calls(gpio)
+    print(f"  GPIO calls per frame: separate {separate}, duplex {combined}")
+    check("a duplex pass makes about half the calls of read + push", combined * 1.8 <= separate)
+
+
+def test_unequal_chains():
+    rng = random.Random(5)
+    pairs = [(rng.getrandbits(24), rng.getrandbits(16)) for _ in range(40)] + [(0xFFFFFF, 0xFFFF)]
+    gpio = FakeGPIO(piso=(21, 20, 16, 16), sipo=(3, 4, 2, 24))
+    duplex = DuplexShiftRegister(gpio=gpio, n_bits=24, in_bits=16)
+    ok = True
+    for out_word, in_word in pairs:
+        gpio.set_inputs(in_word)
+        ok = ok and duplex.exchange(out_word) == in_word and gpio.outputs == out_word
+    check("a 595 chain longer than the 165 chain: both words intact", ok)
+
+
+def test_read_stamped():
+    fake = FakeClock()
+    restore = clock.set_source(fake.monotonic, fake.sleep)
+    try:
+        gpio = FakeGPIO()
+        duplex = DuplexShiftRegister(gpio=gpio, max_age_ms=10)
+        gpio.set_inputs(1 << 3)
+        fake.advance(0.002)
+        duplex.push_word(0b11)
+        t_push = clock.monotonic_ns()
+        fake.advance(0.005)
+        latches = len(gpio.latched)
+        check("the push's sample is handed to the next read, stamped at the push",
+              duplex.read_stamped() == (t_push, 1 << 3) and len(gpio.latched) == latches)
+        gpio.set_inputs(1 << 4)
+        fake.advance(0.005)
+        t_read = clock.monotonic_ns()
+        check("a second read samples again, re-latching the same output word",
+              duplex.read_stamped() == (t_read, 1 << 4) and gpio.latched[-1] == 0b11
+              and len(gpio.latched) == latches + 1)
+        duplex.push_word(0b111)
+        fake.advance(0.050)
+        gpio.set_inputs(1 << 5)
+        check("an unread but stale sample is not used",
+              duplex.read_word() == 1 << 5)
+    finally:
+        restore()
+
+
+def test_one_pass_per_frame_in_game():
+    fake = FakeClock()
+    restore = clock.set_source(fake.monotonic, fake.sleep)
+    try:
+        gpio = FakeGPIO()
+        duplex = DuplexShiftRegister(gpio=gpio)
+        game = Game(PISOreg=duplex, SIPOreg=duplex, mixer=Mixer(), events=events)
+        game.mixer.play_effect = lambda name, **k: None
+        passes = []
+        for i in range(12):
+            latches = len(gpio.latched)
+            if i == 6:
+                gpio.set_inputs(1 << 9)
+            game.update(10.0)
+            got = [e for e in events.history.last(1, EventType.BUTTON_DOWN)]
+            if i == 7:  # sampled by frame 6's render, seen by frame 7's poll
+                pressed = bool(got) and got[-1].key == 9
+            game.lasers.set_word(0 if i % 3 else 1 << (i % 14))  # lasers change some frames
+            game.render()
+            passes.append(len(gpio.latched) - latches)
+            fake.advance(0.010)
+        print("  passes per frame:", passes)
+        check("one pass per frame, lasers changing or not", passes == [1] * 12)
+        check("a press reaches the program as an event", pressed)
+    finally:
+        restore()
+
+
+def main():
+    test_exchange_matches_separate_drivers()
+    test_unequal_chains()
+    test_read_stamped()
+    test_one_pass_per_frame_in_game()
+
+    print()
+    if all(passed):
+        print(f"ALL {len(passed)} CHECKS PASSED")
+        return 0
+    print(f"{passed.count(False)} / {len(passed)} CHECKS FAILED")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
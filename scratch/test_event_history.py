@@ -0,0 +1,141 @@
+"""Tests for the type-indexed, time-windowed event history.
+
+Covers :class:`src.event_loop.EventHistory` and its views:
+
+* "last N of a type" and "everything in the last T ms" return the right events,
+  oldest first, as views onto the rings rather than copies;
+* rings stay bounded, and the time-window search stays correct across a wrap;
+* ``EventLoop.get_filtered_history`` keeps its old answers;
+* a query touches O(result) slots, not the whole history.
+
+Run from repo root:
+
+    python3 scratch/test_event_history.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], "-s"]
+
+from src import clock
+from src.event_loop import (EventLoop, EventHistory, HistoryView, EventType,
+                            ButtonDownEvent, ButtonUpEvent, ToggleOnEvent)
+
+
+class FakeClock:
+    def __init__(self, t=1000.0):
+        self.t = t
+    def monotonic(self):
+        return self.t
+    def sleep(self, secs):
+        if secs > 0:
+            self.t += secs
+    def advance(self, secs):
+        self.t += secs
+
+
+passed = []
+def check(label, cond):
+    passed.append(bool(cond))
+    print(("PASS" if cond else "FAIL"), "-", label)
+
+
+class CountingList(list):
+    """A list that counts item reads, to prove a query does not scan."""
+    reads = 0
+    def __getitem__(self, i):
+        CountingList.reads += 1
+        return list.__getitem__(self, i)
+
+
+def test_queries():
+    fake = FakeClock()
+    restore = clock.set_source(fake.monotonic, fake.sleep)
+    try:
+        loop = EventLoop()
+        for key in range(6):
+            loop.put(ButtonDownEvent(key=key))
+            fake.advance(0.100)
+            loop.put(ButtonUpEvent(key=key))
+            fake.advance(0.100)
+        loop.put(ToggleOnEvent(key=1))
+        h = loop.history
+
+        last = h.last(3, EventType.BUTTON_DOWN)
+        check("last(n, type) is a view", isinstance(last, HistoryView))
+        check("last 3 presses, oldest first", [e.key for e in last] == [3, 4, 5])
+        check("view indexing and reversed()",
+              last[0].key == 3 and last[-1].key == 5 and [e.key for e in reversed(last)] == [5, 4, 3])
+        check("asking for more than exist returns what exists",
+              len(h.last(100, EventType.BUTTON_DOWN)) == 6)
+        check("last(n) across all types",
+              [(e.type, e.key) for e in h.last(2)] ==
+              [(EventType.BUTTON_UP, 5), (EventType.TOGGLE_ON, 1)])
+        window = h.within(250)
+        check("within(250ms): the events of the last 250 ms",
+              [(e.type, e.key) for e in window] ==
+              [(EventType.BUTTON_DOWN, 5), (EventType.BUTTON_UP, 5), (EventType.TOGGLE_ON, 1)]
+              and len(h.within(250, EventType.BUTTON_UP)) == 1)
+        check("stamps are recorded", abs(window.t_ns(0) - 1001.0e9) < 1000)
+        check("empty window", len(h.within(10, EventType.BUTTON_DOWN)) == 0)
+        check("get_filtered_history: single type",
+              [e.key for e in loop.get_filtered_history(EventType.BUTTON_UP, n=2)] == [4, 5])
+        check("get_filtered_history: several types, newest n, oldest first",
+              [(e.type, e.key) for e in loop.get_filtered_history(
+                  [EventType.BUTTON_UP, EventType.TOGGLE_ON], n=3)] ==
+              [(EventType.BUTTON_UP, 4), (EventType.BUTTON_UP, 5), (EventType.TOGGLE_ON, 1)])
+    finally:
+        restore()
+
+
+def test_bounded_and_wrapped():
+    fake = FakeClock()
+    restore = clock.set_source(fake.monotonic, fake.sleep)
+    try:
+        h = EventHistory(type_capacity=8, all_capacity=16)
+        for key in range(30):
+            h.record(ButtonDownEvent(key=key))
+            fake.advance(0.010)
+        check("per-type ring holds only its capacity",
+              [e.key for e in h.last(100, EventType.BUTTON_DOWN)] == list(range(22, 30)))
+        check("all-types ring holds only its capacity", len(h) == 16 and next(iter(h)).key == 14)
+        check("time window across the wrap point",
+              [e.key for e in h.within(45, EventType.BUTTON_DOWN)] == [26, 27, 28, 29])
+        check("a window older than the ring is clipped to what is held",
+              [e.key for e in h.within(10_000, EventType.BUTTON_DOWN)] == list(range(22, 30)))
+    finally:
+        restore()
+
+
+def test_cost_is_o_result():
+    h = EventHistory(type_capacity=4096, all_capacity=4096)
+    ring = h.by_type[EventType.BUTTON_DOWN]
+    for key in range(4096):
+        h.record(ButtonDownEvent(key=key))
+    ring.events = CountingList(ring.events)
+    CountingList.reads = 0
+    keys = [e.key for e in h.last(4, EventType.BUTTON_DOWN)]
+    check("last(4) reads 4 slots of a 4096 ring",
+          keys == [4092, 4093, 4094, 4095] and CountingList.reads == 4)
+    CountingList.reads = 0
+    window = h.within(0.0, EventType.BUTTON_DOWN, now_ns=ring.stamps[4095 % 4096])
+    check("within() finds its range without reading events", CountingList.reads == 0)
+    check("... and returns the newest", [e.key for e in window][-1] == 4095)
+
+
+def main():
+    test_queries()
+    test_bounded_and_wrapped()
+    test_cost_is_o_result()
+
+    print()
+    if all(passed):
+        print(f"ALL {len(passed)} CHECKS PASSED")
+        return 0
+    print(f"{passed.count(False)} / {len(passed)} CHECKS FAILED")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
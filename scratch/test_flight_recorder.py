@@ -0,0 +1,225 @@
+"""Tests for the flight recorder and exact replay.
+
+Records a real headless session -- GameSelect, then Flipper (random deals)
+launched, played and re-entered through the input word -- on a fake clock,
+then replays it with :class:`src.flight_recorder.Replay`:
+
+* the whole session replays to the identical output-word stream and program
+  switches, random deals included;
+* a session shut down mid-game, lasers lit, replays too: the laser-off push
+  at shutdown is not recorded;
+* a segment cut at a later program switch replays on its own;
+* a tampered recording is reported as diverging;
+* the debounce holds are recorded, and a replay uses them whatever this
+  process's ``config`` says;
+* the ring stays bounded, and a truncated trailing record is dropped.
+
+Run from repo root:
+
+    SDL_AUDIODRIVER=dummy SDL_VIDEODRIVER=dummy python3 scratch/test_flight_recorder.py
+"""
+import os
+import random
+import sys
+import tempfile
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], "-s"]  # '-s' => skip RPi.GPIO import
+
+from src import clock
+from src.config import config
+from src.game_loop import Game
+from src.audio_utils import Mixer
+from src.event_loop import events
+from src.flight_recorder import (FlightRecorder, Replay, ReplayResult, load_session,
+                                 read_segment, read_records, FRAME, INPUT, OUTPUT, PROGRAM)
+
+
+class ScriptedPISO:
+    def __init__(self):
+        self.word = 0
+    def read_word(self):
+        return self.word
+
+
+class DummySIPO:
+    def __init__(self):
+        self.last = None
+    def push_word(self, word):
+        self.last = word
+
+
+class FakeClock:
+    def __init__(self, t=1000.0):
+        self.t = t
+    def monotonic(self):
+        return self.t
+    def sleep(self, secs):
+        if secs > 0:
+            self.t += secs
+    def advance(self, secs):
+        self.t += secs
+
+
+passed = []
+def check(label, cond):
+    passed.append(bool(cond))
+    print(("PASS" if cond else "FAIL"), "-", label)
+
+
+TOGGLE0 = 1 << 14
+DT = 10.0
+
+
+def quiet_mixer():
+    mixer = Mixer()
+    mixer.play_effect = lambda name, **k: None
+    return mixer
+
+
+def record_session(directory, segment_bytes=4_000_000, end_in_flipper=False):
+    """Play a short Flipper session under a recorder; returns ``(recorder, game)``.
+
+    With ``end_in_flipper`` the session is shut down mid-game, lasers lit.
+    """
+    fake = FakeClock()
+    restore = clock.set_source(fake.monotonic, fake.sleep)
+    try:
+        recorder = FlightRecorder(directory, segments=4, segment_bytes=segment_bytes,
+                                  flush_ms=100, fps=100)
+        piso = ScriptedPISO()
+        game = Game(PISOreg=piso, SIPOreg=DummySIPO(), mixer=quiet_mixer(),
+                    events=events, recorder=recorder)
+        game.lasers.set_word(0)
+        game.render()
+        jitter = random.Random(3)  # not the global RNG: that one belongs to the game
+
+        def hold(word, frames=3):
+            # a few frames per word: releases must outlast the debounce hold
+            piso.word = word
+            for _ in range(frames):
+                game.update(DT)
+                game.render()
+                fake.advance(DT / 1000 + jitter.random() * 0.002)  # uneven frames
+
+        for _ in range(3):
+            hold(0); hold(1 << 1); hold(0); hold(1 << 1)   # arm + launch Flipper
+            for cell in (0, 3, 5, 3):
+                hold(0); hold(1 << cell, frames=2)
+            hold(0b11); hold(0b11 | TOGGLE0); hold(0b11)    # gesture back to GameSelect
+        if end_in_flipper:
+            hold(0); hold(1 << 1); hold(0); hold(1 << 1)
+            hold(0); hold(1 << 3, frames=2)
+        hold(0, frames=20)
+        game.cleanup()
+        return recorder, game
+    finally:
+        restore()
+
+
+def test_whole_session():
+    with tempfile.TemporaryDirectory() as tmp:
+        recorder, game = record_session(tmp)
+        records = load_session(tmp)
+        kinds = {r[0] for r in records}
+        check("recording holds frames, inputs, outputs and switches",
+              kinds == {FRAME, INPUT, OUTPUT, PROGRAM})
+        names = [r[2] for r in records if r[0] == PROGRAM]
+        check("program switches are logged in order",
+              names == ["GameSelect"] + ["Flipper", "GameSelect"] * 3)
+        result = Replay(records).run(mixer=quiet_mixer())
+        check("replay result type", isinstance(result, ReplayResult))
+        check("whole session replays to the same output words", result.ok and len(result.got) > 10)
+        check("... and the same program switches", result.switches == result.expected_switches
+              and len(result.switches) == 6)
+        check("replay runs every recorded frame",
+              result.frames == sum(1 for r in records if r[0] == FRAME))
+
+        tampered = list(records)
+        i = next(i for i in range(len(tampered) - 1, -1, -1) if tampered[i][0] == OUTPUT
+                 and any(r[0] == FRAME for r in tampered[:i]))
+        kind, t_ns, word = tampered[i]
+        tampered[i] = (kind, t_ns, word ^ 1)
+        bad = Replay(tampered).run(mixer=quiet_mixer())
+        check("a tampered recording is reported as diverging",
+              not bad.ok and bad.first_divergence() is not None and "diverge" in bad.report())
+
+
+def test_ends_lit():
+    with tempfile.TemporaryDirectory() as tmp:
+        _, game = record_session(tmp, end_in_flipper=True)
+        records = load_session(tmp)
+        last = max(i for i, r in enumerate(records) if r[0] == FRAME)
+        check("a session can end with lasers lit",
+              game.state_machine.program.__class__.__name__ == "Flipper"
+              and [r[2] for r in records[:last] if r[0] == OUTPUT][-1] != 0)
+        check("the laser-off push at shutdown is not recorded",
+              not any(r[0] == OUTPUT for r in records[last:]))
+        result = Replay(records).run(mixer=quiet_mixer())
+        check("a session that ends with lasers lit replays", result.ok)
+
+
+def test_recorded_holds():
+    with tempfile.TemporaryDirectory() as tmp:
+        _, game = record_session(tmp)
+        records = load_session(tmp)
+        debouncer = game.input_manager.debouncer
+        check("each program switch carries the debounce holds",
+              all(list(r[7]) == debouncer.press_ns and list(r[8]) == debouncer.release_ns
+                  for r in records if r[0] == PROGRAM)
+              and max(debouncer.release_ns) > 0)
+        saved = config.DEBOUNCE_RELEASE_MS
+        config.DEBOUNCE_RELEASE_MS = 0  # e.g. a replay on a desktop with other settings
+        try:
+            result = Replay(records).run(mixer=quiet_mixer())
+        finally:
+            config.DEBOUNCE_RELEASE_MS = saved
+        check("a replay runs with the recorded holds, not the current config", result.ok)
+
+
+def test_rotated_segments():
+    with tempfile.TemporaryDirectory() as tmp:
+        record_session(tmp, segment_bytes=2_000)
+        files = sorted(os.listdir(tmp))
+        check("ring holds at most its segment count", 1 < len(files) <= 4)
+        segments = sorted((read_segment(os.path.join(tmp, f)) for f in files), key=lambda s: s[1])
+        first_kinds = [s[3][0][0] for s in segments]
+        check("each segment opens on a program switch", all(k == PROGRAM for k in first_kinds))
+        result = Replay(segments[-1][3]).run(mixer=quiet_mixer())
+        check("the newest segment replays on its own", result.ok and result.frames > 0)
+
+
+def test_truncated_tail():
+    with tempfile.TemporaryDirectory() as tmp:
+        recorder, _ = record_session(tmp)
+        path = recorder.segment_path(recorder.seq)
+        with open(path, "rb") as f:
+            data = f.read()
+        _, _, _, records = read_segment(path)
+        with open(path, "wb") as f:
+            f.write(data[:-5])
+        _, _, _, cut = read_segment(path)
+        check("a partial trailing record is dropped, the rest kept", cut == records[:-1])
+        check("an empty buffer decodes to nothing", list(read_records(b"")) == [])
+
+
+def main():
+    random.seed(7)
+    test_whole_session()
+    test_ends_lit()
+    test_recorded_holds()
+    test_rotated_segments()
+    test_truncated_tail()
+
+    print()
+    if all(passed):
+        print(f"ALL {len(passed)} CHECKS PASSED")
+        return 0
+    print(f"{passed.count(False)} / {len(passed)} CHECKS FAILED")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
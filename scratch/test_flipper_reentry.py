@@ -26,6 +26,9 @@ from src.audio_utils import Mixer
 from src.event_loop import events
 from src.config import config
 
+# Scripted inputs are clean edges a frame apart: no contact bounce to filter.
+config.DEBOUNCE_RELEASE_MS = 0
+
 
 class ScriptedPISO:
     def __init__(self):
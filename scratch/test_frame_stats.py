@@ -0,0 +1,162 @@
+"""Unit tests for the bounded frame-timing telemetry (:mod:`src.frame_stats`).
+
+Pins what replaced the old grow-forever ``dts`` list:
+
+* memory is fixed -- the ring buffer never grows past its window no matter how
+  many frames are recorded;
+* the streaming histogram reports sane p50/p95/p99/max;
+* overruns are counted against the clock's budget, and ``GameClock`` resyncs
+  show up in the report;
+* the opt-in ``FrameProfiler`` charges each phase its own time and names the
+  callback that blew an over-budget frame.
+
+Driven by a deterministic ``FakeClock`` (no real sleeping). Run from repo root:
+
+    SDL_AUDIODRIVER=dummy SDL_VIDEODRIVER=dummy python3 scratch/test_frame_stats.py
+"""
+import os
+import sys
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], "-s"]
+
+from src import clock
+from src.game_loop import GameClock, FrameProfiler
+from src.frame_stats import FrameStats, Histogram
+
+
+class FakeClock:
+    """A controllable monotonic clock; ``sleep`` simply advances it (no waiting)."""
+    def __init__(self, t=1000.0):
+        self.t = t
+
+    def monotonic(self):
+        return self.t
+
+    def sleep(self, secs):
+        if secs > 0:
+            self.t += secs
+
+    def advance(self, secs):
+        self.t += secs
+
+
+passed = []
+def check(label, cond):
+    passed.append(bool(cond))
+    print(("PASS" if cond else "FAIL"), "-", label)
+
+
+def test_histogram_percentiles():
+    h = Histogram(bucket_ms=0.25, max_ms=100.0)
+    check("empty histogram percentile is 0", h.percentile(50) == 0.0)
+    for _ in range(98):
+        h.add(10.0)
+    h.add(20.0)
+    h.add(500.0)  # beyond max_ms -> overflow bucket
+    check("p50 sits at the 10ms bucket", abs(h.percentile(50) - 10.0) <= 0.25)
+    check("p99 reaches the 20ms straggler", abs(h.percentile(99) - 20.0) <= 0.25)
+    check("p100 reports the overflow sample's true max", h.percentile(100) == 500.0)
+    check("max tracks the largest sample", h.max_seen == 500.0)
+    h.reset()
+    check("reset empties the histogram", h.count == 0 and h.percentile(99) == 0.0)
+
+
+def test_ring_is_bounded():
+    fake = FakeClock()
+    restore = clock.set_source(fake.monotonic, fake.sleep)
+    try:
+        stats = FrameStats(GameClock(100), window=64)
+        for i in range(10_000):
+            stats.record(10.0 + (i % 3))
+        check("ring buffer stays at its window", len(stats.recent) == 64)
+        check("recent_dts returns at most the window", len(stats.recent_dts()) == 64)
+        check("every frame still counted", stats.frames == 10_000)
+        last = stats.recent_dts()[-1]
+        check("recent_dts is oldest-first (newest last)", last == 10.0 + (9_999 % 3))
+    finally:
+        restore()
+
+
+def test_overruns_and_resyncs():
+    fake = FakeClock()
+    restore = clock.set_source(fake.monotonic, fake.sleep)
+    try:
+        gc = GameClock(100)
+        stats = FrameStats(gc)
+        for _ in range(50):
+            stats.record(gc.tick())
+        check("paced cheap frames are not overruns", stats.overruns == 0)
+        for _ in range(2):
+            fake.advance(0.025)  # 25ms of work against a 10ms budget
+            stats.record(gc.tick())
+        check("over-budget frames counted as overruns", stats.overruns == 2)
+        check("no resync for a modest overrun", stats.resyncs == 0)
+        fake.advance(5.0)  # a stall far past MAX_FRAME_SKIP frames
+        stats.record(gc.tick())
+        check("a long stall is counted as a resync", stats.resyncs == 1)
+        s = stats.summary()
+        check("summary reports p50 near the 10ms target", abs(s['p50_ms'] - 10.0) <= 0.25)
+        check("summary max covers the slow frames", s['max_ms'] > 24.9)
+        check("report mentions overruns and resyncs",
+              'overruns 2' in stats.report() and 'resyncs 1' in stats.report())
+    finally:
+        restore()
+
+
+def test_profiler_names_the_culprit():
+    fake = FakeClock()
+    restore = clock.set_source(fake.monotonic, fake.sleep)
+    try:
+        prof = FrameProfiler(budget_ms=10.0)
+
+        def slow_reveal():
+            fake.advance(0.012)  # a 12ms callback
+
+        # a cheap frame: 1ms per phase, under budget
+        prof.begin()
+        for phase in FrameProfiler.PHASES:
+            fake.advance(0.001)
+            prof.lap(phase)
+        prof.end_frame(now_ms=10.0)
+        check("cheap frame not logged as slow", prof.over_budget == 0)
+
+        # a frame whose program phase runs a slow scheduled callback
+        prof.begin()
+        fake.advance(0.001); prof.lap('poll')
+        fake.advance(0.001); prof.lap('animations')
+        prof.call(slow_reveal)
+        prof.lap('program')
+        fake.advance(0.001); prof.lap('push')
+        prof.end_frame(now_ms=20.0)
+        check("over-budget frame counted", prof.over_budget == 1)
+        rec = prof.slow_frames[-1]
+        check("slow frame blames the program phase",
+              max(rec['phases'], key=rec['phases'].get) == 'program')
+        check("slow frame names the callback",
+              rec['culprit'].endswith('slow_reveal') and rec['culprit_ms'] > 11.9)
+        check("per-phase histograms saw both frames",
+              all(h.count == 2 for h in prof.phases.values()))
+        check("report names the culprit", 'slow_reveal' in prof.report())
+    finally:
+        restore()
+
+
+def main():
+    test_histogram_percentiles()
+    test_ring_is_bounded()
+    test_overruns_and_resyncs()
+    test_profiler_names_the_culprit()
+
+    print()
+    if all(passed):
+        print(f"ALL {len(passed)} CHECKS PASSED")
+        return 0
+    print(f"{passed.count(False)} / {len(passed)} CHECKS FAILED")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""Tests for the memory-mapped GPIO register backend, off the Pi.
+
+Runs :class:`src.shift_register.MmapOutputShiftRegister` and
+:class:`src.shift_register.MmapInputShiftRegister` against a
+:class:`src.gpio_mmap.FakeGpioMem` (a file-backed register page with the
+simulated 165/595 board behind it) and checks:
+
+* words pushed and read match the ``RPi.GPIO`` drivers on the same board;
+* the exact store sequence: SER is set before every rising shift edge, bits go
+  out MSB-first, and a word costs a fixed number of register stores;
+* pin functions are written into the function-select registers of the page;
+* an ``InputSampler`` works over the mmap driver unchanged.
+
+Run from repo root:
+
+    python3 scratch/test_gpio_mmap.py
+"""
+import os
+import random
+import struct
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], "-s"]
+
+from src.fake_gpio import FakeGPIO
+from src.gpio_mmap import (FakeGpioMem, GPSET0, GPCLR0, GPFSEL0, FSEL_INPUT, FSEL_OUTPUT,
+                           PAGE_SIZE)
+from src.input_sampler import InputSampler
+from src.shift_register import (InputShiftRegister, OutputShiftRegister,
+                                MmapInputShiftRegister, MmapOutputShiftRegister)
+
+
+passed = []
+def check(label, cond):
+    passed.append(bool(cond))
+    print(("PASS" if cond else "FAIL"), "-", label)
+
+
+def test_words_match_rpi_gpio_driver():
+    rng = random.Random(11)
+    words = [0, 0xFFFF, 0x8001, 0x3FFF] + [rng.getrandbits(16) for _ in range(50)]
+    ref = FakeGPIO()
+    ref_out, ref_in = OutputShiftRegister(gpio=ref), InputShiftRegister(gpio=ref)
+    mem = FakeGpioMem()
+    try:
+        out, inp = MmapOutputShiftRegister(mem=mem), MmapInputShiftRegister(mem=mem)
+        for w in words:
+            ref_out.push_word(w)
+            out.push_word(w)
+        check("pushed words latch identically",
+              mem.board.latched[1:] == words and ref.latched[1:] == words)
+        reads = []
+        for w in words:
+            ref.set_inputs(w)
+            mem.board.set_inputs(w)
+            reads.append((ref_in.read_word(), inp.read_word()))
+        check("read words match the RPi.GPIO driver",
+              all(a == b == w for (a, b), w in zip(reads, words)))
+    finally:
+        mem.close()
+
+
+def test_store_sequence():
+    mem = FakeGpioMem()
+    try:
+        out = MmapOutputShiftRegister(mem=mem)
+        ser, clk, rclk = 1 << out.SER, 1 << out.SRCLK, 1 << out.RCLK
+        del mem.writes[:]
+        word = 0b1011_0000_0000_0110
+        out.push_word(word)
+        writes = list(mem.writes)
+        check("a word is 3 stores per bit plus the latch pulse", len(writes) == 3 * 16 + 2)
+
+        ser_level, shifted, ok = 0, [], True
+        for reg, mask in writes:
+            if mask == ser:
+                ser_level = 1 if reg == GPSET0 else 0
+            elif mask == clk and reg == GPSET0:
+                shifted.append(ser_level)
+            elif mask not in (clk, rclk):
+                ok = False  # no store may move SER together with a clock
+        check("SER and the clocks are never moved in the same store", ok)
+        check("bits shift out MSB-first, SER set before each rising edge",
+              shifted == [(word >> i) & 1 for i in reversed(range(16))])
+        check("the word is latched last", writes[-2:] == [(GPSET0, rclk), (GPCLR0, rclk)])
+    finally:
+        mem.close()
+
+
+def test_page_is_file_backed():
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    try:
+        mem = FakeGpioMem(path=path)
+        MmapOutputShiftRegister(mem=mem)
+        MmapInputShiftRegister(mem=mem)
+        check("function select: SER/SRCLK/RCLK/SH_LD/CLK outputs, QH input",
+              all(mem.function(p) == FSEL_OUTPUT for p in (2, 3, 4, 20, 21))
+              and mem.function(16) == FSEL_INPUT)
+        mem.close()
+        with open(path, "rb") as f:
+            page = f.read()
+        fsel0, = struct.unpack_from("<I", page, GPFSEL0 * 4)
+        check("register stores land in the mapped file",
+              len(page) == PAGE_SIZE and (fsel0 >> 6) & 0b111 == FSEL_OUTPUT)
+    finally:
+        os.remove(path)
+
+
+def test_sampler_over_mmap():
+    mem = FakeGpioMem()
+    try:
+        sampler = InputSampler(MmapInputShiftRegister(mem=mem))
+        mem.board.set_inputs(1 << 9)
+        sampler.sample()
+        check("InputSampler queues changes read through the mmap driver",
+              [w for _, w in sampler.drain()] == [1 << 9])
+    finally:
+        mem.close()
+
+
+def main():
+    test_words_match_rpi_gpio_driver()
+    test_store_sequence()
+    test_page_is_file_backed()
+    test_sampler_over_mmap()
+
+    print()
+    if all(passed):
+        print(f"ALL {len(passed)} CHECKS PASSED")
+        return 0
+    print(f"{passed.count(False)} / {len(passed)} CHECKS FAILED")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
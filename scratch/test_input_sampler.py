@@ -0,0 +1,166 @@
+"""Tests for the threaded input backend, run against the fake GPIO board.
+
+Covers, off the Pi:
+
+* the real ``InputShiftRegister`` / ``OutputShiftRegister`` drivers bit-bang
+  correct words through :class:`src.fake_gpio.FakeGPIO`'s simulated 165/595;
+* ``InputSampler`` queues only *changes*, each stamped with the monotonic-ns
+  time it was sampled;
+* ``InputManager`` drains that queue in order, so a press and release that both
+  land between two frames still produce both events, carrying ``t_ns``;
+* the real sampler thread picks up a press on its own, and an edge on the
+  optional interrupt pin wakes it immediately.
+
+Run from repo root:
+
+    SDL_AUDIODRIVER=dummy SDL_VIDEODRIVER=dummy python3 scratch/test_input_sampler.py
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], "-s"]
+
+from src import clock
+from src.fake_gpio import FakeGPIO
+from src.shift_register import InputShiftRegister, OutputShiftRegister
+from src.input_sampler import InputSampler
+from src.io_managers import InputManager
+from src.event_loop import events, EventType
+from src.config import config
+
+# Scripted inputs are clean edges a frame apart: no contact bounce to filter.
+config.DEBOUNCE_RELEASE_MS = 0
+
+
+class FakeClock:
+    def __init__(self, t=1000.0):
+        self.t = t
+    def monotonic(self):
+        return self.t
+    def sleep(self, secs):
+        if secs > 0:
+            self.t += secs
+    def advance(self, secs):
+        self.t += secs
+
+
+passed = []
+def check(label, cond):
+    passed.append(bool(cond))
+    print(("PASS" if cond else "FAIL"), "-", label)
+
+
+def test_drivers_on_fake_board():
+    gpio = FakeGPIO()
+    piso = InputShiftRegister(gpio=gpio)
+    sipo = OutputShiftRegister(gpio=gpio)
+    for word in (0, 1, 1 << 13, 1 << 15, 0xA5C3, 0xFFFF):
+        gpio.set_inputs(word)
+        if piso.read_word() != word:
+            check(f"165 read of {word:#06x}", False)
+            break
+    else:
+        check("165 driver reads every word back exactly", True)
+    sipo.push_word(0x2B6D)
+    check("595 driver latches the pushed word", gpio.outputs == 0x2B6D)
+
+
+def test_sampler_queues_timestamped_changes():
+    fake = FakeClock()
+    restore = clock.set_source(fake.monotonic, fake.sleep)
+    try:
+        gpio = FakeGPIO()
+        sampler = InputSampler(InputShiftRegister(gpio=gpio), rate_hz=1000)
+        sampler.sample()
+        check("no change -> nothing queued", sampler.drain() == [])
+        fake.advance(0.0013)
+        gpio.set_inputs(1 << 4)
+        sampler.sample()
+        fake.advance(0.0010)
+        sampler.sample()               # unchanged: not queued
+        fake.advance(0.0021)
+        gpio.set_inputs(0)
+        sampler.sample()
+        changes = sampler.drain()
+        check("two changes queued", [w for _, w in changes] == [1 << 4, 0])
+        check("each change stamped with its own sample time (ns)",
+              changes[0][0] == int(1000.0013 * 1e9) and changes[1][0] == int(1000.0044 * 1e9))
+        check("drain empties the queue", sampler.drain() == [])
+        check("read_word tracks the latest sample", sampler.read_word() == 0)
+    finally:
+        restore()
+
+
+def test_input_manager_consumes_queue():
+    fake = FakeClock()
+    restore = clock.set_source(fake.monotonic, fake.sleep)
+    try:
+        gpio = FakeGPIO()
+        sampler = InputSampler(InputShiftRegister(gpio=gpio), rate_hz=1000)
+        im = InputManager(register=sampler)
+        events.clear()
+        # a quick tap entirely between two frames
+        gpio.set_inputs(1 << 2); fake.advance(0.002); sampler.sample()
+        gpio.set_inputs(0);      fake.advance(0.003); sampler.sample()
+        im.poll()
+        got = [(e.type, e.key, e.t_ns) for e in events.get()]
+        check("tap inside one frame yields down then up",
+              [(t, k) for t, k, _ in got] == [(EventType.BUTTON_DOWN, 2), (EventType.BUTTON_UP, 2)])
+        check("events carry their sample timestamps in order",
+              got[0][2] < got[1][2] and got[1][2] - got[0][2] == 3_000_000)
+        check("changed_state set for the frame", im.changed_state)
+        im.poll()
+        check("quiet frame -> changed_state cleared", not im.changed_state)
+    finally:
+        restore()
+
+
+def test_thread_and_edge_wake():
+    gpio = FakeGPIO()
+    sampler = InputSampler(InputShiftRegister(gpio=gpio), rate_hz=1000).start()
+    try:
+        gpio.set_inputs(1 << 7)
+        deadline = time.monotonic() + 1.0
+        while sampler.read_word() != 1 << 7 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        check("sampler thread picks up a press on its own", sampler.read_word() == 1 << 7)
+    finally:
+        sampler.stop()
+    check("stop() joins the thread", not sampler.running)
+
+    gpio = FakeGPIO()
+    edge_pin = 26
+    slow = InputSampler(InputShiftRegister(gpio=gpio), rate_hz=0.5,
+                        edge_pin=edge_pin).start()  # 2 s period: only an edge wakes it fast
+    try:
+        time.sleep(0.05)  # let the thread take its first sample and go to sleep
+        gpio.set_inputs(1 << 3, edge_pin=edge_pin)
+        deadline = time.monotonic() + 0.5
+        while slow.read_word() != 1 << 3 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        check("an edge on the interrupt pin wakes the sampler at once",
+              slow.read_word() == 1 << 3)
+    finally:
+        slow.stop()
+
+
+def main():
+    test_drivers_on_fake_board()
+    test_sampler_queues_timestamped_changes()
+    test_input_manager_consumes_queue()
+    test_thread_and_edge_wake()
+
+    print()
+    if all(passed):
+        print(f"ALL {len(passed)} CHECKS PASSED")
+        return 0
+    print(f"{passed.count(False)} / {len(passed)} CHECKS FAILED")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
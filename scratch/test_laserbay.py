@@ -0,0 +1,89 @@
+"""Tests for the bitmask-backed LaserBay.
+
+Covers :class:`src.game_loop.LaserBay` and the simulator's ``DummyLaserBay``:
+
+* per-port writes, mask operations and ``apply`` all act on the one word, so
+  ``set_word`` followed by per-port writes never resurrects cleared lasers;
+* ``to_word`` is the word itself, and ``set_value`` only touches its bit;
+* the simulator's bay keeps working: its drawn views follow the pushed word.
+
+Run from repo root:
+
+    SDL_AUDIODRIVER=dummy SDL_VIDEODRIVER=dummy python3 scratch/test_laserbay.py
+"""
+import os
+import sys
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], "-s"]
+
+from src.game_loop import LaserBay
+
+
+passed = []
+def check(label, cond):
+    passed.append(bool(cond))
+    print(("PASS" if cond else "FAIL"), "-", label)
+
+
+def test_single_source_of_truth():
+    bay = LaserBay(14)
+    bay.turn_on(1)
+    bay.turn_on(7)
+    bay.set_word(0)
+    bay.turn_on(3)
+    check("set_word(0) then turn_on lights only that laser", bay.to_word() == 1 << 3)
+    bay.set_word(0b1010)
+    bay.turn_off(3)
+    check("turn_off after set_word keeps the other bits", bay.to_word() == 0b0010)
+    bay.set_value(5, 1)
+    bay.set_value(1, 0)
+    bay.set_value(5, True)
+    check("set_value touches only its own bit", bay.to_word() == 1 << 5)
+    check("is_on reads the word", bay.is_on(5) and not bay.is_on(1))
+
+
+def test_mask_ops():
+    bay = LaserBay(14)
+    bay.set_mask(0b1100)
+    bay.clear_mask(0b0100)
+    bay.toggle_mask(0b1001)
+    check("set/clear/toggle masks", bay.to_word() == 0b0001)
+    bay.set_word(0b1111)
+    bay.apply(0b110000, 0b0011)
+    check("apply clears then sets in one step", bay.to_word() == 0b111100)
+    bay.apply(0b1, 0b1)
+    check("apply: on wins where both masks overlap", bay.to_word() & 1)
+    check("to_word is the word attribute", bay.to_word() is bay.word)
+
+
+def test_dummy_laserbay():
+    from src.simulator.simulator import DummyLaserBay, DummyOutputShiftRegister
+    bay = DummyLaserBay(14)
+    sipo = DummyOutputShiftRegister()
+    bay.set_word(0)
+    bay.set_mask(1 << 4 | 1 << 13)
+    sipo.push_word(bay.to_word())
+    lit = sorted(port for port, view in bay.lasers.items() if view.on)
+    check("the simulator's bay drives its views from the word", lit == [4, 13])
+    check("the simulator's bay keeps brightness levels",
+          bay.levels() == [bay.max_level] * 14)
+
+
+def main():
+    test_single_source_of_truth()
+    test_mask_ops()
+    test_dummy_laserbay()
+
+    print()
+    if all(passed):
+        print(f"ALL {len(passed)} CHECKS PASSED")
+        return 0
+    print(f"{passed.count(False)} / {len(passed)} CHECKS FAILED")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""Tests for the threaded output backend, on a fake clock and the fake GPIO board.
+
+Covers :class:`src.output_scheduler.OutputScheduler`:
+
+* planned words are latched at their exact times, each push stamped with the
+  fake clock's time at the latch; when several are overdue only the newest
+  is latched, and a word equal to the one showing is never pushed;
+* ``OutputManager`` still de-duplicates the frame words, collects the
+  scheduler's pushes into ``pushes`` (so ``shown_at`` sees a change made
+  between frames) and records only the frame words;
+* in a running ``Game``, Catch's target blink and blip steps land on their
+  exact grid however uneven the frames are, where the per-frame push is off
+  by up to a frame;
+* the real thread latches a planned word on its own.
+
+The thread is stood in for by calling ``run_due`` at each pending entry's
+time. Run from repo root:
+
+    SDL_AUDIODRIVER=dummy SDL_VIDEODRIVER=dummy python3 scratch/test_output_scheduler.py
+"""
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], "-s"]
+
+from src import clock
+from src.fake_gpio import FakeGPIO
+from src.shift_register import OutputShiftRegister
+from src.output_scheduler import OutputScheduler
+from src.io_managers import OutputManager
+from src.game_loop import Game
+from src.audio_utils import Mixer
+from src.event_loop import events
+
+MS = 1_000_000
+
+
+class FakeClock:
+    def __init__(self, t=1000.0):
+        self.t = t
+    def monotonic(self):
+        return self.t
+    def sleep(self, secs):
+        if secs > 0:
+            self.t += secs
+    def advance(self, secs):
+        self.t += secs
+    def set_ns(self, t_ns):
+        self.t = t_ns / 1e9
+
+
+class ScriptedPISO:
+    def __init__(self):
+        self.word = 0
+    def read_word(self):
+        return self.word
+
+
+class Recorder:
+    def __init__(self):
+        self.outputs = []
+    def output(self, t_ns, word):
+        self.outputs.append(word)
+
+
+passed = []
+def check(label, cond):
+    passed.append(bool(cond))
+    print(("PASS" if cond else "FAIL"), "-", label)
+
+
+def run_until(fake, sched, t_ns):
+    """Stand in for the thread: latch every entry due before ``t_ns`` at its time."""
+    while sched.pending and sched.pending[0][0] <= t_ns:
+        fake.set_ns(sched.pending[0][0])
+        sched.run_due()
+    fake.set_ns(t_ns)
+
+
+def test_exact_times():
+    fake = FakeClock()
+    restore = clock.set_source(fake.monotonic, fake.sleep)
+    try:
+        gpio = FakeGPIO()
+        sched = OutputScheduler(OutputShiftRegister(gpio=gpio), lead_ms=50)
+        t0 = clock.monotonic_ns()
+        sched.plan([(t0, 1), (t0 + 5 * MS, 2), (t0 + 10 * MS, 2), (t0 + 15 * MS, 3)])
+        check("a due entry is latched by plan() itself", gpio.outputs == 1)
+        check("run_due says how long until the next entry", sched.run_due(t0) == 5 * MS)
+        run_until(fake, sched, t0 + 20 * MS)
+        pushes = sched.drain()
+        check("each change is latched at its planned time, stamped then",
+              pushes == [(t0, 1), (t0 + 5 * MS, 2), (t0 + 15 * MS, 3)]
+              and gpio.latched[-3:] == [1, 2, 3])
+        sched.plan([(t0 + 30 * MS, 4), (t0 + 35 * MS, 5), (t0 + 60 * MS, 6)])
+        fake.set_ns(t0 + 40 * MS)  # the thread was late for two entries
+        sched.run_due()
+        check("overdue entries collapse to the newest",
+              sched.drain() == [(t0 + 40 * MS, 5)] and gpio.latched[-1] == 5
+              and [w for _, w in sched.pending] == [6])
+        sched.plan([(t0 + 41 * MS, 5), (t0 + 45 * MS, 5)])
+        run_until(fake, sched, t0 + 50 * MS)
+        check("a replanned word equal to the latched one is not pushed",
+              sched.drain() == [] and gpio.latched[-1] == 5 and sched.pending == [])
+    finally:
+        restore()
+
+
+def test_output_manager():
+    fake = FakeClock()
+    restore = clock.set_source(fake.monotonic, fake.sleep)
+    try:
+        gpio = FakeGPIO()
+        sched = OutputScheduler(OutputShiftRegister(gpio=gpio))
+        outputs = OutputManager(sched)
+        outputs.recorder = rec = Recorder()
+        t0 = clock.monotonic_ns()
+        outputs.push_word(7, t0, [(t0 + 4 * MS, 8)])
+        latches = len(gpio.latched)
+        outputs.push_word(7, t0, [(t0 + 4 * MS, 8)])
+        outputs.push_word(7, t0, [(t0 + 4 * MS, 8)])
+        check("repeated frame words do not reach the register", len(gpio.latched) == latches)
+        run_until(fake, sched, t0 + 6 * MS)
+        check("shown_at sees a change latched between frames",
+              outputs.shown_at(t0 + 5 * MS) == (t0 + 4 * MS, 8)
+              and outputs.shown_at(t0 + 3 * MS)[1] == 7)
+        outputs.push_word(8, t0 + 6 * MS)
+        check("a frame word matching the scheduled one is not pushed again",
+              gpio.latched[-2:] == [7, 8] and len(gpio.latched) == latches + 1)
+        outputs.push_word(8, t0 + 7 * MS)
+        outputs.push_word(9, t0 + 8 * MS)
+        check("only the frame words are recorded", rec.outputs == [7, 8, 9])
+    finally:
+        restore()
+
+
+def blink_errors(scheduled):
+    """Run Catch's chase on uneven frames; return each change's distance to its grid, ms."""
+    fake = FakeClock()
+    restore = clock.set_source(fake.monotonic, fake.sleep)
+    try:
+        gpio = FakeGPIO()
+        sipo = OutputShiftRegister(gpio=gpio)
+        sched = OutputScheduler(sipo) if scheduled else None
+        game = Game(PISOreg=ScriptedPISO(), SIPOreg=sched or sipo, mixer=Mixer(), events=events)
+        game.mixer.play_effect = lambda name, **k: None
+        game.state_machine.launch_single_program("Catch")
+        catch = game.state_machine.program
+        catch.timers.clear()
+        catch._start_chase()
+        catch.level_index = 0
+        catch._clock_ms = 0.0
+        anchor_ns = game.frame_t_ns  # clock 0 of the blink and the blip
+        half = catch.blink_half_period_ms
+        step = catch.level_step_ms[0]
+        jitter = random.Random(7)
+        for i in range(121):
+            if i == 1:
+                game.outputs.shown_at(0)
+                game.outputs.pushes.clear()  # keep the frame-timed chase start out
+            dt = 10.0 + (jitter.random() * 25 if jitter.random() < 0.2 else 0)  # stalls
+            if sched is not None:
+                run_until(fake, sched, clock.monotonic_ns() + int(dt * MS))
+            else:
+                fake.advance(dt / 1000)
+            game.update(dt)
+            game.render()
+        game.outputs.shown_at(0)  # collect the scheduler's last pushes
+        errors = []
+        for t_ns, _ in game.outputs.pushes:
+            off = (t_ns - anchor_ns) / MS
+            errors.append(min(min(off % g, g - off % g) for g in (half, step)))
+        return errors
+    finally:
+        restore()
+
+
+def test_blink_in_game():
+    late = blink_errors(scheduled=False)
+    exact = blink_errors(scheduled=True)
+    print(f"  worst change off its grid: per-frame {max(late):.2f} ms, scheduled {max(exact):.4f} ms")
+    check("per-frame pushes land up to a frame late", max(late) > 1.0)
+    check("scheduled pushes land on the blink/step grid",
+          len(exact) > 10 and max(exact) < 0.002)
+
+
+def test_thread():
+    gpio = FakeGPIO()
+    sched = OutputScheduler(OutputShiftRegister(gpio=gpio)).start()
+    try:
+        t0 = clock.monotonic_ns()
+        sched.plan([(t0 + 20 * MS, 0x55)])
+        deadline = time.monotonic() + 1.0
+        while gpio.outputs != 0x55 and time.monotonic() < deadline:
+            time.sleep(0.002)
+        pushed = sched.drain()
+        check("the thread latches a planned word on its own, not early",
+              gpio.outputs == 0x55 and pushed and pushed[-1][0] >= t0 + 20 * MS)
+    finally:
+        sched.stop()
+    check("stop() ends the thread", not sched.running)
+
+
+def main():
+    test_exact_times()
+    test_output_manager()
+    test_blink_in_game()
+    test_thread()
+
+    print()
+    if all(passed):
+        print(f"ALL {len(passed)} CHECKS PASSED")
+        return 0
+    print(f"{passed.count(False)} / {len(passed)} CHECKS FAILED")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""Tests for config-driven port counts (cabinets wider than 14 ports).
+
+Covers :mod:`src.ports` and everything that used to assume one 16-bit word:
+
+* chain widths round the input/output words up to whole 8-bit chips;
+* ``State`` decodes buttons and toggles at 32 ports, interns wide words, and
+  ``from_list`` puts the toggles above the buttons;
+* through the real drivers on a 40-bit fake board, a press of button 31 and
+  toggle 1 become events (an unused pin on the last chip does not), and a
+  32-port ``LaserBay`` word reaches the 595 chain with the right masks;
+* the flight recorder stores and reads back 66-bit words (64 ports);
+* the simulator lays out and keys every port, and the 14-port layout is
+  unchanged.
+
+Run from repo root:
+
+    SDL_AUDIODRIVER=dummy SDL_VIDEODRIVER=dummy python3 scratch/test_port_width.py
+"""
+import os
+import sys
+import tempfile
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], "-s"]
+
+from src import ports
+from src.config import config
+from src.event_loop import events, EventType
+from src.fake_gpio import FakeGPIO
+from src.flight_recorder import FlightRecorder, read_segment, INPUT, OUTPUT
+from src.game_loop import LaserBay
+from src.io_managers import Debouncer, InputManager, OutputManager
+from src.programs.base import State
+from src.shift_register import InputShiftRegister, OutputShiftRegister
+
+
+passed = []
+def check(label, cond):
+    passed.append(bool(cond))
+    print(("PASS" if cond else "FAIL"), "-", label)
+
+
+def set_ports(n):
+    config.N_PORTS = n
+    State.set_shape(n, config.N_TOGGLES)
+
+
+def test_widths():
+    widths = {}
+    for n in (14, 32, 64):
+        set_ports(n)
+        widths[n] = (ports.input_bits(), ports.input_chain(), ports.output_chain())
+    check("chains are the words rounded up to whole chips",
+          widths == {14: (16, 16, 16), 32: (34, 40, 40), 64: (66, 72, 72)})
+
+
+def test_state():
+    set_ports(32)
+    s = State.from_list([0, 31], (1, 1))
+    check("buttons and toggles decode at 32 ports",
+          s.buttons_on == (0, 31) and s.toggles_on == (0, 1) and s.word == 1 | 1 << 31 | 3 << 32)
+    check("wide words are interned", State(s.word) is s and (s | 1 << 5) is State(s.word | 1 << 5))
+    check("get_on / to_list cover the whole word",
+          s.get_on() == [0, 31, 32, 33] and len(s.to_list()) == 34)
+
+
+def test_drivers():
+    set_ports(32)
+    config.DEBOUNCE_RELEASE_MS = 0
+    gpio = FakeGPIO()
+    inputs = InputManager(register=InputShiftRegister(gpio=gpio))
+    events.get()
+    gpio.inputs = 1 << 31 | 1 << 33 | 1 << 38  # bit 38: an unused pin on the fifth 165
+    inputs.poll()
+    got = sorted((e.type, e.key) for e in events.get())
+    check("button 31 and toggle 1 come through a 40-bit chain, the spare pin does not",
+          got == sorted([(EventType.BUTTON_DOWN, 31), (EventType.TOGGLE_ON, 1)])
+          and inputs.debouncer.stable == 1 << 31 | 1 << 33)
+    check("the debouncer is as wide as the input word",
+          len(Debouncer.from_config().since_ns) == 34)
+
+    outputs = OutputManager(OutputShiftRegister(gpio=gpio))
+    bay = LaserBay()
+    bay.turn_on(31)
+    bay.turn_on(0)
+    outputs.push_word(bay.to_word())
+    check("a 32-port bay word reaches the 595 chain",
+          bay.n == 32 and gpio.outputs == 1 << 31 | 1)
+    check("the output masks follow the port count",
+          outputs.laser_mask == (1 << 32) - 1 and outputs.extra_mask == 3 << 32)
+
+
+def test_recorder():
+    set_ports(64)
+    with tempfile.TemporaryDirectory() as directory:
+        recorder = FlightRecorder(directory)
+        recorder.input(10, 1 << 65 | 1)
+        recorder.output(11, 1 << 63)
+        recorder.close()
+        _, _, _, records = read_segment(recorder.segment_path(recorder.seq))
+    check("66-bit words survive a recording",
+          recorder.word_bytes == 9 and records == [(INPUT, 10, 1 << 65 | 1), (OUTPUT, 11, 1 << 63)])
+
+
+def test_simulator():
+    from src.simulator.simulator import DummyLaserBay, DummyInputShiftRegister
+    import pygame
+    set_ports(32)
+    bay = DummyLaserBay()
+    keys = DummyInputShiftRegister()
+    check("the simulator lays out every port",
+          sorted(bay.lasers) == list(range(32)))
+    check("every button and both toggles have a key",
+          sorted(keys.bitmap.values()) == list(range(34))
+          and keys.bitmap[pygame.K_e] == 32 and keys.bitmap[pygame.K_f] == 33)
+    set_ports(14)
+    bay = DummyLaserBay()
+    layout = {port: (tuple(view.pos), tuple(view.direction)) for port, view in bay.lasers.items()}
+    check("the 14-port floor keeps its layout",
+          layout[0] == ((70, 260), (0, -1)) and layout[6] == ((450, 200), (-1, 0))
+          and layout[7] == ((450, 150), (-1, 0)) and layout[13] == ((100, 100), (0, 1)))
+
+
+def main():
+    try:
+        test_widths()
+        test_state()
+        test_drivers()
+        test_recorder()
+        test_simulator()
+    finally:
+        set_ports(14)
+
+    print()
+    if all(passed):
+        print(f"ALL {len(passed)} CHECKS PASSED")
+        return 0
+    print(f"{passed.count(False)} / {len(passed)} CHECKS FAILED")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
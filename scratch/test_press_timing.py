@@ -0,0 +1,303 @@
+"""Tests for press timestamps and judging presses at the instant they happened.
+
+Covers:
+
+* every input event carries ``t_ns``, on both the polled and the threaded path;
+* ``OutputManager.shown_at`` / ``Program.lasers_at`` reconstruct the laser word
+  on display at any recent instant, and ``Program.event_ms`` maps a press onto
+  the ``now_ms`` timeline;
+* Catch judges the blip the lasers showed at the press, not where the blip has
+  moved by the time the frame handling the press runs;
+* WhackAMole does not score a mole whose lifetime ran out before the press;
+* Trivia's buzz race goes to the team that pressed first, whatever their
+  button numbers, and a buzz made before the window closed beats the timeout.
+
+Drives a real ``Game`` off a deterministic ``FakeClock``, with an
+``InputSampler`` sampled by hand so presses land between frames. Run from repo
+root:
+
+    SDL_AUDIODRIVER=dummy SDL_VIDEODRIVER=dummy python3 scratch/test_press_timing.py
+"""
+import os
+import sys
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], "-s"]
+
+from src import clock
+from src.game_loop import Game
+from src.audio_utils import Mixer
+from src.event_loop import events, EventType, ButtonDownEvent
+from src.input_sampler import InputSampler
+from src.io_managers import InputManager, OutputManager
+from src.config import config
+
+# Scripted inputs are clean edges a frame apart: no contact bounce to filter.
+config.DEBOUNCE_RELEASE_MS = 0
+
+
+class ScriptedPISO:
+    def __init__(self):
+        self.word = 0
+    def read_word(self):
+        return self.word
+
+
+class DummySIPO:
+    def __init__(self):
+        self.last = None
+    def push_word(self, word):
+        self.last = word
+
+
+class FakeClock:
+    def __init__(self, t=1000.0):
+        self.t = t
+    def monotonic(self):
+        return self.t
+    def sleep(self, secs):
+        if secs > 0:
+            self.t += secs
+    def advance(self, secs):
+        self.t += secs
+
+
+passed = []
+def check(label, cond):
+    passed.append(bool(cond))
+    print(("PASS" if cond else "FAIL"), "-", label)
+
+
+class Rig:
+    """A Game on a fake clock whose input goes through a hand-sampled sampler."""
+    DT = 10.0
+
+    def __init__(self, fake):
+        self.fake = fake
+        self.piso = ScriptedPISO()
+        self.sampler = InputSampler(self.piso)
+        self.game = Game(PISOreg=self.sampler, SIPOreg=DummySIPO(),
+                         mixer=Mixer(), events=events)
+        self.game.mixer.play_effect = lambda name, **k: None
+
+    def prog(self):
+        return self.game.state_machine.program
+
+    def update(self):
+        self.fake.advance(self.DT / 1000)
+        self.game.update(self.DT)
+
+    def render(self):
+        self.game.render()
+
+    def frame(self):
+        self.update()
+        self.render()
+
+    def press(self, word, after_ms=1.0):
+        """Change the inputs ``after_ms`` from now and sample it (between frames)."""
+        self.fake.advance(after_ms / 1000)
+        self.piso.word = word
+        self.sampler.sample()
+
+
+def test_events_are_stamped():
+    fake = FakeClock()
+    restore = clock.set_source(fake.monotonic, fake.sleep)
+    try:
+        piso = ScriptedPISO()
+        im = InputManager(register=piso)
+        events.clear()
+        piso.word = 1 << 4
+        im.poll()
+        got = events.get()
+        check("polled events carry the poll time",
+              [(e.type, e.t_ns) for e in got] == [(EventType.BUTTON_DOWN, int(1000.0 * 1e9))])
+    finally:
+        restore()
+
+
+def test_output_history():
+    fake = FakeClock()
+    restore = clock.set_source(fake.monotonic, fake.sleep)
+    try:
+        om = OutputManager(register=DummySIPO())
+        t0 = clock.monotonic_ns()
+        fake.advance(0.010); om.push_word(0b01)
+        t1 = clock.monotonic_ns()
+        fake.advance(0.010); om.push_word(0b01)   # unchanged: not a new entry
+        fake.advance(0.010); om.push_word(0b10)
+        t2 = clock.monotonic_ns()
+        check("word before the first change is the boot word",
+              om.shown_at(t1 - 1) == (t0, 0))
+        check("a word is shown from the instant it was latched",
+              om.shown_at(t1) == (t1, 0b01))
+        check("duplicate pushes do not split the history",
+              om.shown_at(t2 - 1) == (t1, 0b01))
+        check("latest word", om.shown_at(t2 + 10**9) == (t2, 0b10))
+        check("older than the history -> None", om.shown_at(t0 - 1) is None)
+    finally:
+        restore()
+
+
+def test_event_ms():
+    fake = FakeClock()
+    restore = clock.set_source(fake.monotonic, fake.sleep)
+    try:
+        rig = Rig(fake)
+        rig.frame()
+        rig.press(1 << 9, after_ms=3.0)  # an unassigned button
+        rig.fake.advance(0.004)          # the frame starts late
+        rig.game.update(rig.DT)
+        press = ButtonDownEvent(key=9, t_ns=rig.sampler.t_ns)
+        prog = rig.prog()
+        check("event_ms places the press 4ms before the frame's now_ms",
+              abs(prog.event_ms(press) - (rig.game.now_ms - 4.0)) < 1e-6)
+        check("an unstamped event counts as now",
+              prog.event_ms(ButtonDownEvent(key=9)) == rig.game.now_ms)
+        check("lasers_at(None) is None", prog.lasers_at(None) is None)
+    finally:
+        restore()
+
+
+def arm_catch(rig, target):
+    """Start a chase with the blip one step short of the target."""
+    game = rig.game
+    game.state_machine.launch_single_program("Catch")
+    p = rig.prog()
+    p.timers.clear()
+    p._start_chase()
+    p.target = target
+    p.level_index = 0
+    p.blip = target - 1
+    p._clock_ms = 0.0
+    rig.frame()
+    return p
+
+
+def test_catch_judges_the_shown_blip():
+    fake = FakeClock()
+    restore = clock.set_source(fake.monotonic, fake.sleep)
+    try:
+        rig = Rig(fake)
+        target = 3
+        p = arm_catch(rig, target)
+        step_ms = p.level_step_ms[p.level_index]
+
+        # The blip reaches the target and is shown...
+        p._blip_accum_ms = step_ms - rig.DT
+        rig.frame()
+        check("blip shown on the target", p.blip == target and rig.game.outputs.prev_word & (1 << target))
+        # ...next frame it steps off, and the press lands after that frame's
+        # poll but before its word is latched: the player saw it on target.
+        p._blip_accum_ms = step_ms - rig.DT
+        rig.update()
+        check("blip has already moved on in the program", p.blip != target)
+        rig.press(1 << 5, after_ms=0.5)
+        fake.advance(0.001)
+        rig.render()
+        rig.update()
+        check("press judged against the shown blip -> catch", p.state == p.CATCH_HOLD)
+
+        # Same timing, but the press comes after the off-target word is latched.
+        p = arm_catch(rig, target)
+        rig.press(0)
+        p._blip_accum_ms = step_ms - rig.DT
+        rig.frame()
+        p._blip_accum_ms = step_ms - rig.DT
+        rig.update()
+        fake.advance(0.001)
+        rig.render()
+        rig.press(1 << 5, after_ms=0.5)
+        rig.update()
+        check("press after the blip visibly left -> miss", p.state == p.MISS_HOLD)
+        check("miss holds the blip where it was shown at the press", p.blip == target + 1)
+    finally:
+        restore()
+
+
+def test_whack_a_mole_expired_before_press():
+    fake = FakeClock()
+    restore = clock.set_source(fake.monotonic, fake.sleep)
+    try:
+        rig = Rig(fake)
+        rig.game.state_machine.launch_single_program("WhackAMole")
+        p = rig.prog()
+        p._select_mode(2)  # 1-player
+        rig.frame()
+        p.moles = {1: 25.0}  # 25 ms to live as of this frame
+        p._spawn_accum = -10**9  # no spawns to muddy the board
+        rig.press(1 << 1, after_ms=20.0)   # in time
+        rig.fake.advance(0.030)            # a stalled frame
+        score = p.score["left"]
+        rig.game.update(50.0)
+        check("press inside the mole's lifetime is a hit, despite the stall",
+              p.score["left"] == score + 1)
+        rig.press(0)
+        rig.frame()
+        p.moles = {1: 25.0}
+        rig.press(1 << 1, after_ms=30.0)   # too late, but the next frame is later still
+        rig.fake.advance(0.010)
+        rig.game.update(40.0)
+        check("press after the mole's lifetime ran out scores nothing",
+              p.score["left"] == score + 1)
+    finally:
+        restore()
+
+
+def test_trivia_buzz_race():
+    fake = FakeClock()
+    restore = clock.set_source(fake.monotonic, fake.sleep)
+    try:
+        rig = Rig(fake)
+        rig.game.state_machine.launch_single_program("Trivia")
+        p = rig.prog()
+        black = next(b for b, t in p.team_of_buzz.items() if t == "black")
+        white = next(b for b, t in p.team_of_buzz.items() if t == "white")
+        late, early = (black, white) if black < white else (white, black)
+
+        def ask():
+            p._enter_ready()
+            p.first_team = None
+            p.phase = type(p.phase).ASKING
+            rig.press(0)
+            rig.frame()
+            p.buzz_deadline = rig.game.now_ms + 100.0
+
+        ask()
+        rig.press(1 << early, after_ms=2.0)
+        rig.press((1 << early) | (1 << late), after_ms=2.0)
+        rig.frame()
+        check("both buzzes in one frame: the earlier press wins, not the lower button",
+              p.first_team == p.team_of_buzz[early])
+
+        ask()
+        rig.press(1 << early, after_ms=95.0)     # inside the window...
+        rig.fake.advance(0.030)                  # ...but the frame is late
+        rig.game.update(125.0)
+        check("a buzz made before the window closed beats the timeout",
+              p.first_team == p.team_of_buzz[early])
+    finally:
+        restore()
+
+
+def main():
+    test_events_are_stamped()
+    test_output_history()
+    test_event_ms()
+    test_catch_judges_the_shown_blip()
+    test_whack_a_mole_expired_before_press()
+    test_trivia_buzz_race()
+
+    print()
+    if all(passed):
+        print(f"ALL {len(passed)} CHECKS PASSED")
+        return 0
+    print(f"{passed.count(False)} / {len(passed)} CHECKS FAILED")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
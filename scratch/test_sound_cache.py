@@ -0,0 +1,154 @@
+"""Tests for the memory-budgeted sound cache.
+
+Covers :class:`src.sound_cache.SoundCache` and the ``Mixer`` calls on it:
+
+* a sound's size is its decoded byte count, read without copying the buffer;
+* past the budget the least recently used entry goes first, reading an entry
+  refreshes it, and a pinned entry is never evicted (until unpinned);
+* hit, miss, eviction and resident-byte counts, and the one-line report;
+* ``load_effect`` pins a program's preloads, ``pin=False`` clips stay within
+  the budget however many are loaded, and ``play_effect`` / ``use_patch`` go
+  through the cache;
+* a program switch unpins the outgoing program's sounds but keeps the active
+  patch pinned.
+
+Run from repo root:
+
+    SDL_AUDIODRIVER=dummy SDL_VIDEODRIVER=dummy python3 scratch/test_sound_cache.py
+"""
+import os
+import sys
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], "-s"]
+
+import pygame
+
+from src.audio_utils import Mixer
+from src.config import config
+from src.sound_cache import SoundCache, sound_bytes
+
+
+class ScriptedPISO:
+    def read_word(self):
+        return 0
+
+
+class NullSIPO:
+    def push_word(self, word):
+        pass
+
+
+passed = []
+def check(label, cond):
+    passed.append(bool(cond))
+    print(("PASS" if cond else "FAIL"), "-", label)
+
+
+def tone(ms):
+    """A silent mono 16-bit Sound lasting ``ms`` at 22050 Hz."""
+    return pygame.mixer.Sound(buffer=b"\0\0" * int(22050 * ms / 1000))
+
+
+def test_cache():
+    Mixer()  # pygame.mixer at the standard format
+    sound = tone(100)
+    raw = len(sound.get_raw())
+    check("a sound's size is its decoded bytes",
+          sound_bytes(sound) == raw and sound_bytes([sound, sound]) == 2 * raw)
+
+    size = sound_bytes(tone(100))
+    cache = SoundCache(3 * size)
+    for key in "abc":
+        cache.put(key, tone(100))
+    cache.lookup("a")                       # a is now the most recent
+    cache.put("d", tone(100))
+    check("past the budget the least recently used goes first",
+          list(cache.entries) == ["c", "a", "d"] and cache.resident_bytes == 3 * size)
+
+    cache.pin("c")
+    cache.put("e", tone(100))
+    cache.put("f", tone(100))
+    check("a pinned entry is never evicted", "c" in cache and list(cache.entries) == ["c", "e", "f"])
+    cache.put("big", tone(300))
+    check("an entry bigger than the room left still goes in; the rest make way",
+          list(cache.entries) == ["c", "big"] and cache.evictions == 5)
+    cache.unpin("c")
+    check("unpinning over the budget evicts at once", list(cache.entries) == ["big"])
+
+    check("a missing key reads as absent", cache.lookup("zz") is None and cache.get("zz", 1) == 1)
+    s = cache.summary()
+    check("hits, misses, evictions and resident bytes are counted",
+          (s["hits"], s["misses"], s["evictions"], s["entries"]) == (1, 1, 6, 1)
+          and s["resident_bytes"] == sound_bytes(cache["big"]) and s["hit_rate"] == 0.5)
+    check("the report is one line", "hits 1" in cache.report() and "\n" not in cache.report())
+
+
+def test_mixer():
+    mixer = Mixer()
+    cache = mixer.effects
+    preload = config.Catch.INTRO_SOUND
+    sound = mixer.load_effect(preload)
+    check("load_effect caches and pins a preload", cache[preload] is sound and preload in cache.pinned)
+    check("loading it again is a hit, not a decode",
+          mixer.load_effect(preload, volume=0.5) is sound and cache.hits == 1)
+
+    clip = config.Catch.ZAP_SOUND
+    misses = cache.misses
+    mixer.play_effect(clip)
+    mixer.play_effect(clip)
+    check("play_effect decodes on a miss, then hits", cache.misses == misses + 1
+          and clip in cache and clip not in cache.pinned)
+    mixer.stop_all()
+
+    cache.budget_bytes = cache.resident_bytes + 3 * sound_bytes(sound)
+    names = [os.path.join("menu", f) for f in sorted(os.listdir(os.path.join(Mixer.EFFECTS_DIR, "menu")))
+             if f.endswith(".wav")]
+    for name in names:
+        mixer.load_effect(name, pin=False)
+    check(f"unpinned clips stay within the budget ({len(names)} loaded)",
+          len(names) > 5 and cache.resident_bytes <= cache.budget_bytes
+          and preload in cache and ("patch", "numbers") in cache)
+
+    patch_before = mixer.patch
+    mixer.use_patch("numbers")
+    check("use_patch hits the cached patch", mixer.patch is patch_before)
+
+
+def test_program_switch():
+    from src.game_loop import Game
+    from src.event_loop import events
+    from src.programs.simon_says import SimonSays
+
+    config.DEBOUNCE_RELEASE_MS = 0
+    game = Game(PISOreg=ScriptedPISO(), SIPOreg=NullSIPO(), mixer=Mixer(), events=events)
+    cache = game.mixer.effects
+    game.state_machine.launch_single_program("SimonSays")
+    game.mixer.wait_loads()  # its patch loads in the background
+    welcome = SimonSays.WELCOME
+    patch = ("patch", config.SimonSays.PATCH)
+    check("a program's preloads and patch are pinned while it runs",
+          welcome in cache.pinned and patch in cache.pinned)
+    game.state_machine.enter_game_select()
+    check("a switch unpins them but keeps the active patch pinned",
+          welcome not in cache.pinned and welcome in cache and patch in cache.pinned)
+    game.mixer.stop_all()
+
+
+def main():
+    test_cache()
+    test_mixer()
+    test_program_switch()
+
+    print()
+    if all(passed):
+        print(f"ALL {len(passed)} CHECKS PASSED")
+        return 0
+    print(f"{passed.count(False)} / {len(passed)} CHECKS FAILED")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
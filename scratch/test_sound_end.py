@@ -0,0 +1,240 @@
+"""Tests for the mixer's playback tracking and ``SoundEndEvent``.
+
+Covers :class:`src.audio_utils.Playback` and its users:
+
+* a play returns a handle; when its channel goes quiet the mixer posts a
+  ``SoundEndEvent`` carrying it and calls ``on_end`` once, on the next update;
+* a channel that never reports its end is given up ``SOUND_END_SLACK_MS``
+  after the sound's length, on the frame clock, and pacing wakes for both;
+* ``stop`` ends a playback as interrupted (so does losing its channel),
+  ``cancel`` and ``stop_all`` end nothing and call nothing;
+* an ``on_end`` can start the next sound, which is how Trivia's voice
+  sequencer now chains clips;
+* Catch leaves its intro when the intro stops playing, and GameSelect issues a
+  power command only after its spoken confirmation ends, without blocking.
+
+The dummy audio driver plays in real time, so the short sounds here really
+end; the long ones (every asset loads as 2 s of silence) do not within a test.
+
+Run from repo root:
+
+    SDL_AUDIODRIVER=dummy SDL_VIDEODRIVER=dummy python3 scratch/test_sound_end.py
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], "-s"]
+
+import pygame
+
+from src.audio_utils import Mixer
+from src.config import config
+from src.event_loop import events, EventType
+
+
+class ScriptedPISO:
+    def read_word(self):
+        return 0
+
+
+class NullSIPO:
+    def push_word(self, word):
+        pass
+
+
+passed = []
+def check(label, cond):
+    passed.append(bool(cond))
+    print(("PASS" if cond else "FAIL"), "-", label)
+
+
+def tone(ms):
+    """A silent mono 16-bit Sound lasting ``ms`` at 22050 Hz."""
+    return pygame.mixer.Sound(buffer=b"\0\0" * int(22050 * ms / 1000))
+
+
+def sound_ends():
+    return [e for e in events.get() if e.type == EventType.SOUND_END]
+
+
+def until_quiet(playback, secs=1.0):
+    """Wait (wall time) for the playback's channel to go quiet."""
+    stop = time.monotonic() + secs
+    while playback.channel.get_busy() and time.monotonic() < stop:
+        time.sleep(0.01)
+
+
+def test_end():
+    mixer = Mixer()
+    events.clear()
+    ended = []
+    short = tone(60)
+    playback = mixer.play(short, on_end=lambda: ended.append("short"))
+    check("a play returns a watched handle", playback.channel is not None
+          and playback in mixer.playing and not playback.done)
+    mixer.update(10)
+    check("a sounding channel does not end it", not ended and not sound_ends())
+    until_quiet(playback)
+    mixer.update(10)
+    got = sound_ends()
+    check("a quiet channel ends it: one event, carrying the handle",
+          len(got) == 1 and got[0].playback is playback and got[0].sound is short)
+    mixer.update(10)
+    check("on_end runs once and the end was natural",
+          ended == ["short"] and playback.done and not playback.interrupted
+          and not mixer.playing and not sound_ends())
+
+    chain = []
+    def next_clip():
+        chain.append(mixer.play(tone(40)))
+    first = mixer.play(tone(40), on_end=next_clip)
+    until_quiet(first)
+    mixer.update(10)
+    check("an on_end can start the next sound", len(chain) == 1 and mixer.playing == chain)
+
+
+def test_bound_and_pacing():
+    mixer = Mixer()
+    events.clear()
+    long = tone(2000)
+    length_ms = long.get_length() * 1000
+    playback = mixer.play(long)
+    mixer.update(5)
+    check("pacing wakes when the sound should end",
+          abs(mixer.next_deadline_ms(100) - (100 + length_ms - 5)) < 1e-6)
+    mixer.update(length_ms)
+    check("past its length the loop waits for the give-up time",
+          abs(mixer.next_deadline_ms(0) - (config.SOUND_END_SLACK_MS - 5)) < 1e-6)
+    mixer.update(config.SOUND_END_SLACK_MS - 10)
+    check("a channel still sounding within the slack is waited for", not playback.done)
+    mixer.update(10)
+    check("then it is given up on the frame clock", playback.done and len(sound_ends()) == 1
+          and mixer.next_deadline_ms(0) is None)
+    loop = mixer.play(long, loops=-1)
+    mixer.update(60_000)
+    check("a sound looping forever has no end to wait for",
+          not loop.done and mixer.next_deadline_ms(0) is None)
+    mixer.stop_all()
+
+
+def test_stop_and_cancel():
+    mixer = Mixer()
+    events.clear()
+    ended = []
+    playback = mixer.play(tone(2000), on_end=lambda: ended.append("stop"))
+    playback.stop()
+    mixer.update(10)
+    check("stop ends it as interrupted on the next update",
+          ended == ["stop"] and playback.interrupted and len(sound_ends()) == 1)
+
+    playback = mixer.play(tone(2000), on_end=lambda: ended.append("cancel"))
+    playback.cancel()
+    mixer.update(10_000)
+    check("cancel drops the end: no event, no on_end",
+          ended == ["stop"] and not sound_ends() and not mixer.playing
+          and playback.channel.get_busy())
+    playback.channel.stop()
+
+    channel = pygame.mixer.Channel(1)
+    taken = mixer.play(tone(2000), channel=channel)
+    channel.play(tone(2000))
+    mixer.update(10)
+    check("losing its channel to another sound ends it as interrupted",
+          taken.done and taken.interrupted and len(sound_ends()) == 1)
+
+    kept = [mixer.play(tone(2000), on_end=lambda: ended.append("all")) for _ in range(3)]
+    mixer.stop_all()
+    mixer.update(10_000)
+    check("stop_all ends nothing and calls nothing",
+          ended == ["stop"] and not sound_ends() and all(p.done for p in kept))
+
+
+def test_voice():
+    from src.programs.trivia_voice import _VoSequencer
+    mixer = Mixer()
+    now = [0.0]
+    timers = []
+    def after(ms, fn):
+        timers.append((now[0] + ms, fn))
+        class Handle:
+            def cancel(self):
+                timers[:] = [t for t in timers if t[1] is not fn]
+        return Handle()
+    done = []
+    seq = _VoSequencer(mixer, pygame.mixer.Channel(0), after, gap_ms=0)
+    clips = [tone(40), tone(40)]
+    seq.play(clips, on_done=lambda: done.append(True))
+    channel = pygame.mixer.Channel(0)
+    check("the first clip plays on the voice channel",
+          channel.get_sound() is clips[0] and not timers)
+    until_quiet(mixer.playing[0])
+    mixer.update(10)
+    timers.pop()[1]()
+    check("the next clip starts once the first has stopped playing",
+          channel.get_sound() is clips[1] and not done)
+    seq.interrupt()
+    mixer.update(10)
+    check("an interrupt drops the clip in flight: nothing advances",
+          not timers and not done and not mixer.playing)
+
+
+def test_programs():
+    from src.game_loop import Game
+    from src.programs import game_select
+
+    config.DEBOUNCE_RELEASE_MS = 0
+    game = Game(PISOreg=ScriptedPISO(), SIPOreg=NullSIPO(), mixer=Mixer(), events=events)
+    step = game.update
+    prog = lambda: game.state_machine.program
+
+    game.state_machine.launch_single_program("Catch")
+    intro = prog()._intro
+    step(10)
+    check("Catch holds READY while the intro plays", prog().state == "READY")
+    for _ in range(int((intro.end_by_ms - game.mixer.automation.now_ms) // 10) + 2):
+        step(10)
+    check("and starts level 1 once the intro has stopped",
+          intro.done and prog().state == "PAUSE" and prog().level_index == 0)
+
+    game.state_machine.enter_game_select()
+    gs = prog()
+    launched = []
+    real_popen, real_argv = game_select.subprocess.Popen, sys.argv
+    game_select.subprocess.Popen = launched.append
+    sys.argv = [sys.argv[0]]
+    try:
+        t0 = time.monotonic()
+        gs._execute_system_action(12)
+        blocked = time.monotonic() - t0
+        check(f"a power command waits for its confirmation, without blocking ({blocked:.3f}s)",
+              not launched and gs.power_committed and blocked < 0.5)
+        for _ in range(300):
+            step(10)
+        check("and is issued once the confirmation has stopped playing",
+              launched == [config.GameSelect.SYSTEM_ACTIONS["reboot"]])
+    finally:
+        game_select.subprocess.Popen, sys.argv = real_popen, real_argv
+    game.mixer.stop_all()
+
+
+def main():
+    test_end()
+    test_bound_and_pacing()
+    test_stop_and_cancel()
+    test_voice()
+    test_programs()
+
+    print()
+    if all(passed):
+        print(f"ALL {len(passed)} CHECKS PASSED")
+        return 0
+    print(f"{passed.count(False)} / {len(passed)} CHECKS FAILED")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
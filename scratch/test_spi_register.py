@@ -0,0 +1,111 @@
+"""Tests for the SPI shift-register transport, against the fake ``spidev`` board.
+
+Covers :mod:`src.spi_register` on a :class:`src.fake_spidev.FakeSpiBoard`:
+
+* a pushed word goes out MSB-first in a single transfer on CE0 and is latched
+  only when chip-select rises after the last byte (or, with a GPIO latch pin,
+  by the pulse that follows the transfer);
+* a read pulses ``SH_LD`` before a single transfer on CE1, returns the word
+  MSB-first, and never latches the outputs;
+* words match the bit-banged drivers, and an ``InputSampler`` works on top.
+
+Run from repo root:
+
+    python3 scratch/test_spi_register.py
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], "-s"]
+
+from src.fake_spidev import FakeSpiBoard
+from src.input_sampler import InputSampler
+from src.spi_register import SpiInputShiftRegister, SpiOutputShiftRegister
+
+
+passed = []
+def check(label, cond):
+    passed.append(bool(cond))
+    print(("PASS" if cond else "FAIL"), "-", label)
+
+
+def rig(**board_kwargs):
+    board = FakeSpiBoard(**board_kwargs)
+    out = SpiOutputShiftRegister(spi=board.SpiDev(), gpio=board,
+                                 latch_pin=board_kwargs.get("rclk_pin"))
+    inp = SpiInputShiftRegister(spi=board.SpiDev(), gpio=board)
+    return board, out, inp
+
+
+def test_output_framing():
+    board, out, _ = rig()
+    check("setup clears the outputs", board.latched == [0])
+    del board.log[:]
+    board.syscalls = 0
+    out.push_word(0xA503)
+    check("one transfer per word", board.syscalls == 1)
+    check("framing: CE0 low, both bytes MSB-first, CE0 high, then the latch",
+          board.log == [("cs", 0, 0), ("xfer", 0, [0xA5, 0x03], [0, 0]), ("cs", 0, 1),
+                        ("latch", 0xA503)])
+    check("the 595 shows the word", board.outputs == 0xA503)
+
+
+def test_gpio_latch():
+    board, out, _ = rig(latch_device=None, rclk_pin=3)
+    del board.log[:]
+    out.push_word(0x0F0F)
+    kinds = [entry[0] for entry in board.log]
+    check("GPIO latch: the transfer completes before RCLK rises",
+          kinds == ["cs", "xfer", "cs", "pin", "latch", "pin"]
+          and board.log[3] == ("pin", 3, 1) and board.outputs == 0x0F0F)
+
+
+def test_input_framing():
+    board, out, inp = rig()
+    out.push_word(0x1234)
+    board.set_inputs(0xC001)
+    del board.log[:]
+    word = inp.read_word()
+    check("read returns the inputs, MSB-first", word == 0xC001)
+    check("framing: SH_LD pulsed low, then one transfer on CE1",
+          [e[:3] for e in board.log] ==
+          [("pin", 21, 0), ("pin", 21, 1), ("cs", 1, 0), ("xfer", 1, [0, 0]), ("cs", 1, 1)])
+    check("a read never latches the outputs", board.outputs == 0x1234 and
+          not any(e[0] == "latch" for e in board.log))
+
+
+def test_words_and_sampler():
+    board, out, inp = rig()
+    rng = random.Random(5)
+    words = [rng.getrandbits(16) for _ in range(40)] + [0, 0xFFFF]
+    ok_out = ok_in = True
+    for w in words:
+        out.push_word(w)
+        ok_out = ok_out and board.outputs == w
+        board.set_inputs(w ^ 0xFFFF)
+        ok_in = ok_in and inp.read_word() == w ^ 0xFFFF
+    check("random words round-trip out and in", ok_out and ok_in)
+    sampler = InputSampler(inp)
+    board.set_inputs(1 << 14)
+    sampler.sample()
+    check("InputSampler works over the SPI driver", [w for _, w in sampler.drain()] == [1 << 14])
+
+
+def main():
+    test_output_framing()
+    test_gpio_latch()
+    test_input_framing()
+    test_words_and_sampler()
+
+    print()
+    if all(passed):
+        print(f"ALL {len(passed)} CHECKS PASSED")
+        return 0
+    print(f"{passed.count(False)} / {len(passed)} CHECKS FAILED")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Tests for the interned, table-decoded ``State``.
+
+Pins that interning changed nothing observable: decoding, operators, equality
+and ``from_list`` give the same answers as before for every 16-bit word, and
+``State(word)`` returns one shared instance per word. Run from repo root:
+
+    python3 scratch/test_state.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], "-s"]
+
+from src.programs.base import State
+
+
+passed = []
+def check(label, cond):
+    passed.append(bool(cond))
+    print(("PASS" if cond else "FAIL"), "-", label)
+
+
+def reference(word):
+    """The original bit-loop decoders, for comparison."""
+    buttons = word & (2**14 - 1)
+    toggles = (word & (3 << 14)) >> 14
+    return ([i for i in range(16) if (word >> i) & 1],
+            [i for i in range(14) if (buttons >> i) & 1],
+            [i for i in range(2) if (toggles >> i) & 1],
+            [(word >> i) & 1 for i in range(16)])
+
+
+def test_decoding_matches_for_every_word():
+    for word in range(1 << 16):
+        s = State(word)
+        got = (s.get_on(), s.get_buttons_on(), s.get_toggles_on(), s.to_list())
+        if got != reference(word) or s.buttons != word & 0x3FFF or s.toggles != word >> 14:
+            check(f"decode of {word:#06x}", False)
+            return
+    check("decode matches the bit loops for all 65,536 words", True)
+
+
+def test_interning():
+    a = State(0b101)
+    check("same word -> same instance", State(5) is a and State(a) is a)
+    check("operators return interned states",
+          (a | 2) is State(7) and (a ^ a) is State(0) and (a & State(1)) is State(1))
+    check("from_list is interned", State.from_list([0, 2]) is a)
+    on = a.get_buttons_on()
+    on.append(13)
+    check("decoded lists are fresh copies (mutating one is harmless)",
+          a.get_buttons_on() == [0, 2] and a.buttons_on == (0, 2))
+    wide = State(1 << 15) << 1
+    check("words past 16 bits still work (just not interned)",
+          int(wide) == 1 << 16 and wide.get_buttons_on() == [] and wide is not State(1 << 16))
+
+
+def test_public_behaviour():
+    s = State.from_list([1, 13], toggles=(1, 0))
+    check("equality with ints and States", s == int(s) and s == State(int(s)) and not (s == 0))
+    check("shifts", (State(0b10) >> 1) == 1 and (State(1) << 3) == 8)
+    check("repr unchanged", repr(s) == "State(buttons=[1, 13], toggles=[0])")
+
+
+def main():
+    test_decoding_matches_for_every_word()
+    test_interning()
+    test_public_behaviour()
+
+    print()
+    if all(passed):
+        print(f"ALL {len(passed)} CHECKS PASSED")
+        return 0
+    print(f"{passed.count(False)} / {len(passed)} CHECKS FAILED")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
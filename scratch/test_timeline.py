@@ -0,0 +1,193 @@
+"""Tests for compiled animation timelines and the seeking animation runner.
+
+Covers :class:`src.animation.Timeline` and :class:`src.animation.Animation`:
+
+* a sequence compiles to its words and cumulative start times, and
+  ``index_at`` finds the right frame from any cursor hint;
+* frames play on the tick nearest their start (the last frame is shown for
+  its full slot), however uneven the ticks, and a long tick seeks straight
+  to the frame it lands in;
+* a looping animation wraps by modulo; ``loops=n`` plays ``n + 1`` passes
+  and then ends, its layer leaving the bay as it was;
+* several animations run at once, each under its own id, including one
+  started from another's ``done``;
+* ``next_deadline_ms`` names the tick that plays the next frame, and idle
+  ticks allocate nothing that outlives them.
+
+Run from repo root:
+
+    SDL_AUDIODRIVER=dummy SDL_VIDEODRIVER=dummy python3 scratch/test_timeline.py
+"""
+import os
+import sys
+import tracemalloc
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], "-s"]
+
+from src.animation import (Animation, Compositor, Frame, FrameSequence, Timeline,
+                           hold_pattern, ping_pong, random_k_dance)
+from src.config import config
+from src.game_loop import LaserBay
+
+
+class StubMixer:
+    def __init__(self):
+        self.played = []
+    def play_effect(self, name, **kwargs):
+        self.played.append(name)
+
+
+class StubGame:
+    profiler = None
+    def __init__(self):
+        self.lasers = LaserBay()
+        self.compositor = Compositor()
+        self.mixer = StubMixer()
+    def laser_word(self):
+        return self.compositor.compose(self.lasers.to_word())
+
+
+passed = []
+def check(label, cond):
+    passed.append(bool(cond))
+    print(("PASS" if cond else "FAIL"), "-", label)
+
+
+def fresh_game():
+    Animation.kill_all()
+    Animation.game = game = StubGame()
+    return game
+
+
+def run(dts):
+    """Tick the runner through ``dts``; return the composed word after each tick."""
+    words = []
+    for dt in dts:
+        Animation.update_all(dt)
+        words.append(Animation.game.laser_word())
+    return words
+
+
+def test_compile():
+    seq = FrameSequence(Frame.from_list(words=[1, 2, 4], sounds=["a.wav", None, None]),
+                        timing_track=[100, 50, 25])
+    tl = seq.compile()
+    check("a sequence compiles to words and cumulative starts",
+          tl.words == [1, 2, 4] and list(tl.starts) == [0, 100, 150] and tl.period_ms == 175
+          and tl.sounds == ("a.wav", None, None))
+    ok = all(tl.index_at(t, hint) == (0 if t < 100 else 1 if t < 150 else 2)
+             for t in (0, 50, 99.9, 100, 120, 150, 174) for hint in (0, 1, 2) if tl.starts[hint] <= t)
+    check("index_at finds the frame from any earlier cursor", ok and tl.index_at(160, 0) == 2)
+
+
+def test_playback():
+    game = fresh_game()
+    anim = Animation(Timeline([1, 2, 4], [100, 100, 100]))
+    anim.start()
+    tick = 1000 / config.FPS
+    words = run([tick] * int(300 // tick + 3))
+    shown = {}
+    for i, word in enumerate(words):
+        shown.setdefault(word, (i + 1) * tick)
+    check("frames play on the tick nearest their start",
+          all(abs(shown[w] - start) <= tick / 2 + 1e-9 for w, start in ((2, 100), (4, 200)))
+          and words[0] == 1)
+    check("the last frame holds its slot, then its layer goes",
+          4 in words and words[-1] == 0 and anim.anim_id not in Animation.currently_running)
+
+    fresh_game()
+    anim = Animation(Timeline([1, 2, 4, 8], [100] * 4))
+    anim.start()
+    words = run([10, 250, 10])
+    check("a long tick seeks straight to the frame it lands in", words == [1, 4, 4]
+          and anim.frame_no == 2)
+
+
+def test_loops():
+    fresh_game()
+    anim = hold_pattern(fps=10, pattern=[1, 2, 3])
+    anim.start()
+    words = run([37.0, 41.0, 29.0, 53.0, 100.0, 17.0, 60.0, 300.0])
+    t, expect = 0.0, []
+    for dt in (37.0, 41.0, 29.0, 53.0, 100.0, 17.0, 60.0, 300.0):
+        t += dt
+        expect.append([1, 2, 3][int((t + anim.epsilon) // 100) % 3])
+    check("a looping animation wraps by modulo on uneven ticks", words == expect)
+    check("it keeps running and counts its passes",
+          anim.anim_id in Animation.currently_running and anim.pass_no == int((t + anim.epsilon) // 300))
+
+    fresh_game()
+    anim = Animation(Timeline([5, 6], [50, 50]), loops=1)
+    anim.start()
+    words = run([50.0] * 5)
+    check("loops=1 plays two passes, then ends",
+          words == [6, 5, 6, 0, 0] and anim.anim_id not in Animation.currently_running)
+
+
+def test_concurrent():
+    game = fresh_game()
+    a = ping_pong(fps=10, loops=0)
+    b = random_k_dance(k=2, fps=10, dur=1.0)
+    check("factories build compiled timelines with their own ids",
+          isinstance(a.timeline, Timeline) and isinstance(b.timeline, Timeline)
+          and len(b.timeline) == 10 and a.anim_id != b.anim_id)
+    a.start()
+    b.start()
+    check("two animations run at once", len(Animation.currently_running) == 2)
+
+    fresh_game()
+    follow = Animation(Timeline([9], [100]))
+    lead = Animation(Timeline([1], [20]), done_callback=follow.start)
+    lead.start()
+    words = run([20.0, 20.0, 20.0])
+    check("an animation started from another's done runs next",
+          words[1:] == [9, 9] and follow.anim_id in Animation.currently_running
+          and lead.anim_id not in Animation.currently_running)
+
+
+def test_deadline_and_allocation():
+    fresh_game()
+    anim = Animation(Timeline([1, 2], [500, 500]), loops=-1)
+    anim.start()
+    run([10.0])
+    deadline = Animation.next_deadline_ms(1000.0)
+    check("next_deadline_ms is when the next frame plays",
+          abs(deadline - (1000.0 + 500 - anim.epsilon - 10)) < 1e-9)
+
+    Animation.kill_all()
+    anims = [Animation(Timeline([1, 2], [1e9, 1e9]), loops=-1) for _ in range(20)]
+    for anim in anims:
+        anim.start()
+    run([10.0])
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    run([10.0] * 200)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    check("idle ticks of 20 animations allocate nothing that outlives them",
+          after - before < 512)
+
+
+def main():
+    try:
+        test_compile()
+        test_playback()
+        test_loops()
+        test_concurrent()
+        test_deadline_and_allocation()
+    finally:
+        Animation.kill_all()
+
+    print()
+    if all(passed):
+        print(f"ALL {len(passed)} CHECKS PASSED")
+        return 0
+    print(f"{passed.count(False)} / {len(passed)} CHECKS FAILED")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""Tests for the hierarchical timer wheel and what runs on it.
+
+Covers :class:`src.timer_wheel.TimerWheel` and its users:
+
+* timers fire on the first run strictly after their deadline, in deadline
+  order (ties in the order scheduled), however far the clock jumps -- checked
+  against a sorted reference over deadlines from now to beyond the wheel;
+* handles cancel, re-arm (``reset``) and report ``active``; a callback can
+  cancel a timer due in the same run, or schedule one that is already due,
+  or clear the wheel and schedule on it again;
+* ``next_deadline_ms`` is the earliest pending deadline at every level;
+* ``Program.after`` returns a cancellable handle, cooldowns end on time and
+  restart cleanly, and adaptive pacing sees both;
+* Trivia's voice sequencer cancels the clip in flight on interrupt.
+
+Run from repo root:
+
+    SDL_AUDIODRIVER=dummy SDL_VIDEODRIVER=dummy python3 scratch/test_timer_wheel.py
+"""
+import os
+import random
+import sys
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], "-s"]
+
+from src.timer_wheel import TimerWheel
+
+
+passed = []
+def check(label, cond):
+    passed.append(bool(cond))
+    print(("PASS" if cond else "FAIL"), "-", label)
+
+
+def test_order_and_jumps():
+    rng = random.Random(7)
+    ok_fire, ok_next = True, True
+    for _ in range(20):
+        wheel = TimerWheel(10)
+        fired = []
+        now = 0.0
+        pending = []
+        for i in range(300):
+            deadline = now + rng.choice([rng.uniform(-5, 50), rng.uniform(0, 5e3),
+                                         rng.uniform(0, 5e5), rng.uniform(0, 1e8), rng.uniform(0, 1e10)])
+            pending.append((deadline, i, wheel.call_at(deadline, fired.append, i)))
+        for entry in rng.sample(pending, 50):
+            entry[2].cancel()
+            pending.remove(entry)
+        pending.sort()
+        while pending:
+            ok_next &= wheel.next_deadline_ms() == pending[0][0]
+            now += rng.choice([rng.uniform(0, 30), rng.uniform(0, 1e4), rng.uniform(0, 1e9),
+                               pending[0][0] - now + 1e-6])
+            fired.clear()
+            wheel.run_due(now)
+            ok_fire &= fired == [i for deadline, i, _ in pending if deadline < now]
+            pending = [entry for entry in pending if entry[0] >= now]
+            ok_fire &= len(wheel) == len(pending)
+    check("timers fire strictly after their deadline, in order, across any jump", ok_fire)
+    check("next_deadline_ms is the earliest pending deadline at every level", ok_next)
+    check("an empty wheel has no next deadline", TimerWheel().next_deadline_ms() is None)
+
+
+def test_handles():
+    wheel = TimerWheel(10)
+    fired = []
+    a = wheel.call_at(100, fired.append, "a")
+    b = wheel.call_at(100, fired.append, "b")
+    c = wheel.call_at(50, fired.append, "c")
+    wheel.run_due(100)
+    check("a deadline equal to now is not yet due", fired == ["c"] and a.active)
+    wheel.run_due(100.5)
+    check("equal deadlines fire in the order scheduled", fired == ["c", "a", "b"]
+          and not a.active and len(wheel) == 0)
+
+    fired.clear()
+    t = wheel.call_at(200, fired.append, "t")
+    t.cancel()
+    t.cancel()
+    wheel.reset(t, 300)
+    wheel.run_due(250)
+    check("a cancelled timer can be re-armed with reset", fired == [] and t.active)
+    wheel.reset(t, 260)
+    wheel.run_due(270)
+    check("reset moves a pending timer", fired == ["t"] and len(wheel) == 0)
+
+    fired.clear()
+    later = wheel.call_at(290, fired.append, "later")
+    def first():
+        fired.append("first")
+        later.cancel()
+        wheel.call_at(280, fired.append, "added")
+    wheel.call_at(285, first)
+    wheel.run_due(300)
+    check("a callback can cancel a due timer and add one that is already due",
+          fired == ["first", "added"] and len(wheel) == 0)
+
+    wheel.call_at(1e12, fired.append, "far")
+    wheel.clear()
+    check("clear drops everything", len(wheel) == 0 and wheel.next_deadline_ms() is None)
+
+    fired.clear()
+    def teardown():
+        # a program's quit() from a timer: clear the wheel, schedule afresh
+        fired.append("teardown")
+        wheel.clear()
+        wheel.call_at(305, fired.append, "due")
+        wheel.call_at(330, fired.append, "soon")
+        wheel.call_at(5e4, fired.append, "far")
+    wheel.call_at(301, teardown)
+    wheel.call_at(302, fired.append, "dropped")
+    wheel.call_at(2e4, fired.append, "dropped")
+    wheel.run_due(1000)  # a late frame: "soon" is due in this same run
+    check("a callback can clear the wheel and schedule on it again",
+          fired == ["teardown", "due", "soon"] and len(wheel) == 1
+          and wheel.next_deadline_ms() == 5e4)
+    wheel.run_due(6e4)
+    check("... and the timers it adds later fire on time",
+          fired == ["teardown", "due", "soon", "far"] and len(wheel) == 0)
+
+
+def test_program():
+    from src.game_loop import Game
+    from src.audio_utils import Mixer
+    from src.config import config
+    from src.event_loop import events
+
+    class ScriptedPISO:
+        def read_word(self):
+            return 0
+
+    class NullSIPO:
+        def push_word(self, word):
+            pass
+
+    config.DEBOUNCE_RELEASE_MS = 0
+    game = Game(PISOreg=ScriptedPISO(), SIPOreg=NullSIPO(), mixer=Mixer(), events=events)
+    prog = game.state_machine.program
+    prog.teardown()
+    step = lambda ms: game.update(ms)
+
+    ran = []
+    keep = prog.after(100, ran.append, "keep")
+    drop = prog.after(50, ran.append, "drop")
+    drop.cancel()
+    prog.start_cooldown(3, ms=200)
+    step(60)
+    step(60)
+    check("after returns a handle; a cancelled callback never runs", ran == ["keep"]
+          and not keep.active and 3 in prog.cooldowns)
+    prog.start_cooldown(3, ms=200)  # restart: the end moves out
+    step(150)
+    check("restarting a cooldown moves its end", 3 in prog.cooldowns)
+    deadline = prog.timers.next_deadline_ms()
+    step(60)
+    check("the cooldown ends on time and pacing saw its deadline",
+          3 not in prog.cooldowns and abs(deadline - (120 + 200)) < 1e-9 and len(prog.timers) == 0)
+
+
+def test_voice():
+    from src.programs.trivia_voice import _VoSequencer
+    from src.audio_utils import Mixer
+    wheel = TimerWheel(10)
+    now = [0.0]
+    after = lambda ms, fn, *args: wheel.call_at(now[0] + ms, fn, *args)
+    done = []
+
+    class Clip:
+        def get_length(self):
+            return 0.5
+
+    class Channel:
+        def __init__(self):
+            self.played = []
+        def play(self, sound, loops=0):
+            self.played.append(sound)
+        def stop(self):
+            pass
+
+    channel = Channel()
+    seq = _VoSequencer(Mixer(), channel, after, gap_ms=0)
+    seq.play([Clip(), Clip()], on_done=lambda: done.append(True))
+    seq.interrupt()
+    now[0] = 5000.0
+    wheel.run_due(now[0])
+    check("an interrupt cancels the clip in flight",
+          len(channel.played) == 1 and not done and len(wheel) == 0)
+
+
+def main():
+    test_order_and_jumps()
+    test_handles()
+    test_program()
+    test_voice()
+
+    print()
+    if all(passed):
+        print(f"ALL {len(passed)} CHECKS PASSED")
+        return 0
+    print(f"{passed.count(False)} / {len(passed)} CHECKS FAILED")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -25,6 +25,9 @@ from src.config import config
 from src.programs import trivia as trivia_mod
 from src.programs.trivia_source import Question
 
+# Scripted inputs are clean edges a frame apart: no contact bounce to filter.
+config.DEBOUNCE_RELEASE_MS = 0
+
 
 class ScriptedPISO:
     def __init__(self):
@@ -0,0 +1,173 @@
+"""Tests for the frame-driven music ducking and fades.
+
+Covers :class:`src.audio_utils.VolumeAutomation` and the ``Mixer`` calls on it:
+
+* the fade curves start and end on their levels; the log curve is even in
+  decibels and fades to and from silence;
+* a duck fades down, holds and restores on the automation clock, and the music
+  volume follows it frame by frame;
+* a duck that arrives mid-hold extends the first one (no early restore, no
+  race), and one that arrives mid-release starts from the current gain;
+* setting the volume, fading the music out or stopping everything ends a duck;
+* ducking starts no threads, and ``Game.update`` steps the automation.
+
+Run from repo root:
+
+    SDL_AUDIODRIVER=dummy SDL_VIDEODRIVER=dummy python3 scratch/test_volume_automation.py
+"""
+import os
+import sys
+import threading
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.argv = [sys.argv[0], "-s"]
+
+import pygame
+
+from src.audio_utils import Curve, Envelope, Mixer, VolumeAutomation
+from src.config import config
+
+MUSIC = VolumeAutomation.MUSIC
+QUANTUM = 1 / 128 + 1e-9  # pygame keeps music volume in 1/128 steps
+
+
+passed = []
+def check(label, cond):
+    passed.append(bool(cond))
+    print(("PASS" if cond else "FAIL"), "-", label)
+
+
+def close(a, b, tol=1e-9):
+    return abs(a - b) <= tol
+
+
+def test_curves():
+    ends = all(close(curve(0, 0.2, 0.8), 0.2) and close(curve(1, 0.2, 0.8), 0.8)
+               for curve in (Curve.LINEAR, Curve.SMOOTH, Curve.LOG))
+    check("every curve starts and ends on its levels", ends)
+    check("linear and smooth meet at the midpoint",
+          close(Curve.LINEAR(0.5, 0, 1), 0.5) and close(Curve.SMOOTH(0.5, 0, 1), 0.5)
+          and Curve.SMOOTH(0.1, 0, 1) < Curve.LINEAR(0.1, 0, 1))
+    check("the log curve is even in decibels", close(Curve.LOG(0.5, 0.01, 1), 0.1))
+    check("the log curve fades to and from silence",
+          Curve.LOG(0, 0, 1) == 0 and close(Curve.LOG(0.5, 1, 0), 10 ** -1.5)
+          and Curve.LOG(1, 1, 0) == 0)
+
+    env = Envelope(0, 1.0).to(0.0, 100).to(0.0, 50).to(0.5, 0)
+    check("an envelope is read by segment, holds and jumps, and stays at its end",
+          [env.at(t) for t in (0, 50, 120, 150, 500)] == [1.0, 0.5, 0.0, 0.5, 0.5])
+
+
+def new_mixer():
+    mixer = Mixer()
+    mixer.set_music_volume(0.8)
+    return mixer
+
+
+def run(mixer, ms, dt=10):
+    """Step ``ms`` of frames; returns the music volume after each."""
+    vols = []
+    for _ in range(int(ms // dt)):
+        mixer.update(dt)
+        vols.append(mixer.music_gain())
+    return vols
+
+
+def test_duck():
+    mixer = new_mixer()
+    mixer.duck_music(1.0, duck_vol=0.2, restore_vol=0.8)
+    down = run(mixer, 250)
+    check("a duck fades down over DUCK_DUR", close(down[-1], 0.2)
+          and all(a >= b for a, b in zip(down, down[1:])) and down[0] < 0.8)
+    check("the music volume follows the envelope",
+          abs(pygame.mixer.music.get_volume() - 0.2) <= QUANTUM)
+    hold = run(mixer, 740)
+    check("it holds for the duck's length", all(close(v, 0.2) for v in hold))
+    up = run(mixer, 270)
+    check("then restores over DUCK_DUR", close(up[-1], 0.8) and not mixer.automation.envelopes
+          and abs(pygame.mixer.music.get_volume() - 0.8) <= QUANTUM)
+
+    mixer = new_mixer()
+    mixer.duck_music(1.0, duck_vol=0.2, restore_vol=0.8)
+    run(mixer, 500)
+    mixer.duck_music(1.0, duck_vol=0.3, restore_vol=0.7)   # overlaps the first
+    vols = run(mixer, 900)
+    check("an overlapping duck extends the first: no restore in between",
+          all(v <= 0.3 + 1e-9 for v in vols) and close(vols[-1], 0.3))
+    vols = run(mixer, 400)
+    check("and the latest levels win", close(vols[-1], 0.7))
+
+    mixer = new_mixer()
+    mixer.duck_music(0.5, duck_vol=0.2, restore_vol=0.8)
+    run(mixer, 600)                      # partway back up
+    mid = mixer.music_gain()
+    mixer.duck_music(0.5, duck_vol=0.2, restore_vol=0.8)
+    mixer.update(1)
+    check(f"a duck during the release starts from the current gain ({mid:.2f})",
+          0.2 < mid < 0.8 and abs(mixer.music_gain() - mid) < 0.05)
+
+    for end in ("set", "fade", "stop"):
+        mixer = new_mixer()
+        mixer.duck_music(1.0, duck_vol=0.2, restore_vol=0.8)
+        run(mixer, 300)
+        if end == "set":
+            mixer.set_music_volume(0.5)
+        elif end == "fade":
+            mixer.fade_music(100)
+        else:
+            mixer.stop_all()
+        run(mixer, 2000)
+        ok = not mixer.automation.envelopes and close(mixer.music_gain(), 0.5 if end == "set" else 0.2)
+        check(f"{end} ends a running duck", ok)
+
+    mixer = new_mixer()
+    mixer.ramp_music(0.0, 400, Curve.SMOOTH)
+    vols = run(mixer, 400)
+    check("ramp_music fades along the chosen curve",
+          close(vols[19], 0.4) and vols[4] > 0.8 * (1 - 0.125) and vols[-1] == 0.0)
+
+
+def test_no_threads_and_game():
+    from src.game_loop import Game
+    from src.event_loop import events
+
+    class ScriptedPISO:
+        def read_word(self):
+            return 0
+
+    class NullSIPO:
+        def push_word(self, word):
+            pass
+
+    config.DEBOUNCE_RELEASE_MS = 0
+    game = Game(PISOreg=ScriptedPISO(), SIPOreg=NullSIPO(), mixer=Mixer(), events=events)
+    mixer = game.mixer
+    mixer.set_music_volume(1.0)
+    before = threading.active_count()
+    for bank_id in range(5):
+        mixer.play_by_id(bank_id)                       # ducks, as on every cue
+        mixer.duck_music(0.3, duck_vol=0.4, restore_vol=1.0)
+    check("ducking starts no threads", threading.active_count() == before)
+    game.update(100)
+    check("Game.update steps the automation", mixer.music_gain() < 1.0
+          and mixer.automation.now_ms == 100)
+    mixer.stop_all()
+
+
+def main():
+    test_curves()
+    test_duck()
+    test_no_threads_and_game()
+
+    print()
+    if all(passed):
+        print(f"ALL {len(passed)} CHECKS PASSED")
+        return 0
+    print(f"{passed.count(False)} / {len(passed)} CHECKS FAILED")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
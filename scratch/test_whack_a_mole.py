@@ -22,6 +22,9 @@ from src.audio_utils import Mixer
 from src.event_loop import events
 from src.config import config
 
+# Scripted inputs are clean edges a frame apart: no contact bounce to filter.
+config.DEBOUNCE_RELEASE_MS = 0
+
 # Point the persistent high-score file at a throwaway temp path so the test is
 # hermetic (never touches a real box's records).
 _HS = os.path.join(tempfile.mkdtemp(prefix="whack_hs_"), "whack_a_mole.json")
@@ -72,6 +75,7 @@ def main():
 
     # the fixed clips loaded (hammer on every press, mole-hit on a hit, pop-up on spawn)
     fx = game.mixer.effects
+    game.mixer.wait_loads()   # the spoken stubs and numbers decode in the background
     check("hammer clip loaded", prog().hammer in fx)
     check("mole-hit clip loaded", prog().mole_hit in fx)
     check("pop-up clip loaded", prog().popup in fx)
@@ -9,19 +9,48 @@ print('importing Simulator')
 from .simulator.simulator import Simulator
 print('importing Event Loop')
 from .event_loop import events
+from .spi_register import SpiInputShiftRegister, SpiOutputShiftRegister
+from .input_sampler import InputSampler
+from .output_scheduler import OutputScheduler
+from .bam import BamEngine
+from .flight_recorder import FlightRecorder
+from .config import config
 
 print('loading src/__main__.py ...')
 mixer = Mixer()
+recorder = FlightRecorder() if config.RECORDER_ENABLED else None
 
 if '-s' in sys.argv:
     #PISOreg = DummyInputShiftRegister() 
     #SIPOreg = DummyOutputShiftRegister() 
-    game = Simulator()
+    game = Simulator(recorder=recorder)
     game.run()
 else:
-    PISOreg = InputShiftRegister() 
-    SIPOreg = OutputShiftRegister() 
-    game = Game(PISOreg=PISOreg, SIPOreg=SIPOreg, mixer=mixer, events=events)
+    if config.REGISTER_DUPLEX and config.REGISTER_BACKEND != 'rpi':
+        raise ValueError('REGISTER_DUPLEX needs REGISTER_BACKEND = "rpi" (not "mmap" or "spi")')
+    if config.REGISTER_BACKEND == 'mmap':
+        PISOreg = MmapInputShiftRegister()
+        SIPOreg = MmapOutputShiftRegister()
+    elif config.REGISTER_BACKEND == 'spi':
+        PISOreg = SpiInputShiftRegister()
+        SIPOreg = SpiOutputShiftRegister()
+    elif config.REGISTER_DUPLEX:
+        if config.INPUT_BACKEND == 'thread':
+            raise ValueError('REGISTER_DUPLEX cannot be combined with INPUT_BACKEND = "thread"')
+        if config.OUTPUT_SCHEDULER or config.BAM_ENABLED:
+            raise ValueError('REGISTER_DUPLEX cannot be combined with OUTPUT_SCHEDULER or BAM_ENABLED')
+        PISOreg = SIPOreg = DuplexShiftRegister()
+    else:
+        PISOreg = InputShiftRegister()
+        SIPOreg = OutputShiftRegister()
+    if config.INPUT_BACKEND == 'thread':
+        PISOreg = InputSampler(PISOreg, edge_pin=config.INPUT_EDGE_PIN).start()
+    if config.BAM_ENABLED:
+        SIPOreg = BamEngine(SIPOreg).start()
+    if config.OUTPUT_SCHEDULER:
+        SIPOreg = OutputScheduler(SIPOreg).start()
+    game = Game(PISOreg=PISOreg, SIPOreg=SIPOreg, mixer=mixer, events=events,
+                recorder=recorder)
     game.run()
 
 
@@ -2,25 +2,33 @@
 
 A :class:`Frame` is one laser word (+ optional sound). A :class:`FrameSequence`
 is an ordered list of frames with per-frame timings; :class:`DynamicFrameSequence`
-generates frames on the fly via a function. An :class:`Animation` plays a
-sequence over time, driven once per game frame by :meth:`Animation.update_all`.
-
-Animations run globally: the class tracks all running animations and they write
-directly to the shared :class:`~src.game_loop.LaserBay` via the ``Animation.game``
-reference set by :class:`~src.game_loop.Game`. The factory helpers at the bottom
+generates frames on the fly via a function. Either compiles to a
+:class:`Timeline` -- flat arrays of words and cumulative start times -- which an
+:class:`Animation` plays by seeking to its elapsed time, driven once per game
+frame by :meth:`Animation.update_all`.
+
+Animations run globally: the class tracks all running animations. Each draws
+into its own :class:`Layer` of the game's :class:`Compositor` (reached via the
+``Animation.game`` reference set by :class:`~src.game_loop.Game`), which blends
+the layers over the program's :class:`~src.game_loop.LaserBay` once per frame,
+so an animation never overwrites the program's word. The factory helpers at the bottom
 (:func:`hold_pattern`, :func:`ping_pong`, :func:`random_k_dance`) build ready-to-
 start animations.
 """
 # animation.py #
 import random
 import os
+from array import array
+from bisect import bisect_right
+from . import clock
 from .config import config
+from .timer_wheel import TimerWheel
 
 class Frame:
   """A single animation frame: a laser ``word`` and/or a ``sound`` to play.
 
   Args:
-      word: 14-bit laser bitmask for this frame (or None to leave lasers as-is).
+      word: Laser bitmask for this frame (or None to leave lasers as-is).
       sound: Effect filename to play on this frame (or None).
       t: Optional per-frame time (unused by the default timing track).
   """
@@ -73,6 +81,11 @@ class FrameSequence:
     frame_t = dur / len(frames)
     return cls(frames=frames, timing_track=[frame_t]*len(frames))
 
+  def compile(self):
+    """This sequence as a :class:`Timeline`."""
+    return Timeline([frame.word for frame in self.frames], self.timing_track,
+                    [frame.sound for frame in self.frames], self.func)
+
 
 class DynamicFrameSequence(FrameSequence):
   """A frame sequence whose frames are generated on the fly by ``func``.
@@ -92,8 +105,8 @@ class DynamicFrameSequence(FrameSequence):
 
 
   def random(self, frame):
-    """Default generator: a fully random 14-bit laser word."""
-    return Frame(word=random.randint(0,2**14-1))
+    """Default generator: a fully random laser word (``config.N_PORTS`` bits)."""
+    return Frame(word=random.randint(0, (1 << config.N_PORTS) - 1))
 
   @classmethod
   def by_fps(cls, func, n_frames, fps):
@@ -102,119 +115,326 @@ class DynamicFrameSequence(FrameSequence):
     return cls(func=func, n_frames=n_frames, timing_track=[frame_t]*n_frames)
 
 
+class Timeline:
+  """A frame sequence compiled to flat arrays, looked up by elapsed time.
+
+  Frame ``i`` covers ``starts[i] <= t < starts[i+1]`` (the last one runs to
+  ``period_ms``). :meth:`index_at` finds the frame for a time with a cursor
+  check first -- playback only moves forward, so that is usually one
+  comparison -- and a binary search otherwise. Nothing is allocated per
+  lookup, so any number of animations can share or step timelines each tick.
+
+  Args:
+      words: Laser word per frame (None leaves the lasers as they are).
+      durations_ms: Duration per frame, ms.
+      sounds: Effect filename (or None) per frame; None for no sounds.
+      func: Optional per-frame transform, ``Frame -> Frame``, applied when a
+          frame plays (the :class:`DynamicFrameSequence` generator).
+
+  Attributes:
+      words (list): The frame words.
+      sounds (tuple): The frame sounds, or None if no frame has one.
+      starts (array): Cumulative start time of each frame, ms.
+      period_ms (float): One pass through the timeline, ms.
+  """
+  __slots__ = ('words', 'sounds', 'starts', 'period_ms', 'func', 'last_frame_index')
+
+  def __init__(self, words, durations_ms, sounds=None, func=None):
+    self.words = list(words)
+    self.sounds = tuple(sounds) if sounds is not None and any(sounds) else None
+    self.starts = array('d')
+    t = 0.0
+    for dur in durations_ms:
+      self.starts.append(t)
+      t += dur
+    self.period_ms = t
+    self.func = func
+    self.last_frame_index = len(self.words) - 1
+
+  @classmethod
+  def compile(cls, frames):
+    """``frames`` (a :class:`FrameSequence` or a Timeline) as a Timeline."""
+    return frames if isinstance(frames, Timeline) else frames.compile()
+
+  def __len__(self):
+    return len(self.words)
+
+  def __getitem__(self, index):
+    return Frame(self.words[index], self.sounds[index] if self.sounds else None)
+
+  def index_at(self, t_ms, hint=0):
+    """Index of the frame covering ``t_ms`` (``0 <= t_ms < period_ms``).
+
+    Args:
+        t_ms: Time into one pass, ms.
+        hint: A frame at or before the answer (the last one played).
+    """
+    starts = self.starts
+    nxt = hint + 1
+    if nxt > self.last_frame_index or t_ms < starts[nxt]:
+      if t_ms >= starts[hint]:
+        return hint
+    elif nxt == self.last_frame_index or t_ms < starts[nxt + 1]:
+      return nxt
+    return bisect_right(starts, t_ms) - 1
+
+  def end_of(self, index):
+    """When frame ``index`` ends, ms into the pass."""
+    if index < self.last_frame_index:
+      return self.starts[index + 1]
+    return self.period_ms
+
+
+class Blend:
+  """How a :class:`Layer` combines with the word beneath it, inside its mask."""
+  REPLACE = 0  # the layer's bits replace the masked ports
+  OR = 1       # light the layer's lit ports
+  XOR = 2      # flip the layer's lit ports
+  AND_NOT = 3  # darken the layer's lit ports
+
+
+class Layer:
+  """One layer of the laser word: a ``word``, the ports it owns, and a blend.
+
+  Args:
+      mask: Ports this layer may touch (default: every port).
+      blend: A :class:`Blend` mode.
+      z: Stacking order; higher layers compose later (on top).
+
+  Attributes:
+      word (int): The layer's current laser word; bits outside ``mask`` are ignored.
+      active (bool): True while the layer is in a :class:`Compositor`.
+  """
+  __slots__ = ('word', 'mask', 'blend', 'z', 'active')
+
+  def __init__(self, mask=None, blend=Blend.REPLACE, z=0):
+    self.word = 0
+    self.mask = (1 << config.N_PORTS) - 1 if mask is None else mask
+    self.blend = blend
+    self.z = z
+    self.active = False
+
+
+class Compositor:
+  """Stacks :class:`Layer` objects over the program's base word.
+
+  The base is the program's :class:`~src.game_loop.LaserBay`; layers are
+  applied on top of it in ``z`` order (ties in the order added), once per
+  frame, by :meth:`Game.render <src.game_loop.Game.render>`. A layer never
+  writes the base, so when it is removed the program's own word shows again.
+
+  Attributes:
+      layers (list): Active layers, bottom first.
+  """
+  def __init__(self):
+    self.layers = []
+
+  def add(self, layer):
+    """Put ``layer`` on the stack (no-op if it already is)."""
+    if layer.active:
+      return
+    layer.active = True
+    layers = self.layers
+    i = len(layers)
+    while i and layers[i - 1].z > layer.z:
+      i -= 1
+    layers.insert(i, layer)
+
+  def remove(self, layer):
+    """Take ``layer`` off the stack (no-op if it is not on it)."""
+    if layer.active:
+      layer.active = False
+      self.layers.remove(layer)
+
+  def clear(self):
+    """Remove every layer."""
+    for layer in self.layers:
+      layer.active = False
+    self.layers = []
+
+  def compose(self, base):
+    """The word shown: ``base`` with every layer blended over it, bottom first."""
+    word = base
+    for layer in self.layers:
+      mask = layer.mask
+      bits = layer.word & mask
+      blend = layer.blend
+      if blend == Blend.REPLACE:
+        word = (word & ~mask) | bits
+      elif blend == Blend.OR:
+        word |= bits
+      elif blend == Blend.XOR:
+        word ^= bits
+      else:
+        word &= ~bits
+    return word
+
+
 class Animation:
-  """Plays a :class:`FrameSequence` over time, writing to the lasers.
+  """Plays a :class:`Timeline` over time, drawing into its own :class:`Layer`.
+
+  The sequence is compiled once, at construction. The end of the current
+  frame is a timer on the runner's :class:`~src.timer_wheel.TimerWheel`; only
+  when it fires does the animation seek the timeline (``elapsed % period``),
+  play the frame found there and set the timer for the next one. Ticks in
+  between cost nothing per animation. A long tick skips straight to the right
+  frame, and looping is that same modulo, not a restart. Frames play up to
+  half a tick early (``epsilon``), so each lands on the nearest tick.
+
+  The layer joins the game's compositor when the first frame plays and leaves
+  it when the animation finishes or is killed, uncovering whatever the program
+  has on its base word by then.
 
   Subclass and override :meth:`set_up`, :meth:`play_frame`, and/or :meth:`done`,
   or pass a ``done_callback``. Build one and call :meth:`start`; the global
   :meth:`update_all` advances it each frame until it finishes.
 
   Args:
-      frames: The :class:`FrameSequence` to play.
+      frames: The :class:`FrameSequence` (or :class:`Timeline`) to play.
       loops: Extra loops after the first pass. ``-1`` loops forever.
       done_callback: Optional callable invoked when the animation ends.
+      layer: The :class:`Layer` to draw into (default: every port, replacing
+          what is beneath).
+
+  Attributes:
+      timeline (Timeline): The compiled sequence.
+      layer (Layer): Where the frames are drawn.
+      start_ms (float): The runner's clock at :meth:`start`.
+      frame_no (int): The frame playing (-1 before the first).
+      pass_no (int): Completed passes through the timeline.
 
   Class Attributes:
       currently_running (dict): anim_id -> running animation.
-      finished (dict): anim_ids that finished this frame (reaped by update_all).
+      now_ms (float): The runner's clock: the sum of every ``dt`` passed to
+          :meth:`update_all`.
+      timers (TimerWheel): Every running animation's next frame boundary.
       game: The :class:`~src.game_loop.Game`, injected so frames can drive output.
   """
   currently_running = { }
-  finished = { }
-  _anim_id = 0
+  now_ms = 0.0
+  timers = TimerWheel()
+  _next_id = 0
   game = None
 
-  def __init__(self, frames: FrameSequence, loops=0, done_callback=None):
+  def __init__(self, frames: FrameSequence, loops=0, done_callback=None, layer=None):
     """See class docstring. ``loops`` is the number of loops *after* the first."""
     self.frames = frames
+    self.timeline = Timeline.compile(frames)
     self.epsilon = 1000/config.FPS/2 # half the length of an update tick in ms
 
-    self._loops = loops
     self.loops = loops
     self.done = done_callback or self.done
+    self.layer = layer or Layer()
+    self._timer = None
 
-    self.anim_id = self._anim_id
-    self._anim_id += 1
+    self.anim_id = Animation._next_id
+    Animation._next_id += 1
 
   @classmethod
   def update_all(cls, dt):
-    """Advance every running animation by ``dt`` ms and reap finished ones."""
-    for anim_id, animation in cls.currently_running.items():
-      animation.update(dt)
+    """Advance the runner's clock by ``dt`` ms and play every frame now due."""
+    cls.now_ms += dt
+    timers = cls.timers
+    if timers.count:
+      prof = cls.game.profiler if cls.game is not None else None
+      timers.run_due(cls.now_ms, None if prof is None else cls._profiled(prof))
 
-    for anim_id in set(cls.finished):
-        cls.currently_running.pop(anim_id)
-    cls.finished = { }
+  @staticmethod
+  def _profiled(prof):
+    """A ``run_due`` caller that times each frame under its animation's name."""
+    def call(func, *args):
+      t0 = clock.monotonic()
+      func(*args)
+      animation = func.__self__
+      prof.note(f'{type(animation).__name__}#{animation.anim_id}', (clock.monotonic() - t0) * 1000.0)
+    return call
+
+  @classmethod
+  def next_deadline_ms(cls, now_ms):
+    """The ``now_ms`` of the next frame boundary of any running animation.
+
+    Returns None when nothing is running. A boundary is crossed on the first
+    update that brings the elapsed time within epsilon of it.
+    """
+    deadline = cls.timers.next_deadline_ms()
+    if deadline is None:
+      return None
+    return now_ms + deadline - cls.now_ms
+
+  @property
+  def t(self):
+    """Elapsed ms since :meth:`start`."""
+    return Animation.now_ms - self.start_ms
 
   def start(self):
     """Begin playback. Do not override (override :meth:`set_up` instead)."""
     print('animation started with id:', self.anim_id)
-    self.t = 0        # elapsed time since animation started
-    self.tick_no = 0  # incremented on each game frame
-    self.frame_no = 0
-    self.time_left_in_frame = self.frames.timing_track[0]
-    self.__class__.currently_running[self.anim_id] = self
+    self.start_ms = Animation.now_ms
+    self.frame_no = -1
+    self.pass_no = 0
+    # the first frame plays on the next update (its start, less epsilon, is due)
+    if self._timer is None:
+      self._timer = Animation.timers.call_at(self.start_ms - self.epsilon, self._on_due)
+    else:
+      Animation.timers.reset(self._timer, self.start_ms - self.epsilon)
+    Animation.currently_running[self.anim_id] = self
     self.set_up()
 
-  def advance_frame(self):
-    """Move to the next frame, carrying timing residual; finish at the end."""
-    residual = self.time_left_in_frame
-    print(f'residual:{residual:.1f}')
-    self.frame_no += 1
-    if self.frame_no > self.frames.last_frame_index:
-      return self.finish()
-    self.frame_length = self.frames.timing_track[self.frame_no]
-    self.time_left_in_frame = self.frame_length + residual # negative residual will shorten next frame, & vice versa
-
-  def frame_ready(self):
-    """True when the current frame's time has (nearly) elapsed."""
-    if self.time_left_in_frame < self.epsilon:
-      return True
-
-  def update(self, dt):
-    """Advance the animation by ``dt`` ms. Do not override."""
-    self.tick_no += 1
-    self.t += dt
-    self.time_left_in_frame -= dt
+  def _on_due(self):
+    self.seek(Animation.now_ms - self.start_ms + self.epsilon)
 
-    if self.frame_ready():
-      self.play_frame() # game ref not necessary here, it is stuck on the class object instead (TODO)
-      self.advance_frame()
+  def seek(self, t_ms):
+    """Play the frame at elapsed time ``t_ms``, looping or finishing as due."""
+    timeline = self.timeline
+    period = timeline.period_ms
+    if period <= 0:
+      return self.finish()
+    pass_no, local = divmod(t_ms, period)
+    pass_no = int(pass_no)
+    if self.loops != -1 and pass_no > self.loops:
+      return self.finish()
+    hint = self.frame_no if pass_no == self.pass_no and self.frame_no >= 0 else 0
+    index = timeline.index_at(local, hint)
+    due_ms = pass_no * period + timeline.end_of(index) - self.epsilon
+    Animation.timers.reset(self._timer, self.start_ms + due_ms)
+    if index != self.frame_no or pass_no != self.pass_no:
+      self.frame_no, self.pass_no = index, pass_no
+      self.play_frame()
 
   def finish(self):
-    """Loop or end the animation. Do not override (override :meth:`done`)."""
-    if self.loops == -1:
-      return self.start()
-
-    elif self.loops > 0:
-      self.loops -= 1
-      return self.start()
-
-    self.loops = self._loops
+    """End the animation. Do not override (override :meth:`done`)."""
+    self._stop()
     self.done()
-    self.__class__.finished[self.anim_id] = self
+
+  def _stop(self):
+    if self._timer is not None:
+      self._timer.cancel()
+    Animation.currently_running.pop(self.anim_id, None)
+    self.game.compositor.remove(self.layer)
 
   @classmethod
   def kill_by_id(cls, anim_id):
-    """Mark a single running animation (by id) to be reaped."""
+    """Stop a single running animation (by id), without its ``done``."""
     anim = cls.currently_running.get(anim_id)
     if anim is not None:
-      cls.finished[anim_id] = anim
+      anim.kill()
 
   @classmethod
   def kill_all(cls):
     """Immediately stop every running animation.
 
     Used by the StateMachine when tearing down a program so animations don't
-    keep driving the lasers into the next program. Does not invoke ``done``
-    callbacks.
+    keep driving the lasers into the next program. Clears every compositor
+    layer (a program's own overlays too). Does not invoke ``done`` callbacks.
     """
     cls.currently_running = { }
-    cls.finished = { }
+    cls.timers.clear()
+    if cls.game is not None:
+      cls.game.compositor.clear()
 
   def kill(self):
-    """Mark this animation to be reaped on the next :meth:`update_all`."""
-    self.__class__.finished[self.anim_id] = self
+    """Stop this animation now, without its ``done``."""
+    self._stop()
     print('animation killed with id:', self.anim_id)
 
   def set_up(self):
@@ -232,23 +452,27 @@ class Animation:
     pass
 
   def play_frame(self):
-      """Render the current frame: set the laser word and play its sound.
+      """Render the current frame: draw its word into the layer and play its sound.
 
-      The ``game`` reference is injected on the class by
-      :meth:`Game.__init__ <src.game_loop.Game.__init__>`.
+      Reads the compiled arrays directly; only a sequence with a ``func``
+      builds a :class:`Frame` to hand it. The ``game`` reference is injected
+      on the class by :meth:`Game.__init__ <src.game_loop.Game.__init__>`.
       """
-      frame = self.frames[self.frame_no] # uses complete word here, but could instead turn individual lasers on/off
-      if self.frames.func:
-        frame = self.frames.func(frame) # todo: what arguments if any to provide to func? could it be used to modify current frame before
-                # playback?
-      if frame.word is not None:
-        self.game.lasers.set_word(frame.word)
-      if frame.sound:
-        self.game.mixer.play_effect(frame.sound)
+      timeline, i = self.timeline, self.frame_no
+      word = timeline.words[i]
+      sound = timeline.sounds[i] if timeline.sounds else None
+      if timeline.func:
+        frame = timeline.func(Frame(word, sound))
+        word, sound = frame.word, frame.sound
+      if word is not None:
+        self.layer.word = word
+        if not self.layer.active:
+          self.game.compositor.add(self.layer)
+      if sound:
+        self.game.mixer.play_effect(sound)
 
   def done(self):
-    """End hook: clears the lasers. Override in a subclass or via init."""
-    self.game.lasers.set_word(0)
+    """End hook; the layer is already gone. Override in a subclass or via init."""
     print(f'Animation {self.anim_id} ended.')
 
   @staticmethod
@@ -265,29 +489,25 @@ class ThreadedAnimation:
 def hold_pattern(fps=1, loops=-1, pattern=[1,0,7,0,3,0,0,0]):
   """Build a slow looping animation that cycles through ``pattern`` words."""
   word_frames = pattern # todo: put this in config object
-  sound_frames = None
-  frames = Frame.from_list(words=word_frames, sounds=sound_frames)
-  frame_seq = FrameSequence.by_fps(frames=frames, fps=fps)
-  return Animation(frames=frame_seq, loops=loops)
+  return Animation(frames=Timeline(word_frames, [1000/fps]*len(word_frames)), loops=loops)
 
 def ping_pong(fps=5, loops=3):
   """Build a single-laser sweep that bounces up and back across the ports."""
-  word_frames =  [2**i for i in range(14)] + [2**i for i in reversed(range(1,13))]
-  sound_frames = None #[os.path.join('lasers', '02_Low.wav')]*len(word_frames)
-  frames = Frame.from_list(words=word_frames, sounds=sound_frames)
-  frame_seq = FrameSequence.by_fps(frames=frames, fps=fps)
-  return Animation(frames=frame_seq, loops=loops)
+  n = config.N_PORTS
+  word_frames =  [2**i for i in range(n)] + [2**i for i in reversed(range(1,n-1))]
+  return Animation(frames=Timeline(word_frames, [1000/fps]*len(word_frames)), loops=loops)
 
 def random_k_dance(k=3, fps=5, dur=10):
   """Build a celebratory animation flashing ``k`` random lasers per frame.
 
+  The random words are drawn once, here, into the timeline.
+
   Args:
       k: Number of lasers lit each frame.
       fps: Frames per second.
       dur: Total duration in seconds.
   """
   n_frames = int(dur * fps)
-  def func(frame):
-    return Frame(word=sum(1 << random.randint(0,13) for _ in range(k)))
-  frame_seq = DynamicFrameSequence.by_fps(func, n_frames, fps)
-  return Animation(frames=frame_seq)
+  n = config.N_PORTS
+  word_frames = [sum(1 << random.randint(0, n - 1) for _ in range(k)) for _ in range(n_frames)]
+  return Animation(frames=Timeline(word_frames, [1000/fps]*n_frames))
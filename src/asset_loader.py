@@ -0,0 +1,219 @@
+"""Background loading of sound assets, off the game loop's thread.
+
+Decoding a sound is a blocking disk read plus a WAV/OGG decode, and done on the
+game loop it stalls the frame it happens in -- a program's ``start()`` loading
+dozens of clips, or a voice line decoded the first time it is spoken, drops
+frames on the Pi Zero. :class:`AssetLoader` runs those loads on a small
+``ThreadPoolExecutor`` and hands back a :class:`Load` handle for each request.
+
+Threading rules: a worker only runs the load function (``Sound(path)``, which
+releases the GIL while SDL reads and decodes). Everything that touches shared
+state -- the sound cache, pins, volumes -- happens in a load's ``on_done``
+callbacks, which :meth:`AssetLoader.poll` runs on the game thread; the
+:class:`~src.audio_utils.Mixer` polls every frame. At most ``max_in_flight``
+loads are handed to the pool at once and the rest wait their turn, in request
+order, so a burst of prefetches cannot queue unbounded work (or decoded memory)
+behind the one sound a play is waiting for.
+"""
+import concurrent.futures
+from collections import deque
+
+from .config import config
+
+
+class Load:
+    """One requested load: queued, then in flight, then done.
+
+    Attributes:
+        key: What is loaded; the loader joins requests for the same key.
+        value: What the load function returned, once done.
+        error (Exception | None): What it raised instead, once done.
+        done (bool): Collected on the game thread, callbacks run.
+        cancelled (bool): Dropped by :meth:`AssetLoader.cancel_all`; it will
+            never be done.
+    """
+    def __init__(self, key, fn, args):
+        self.key = key
+        self.fn = fn
+        self.args = args
+        self.future = None  # set when handed to the pool
+        self.callbacks = []
+        self.value = None
+        self.error = None
+        self.done = False
+        self.cancelled = False
+
+    @property
+    def started(self):
+        """True once it has been handed to a worker."""
+        return self.future is not None
+
+    def __repr__(self):
+        state = ('done' if self.done else 'cancelled' if self.cancelled
+                 else 'in flight' if self.started else 'queued')
+        return f'<Load {self.key!r} {state}>'
+
+
+class AssetLoader:
+    """Runs load functions on worker threads, a capped number at a time.
+
+    Args:
+        workers: Worker threads (created on the first load).
+        max_in_flight: Loads handed to the pool at once; more wait in a queue.
+
+    Attributes:
+        loads (dict): Every load not yet collected, by key.
+        queued (deque): Loads waiting for a slot, oldest first.
+        in_flight (list): Loads handed to the pool.
+        completed / failed (int): Running counts of collected loads.
+    """
+    def __init__(self, workers=config.LOADER_WORKERS, max_in_flight=config.LOADER_MAX_IN_FLIGHT):
+        self.workers = workers
+        self.max_in_flight = max_in_flight
+        self.loads = {}
+        self.queued = deque()
+        self.in_flight = []
+        self.completed = 0
+        self.failed = 0
+        self._pool = None
+
+    def __len__(self):
+        return len(self.loads)
+
+    def __contains__(self, key):
+        return key in self.loads
+
+    def get(self, key):
+        """The pending :class:`Load` for ``key``, or None."""
+        return self.loads.get(key)
+
+    def load(self, key, fn, *args, on_done=None):
+        """Request ``fn(*args)`` on a worker. Never blocks.
+
+        A request for a key that is already pending joins that load instead of
+        starting another.
+
+        Args:
+            key: Names the load (e.g. the effect's file name).
+            fn: The load function; it runs on a worker thread, so it must not
+                touch game state.
+            *args: Its arguments.
+            on_done: Called with the :class:`Load` on the game thread once it
+                finishes, whether it succeeded or failed.
+
+        Returns:
+            Load: The handle.
+        """
+        load = self.loads.get(key)
+        if load is None:
+            load = Load(key, fn, args)
+            self.loads[key] = load
+            self.queued.append(load)
+            self._fill()
+        if on_done is not None:
+            load.callbacks.append(on_done)
+        return load
+
+    def wait(self, load, timeout_ms=None):
+        """Block until ``load`` finishes or ``timeout_ms`` passes, then collect.
+
+        A load still queued starts at once, past the cap: the caller needs it
+        now. Only the loads' own callbacks run, on this (the game) thread.
+
+        Args:
+            load: The handle to wait for.
+            timeout_ms: The most to wait; None waits as long as it takes.
+
+        Returns:
+            bool: Whether it is done; False at once for a cancelled load.
+        """
+        if load.done:
+            return True
+        if self.loads.get(load.key) is not load:
+            return False  # cancelled: never handed out again, never done
+        if load.future is None:
+            self.queued.remove(load)
+            self._submit(load)
+        concurrent.futures.wait([load.future], None if timeout_ms is None else timeout_ms / 1000)
+        self.poll()
+        return load.done
+
+    def wait_all(self, timeout_ms=None):
+        """Block until every pending load is done, or ``timeout_ms`` passes.
+
+        For tests and tools; the game loop never calls it.
+
+        Returns:
+            bool: Whether nothing is left pending.
+        """
+        while self.in_flight:
+            futures = [load.future for load in self.in_flight]
+            done, _ = concurrent.futures.wait(
+                futures, None if timeout_ms is None else timeout_ms / 1000,
+                return_when=concurrent.futures.FIRST_COMPLETED)
+            self.poll()
+            if not done:
+                break
+        return not self.loads
+
+    def poll(self):
+        """Collect finished loads, run their callbacks, and start queued ones.
+
+        Called on the game thread (every frame, by the mixer).
+
+        Returns:
+            list: The loads collected.
+        """
+        finished = []
+        in_flight = []
+        for load in self.in_flight:
+            (finished if load.future.done() else in_flight).append(load)
+        self.in_flight = in_flight
+        for load in finished:
+            if load.cancelled:
+                continue  # its result is for a mixer that is gone
+            del self.loads[load.key]
+            error = load.future.exception()
+            if error is None:
+                load.value = load.future.result()
+                self.completed += 1
+            else:
+                load.error = error
+                self.failed += 1
+            load.done = True
+            callbacks, load.callbacks = load.callbacks, []
+            for on_done in callbacks:
+                on_done(load)
+        self._fill()
+        return finished
+
+    def cancel_all(self):
+        """Forget every pending load without running its callbacks.
+
+        Loads already running finish on their worker and are dropped when
+        collected (they still count against the cap until then).
+        """
+        for load in self.loads.values():
+            load.callbacks = []
+            load.cancelled = True
+        self.loads.clear()
+        self.queued.clear()
+
+    def shutdown(self):
+        """Cancel everything pending and stop the workers (without waiting for them)."""
+        self.cancel_all()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        self.in_flight = []
+
+    def _fill(self):
+        while self.queued and len(self.in_flight) < self.max_in_flight:
+            self._submit(self.queued.popleft())
+
+    def _submit(self, load):
+        if self._pool is None:
+            self._pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix='asset-loader')
+        load.future = self._pool.submit(load.fn, *load.args)
+        self.in_flight.append(load)
@@ -10,26 +10,278 @@ Three kinds of audio:
   directory under ``assets/sounds/patches``; played by index with
   :meth:`Mixer.play_by_id`.
 
+Decoded effects and patches live in one :class:`~src.sound_cache.SoundCache`
+under a byte budget; what the active program loaded and the active patch are
+pinned there, everything else is evicted least recently used first. Effects
+can be decoded on background threads by an :class:`~src.asset_loader.AssetLoader`
+(:meth:`Mixer.prefetch`); a play whose sound is still loading waits for it at
+most ``config.LOAD_WAIT_MS`` and is skipped if it is not ready, so no frame
+blocks on a slow read.
+
 All assets are 22050 Hz / mono / 16-bit by convention. The mixer also supports
-"ducking" -- briefly lowering the music while a voice clip plays.
+"ducking" -- briefly lowering the music while a voice clip plays -- and other
+volume fades. Both are envelopes on a :class:`VolumeAutomation` that the game
+loop steps every frame (:meth:`Mixer.update`); no thread sleeps through a fade.
+
+Every play returns a :class:`Playback` for the channel it landed on. The same
+per-frame update watches those channels and, when one goes quiet, posts a
+:class:`~src.event_loop.SoundEndEvent` and calls the play's ``on_end``, so a
+program can sequence on what the audio actually did instead of on
+``Sound.get_length()`` estimates.
 """
 from pygame.mixer import Sound
 import pygame
+import math
 import os
 import subprocess
-import time
-from . import clock
-import threading
 from .config import config
+from .asset_loader import AssetLoader
 from .event_loop import SoundEndEvent, events
+from .sound_cache import SoundCache
+
+
+def lerp(t, a, b):
+    """Linear interpolation: return ``a`` at ``t=0`` and ``b`` at ``t=1``."""
+    return a + t*(b-a)
+
+
+def smoothstep(t, a, b):
+    """Ease in and out: like :func:`lerp`, but starting and landing gently."""
+    return a + t*t*(3 - 2*t)*(b-a)
+
+
+_SILENT = 1e-3  # -60 dB: where a logarithmic fade to or from silence starts/ends
+
+
+def log_lerp(t, a, b):
+    """Even steps in decibels, the way the ear hears a fade; 0 counts as -60 dB."""
+    if t <= 0:
+        return a
+    if t >= 1:
+        return b
+    lo_a, lo_b = max(a, _SILENT), max(b, _SILENT)
+    return lo_a * math.exp(t * math.log(lo_b / lo_a))
+
+
+class Curve:
+    """Fade shapes for :class:`VolumeAutomation`: ``curve(t, a, b)`` for ``t`` in 0..1."""
+    LINEAR = lerp
+    SMOOTH = smoothstep
+    LOG = log_lerp
+
+
+class Envelope:
+    """One target's gain over time: breakpoints joined by curved segments.
 
+    Built with :meth:`to`, read with :meth:`at`; time only moves forward, so a
+    cursor remembers the current segment.
 
-#class GameChannel(pygame.mixer.Channel):
-    # WIP
-#    def set_endevent(self, pg_evt_type):
-#        super().set_endevent(pg_evt_type)
-#        events.put(SoundEndEvent()) # not here..look in source for when event is pushed
-#        print('set endevent for channel')
+    Args:
+        start_ms: Where it starts, on the automation's timeline.
+        gain: The gain there.
+
+    Attributes:
+        points (list): ``(t_ms, gain, curve)``; ``curve`` shapes the segment
+            ending at that point.
+        hold_end_ms (float): For a duck, when its release begins (else None).
+    """
+    __slots__ = ('points', 'i', 'hold_end_ms')
+
+    def __init__(self, start_ms, gain):
+        self.points = [(start_ms, gain, None)]
+        self.i = 0
+        self.hold_end_ms = None
+
+    def to(self, gain, ms, curve=lerp):
+        """Add a segment reaching ``gain`` ``ms`` after the last point."""
+        self.points.append((self.points[-1][0] + max(ms, 0), gain, curve))
+        return self
+
+    @property
+    def end_ms(self):
+        return self.points[-1][0]
+
+    def at(self, now_ms):
+        """The gain at ``now_ms`` (held at the last point past the end)."""
+        points = self.points
+        i, last = self.i, len(points) - 1
+        while i < last and points[i + 1][0] <= now_ms:
+            i += 1
+        self.i = i
+        t0, g0, _ = points[i]
+        if i == last or now_ms <= t0:
+            return g0
+        t1, g1, curve = points[i + 1]
+        return curve((now_ms - t0) / (t1 - t0), g0, g1)
+
+
+class VolumeAutomation:
+    """Frame-driven volume envelopes, at most one per target.
+
+    A target is :attr:`MUSIC` (the streamed track) or anything with
+    ``set_volume``/``get_volume`` (a ``Sound`` or ``Channel``). :meth:`update`
+    advances the automation's own clock by the frame's ``dt`` and sets each
+    target that has an envelope to its gain for that instant. A new envelope
+    for a target starts from the gain the target has right now, so replacing
+    one never jumps.
+
+    Attributes:
+        now_ms (float): The automation's clock (the sum of every ``dt``).
+        envelopes (dict): target -> running :class:`Envelope`.
+    """
+    MUSIC = 'music'
+
+    def __init__(self):
+        self.now_ms = 0.0
+        self.envelopes = {}
+        self.levels = {}  # target -> the gain last set on it
+
+    def gain(self, target=MUSIC):
+        """The target's current gain: its envelope's, else the last one set."""
+        env = self.envelopes.get(target)
+        if env is not None:
+            return env.at(self.now_ms)
+        level = self.levels.get(target)
+        if level is None:
+            level = pygame.mixer.music.get_volume() if target == self.MUSIC else target.get_volume()
+        return level
+
+    def set(self, target, gain):
+        """Set the target's gain now, dropping any envelope it has."""
+        self.envelopes.pop(target, None)
+        self._apply(target, gain)
+
+    def cancel(self, target):
+        """Drop the target's envelope, leaving its gain where it is."""
+        self.envelopes.pop(target, None)
+
+    def ramp(self, target, gain, ms, curve=Curve.LINEAR):
+        """Fade the target from its current gain to ``gain`` over ``ms``.
+
+        Returns:
+            The new :class:`Envelope` (extend it with ``to`` for more segments).
+        """
+        env = Envelope(self.now_ms, self.gain(target)).to(gain, ms, curve)
+        self.envelopes[target] = env
+        return env
+
+    def duck(self, target, hold_ms, duck_gain, restore_gain, fade_ms, release_ms,
+             curve=Curve.LINEAR):
+        """Dip the target to ``duck_gain`` for ``hold_ms``, then return to ``restore_gain``.
+
+        It fades down over ``fade_ms`` (at most half the hold), stays down until
+        the hold ends, and fades back over ``release_ms``. A duck that arrives
+        while one is still holding extends it: the dip lasts until the later of
+        the two ends, and the latest levels win.
+        """
+        now = self.now_ms
+        end = now + hold_ms
+        running = self.envelopes.get(target)
+        if running is not None and running.hold_end_ms is not None and running.hold_end_ms > end:
+            end = running.hold_end_ms
+        fade_ms = min(fade_ms, (end - now) / 2)
+        env = self.ramp(target, duck_gain, fade_ms, curve)
+        env.to(duck_gain, end - now - fade_ms)
+        env.to(restore_gain, release_ms, curve)
+        env.hold_end_ms = end
+        return env
+
+    def update(self, dt):
+        """Advance ``dt`` ms and set every automated target to its gain."""
+        self.now_ms += dt
+        if not self.envelopes:
+            return
+        now, levels = self.now_ms, self.levels
+        finished = []
+        for target, env in self.envelopes.items():
+            gain = env.at(now)
+            if gain != levels.get(target):
+                self._apply(target, gain)
+            if now >= env.end_ms:
+                finished.append(target)
+        for target in finished:
+            del self.envelopes[target]
+
+    def clear(self):
+        """Drop every envelope."""
+        self.envelopes.clear()
+
+    def _apply(self, target, gain):
+        self.levels[target] = gain
+        if target == self.MUSIC:
+            pygame.mixer.music.set_volume(gain)
+        else:
+            target.set_volume(gain)
+
+
+class Playback:
+    """One play of a sound on a mixer channel: what :meth:`Mixer.play` returns.
+
+    :meth:`Mixer.update` watches the channel every frame and ends the playback
+    once the channel goes quiet or starts playing something else. A channel that
+    never reports its end is given up on ``config.SOUND_END_SLACK_MS`` after the
+    sound's length, so nothing waiting on it can hang. On the end the mixer posts
+    a :class:`~src.event_loop.SoundEndEvent` carrying the playback, then calls
+    ``on_end()``.
+
+    Attributes:
+        sound (Sound): What is playing.
+        channel (Channel): The channel it plays on (None if none was free; it
+            then ends on the next frame).
+        name (str): The effect's file name when played by name, else None.
+        on_end: Called with no arguments when it ends, or None.
+        due_ms (float): When it should end by its length, on the mixer clock
+            (None while it loops forever).
+        done (bool): True once ended or cancelled.
+        interrupted (bool): True if it was stopped or its channel taken before
+            it finished.
+    """
+    __slots__ = ('sound', 'channel', 'name', 'on_end', 'due_ms', 'end_by_ms',
+                 'done', 'interrupted')
+
+    def __init__(self, sound, channel, name=None, on_end=None):
+        self.sound = sound
+        self.channel = channel
+        self.name = name
+        self.on_end = on_end
+        self.due_ms = None
+        self.end_by_ms = None
+        self.done = False
+        self.interrupted = False
+
+    def stop(self, fade_ms=0):
+        """Stop (or fade out) the sound. It still ends, interrupted, on a later frame."""
+        if self.done:
+            return
+        self.interrupted = True
+        channel = self.channel
+        if channel is not None and channel.get_sound() is self.sound:
+            if fade_ms:
+                channel.fadeout(fade_ms)
+            else:
+                channel.stop()
+
+    def cancel(self):
+        """Stop watching: no event and no ``on_end``. The sound keeps playing."""
+        self.done = True
+        self.on_end = None
+
+    def _ended(self, now_ms):
+        channel = self.channel
+        if channel is None:
+            return True
+        playing = channel.get_sound()
+        if playing is not self.sound:
+            if playing is not None:
+                self.interrupted = True  # the channel was taken for another sound
+            return True
+        if not channel.get_busy():
+            return True
+        return self.end_by_ms is not None and now_ms > self.end_by_ms
+
+    def __repr__(self):
+        state = 'done' if self.done else 'playing'
+        return f'Playback({self.name or self.sound!r}, {state})'
 
 
 class Mixer:
@@ -44,16 +296,27 @@ class Mixer:
     Class Attributes:
         MUSIC_DIR / SOUNDS_DIR / PATCH_DIR / EFFECTS_DIR (str): Asset roots.
         DUCK_DUR (float): Duck fade duration (seconds).
+        DUCK_CURVE: Shape of the duck fades (a :class:`Curve`).
         VOL_LOW / VOL_HIGH (float): Ducked / normal music volumes.
+
+    Attributes:
+        automation (VolumeAutomation): The volume envelopes; stepped by
+            :meth:`update`.
+        playing (list): The :class:`Playback` objects still being watched.
+        effects (SoundCache): Decoded effects by file name, and patches by
+            ``('patch', name)``.
+        loader (AssetLoader): Decodes effects and measures music in the
+            background; polled by :meth:`update`.
+        patch (list): The active patch's 14 sounds.
     """
     MUSIC_DIR = os.path.join(config.PROJECT_ROOT, 'assets', 'music')
     SOUNDS_DIR = os.path.join(config.PROJECT_ROOT, 'assets', 'sounds')
     PATCH_DIR = os.path.join(SOUNDS_DIR, 'patches')
     EFFECTS_DIR = os.path.join(SOUNDS_DIR, 'effects')
     DUCK_DUR = .25
+    DUCK_CURVE = staticmethod(Curve.LINEAR)
     VOL_LOW = .15
     VOL_HIGH = 1
-    FPS = 30
 
     def __init__(self, sr=int(22050), bitdepth=-16, channels=1, buffer=config.AUDIO_BUFFER):
         pygame.mixer.pre_init(sr, bitdepth, channels, buffer)
@@ -61,11 +324,64 @@ class Mixer:
         print(f'mixer initialized in Mixer class to sr:{sr}, buffer:{buffer}')
 
         self.patch = None
-        self.patches = { }
-        self.effects = { }
-        self._load_patch('numbers')
+        self.effects = SoundCache(config.SOUND_CACHE_BYTES)
+        self.loader = AssetLoader()
+        self._held = set()  # cache keys pinned for the active program
+        self._patch_key = None
+        self._wanted_patch = None  # key of the patch use_patch is waiting for
+        self._program = 0  # bumped on every program switch
+        self._music_lengths = {}
         self.use_patch('numbers')
-        self.fps = self.FPS
+        self.automation = VolumeAutomation()
+        self.playing = []
+
+    def update(self, dt):
+        """Advance the volume automation by ``dt`` ms, end finished playbacks,
+        and cache the sounds the loader has finished decoding.
+
+        Called once per frame, before the program's update, so the
+        ``SoundEndEvent`` of a sound that ended is in that frame's events.
+        """
+        self.automation.update(dt)
+        if self.playing:
+            self._watch()
+        if self.loader.in_flight:
+            self.loader.poll()
+
+    def _watch(self):
+        now = self.automation.now_ms
+        ended = []
+        playing = []
+        for playback in self.playing:
+            if playback.done:
+                continue
+            (ended if playback._ended(now) else playing).append(playback)
+        self.playing = playing  # on_end callbacks may start new playbacks
+        for playback in ended:
+            playback.done = True
+            events.put(SoundEndEvent(sound=playback.sound, playback=playback))
+            on_end, playback.on_end = playback.on_end, None
+            if on_end is not None:
+                on_end()
+
+    def next_deadline_ms(self, now_ms):
+        """The ``now_ms`` at which the next watched sound should end, or None.
+
+        That is its length after it started or, once that has passed, the
+        give-up time, so adaptive pacing wakes for the end instead of idling
+        past it (and polls meanwhile). ``now_ms`` is the caller's clock.
+        """
+        mixer_now = self.automation.now_ms
+        deadline = None
+        for playback in self.playing:
+            due = playback.due_ms
+            if playback.done or due is None:
+                continue
+            if due < mixer_now:
+                due = playback.end_by_ms
+            if deadline is None or due < deadline:
+                deadline = due
+        return None if deadline is None else now_ms + deadline - mixer_now
 
     def load_music(self, filename, loops=-1, fade_ms=0):
         """Load a music track from ``MUSIC_DIR`` and start playing it.
@@ -80,64 +396,285 @@ class Mixer:
         pygame.mixer.music.play(loops=loops, fade_ms=fade_ms)
 
     def fade_music(self, fade_ms=0):
-        """Fade the music out over ``fade_ms`` milliseconds."""
+        """Fade the music out over ``fade_ms`` milliseconds (and stop it).
+
+        Drops a running duck, so its restore cannot ride the fading track back up.
+        """
+        self.automation.cancel(VolumeAutomation.MUSIC)
         pygame.mixer.music.fadeout(fade_ms)
 
-    def music_length(self, filename):
+    def ramp_music(self, vol, fade_ms, curve=Curve.LINEAR):
+        """Fade the music volume to ``vol`` over ``fade_ms``, keeping it playing.
+
+        Args:
+            vol: Volume to end at (0..1).
+            fade_ms: Fade time in milliseconds.
+            curve: The fade's shape (a :class:`Curve`).
+        """
+        self.automation.ramp(VolumeAutomation.MUSIC, vol, fade_ms, curve)
+
+    def music_gain(self):
+        """The music volume right now, partway through any duck or fade."""
+        return self.automation.gain(VolumeAutomation.MUSIC)
+
+    def music_length(self, filename, wait_ms=None):
         """Return the duration (seconds) of a track in ``MUSIC_DIR``.
 
-        ``pygame.mixer.music`` exposes no length, so this loads the file as a
-        ``Sound`` purely to measure it (the bytes are discarded). Used when a
-        track's own length needs to drive timing -- e.g. Trivia's thinking song
-        doubling as the answer clock.
+        ``pygame.mixer.music`` exposes no length, so the file is decoded as a
+        ``Sound`` purely to measure it (the bytes are discarded), on the loader;
+        the answer is remembered. Used when a track's own length needs to drive
+        timing -- e.g. Trivia's thinking song doubling as the answer clock.
 
         Args:
             filename: File name under ``assets/music``.
+            wait_ms: The most to wait for a measurement still running (see
+                :meth:`measure_music`); None waits as long as it takes.
 
         Returns:
-            float | None: Length in seconds, or ``None`` if it can't be read.
+            float | None: Length in seconds, or ``None`` if it can't be read
+            (or is not measured yet).
         """
-        path = os.path.join(self.MUSIC_DIR, filename)
-        try:
-            return Sound(path).get_length()
-        except Exception as e:  # pragma: no cover - missing/unsupported file
-            print(f"[Mixer] could not measure {filename!r}: {e}")
+        if filename not in self._music_lengths:
+            self.loader.wait(self.measure_music(filename), wait_ms)
+        return self._music_lengths.get(filename)
+
+    def measure_music(self, filename):
+        """Start measuring a track's length in the background. Never blocks.
+
+        Returns:
+            Load | None: The measurement's handle, or None if it is already known.
+        """
+        if filename in self._music_lengths:
             return None
+        path = os.path.join(self.MUSIC_DIR, filename)
+        return self.loader.load(('music', filename), _sound_length, path,
+                                on_done=self._music_measured)
+
+    def _music_measured(self, load):
+        filename = load.key[1]
+        if load.error is not None:  # missing/unsupported file
+            print(f"[Mixer] could not measure {filename!r}: {load.error}")
+        self._music_lengths[filename] = load.value
 
     def stop_all(self):
-        """Stop the music stream and every playing effect channel at once."""
+        """Stop the music stream and every playing effect channel at once.
+
+        Also drops every running duck and fade, and stops watching every
+        playback without ending it (no ``SoundEndEvent``, no ``on_end``): this
+        is the program-switch reset, so nothing may call back into the old
+        program.
+        """
+        self.automation.clear()
+        for playback in self.playing:
+            playback.cancel()
+        self.playing = []
         pygame.mixer.music.stop()
         pygame.mixer.stop()
 
-    def play_effect(self, filename, loops=0):
+    def play_effect(self, filename, loops=0, on_end=None, wait_ms=config.LOAD_WAIT_MS):
         """Play a one-shot effect, loading it on first use.
 
+        A sound that is not cached is loaded in the background and waited for
+        at most ``wait_ms``; if it is still not ready (or cannot be loaded) the
+        play is skipped.
+
         Args:
             filename: Path under ``assets/sounds/effects`` (subdirs allowed).
             loops: Extra repeats after the first play (-1 loops forever).
+            on_end: Called with no arguments when it stops playing.
+            wait_ms: The most to wait for it to load.
+
+        Returns:
+            Playback | None: The handle for this play, or None if it was skipped.
         """
-        if filename not in self.effects:
-            self.load_effect(filename)
-        self.effects[filename].play(loops=loops)
+        sound = self.get_effect(filename, wait_ms)
+        if sound is None:
+            return None
+        return self.play(sound, loops=loops, on_end=on_end, name=filename)
 
-    def load_effect(self, filename, volume=1):
-        """Load (or reload) an effect into the cache at the given volume."""
-        path = os.path.join(self.EFFECTS_DIR, filename)
-        sound = Sound(path)
+    def get_effect(self, filename, wait_ms=config.LOAD_WAIT_MS):
+        """Return an effect's cached ``Sound``, loading it if need be.
+
+        On a miss the load goes to the loader (joining one already started)
+        and is waited for at most ``wait_ms``.
+
+        Args:
+            filename: Path under ``assets/sounds/effects`` (subdirs allowed).
+            wait_ms: The most to wait for it to load.
+
+        Returns:
+            Sound | None: The sound, or None if it is not ready in time or
+            cannot be loaded (both are logged).
+        """
+        sound = self.effects.lookup(filename)
+        if sound is None:
+            load = self._request_effect(filename)
+            if not self.loader.wait(load, wait_ms):
+                print(f"[Mixer] {filename!r} not loaded within {wait_ms} ms; skipped")
+            sound = self.effects.get(filename)
+        return sound
+
+    def effect_length(self, filename, wait_ms=config.LOAD_WAIT_MS):
+        """Return an effect's duration in seconds, loading it like :meth:`get_effect`.
+
+        For timing a celebration around a clip that was prefetched in
+        ``start()``: by the time it is needed it has long been cached.
+
+        Returns:
+            float | None: Length in seconds, or None if it is not ready in
+            time or cannot be loaded.
+        """
+        sound = self.get_effect(filename, wait_ms)
+        return sound.get_length() if sound is not None else None
+
+    def has_effect(self, filename):
+        """True if an effect is cached or still loading (not if its load failed)."""
+        return filename in self.effects or filename in self.loader
+
+    def prefetch(self, filenames, volume=1, pin=True):
+        """Start loading effects in the background. Never blocks.
+
+        Each lands in the cache on the frame its load finishes, like
+        :meth:`load_effect` would have put it there; a missing file is logged
+        then. The loads go in the order given, a few at a time.
+
+        Args:
+            filenames: Paths under ``assets/sounds/effects``.
+            volume: Their playback volume (0..1).
+            pin: Keep them resident until the next program switch. A load that
+                finishes after the switch is cached unpinned.
+
+        Returns:
+            list: A :class:`~src.asset_loader.Load` for each effect not
+            already cached.
+        """
+        loads = []
+        for filename in filenames:
+            sound = self.effects.get(filename)
+            if sound is None:
+                loads.append(self._request_effect(filename, volume, pin))
+                continue
+            sound.set_volume(volume)
+            if pin:
+                self._hold(filename)
+        return loads
+
+    def wait_loads(self, timeout_ms=None):
+        """Block until every pending load has finished (for tests and tools).
+
+        Returns:
+            bool: Whether none is left pending.
+        """
+        return self.loader.wait_all(timeout_ms)
+
+    def load_effect(self, filename, volume=1, pin=True):
+        """Load an effect into the cache (unless it is there) at the given volume.
+
+        Blocks until it is loaded: for sounds a program needs the moment it
+        starts. :meth:`prefetch` the rest.
+
+        Args:
+            filename: Path under ``assets/sounds/effects`` (subdirs allowed).
+            volume: Its playback volume (0..1).
+            pin: Keep it resident until the next program switch, as a program's
+                ``start()`` preloads want. Pass False for one-off clips.
+
+        Returns:
+            Sound: The cached sound.
+        """
+        sound = self.effects.lookup(filename)
+        if sound is None and filename in self.loader:
+            self.loader.wait(self.loader.get(filename))
+            sound = self.effects.get(filename)
+        if sound is None:
+            sound = self._decode_effect(filename)
         sound.set_volume(volume)
-        self.effects[filename] = sound
+        if pin:
+            self._hold(filename)
+        return sound
+
+    def _decode_effect(self, filename):
+        path = os.path.join(self.EFFECTS_DIR, filename)
+        return self.effects.put(filename, Sound(path))
+
+    def _request_effect(self, filename, volume=None, pin=False):
+        program = self._program
+        def loaded(load):
+            self._effect_loaded(load, volume, pin and program == self._program)
+        path = os.path.join(self.EFFECTS_DIR, filename)
+        return self.loader.load(filename, Sound, path, on_done=loaded)
+
+    def _effect_loaded(self, load, volume, pin):
+        if load.error is not None:
+            print(f"[Mixer] could not load {load.key!r}: {load.error}")
+            return
+        sound = self.effects.get(load.key)
+        if sound is None:
+            sound = self.effects.put(load.key, load.value)
+        if volume is not None:
+            sound.set_volume(volume)
+        if pin:
+            self._hold(load.key)
+
+    def _hold(self, key):
+        self._held.add(key)
+        self.effects.pin(key)
+
+    def release_program_sounds(self):
+        """Unpin what the outgoing program loaded; the active patch stays pinned.
+
+        Called by the state machine on every program switch. Nothing is dropped
+        until a later load needs the room, so sounds the next program shares
+        are still there.
+        """
+        self._program += 1
+        for key in self._held:
+            if key != self._patch_key:
+                self.effects.unpin(key)
+        self._held = {self._patch_key} if self._patch_key is not None else set()
+
+    def clear_sounds(self):
+        """Forget every cached effect and patch, e.g. after a mixer re-init made them stale.
+
+        Pending loads are dropped too: they decode for the old mixer format.
+        """
+        self.loader.cancel_all()
+        self.effects.clear()
+        self._held = set()
+        self._patch_key = None
+        self._wanted_patch = None
 
     def set_music_volume(self, vol):
-        """Set the music stream volume (0..1)."""
-        pygame.mixer.music.set_volume(vol)
+        """Set the music stream volume (0..1), ending any duck or fade on it."""
+        self.automation.set(VolumeAutomation.MUSIC, vol)
 
     def aplay(self, path):
         """Play a file via the external ``aplay`` command (blocking)."""
         subprocess.run(f"aplay {path}", shell=True)
 
-    def play(self, sound):
-        """Play a pygame ``Sound`` object directly."""
-        sound.play()
+    def play(self, sound, loops=0, on_end=None, channel=None, name=None):
+        """Play a pygame ``Sound`` object directly and watch it until it ends.
+
+        Args:
+            sound: The ``Sound`` to play.
+            loops: Extra repeats after the first play (-1 loops forever).
+            on_end: Called with no arguments when it stops playing.
+            channel: A (reserved) ``Channel`` to play on; default: any free one.
+            name: What to call it in the handle (the effect's file name).
+
+        Returns:
+            Playback: The handle for this play.
+        """
+        if channel is None:
+            channel = sound.play(loops=loops)
+        else:
+            channel.play(sound, loops=loops)
+        playback = Playback(sound, channel, name, on_end)
+        if loops >= 0:
+            playback.due_ms = self.automation.now_ms + sound.get_length() * 1000 * (loops + 1)
+            playback.end_by_ms = playback.due_ms + config.SOUND_END_SLACK_MS
+        self.playing.append(playback)
+        return playback
 
     def play_by_id(self, bank_id, duck=True):
         """Play sound ``bank_id`` from the current patch.
@@ -145,37 +682,29 @@ class Mixer:
         Args:
             bank_id: Index (0..13) into the active patch.
             duck: If True, duck the music for the duration of the sound.
+
+        Returns:
+            Playback: The handle for this play.
         """
         sound = self.patch[bank_id]
-        self.duck_for_sound(sound) if duck else self.play(sound)
+        return self.duck_for_sound(sound) if duck else self.play(sound)
 
     def fadeout_by_id(self, bank_id, ms=100):
         """Fade out sound ``bank_id`` of the current patch over ``ms`` ms."""
         self.patch[bank_id].fadeout(ms)
 
-    def _init_sound_channel(self):
-        self.sound_q = threading.Queue()
-        self.q_remote = threading.Event()
+    def duck_for_sound(self, sound, on_end=None):
+        """Play ``sound`` while ducking the music for its duration.
 
-    def async_duck(self, sound):
-        """WIP: register an end-of-sound callback to restore volume (unused)."""
-        def async_fade(start_vol, end_vol):
-            pass
-        # register as a waitier for sound's end_event
-        evt = SoundEndEvent(sound)
-        evt.set_done_callback(async_fade, self.VOL_LOW, self.VOL_HIGH)
-
-    def duck_for_sound(self, sound):
-        """Play ``sound`` while ducking the music, on a background thread."""
-        threading.Thread(target=self._duck_for_sound, args=(sound,)).start()
-
-    def _duck_for_sound(self, sound):
-        """Worker: play the sound, then duck the music for its duration."""
-        sound.play() # start playing sound just as fade down begins
-        self._duck_music(sound.get_length())
+        Returns:
+            Playback: The handle for this play.
+        """
+        playback = self.play(sound, on_end=on_end) # start playing sound just as fade down begins
+        self.duck_music(sound.get_length())
+        return playback
 
     def duck_music(self, duration, duck_vol=None, restore_vol=None):
-        """Dip the music for ``duration`` seconds, then restore it (threaded).
+        """Dip the music for ``duration`` seconds, then restore it.
 
         Like :meth:`duck_for_sound` but it does **not** own the sound: the caller
         plays its own effect (e.g. via :meth:`play_effect`) and this only rides
@@ -186,48 +715,97 @@ class Mixer:
             duration: Seconds to stay ducked (typically the cue's length).
             duck_vol: Volume to dip to. Defaults to :attr:`VOL_LOW`.
             restore_vol: Volume to return to. Defaults to :attr:`VOL_HIGH`.
-        """
-        threading.Thread(target=self._duck_music,
-                         args=(duration, duck_vol, restore_vol)).start()
 
-    def _duck_music(self, duration, duck_vol=None, restore_vol=None):
-        """Worker: fade the music down, hold for ``duration``, fade back up."""
+        The music fades down over :attr:`DUCK_DUR` (at most half the duck) and
+        back up over :attr:`DUCK_DUR` after it. A duck that starts while another
+        is still holding extends it rather than racing it.
+        """
         duck_vol = self.VOL_LOW if duck_vol is None else duck_vol
         restore_vol = self.VOL_HIGH if restore_vol is None else restore_vol
-        fade_dur = min(self.DUCK_DUR, duration / 2)
-        self._fade(pygame.mixer.music.get_volume(), duck_vol, fade_dur)
-        time.sleep(max(duration - fade_dur, 0))
-        self._fade(pygame.mixer.music.get_volume(), restore_vol, self.DUCK_DUR)
-
-    def _fade(self, start_vol, end_vol, fade_dur, fps=30):
-        """Linearly ramp the music volume from ``start_vol`` to ``end_vol``."""
-        t0 = clock.monotonic()
-        while (t := clock.monotonic() - t0) < fade_dur:
-            vol = lerp(t/fade_dur, start_vol, end_vol)
-            #print(f'vol: {vol:.2f}','t:', t)
-            pygame.mixer.music.set_volume(vol)
-            time.sleep(fade_dur/fps)
-        pygame.mixer.music.set_volume(end_vol)
+        self.automation.duck(VolumeAutomation.MUSIC, duration * 1000, duck_vol, restore_vol,
+                             self.DUCK_DUR * 1000, self.DUCK_DUR * 1000, self.DUCK_CURVE)
 
     def use_patch(self, patch_name, volume=1):
-        """Make ``patch_name`` the active patch, loading it on first use."""
-        if patch_name not in self.patches:
-            self._load_patch(patch_name, volume)
-        self.patch = self.patches[patch_name]
+        """Make ``patch_name`` the active patch, loading it on first use.
+
+        A cached patch switches at once. Otherwise it loads in the background
+        and the current patch stays active until it is ready (only the very
+        first patch, with nothing to keep playing, is waited for). It stays
+        pinned while active, and until the next program switch.
+
+        Raises:
+            OSError: If the very first patch cannot be loaded (a later one
+                that cannot is logged, and the current patch stays).
+        """
+        key = ('patch', patch_name)
+        self._wanted_patch = key
+        patch = self.effects.lookup(key)
+        if patch is not None:
+            self._set_patch(key, patch)
+            return
+        load = self.prefetch_patch(patch_name, volume)
+        if self.patch is None and self.loader.wait(load) and load.error is not None:
+            raise load.error
+
+    def prefetch_patch(self, patch_name, volume=1, pin=True):
+        """Start loading a patch in the background, e.g. every bank a program
+        may switch to mid-play. Never blocks.
+
+        Args:
+            patch_name: Directory name under ``PATCH_DIR``.
+            volume: Volume applied to every sound in the patch.
+            pin: Keep it resident until the next program switch.
+
+        Returns:
+            Load | None: The pending load, or None if it is already cached.
+        """
+        key = ('patch', patch_name)
+        if key in self.effects:
+            if pin:
+                self._hold(key)
+            return None
+        program = self._program
+        def loaded(load):
+            self._patch_loaded(load, pin and program == self._program)
+        return self.loader.load(key, self._load_patch, patch_name, volume, on_done=loaded)
+
+    def _patch_loaded(self, load, pin):
+        if load.error is not None:
+            print(f"[Mixer] could not load patch {load.key[1]!r}: {load.error}")
+            return
+        patch = self.effects.get(load.key)
+        if patch is None:
+            patch = self.effects.put(load.key, load.value)
+        if pin:
+            self._hold(load.key)
+        if load.key == self._wanted_patch:
+            self._set_patch(load.key, patch)
+
+    def _set_patch(self, key, patch):
+        self._hold(key)
+        self._patch_key = key
+        self.patch = patch
 
     def _load_patch(self, patch_name, volume=1):
-        """Load a 14-sound patch directory into the cache.
+        """Decode a 14-sound patch directory (runs on a loader worker).
 
         Args:
             patch_name: Directory name under ``PATCH_DIR`` containing 14 wav
                 files (22050 Hz), named so that sorting yields button order.
             volume: Volume applied to every sound in the patch.
+
+        Returns:
+            list: The patch's sounds, in button order.
         """
         patch_path = os.path.join(self.PATCH_DIR, patch_name)
         patch = [Sound(f.path) for f in sorted(os.scandir(patch_path), key=lambda p:p.name)]
         for sound in patch:
             sound.set_volume(volume)
-        self.patches[patch_name] = patch
+        return patch
+
+def _sound_length(path):
+    """Decode ``path`` and return its length in seconds (runs on a loader worker)."""
+    return Sound(path).get_length()
 
 #import simpleaudio as sa
 class SimpleMixer(Mixer):
@@ -238,18 +816,20 @@ class SimpleMixer(Mixer):
         self.channels = channels
         self.bytes_per_sample = int(abs(bitdepth)/2)
         self.patch = None
-        self.patches = { }
-        self._load_patch('numbers')
+        self.effects = SoundCache(config.SOUND_CACHE_BYTES,
+                                  size_of=lambda patch: sum(len(w.audio_data) for w in patch))
+        self.loader = AssetLoader()
+        self._held = set()
+        self._patch_key = None
+        self._wanted_patch = None
+        self._program = 0
+        self._music_lengths = {}
         self.use_patch('numbers')
-        self.fps = self.FPS
+        self.automation = VolumeAutomation()
+        self.playing = []
 
-    def _load_patch(self, patch_name):
+    def _load_patch(self, patch_name, volume=1):
         patch_path = os.path.join(self.PATCH_DIR, patch_name)
-        patch = [sa.WaveObject.from_wave_file(f.path)
-                 for f in sorted(os.scandir(patch_path), key=lambda p:p.name)]
-        self.patches[patch_name] = patch
+        return [sa.WaveObject.from_wave_file(f.path)
+                for f in sorted(os.scandir(patch_path), key=lambda p:p.name)]
 
-
-def lerp(t, a, b):
-    """Linear interpolation: return ``a`` at ``t=0`` and ``b`` at ``t=1``."""
-    return a + t*(b-a)
@@ -0,0 +1,183 @@
+"""Laser brightness by bit-angle modulation (BAM) on the 74HC595.
+
+The 595's outputs are plain on/off, so brightness has to come from time:
+each port is lit for a fraction of every refresh period proportional to its
+level. :class:`BamEngine` does this with bit-angle modulation. With ``bits``
+bits of level, one period is split into ``bits`` slots, and slot ``b`` lasts
+``2**b`` base units. In slot ``b`` a port is lit iff bit ``b`` of its level is
+set, so over a period it is lit ``level / (2**bits - 1)`` of the time. That is
+``bits`` pushes per period, where plain PWM at the same resolution needs
+``2**bits - 1``.
+
+The slot table -- ``(word, duration_ns)`` per slot, with adjacent equal words
+merged -- is computed on the caller's thread whenever the levels or the on/off
+word change. The output thread only walks the table, pushing each word and
+sleeping its duration. When every lit port is at full level (or everything is
+dark), the table collapses to one entry and the thread pushes once and idles.
+
+The engine wraps the output register and is register-compatible:
+:meth:`BamEngine.push_word` sets which ports are on (as before), and
+:meth:`BamEngine.set_levels` sets how bright each one is.
+:class:`~src.game_loop.LaserBay` holds the levels and fades, and
+:meth:`Game.render <src.game_loop.Game.render>` forwards them. Bits above the
+lasers (the spare outputs) are never modulated.
+
+Select it with ``config.BAM_ENABLED = True`` (see ``src/__main__.py``);
+``scratch/bench_bam.py`` measures the refresh rate the driver can sustain.
+"""
+import threading
+from . import clock
+from .config import config
+
+
+def slot_table(word, levels, bits, period_ns, n=None):
+    """The BAM slots for on/off ``word`` at per-port ``levels``.
+
+    Args:
+        word: Output word; laser bits that are clear stay dark whatever their
+            level, bits at ``n`` and above are passed through unmodulated.
+        levels: Per-port levels, ``0 .. 2**bits - 1``.
+        bits: Bits of level (slots per period).
+        period_ns: One full refresh period.
+        n: Number of modulated (laser) bits (default ``config.N_PORTS``).
+
+    Returns:
+        A tuple of ``(word, duration_ns)``, adjacent equal words merged, whose
+        durations add up to ``period_ns``.
+    """
+    n = config.N_PORTS if n is None else n
+    base_ns = period_ns / ((1 << bits) - 1)
+    extra = word & ~((1 << n) - 1)
+    table = []
+    for b in range(bits):
+        slot = extra
+        for port in range(n):
+            if word >> port & 1 and levels[port] >> b & 1:
+                slot |= 1 << port
+        dur_ns = base_ns * (1 << b)
+        if table and table[-1][0] == slot:
+            table[-1][1] += dur_ns
+        else:
+            table.append([slot, dur_ns])
+    if len(table) > 1 and table[0][0] == table[-1][0]:
+        table[0][1] += table.pop()[1]  # the cycle wraps: the last slot runs into the first
+    return tuple((slot, int(dur_ns)) for slot, dur_ns in table)
+
+
+class BamEngine:
+    """Drives ``register`` with bit-angle-modulated brightness on a background thread.
+
+    Args:
+        register: Object with ``push_word(word)`` (pushed only by the engine's
+            thread, once started).
+        bits: Bits of brightness per port, 4 to 8 (default ``config.BAM_BITS``).
+        refresh_hz: Full BAM periods per second (default
+            ``config.BAM_REFRESH_HZ``).
+        n: Number of modulated (laser) bits (default ``config.N_PORTS``).
+
+    Attributes:
+        max_level (int): The full-brightness level, ``2**bits - 1``.
+        table (tuple): The current ``(word, duration_ns)`` slots.
+        cycles (int): Periods the thread has completed.
+
+    Class Attributes:
+        SPIN_NS (int): The last stretch of each slot is busy-waited rather than
+            slept, for slot edges tighter than the OS sleep granularity.
+        IDLE_S (float): Longest the thread sleeps on a one-slot table.
+    """
+    SPIN_NS = 50_000
+    IDLE_S = 0.1
+
+    def __init__(self, register, bits=None, refresh_hz=None, n=None):
+        bits = config.BAM_BITS if bits is None else bits
+        n = config.N_PORTS if n is None else n
+        if not 4 <= bits <= 8:
+            raise ValueError(f'BAM needs 4 to 8 bits of brightness, not {bits}')
+        self.register = register
+        self.bits = bits
+        self.n = n
+        self.max_level = (1 << bits) - 1
+        self.period_ns = int(1e9 / (refresh_hz or config.BAM_REFRESH_HZ))
+        self.levels = [self.max_level] * n
+        self.word = 0
+        self.table = slot_table(0, self.levels, bits, self.period_ns, n)
+        self.cycles = 0
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        register.push_word(0)
+
+    def start(self):
+        """Start the output thread. Returns ``self`` for chaining."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='bam-output', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=0.5):
+        """Stop the output thread (idempotent) and leave the plain word showing."""
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.register.push_word(self.word)
+
+    @property
+    def running(self):
+        """True while the output thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def push_word(self, word):
+        """Set which outputs are on; each lit laser shows at its level."""
+        self.word = word
+        self._rebuild()
+
+    def set_levels(self, levels):
+        """Set every port's brightness (``0 .. max_level``)."""
+        self.levels = [max(0, min(self.max_level, int(level))) for level in levels]
+        self._rebuild()
+
+    def clear(self):
+        """Set all outputs low."""
+        self.push_word(0)
+
+    def _rebuild(self):
+        """Swap in a new slot table; the thread restarts its period on it."""
+        self.table = slot_table(self.word, self.levels, self.bits, self.period_ns, self.n)
+        self._wake.set()
+
+    def _run(self):
+        push = self.register.push_word
+        now = clock.monotonic_ns
+        last = None
+        while not self._stopping.is_set():
+            self._wake.clear()
+            table = self.table
+            if len(table) == 1:
+                if table[0][0] != last:
+                    last = table[0][0]
+                    push(last)
+                self._wake.wait(self.IDLE_S)
+                continue
+            deadline = now()
+            for word, dur_ns in table:
+                if word != last:
+                    last = word
+                    push(word)
+                deadline += dur_ns
+                if self._wait_until(deadline):
+                    break  # a new table: start its period now
+            else:
+                self.cycles += 1
+
+    def _wait_until(self, deadline_ns):
+        """Sleep, then spin, until ``deadline_ns``. True if woken by a change."""
+        now = clock.monotonic_ns
+        remaining = deadline_ns - now()
+        if remaining > self.SPIN_NS and self._wake.wait((remaining - self.SPIN_NS) / 1e9):
+            return True
+        while now() < deadline_ns:
+            if self._wake.is_set():
+                return True
+        return False
@@ -41,6 +41,17 @@ def monotonic_ms():
     return _monotonic() * 1000.0
 
 
+def monotonic_ns():
+    """Integer nanoseconds since the same origin as :func:`monotonic`.
+
+    For timestamps taken off the game loop (e.g. the input sampler thread),
+    where float seconds would lose sub-microsecond resolution.
+    """
+    if _monotonic is _time.monotonic:
+        return _time.monotonic_ns()
+    return int(_monotonic() * 1_000_000_000)
+
+
 def sleep(seconds):
     """Block for ``seconds`` (a no-op for non-positive values).
 
@@ -27,9 +27,112 @@ class config:
     # samples ~= 0.7 ms chasing latency, which is far below any audio device's
     # period and crackled everywhere -- on the Pi and on dev machines alike.)
     AUDIO_BUFFER = 1024  # samples
+    # The mixer ends a Playback when its channel goes quiet (src/audio_utils.py).
+    # A channel that never reports its end is given up this long after the
+    # sound's length, so a sequence waiting on it cannot hang: a few buffers of
+    # output latency, plus room for a slow frame.
+    SOUND_END_SLACK_MS = 250
+    # Byte budget for decoded effects and patches (src/sound_cache.py). Past it
+    # the least recently used sounds are dropped and decoded again on next use;
+    # the active program's preloads and the active patch are never dropped.
+    # 22050 Hz mono 16-bit is ~43 KB a second, so 32 MB holds ~12 minutes of
+    # audio: every program's working set with room to spare, well inside the
+    # Pi Zero's 512 MB.
+    SOUND_CACHE_BYTES = 32 * 1024 * 1024
+    # Sounds decode on background threads (src/asset_loader.py) so a load never
+    # stalls a frame. Two workers overlap one file's disk read with another's
+    # decode on the single core; at most LOADER_MAX_IN_FLIGHT loads are handed
+    # to them at once and the rest queue. A play whose sound is not loaded yet
+    # waits at most LOAD_WAIT_MS for it -- a few frames, enough for a short clip
+    # off the SD card -- and is skipped if it is still not ready.
+    LOADER_WORKERS = 2
+    LOADER_MAX_IN_FLIGHT = 4
+    LOAD_WAIT_MS = 50
     REGISTER_DELAY = 0  # seconds (settle delay between GPIO edges)
+    # Cabinet shape. N_PORTS buttons, each with its laser. The input word is the
+    # buttons (bits 0..N_PORTS-1) with N_TOGGLES toggle bits above them; the
+    # output word is the lasers with N_SPARE_OUTPUTS spare bits above. The
+    # register chains are sized to fit, rounded up to whole 8-bit chips (see
+    # src/ports.py), so a 32- or 64-port cabinet is these numbers plus more
+    # cascaded 165s/595s. Set them before the programs are imported: States
+    # built at import bake in the toggle bit positions. 14/2/2 is the original
+    # box, one 16-bit word each way.
+    N_PORTS = 14
+    N_TOGGLES = 2
+    N_SPARE_OUTPUTS = 2
     SIM_SCREEN_WH = 600, 480  # simulator window size, pixels
-    ANTI_JITTER_DELAY = 0.001  # seconds (button-release debounce, e.g. Golf)
+    # Timer wheel (src/timer_wheel.py) behind Program.after, cooldowns and the
+    # animation frame deadlines: the length of one first-level slot. Each frame
+    # visits the slots the clock moved through, so keep it near a frame; timers
+    # still fire on the first frame after their deadline, whatever it is.
+    TIMER_SLOT_MS = 10
+    # Per-phase frame profiler (see ``FrameProfiler`` in src/game_loop.py). Off
+    # in production: when False the loop pays one ``is None`` check per phase.
+    PROFILE_FRAMES = False
+    # Input backend on the box: "poll" reads the 74HC165 once per frame; "thread"
+    # samples it on an InputSampler thread at INPUT_SAMPLE_HZ and queues
+    # timestamped changes. INPUT_EDGE_PIN (BCM, or None) is an optional line that
+    # changes on any press, which wakes the sampler immediately.
+    INPUT_BACKEND = "poll"
+    # Register driver on the box: "rpi" bit-bangs through RPi.GPIO calls; "mmap"
+    # stores straight into the GPIO registers mapped from /dev/gpiomem
+    # (src/gpio_mmap.py), several times cheaper per word on the Pi Zero; "spi"
+    # clocks each word through SPI0 in one transfer (src/spi_register.py; needs
+    # the SPI wiring in docs/dev/hardware.md). SPI_SPEED_HZ is its clock rate.
+    REGISTER_BACKEND = "rpi"
+    SPI_SPEED_HZ = 1_000_000
+    # With the "rpi" backend, drive both chips from one DuplexShiftRegister
+    # (src/shift_register.py): the render push, made every frame, reads the
+    # inputs in the same interleaved pass for the next poll, so a frame costs
+    # one pass instead of two. Not with INPUT_BACKEND = "thread" (the sampler
+    # would share the pins), nor with the "mmap" or "spi" backends, which have
+    # no duplex driver; those combinations fail at startup.
+    REGISTER_DUPLEX = False
+    INPUT_SAMPLE_HZ = 1000
+    INPUT_EDGE_PIN = None
+    # Output scheduler (src/output_scheduler.py): a thread owns the output
+    # register and latches each laser change at its exact monotonic time. Each
+    # frame hands it the frame's word plus the changes the program already
+    # knows are coming (blinks, a moving blip) up to OUTPUT_LEAD_MS ahead, so a
+    # slow frame no longer shows up as an uneven flash. Not with
+    # REGISTER_DUPLEX (that pass must run every frame).
+    OUTPUT_SCHEDULER = False
+    OUTPUT_LEAD_MS = 50
+    # Laser brightness (src/bam.py): a BamEngine thread owns the output register
+    # and shows each lit laser at its LaserBay level by bit-angle modulation:
+    # BAM_BITS bits of level (4..8, so 16..256 levels), BAM_REFRESH_HZ full
+    # periods a second. Off: levels are kept but every lit laser is at full.
+    BAM_ENABLED = False
+    BAM_BITS = 4
+    BAM_REFRESH_HZ = 200
+    # Adaptive pacing: while the active program opts in (``Program.IDLE_PACING``)
+    # and nothing is animating, the loop sleeps until its next real deadline
+    # instead of waking every frame, polling input at IDLE_POLL_HZ meanwhile. Any
+    # input edge returns it to full FPS for IDLE_AFTER_MS.
+    ADAPTIVE_PACING = True
+    IDLE_POLL_HZ = 20
+    IDLE_AFTER_MS = 1500
+    # Input debounce (``Debouncer`` in src/io_managers.py): a bit must hold its
+    # new level this long before InputManager accepts the change, so contact
+    # bounce never reaches the event queue. Presses are taken at once (a switch
+    # does not close by itself); a release must stay open DEBOUNCE_RELEASE_MS.
+    # Per-bit overrides map a bit index (0..ports.input_bits()-1) to its own
+    # hold time in ms. The simulator's keyboard does not bounce, so it holds
+    # nothing (``Simulator`` builds its own zero-hold debouncer).
+    DEBOUNCE_PRESS_MS = 0
+    DEBOUNCE_RELEASE_MS = 20
+    DEBOUNCE_PRESS_MS_BY_BIT = {}
+    DEBOUNCE_RELEASE_MS_BY_BIT = {}
+    # Flight recorder (src/flight_recorder.py): logs every frame, raw input
+    # change, output push and program switch into a ring of RECORDER_SEGMENTS
+    # binary files under RECORDER_DIR (relative to PROJECT_ROOT), so a session
+    # can be replayed exactly (scratch/replay_flight.py). Roughly 1.7 KB/s at
+    # 100 FPS; buffered records are written every RECORDER_FLUSH_MS.
+    RECORDER_ENABLED = False
+    RECORDER_DIR = "state/flight"
+    RECORDER_SEGMENTS = 8
+    RECORDER_SEGMENT_BYTES = 4_000_000
+    RECORDER_FLUSH_MS = 1000
     CONGRATS_VOL = 0.75  # volume for the shared celebration sound
     START_PROGRAM = "MusicMaker"  # default for the ``-p`` CLI flag
     PROGRAM_SEQUENCE = [
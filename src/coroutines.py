@@ -0,0 +1,247 @@
+"""Cooperative coroutines on the game clock.
+
+A program can write a multi-step flow as one ``async def`` instead of a chain
+of :meth:`~src.programs.base.Program.after` callbacks, ``on_done`` lambdas and
+stale-callback guards::
+
+    async def countdown(self):
+        for n in (3, 2, 1):
+            self.game.mixer.play_by_id(n)
+            await self.sleep(1000)
+        event = await self.press(self.BUZZERS, timeout_ms=5000)
+        if event is None:
+            return self.quit()          # nobody buzzed in time
+        ...
+
+:meth:`Program.spawn <src.programs.base.Program.spawn>` starts one. There is no
+asyncio loop: a coroutine may only await the :class:`Wait` objects made here
+(a sleep, a press, a signal) or other coroutines. Each program has one
+:class:`TaskRunner`, which the state machine drives once per frame, right after
+the program's ``update``; it resumes every task whose wait was resolved, in the
+order they were resolved. A sleep is a wait that an ``after`` timer resolves,
+so it ends on the frame an ``after`` callback would run. Everything runs on the
+game loop thread against ``now_ms``, so a script is exactly as deterministic as
+the clock that drives it (the fake ``clock`` source in the tests).
+
+Cancelling a task closes its coroutine at the ``await`` it is parked on, so
+``try``/``finally`` blocks in it run. Teardown cancels every task at once.
+"""
+from collections import deque
+
+
+class Wait:
+    """Something a task awaits: resolved once, with a value.
+
+    Calling the wait resolves it, so one can be handed out as a callback (an
+    ``on_done``, an ``after`` target) and awaited afterwards. Awaiting a wait
+    that is already resolved returns at once, without giving up the frame.
+
+    Attributes:
+        done (bool): True once resolved (or dropped with its task).
+        value: What the ``await`` returns.
+    """
+    __slots__ = ('done', 'value', 'task', 'timer')
+
+    def __init__(self):
+        self.done = False
+        self.value = None
+        self.task = None    # the task parked on it
+        self.timer = None   # a pending timer that resolves it
+
+    def __call__(self, value=None):
+        """Resolve with ``value`` and queue the waiting task. Later calls do nothing."""
+        if self.done:
+            return
+        self.done = True
+        self.value = value
+        self._drop_timer()
+        task = self.task
+        if task is not None:
+            self.task = None
+            task.runner.ready.append(task)
+
+    def _drop_timer(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+    def _abandon(self):
+        """The waiting task was cancelled: never wake it."""
+        self.done = True
+        self.task = None
+        self._drop_timer()
+
+    def __await__(self):
+        if not self.done:
+            yield self
+        return self.value
+
+
+class _Press(Wait):
+    """A wait for a button press, resolved with its event (None on timeout)."""
+    __slots__ = ('keys', 'deadline_ms')
+
+    def __init__(self, keys, deadline_ms):
+        super().__init__()
+        self.keys = keys
+        self.deadline_ms = deadline_ms
+
+
+class Task:
+    """A running coroutine; the handle :meth:`TaskRunner.spawn` returns.
+
+    Attributes:
+        waiting (Wait): What it is parked on, or None while queued or done.
+    """
+    __slots__ = ('coro', 'runner', 'waiting')
+
+    def __init__(self, runner, coro):
+        self.coro = coro
+        self.runner = runner
+        self.waiting = None
+
+    @property
+    def done(self):
+        """True once the coroutine has returned, raised or been cancelled."""
+        return self.coro is None
+
+    def cancel(self):
+        """Stop the task at its current ``await``. Safe to call more than once.
+
+        A task may cancel itself (e.g. by calling ``quit()``, which tears the
+        program down); it is then closed at its next ``await``, or simply ends
+        if it returns first.
+        """
+        coro = self.coro
+        if coro is None:
+            return
+        self.coro = None
+        self.runner.tasks.pop(self, None)
+        if self.waiting is not None:
+            self.waiting._abandon()
+            self.waiting = None
+        if self.runner.current is not self:
+            coro.close()
+
+    def _step(self):
+        coro = self.coro
+        runner = self.runner
+        runner.current = self
+        try:
+            wait = coro.send(None)
+        except StopIteration:
+            self._end()
+            return
+        except BaseException:
+            self._end()
+            raise
+        finally:
+            runner.current = None
+        if self.coro is None:
+            # cancelled itself while running: drop what it went on to await
+            if isinstance(wait, Wait):
+                wait._abandon()
+            coro.close()
+            return
+        if not isinstance(wait, Wait):
+            self.cancel()
+            raise TypeError(f'a game task can only await sleeps, presses and signals, not {wait!r}')
+        wait.task = self
+        self.waiting = wait
+
+    def _end(self):
+        self.coro = None
+        self.runner.tasks.pop(self, None)
+
+    def __repr__(self):
+        coro = self.coro
+        name = getattr(coro, '__qualname__', 'done') if coro is not None else 'done'
+        return f'Task({name})'
+
+
+class TaskRunner:
+    """A program's coroutines and the press waits they have open.
+
+    Attributes:
+        tasks (dict): Running tasks, in the order spawned (used as an ordered set).
+        ready (deque): Tasks whose wait resolved, to resume on the next :meth:`run`.
+        presses (list): Press waits still open.
+    """
+    def __init__(self):
+        self.tasks = {}
+        self.ready = deque()
+        self.presses = []
+        self.current = None  # the task being stepped
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def spawn(self, coro):
+        """Start ``coro``; it runs to its first ``await`` on the next :meth:`run`.
+
+        Returns:
+            The :class:`Task`; call its ``cancel()`` to stop it.
+        """
+        task = Task(self, coro)
+        self.tasks[task] = None
+        self.ready.append(task)
+        return task
+
+    def press(self, keys=None, deadline_ms=None):
+        """A :class:`Wait` for the next press of one of ``keys`` (default: any).
+
+        It resolves with the ``ButtonDownEvent`` handed to :meth:`feed`, or with
+        None once ``deadline_ms`` has passed. A press that happened before the
+        deadline still counts when the frame handling it runs after it.
+        """
+        if keys is not None:
+            keys = frozenset([keys] if isinstance(keys, int) else keys)
+        wait = _Press(keys, deadline_ms)
+        self.presses.append(wait)
+        return wait
+
+    def feed(self, event, at_ms):
+        """Offer a press (that happened at ``at_ms``) to the open press waits.
+
+        Returns:
+            True if a wait took it.
+        """
+        taken = False
+        for wait in self.presses:
+            if wait.done:
+                continue
+            if wait.deadline_ms is not None and at_ms > wait.deadline_ms:
+                wait(None)  # its window closed before this press
+            elif wait.keys is None or event.key in wait.keys:
+                wait(event)
+                taken = True
+        self.presses = [wait for wait in self.presses if not wait.done]
+        return taken
+
+    def run(self, now_ms):
+        """Time out the press waits due at ``now_ms``, then resume every ready task.
+
+        Tasks a resumed task wakes (or spawns) run in the same call.
+        """
+        if self.presses:
+            for wait in self.presses:
+                if wait.deadline_ms is not None and now_ms > wait.deadline_ms:
+                    wait(None)
+            self.presses = [wait for wait in self.presses if not wait.done]
+        ready = self.ready
+        while ready:
+            task = ready.popleft()
+            if task.coro is not None:
+                task._step()
+
+    def next_deadline_ms(self):
+        """The earliest press timeout, or None (sleeps are ordinary timers)."""
+        deadlines = [wait.deadline_ms for wait in self.presses if wait.deadline_ms is not None]
+        return min(deadlines) if deadlines else None
+
+    def cancel_all(self):
+        """Cancel every task and drop what they wait on."""
+        for task in list(self.tasks):
+            task.cancel()
+        self.ready.clear()
+        self.presses = []
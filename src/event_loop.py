@@ -3,12 +3,20 @@
 Input is turned into :class:`Event` objects by
 :class:`~src.io_managers.InputManager` and pushed onto the singleton
 :data:`events` queue. The active program drains the queue each frame with
-``for event in events.get(): ...``. A bounded history is also kept for
-sequence/trigger matching.
+``for event in events.get(): ...``. A bounded :class:`EventHistory` is also
+kept for sequence/trigger matching.
+
+Everything here runs on the single-threaded game loop, so the queue is a plain
+list that :meth:`EventLoop.get` swaps out whole -- no lock or condition variable
+per event, unlike ``queue.Queue``. Events are ``__slots__`` objects. Code on
+another thread (input sampler, audio workers) hands events over with
+:meth:`EventLoop.put_threadsafe` instead. ``scratch/bench_event_loop.py``
+measures the per-event cost against the old ``queue.Queue`` version.
 """
+from array import array
 from enum import IntEnum
-from queue import Queue
 from collections import deque
+from . import clock
 
 class EventType(IntEnum):
     """Enumeration of event kinds carried by :class:`Event.type`."""
@@ -22,15 +30,19 @@ class EventType(IntEnum):
     TOGGLE_OFF = 7
 
 class Event:
-    """Base event. Arbitrary keyword attributes are attached on construction.
+    """Base event. Keyword attributes are attached on construction.
 
     Input events carry ``key`` (button/toggle id) and ``state`` (the full
     :class:`~src.programs.base.State` at the time of the event).
 
+    Events use ``__slots__``: a subclass that needs new attributes declares
+    them in its own ``__slots__``.
+
     Class Attributes:
         type (EventType): The event's kind.
         types (list): Per-family registry of member ``EventType`` values.
     """
+    __slots__ = ('has_callback', 'callback', 'args', 'kwargs')
     type = EventType.DEFAULT
     types = []
     def __init__(self, **kwargs):
@@ -49,10 +61,18 @@ class Event:
 
 class SoundEvent(Event):
     """Base class for sound-related events."""
+    __slots__ = ('sound',)
     types = []
 
 class SoundEndEvent(SoundEvent):
-    """Emitted when a sound finishes playing."""
+    """Posted by the mixer when a sound stops playing.
+
+    Attributes:
+        sound (Sound): The sound that ended.
+        playback (Playback): Its :class:`~src.audio_utils.Playback` handle (says
+            whether it was ``interrupted``).
+    """
+    __slots__ = ('playback',)
     type = EventType.SOUND_END
 
 ### END Sound Related Events ###
@@ -61,95 +81,293 @@ class SoundEndEvent(SoundEvent):
 ### Input Related Event Types ###
 
 class InputEvent(Event):
-    """Base class for input-related events."""
+    """Base class for input-related events.
+
+    Attributes:
+        t_ns (int): :func:`src.clock.monotonic_ns` time the input was sampled
+            (None only for events built by hand). Judge close calls against it,
+            not against the frame that happens to process the event.
+    """
+    __slots__ = ('key', 'state', 't_ns')
     types = []
 
+    def __init__(self, key=None, state=None, t_ns=None):
+        self.has_callback = False
+        self.key = key
+        self.state = state
+        self.t_ns = t_ns
+
 class StateChangeEvent(InputEvent):
     """Emitted when the input word changes (currently unused)."""
+    __slots__ = ()
     type = EventType.STATE_CHANGE
     InputEvent.types.append(type)
 
 class ButtonEvent(InputEvent):
     """Base class for button events."""
-    pass
+    __slots__ = ()
 
 class ButtonDownEvent(ButtonEvent):
     """A button was just pressed (``key`` = button id 0..13)."""
+    __slots__ = ()
     type = EventType.BUTTON_DOWN
     InputEvent.types.append(type)
 
 class ButtonUpEvent(ButtonEvent):
     """A button was just released (``key`` = button id 0..13)."""
+    __slots__ = ()
     type = EventType.BUTTON_UP
     InputEvent.types.append(type)
 
 class ToggleEvent(InputEvent):
     """Base class for toggle events (catch with ``isinstance(e, ToggleEvent)``)."""
-    pass
+    __slots__ = ()
 
 class ToggleOnEvent(ToggleEvent):
     """A toggle was switched on (``key`` = toggle id 0..1)."""
+    __slots__ = ()
     type = EventType.TOGGLE_ON
     InputEvent.types.append(type)
 
 class ToggleOffEvent(ToggleEvent):
     """A toggle was switched off (``key`` = toggle id 0..1)."""
+    __slots__ = ()
     type = EventType.TOGGLE_OFF
     InputEvent.types.append(type)
 
 ### END Input Related Event Types ###
 
 
-class EventLoop:
-    """The global event queue plus a bounded event history (singleton).
+class HistoryView:
+    """A read-only window onto a slice of an :class:`EventHistory` ring.
+
+    Creating one copies nothing: it records which ring slots it covers and reads
+    them on access, oldest first. Supports ``len()``, iteration, ``reversed()``
+    and indexing (negative indexes count from the newest). A view stays valid
+    until its ring has wrapped past it, i.e. for the next ``capacity`` events
+    of that kind -- consume it in the frame that asked for it.
+    """
+    __slots__ = ('_ring', '_start', '_stop')
+
+    def __init__(self, ring, start, stop):
+        self._ring = ring
+        self._start = start
+        self._stop = stop
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __getitem__(self, i):
+        n = self._stop - self._start
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError('history view index out of range')
+        ring = self._ring
+        return ring.events[(self._start + i) % ring.capacity]
+
+    def __iter__(self):
+        events, cap = self._ring.events, self._ring.capacity
+        for seq in range(self._start, self._stop):
+            yield events[seq % cap]
+
+    def __reversed__(self):
+        events, cap = self._ring.events, self._ring.capacity
+        for seq in range(self._stop - 1, self._start - 1, -1):
+            yield events[seq % cap]
+
+    def t_ns(self, i):
+        """The time (``clock.monotonic_ns()``) item ``i`` was recorded."""
+        n = self._stop - self._start
+        if i < 0:
+            i += n
+        return self._ring.stamps[(self._start + i) % self._ring.capacity]
+
+    def __repr__(self):
+        return f'HistoryView({list(self)!r})'
+
+
+class _Ring:
+    """Fixed-capacity ring of events with their record times, oldest overwritten."""
+    __slots__ = ('events', 'stamps', 'capacity', 'count')
+
+    def __init__(self, capacity):
+        self.events = [None] * capacity
+        self.stamps = array('q', bytes(8 * capacity))
+        self.capacity = capacity
+        self.count = 0  # total ever appended; slot of item ``seq`` is seq % capacity
+
+    def append(self, event, t_ns):
+        i = self.count % self.capacity
+        self.events[i] = event
+        self.stamps[i] = t_ns
+        self.count += 1
+
+    def first(self):
+        """Sequence number of the oldest event still held."""
+        return max(0, self.count - self.capacity)
+
+    def first_at_or_after(self, t_ns):
+        """Sequence number of the oldest held event recorded at/after ``t_ns``."""
+        lo, hi = self.first(), self.count
+        stamps, cap = self.stamps, self.capacity
+        while lo < hi:  # stamps only grow with seq: binary search
+            mid = (lo + hi) // 2
+            if stamps[mid % cap] < t_ns:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def last(self, n):
+        start = max(self.first(), self.count - n)
+        return HistoryView(self, start, self.count)
+
+    def since(self, t_ns):
+        return HistoryView(self, self.first_at_or_after(t_ns), self.count)
+
+
+class EventHistory:
+    """Recent events, indexed by type and by time.
+
+    Every event is recorded (stamped with ``clock.monotonic_ns()`` when it is
+    put, so stamps never go backwards) into a ring for its
+    :class:`EventType` and into one ring of all events. Queries find their
+    range directly -- a slice off the end for "the last N", a binary search on
+    the stamps for "the last T ms" -- and return a :class:`HistoryView` of it,
+    so they cost O(result), never a scan of the whole history.
+
+    Args:
+        type_capacity: Events kept per ``EventType``.
+        all_capacity: Events kept in the all-types ring.
 
     Class Attributes:
-        HISTORY_SIZE (int): Number of recent events retained for matching.
-        Q_SIZE (int): ``Queue`` maxsize (0 = unbounded).
+        TYPE_CAPACITY (int): Default per-type depth.
+        ALL_CAPACITY (int): Default all-types depth.
     """
-    HISTORY_SIZE = 500
-    Q_SIZE = 0
+    TYPE_CAPACITY = 1024
+    ALL_CAPACITY = 4096
+
+    def __init__(self, type_capacity=TYPE_CAPACITY, all_capacity=ALL_CAPACITY):
+        self.type_capacity = type_capacity
+        self.all = _Ring(all_capacity)
+        self.by_type = {t: _Ring(type_capacity) for t in EventType}
+
+    def record(self, event):
+        """Append ``event`` (called by :meth:`EventLoop.put`)."""
+        t_ns = clock.monotonic_ns()
+        for ring in (self.all, self.by_type[event.type]):  # _Ring.append, inlined
+            i = ring.count % ring.capacity
+            ring.events[i] = event
+            ring.stamps[i] = t_ns
+            ring.count += 1
 
+    def _ring(self, type):
+        return self.all if type is None else self.by_type[type]
+
+    def last(self, n, type=None):
+        """The last ``n`` events (of ``type``, or of any type), oldest first."""
+        return self._ring(type).last(n)
+
+    def within(self, ms, type=None, now_ns=None):
+        """Every event (of ``type``, or any) recorded in the last ``ms`` milliseconds.
+
+        Args:
+            ms: Window length in ms, ending at ``now_ns``.
+            type: An :class:`EventType`, or None for all events.
+            now_ns: End of the window (default: ``clock.monotonic_ns()``).
+        """
+        if now_ns is None:
+            now_ns = clock.monotonic_ns()
+        return self._ring(type).since(now_ns - int(ms * 1_000_000))
+
+    def __len__(self):
+        return min(self.all.count, self.all.capacity)
+
+    def __iter__(self):
+        return iter(self.all.last(self.all.capacity))
+
+
+class EventLoop:
+    """The global event queue plus a bounded event history (singleton).
+
+    :meth:`put` appends to a plain list and :meth:`get` hands back that whole
+    list, swapping in a fresh one, so draining a frame's events costs one
+    swap, not a lock round-trip per event. Both are for the game-loop thread
+    only. Other threads use :meth:`put_threadsafe`, which appends to a
+    separate inbox (``deque.append`` is atomic); :meth:`get` moves the inbox
+    into the batch on the loop thread.
+
+    Attributes:
+        history (EventHistory): Every recently put event, by type and time.
+    """
     def __init__(self):
-        self.q = Queue(maxsize=self.Q_SIZE)
-        self.history = deque(maxlen=self.HISTORY_SIZE)
+        self._pending = []
+        self._inbox = deque()
+        self.history = EventHistory()
 
     def put(self, event: Event):
-        """Enqueue an event and append it to the history."""
-        self.q.put(event)
-        self.history.append(event) # todo: maybe at to history after consumed (e.g. in get() method) ?
+        """Enqueue an event and record it in the history (game-loop thread)."""
+        self._pending.append(event)
+        self.history.record(event) # todo: maybe at to history after consumed (e.g. in get() method) ?
+
+    def put_threadsafe(self, event: Event):
+        """Enqueue an event from any thread; it is delivered by the next :meth:`get`."""
+        self._inbox.append(event)
 
     def clear(self):
-        """Drain any unconsumed events.
+        """Drop any unconsumed events.
 
         Used on program switches so stale input (e.g. the entry-gesture button
         presses) doesn't bleed into the next program.
         """
-        while not self.q.empty():
-            try:
-                self.q.get_nowait()
-            except Exception:
-                break
+        self._pending = []
+        self._inbox.clear()
 
     def get_filtered_history(self, types: 'list(EventType)', n=100):
-        """Return up to the last ``n`` history events matching ``types``.
+        """Return up to the last ``n`` history events matching ``types``, oldest first.
+
+        A single type is answered straight from its ring as a
+        :class:`HistoryView` (prefer ``history.last(n, type)`` in new code);
+        several types are merged from the all-types ring into a list.
 
         Args:
             types: An ``EventType`` or list of them.
             n: Maximum number of (most recent) matches to return.
         """
         if isinstance(types, EventType): # allow single type arguments
-            types = [types]
-        return [e for e in self.history if e.type in types][-n:]
+            return self.history.last(n, types)
+        if len(types) == 1:
+            return self.history.last(n, types[0])
+        matches = []
+        for e in reversed(self.history.all.last(self.history.all.capacity)):
+            if len(matches) >= n:
+                break
+            if e.type in types:
+                matches.append(e)
+        matches.reverse()
+        return matches
 
     def get(self):
-        """Yield and remove every currently-queued event (a one-shot drain)."""
-        for i in range(self.q.qsize()):
-            try:
-                event = self.q.get_nowait()
-            except queue.Empty:
-                return StopIteration
-            yield event
+        """Remove and return every currently-queued event, oldest first.
+
+        Returns the batch itself (a list, or an empty tuple when nothing is
+        queued). Events put while the caller iterates it land in the next
+        batch.
+        """
+        if self._inbox:
+            self._take_inbox()
+        batch = self._pending
+        if not batch:
+            return ()
+        self._pending = []
+        return batch
+
+    def _take_inbox(self):
+        """Move events put from other threads into the pending batch."""
+        inbox = self._inbox
+        while inbox:
+            self.put(inbox.popleft())
 
 #: The process-wide singleton :class:`EventLoop`.
 events = EventLoop() # singleton
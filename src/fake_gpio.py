@@ -0,0 +1,150 @@
+"""An in-memory stand-in for ``RPi.GPIO`` wired to simulated shift registers.
+
+:class:`FakeGPIO` implements the slice of the ``RPi.GPIO`` module API the
+drivers use (``setmode``/``setup``/``output``/``input``/``cleanup`` and edge
+detection) and models the two chips on the laserbox board at the pin level:
+
+* a 74HC165 input register: ``SH_LD`` low loads the parallel inputs, each rising
+  ``CLK`` edge shifts, and ``QH`` reads the current MSB;
+* a 74HC595 output register: each rising ``SRCLK`` edge shifts ``SER`` in, and a
+  rising ``RCLK`` edge latches the shift register to the outputs.
+
+So a driver bit-banging a word through it produces the same word a real board
+would, which lets the register drivers, the input sampler thread and the
+benchmarks run off the Pi. It also counts every call (``calls``), which is the
+cost that matters on the Pi Zero, where each ``RPi.GPIO`` call is expensive.
+
+Pass an instance as the ``gpio`` argument of the register classes in
+:mod:`src.shift_register`.
+"""
+from collections import Counter
+from . import ports
+
+
+class FakeGPIO:
+    """Module-compatible fake of ``RPi.GPIO`` with a simulated 165 + 595 board.
+
+    Args:
+        piso: ``(SH_LD, CLK, QH, n_bits)`` pins of the simulated 74HC165 chain,
+            or None for no input chip. Defaults match
+            :class:`~src.shift_register.InputShiftRegister`; an ``n_bits`` of
+            None is the configured chain width (:func:`src.ports.input_chain`).
+        sipo: ``(RCLK, SRCLK, SER, n_bits)`` pins of the simulated 74HC595
+            chain, or None. Defaults match
+            :class:`~src.shift_register.OutputShiftRegister` (``n_bits`` None:
+            :func:`src.ports.output_chain`).
+
+    Attributes:
+        inputs (int): The parallel input word the 165 sees (the buttons).
+        outputs (int): The word last latched onto the 595's outputs.
+        latched (list): Every word latched, in order.
+        calls (Counter): Call counts by API name (``output``, ``input``, ...).
+    """
+    BCM = 11
+    BOARD = 10
+    OUT = 0
+    IN = 1
+    LOW = 0
+    HIGH = 1
+    PUD_OFF = 20
+    PUD_DOWN = 21
+    PUD_UP = 22
+    RISING = 31
+    FALLING = 32
+    BOTH = 33
+
+    def __init__(self, piso=(21, 20, 16, None), sipo=(3, 4, 2, None)):
+        if piso is not None and piso[3] is None:
+            piso = piso[:3] + (ports.input_chain(),)
+        if sipo is not None and sipo[3] is None:
+            sipo = sipo[:3] + (ports.output_chain(),)
+        self.levels = {}
+        self.modes = {}
+        self.calls = Counter()
+        self.inputs = 0
+        self.outputs = 0
+        self.latched = []
+        self._edge_callbacks = {}
+        self.piso = piso
+        self.sipo = sipo
+        self._piso_shift = 0
+        self._sipo_shift = 0
+
+    # -- RPi.GPIO API ----------------------------------------------------------
+    def setmode(self, mode):
+        self.calls['setmode'] += 1
+        self.mode = mode
+
+    def setwarnings(self, flag):
+        self.calls['setwarnings'] += 1
+
+    def setup(self, channel, direction, initial=None, pull_up_down=None):
+        self.calls['setup'] += 1
+        for ch in self._channels(channel):
+            self.modes[ch] = direction
+            if direction == self.OUT:
+                self.levels[ch] = self.LOW if initial is None else int(bool(initial))
+
+    def output(self, channel, value):
+        self.calls['output'] += 1
+        channels = self._channels(channel)
+        values = value if isinstance(value, (list, tuple)) else [value] * len(channels)
+        for ch, v in zip(channels, values):
+            self._drive(ch, 1 if v else 0)
+
+    def input(self, channel):
+        self.calls['input'] += 1
+        if self.piso is not None and channel == self.piso[2]:
+            n_bits = self.piso[3]
+            return (self._piso_shift >> (n_bits - 1)) & 1
+        return self.levels.get(channel, self.LOW)
+
+    def add_event_detect(self, channel, edge, callback=None, bouncetime=None):
+        self.calls['add_event_detect'] += 1
+        self._edge_callbacks[channel] = callback
+
+    def remove_event_detect(self, channel):
+        self.calls['remove_event_detect'] += 1
+        self._edge_callbacks.pop(channel, None)
+
+    def cleanup(self, channel=None):
+        self.calls['cleanup'] += 1
+        self._edge_callbacks.clear()
+
+    # -- test helpers -----------------------------------------------------------
+    def set_inputs(self, word, edge_pin=None):
+        """Change the parallel input word (a press); fire ``edge_pin``'s callback."""
+        self.inputs = word
+        if self.piso is not None and self.levels.get(self.piso[0]) == self.LOW:
+            self._piso_shift = word  # SH_LD held low: the 165 is transparent
+        callback = self._edge_callbacks.get(edge_pin)
+        if callback is not None:
+            callback(edge_pin)
+
+    def reset_counts(self):
+        """Zero the call counters (e.g. after driver setup, before a benchmark)."""
+        self.calls.clear()
+
+    # -- chip models ------------------------------------------------------------
+    @staticmethod
+    def _channels(channel):
+        return list(channel) if isinstance(channel, (list, tuple)) else [channel]
+
+    def _drive(self, ch, level):
+        prev = self.levels.get(ch, self.LOW)
+        self.levels[ch] = level
+        rising = level and not prev
+        if self.piso is not None:
+            sh_ld, clk, qh, n_bits = self.piso
+            if ch == sh_ld and not level:
+                self._piso_shift = self.inputs  # parallel load
+            elif ch == clk and rising and self.levels.get(sh_ld, self.HIGH):
+                self._piso_shift = (self._piso_shift << 1) & ((1 << n_bits) - 1)
+        if self.sipo is not None:
+            rclk, srclk, ser, n_bits = self.sipo
+            if ch == srclk and rising:
+                bit = self.levels.get(ser, self.LOW)
+                self._sipo_shift = ((self._sipo_shift << 1) | bit) & ((1 << n_bits) - 1)
+            elif ch == rclk and rising:
+                self.outputs = self._sipo_shift
+                self.latched.append(self.outputs)
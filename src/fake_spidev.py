@@ -0,0 +1,139 @@
+"""An in-memory stand-in for ``spidev`` wired to a simulated 595 + 165 on SPI0.
+
+:class:`FakeSpiBoard` models the SPI wiring described in
+:mod:`src.spi_register` at the signal level:
+
+* the 74HC595 shifts MOSI in on every clock and latches on the rising edge of
+  its ``RCLK`` -- chip-select ``latch_device`` (CE0), or ``rclk_pin`` if it is
+  wired to a GPIO instead;
+* the 74HC165 loads its parallel inputs while ``SH_LD`` is low, and presents
+  its MSB on MISO, shifting on every clock once ``SH_LD`` is high again.
+
+Every chip-select edge, transfer and latch-pin edge is appended to ``log`` in
+order, so tests can check the framing and that a latch happens only after all
+of a word's bits. :meth:`FakeSpiBoard.SpiDev` returns devices with the slice
+of the ``spidev.SpiDev`` API the drivers use, and the board itself stands in
+for ``RPi.GPIO`` on the latch pins. Pass them as the drivers' ``spi`` and
+``gpio`` arguments.
+"""
+from . import ports
+
+
+class FakeSpiDev:
+    """One ``spidev.SpiDev`` handle on a :class:`FakeSpiBoard`."""
+    def __init__(self, board):
+        self.board = board
+        self.bus = None
+        self.device = None
+        self.max_speed_hz = 0
+        self.mode = 0
+
+    def open(self, bus, device):
+        self.bus, self.device = bus, device
+
+    def xfer2(self, values):
+        return self.board._transfer(self.device, list(values))
+
+    def writebytes(self, values):
+        self.board._transfer(self.device, list(values))
+
+    def readbytes(self, n):
+        return self.board._transfer(self.device, [0] * n)
+
+    def close(self):
+        self.board.log.append(('close', self.device))
+
+
+class FakeSpiBoard:
+    """A 595 and a 165 on a simulated SPI0, plus their GPIO latch pins.
+
+    Args:
+        n_bits: Width of each chain (default: the longer configured chain,
+            see :mod:`src.ports`).
+        latch_device: Chip select wired to the 595's ``RCLK`` (None if none).
+        rclk_pin: BCM pin wired to ``RCLK`` instead, or None.
+        sh_ld: BCM pin wired to the 165's ``SH_LD``.
+
+    Attributes:
+        inputs (int): The parallel input word the 165 sees.
+        outputs (int): The word last latched onto the 595's outputs.
+        latched (list): Every word latched, in order.
+        log (list): ``('cs', device, level)``, ``('xfer', device, tx, rx)``,
+            ``('pin', pin, level)`` and ``('latch', word)`` entries, in order.
+        syscalls (int): Transfers made (one ioctl each on the real device).
+    """
+    BCM = 11
+    OUT = 0
+    IN = 1
+    LOW = 0
+    HIGH = 1
+
+    def __init__(self, n_bits=None, latch_device=0, rclk_pin=None, sh_ld=21):
+        if n_bits is None:
+            n_bits = max(ports.input_chain(), ports.output_chain())
+        self.n_bits = n_bits
+        self.latch_device = latch_device
+        self.rclk_pin = rclk_pin
+        self.sh_ld = sh_ld
+        self.inputs = 0
+        self.outputs = 0
+        self.latched = []
+        self.log = []
+        self.syscalls = 0
+        self.levels = {sh_ld: self.HIGH}
+        self._shift_out = 0
+        self._shift_in = 0
+
+    # -- spidev module API -------------------------------------------------------
+    def SpiDev(self):
+        return FakeSpiDev(self)
+
+    # -- RPi.GPIO API (latch pins only) -------------------------------------------
+    def setmode(self, mode):
+        pass
+
+    def setup(self, channel, direction, initial=None, pull_up_down=None):
+        if direction == self.OUT:
+            self.output(channel, self.LOW if initial is None else initial)
+
+    def output(self, pin, value):
+        level = 1 if value else 0
+        rising = level and not self.levels.get(pin, self.LOW)
+        self.levels[pin] = level
+        self.log.append(('pin', pin, level))
+        if pin == self.sh_ld and not level:
+            self._shift_in = self.inputs  # parallel load
+        if pin == self.rclk_pin and rising:
+            self._latch()
+
+    # -- chip models --------------------------------------------------------------
+    def _transfer(self, device, tx):
+        self.syscalls += 1
+        mask = (1 << self.n_bits) - 1
+        self.log.append(('cs', device, 0))
+        rx = []
+        for byte in tx:
+            got = 0
+            for i in reversed(range(8)):
+                # mode 0: both sides sample on the rising edge, then the 165 shifts
+                got = (got << 1) | ((self._shift_in >> (self.n_bits - 1)) & 1)
+                if self.levels.get(self.sh_ld, self.HIGH):
+                    self._shift_in = (self._shift_in << 1) & mask
+                self._shift_out = ((self._shift_out << 1) | ((byte >> i) & 1)) & mask
+            rx.append(got)
+        self.log.append(('xfer', device, list(tx), rx))
+        self.log.append(('cs', device, 1))
+        if device == self.latch_device:
+            self._latch()
+        return rx
+
+    def _latch(self):
+        self.outputs = self._shift_out
+        self.latched.append(self.outputs)
+        self.log.append(('latch', self.outputs))
+
+    def set_inputs(self, word):
+        """Change the parallel input word (a press)."""
+        self.inputs = word
+        if not self.levels.get(self.sh_ld, self.HIGH):
+            self._shift_in = word  # SH_LD held low: the 165 is transparent
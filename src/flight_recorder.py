@@ -0,0 +1,556 @@
+"""Flight recorder: a compact binary log of a session, and exact replay of it.
+
+:class:`FlightRecorder` logs, each with a :func:`src.clock.monotonic_ns` stamp:
+
+* every frame and its ``dt``, so a replay steps ``now_ms`` identically;
+* every change of the *raw* input word, before debounce, so the debounce is
+  replayed too;
+* every word actually pushed to the output register;
+* every program switch, with the seed :mod:`random` was reseeded with for that
+  program, the frame's ``now_ms``, the input word at that moment and the
+  debouncer's per-bit press and release holds.
+
+Because the recorder reseeds :mod:`random` at each switch, a program switch is
+a *replay point*: the program, its RNG and its inputs (debounce holds included)
+can be rebuilt from that record alone. Records are buffered in memory and written every
+``config.RECORDER_FLUSH_MS`` (and on shutdown) into a ring of
+``config.RECORDER_SEGMENTS`` segment files under ``config.RECORDER_DIR``,
+overwriting the oldest. A segment is closed at the first program switch after
+it reaches ``config.RECORDER_SEGMENT_BYTES``, so each segment starts at a
+replay point; a program left running long enough to reach ``HARD_LIMIT`` times
+that size is cut mid-program, and that segment is then only replayable from
+its first switch on.
+
+:class:`Replay` drives a real :class:`~src.game_loop.Game` through a recording
+with a fake :mod:`src.clock` source and a :class:`ReplayRegister` standing in
+for the input register. It runs at full speed, not in real time, and compares
+the output words the game pushes against the recorded ones, frame by frame.
+That turns any recorded session into a regression check and a benchmark (see
+``scratch/replay_flight.py``).
+
+Format (little-endian; one header per segment, then records back to back)::
+
+    header   4s magic 'LBFR', B version, I session, I sequence, H fps,
+             B word bytes (W)
+    FRAME    B kind, q t_ns, d dt_ms
+    INPUT    B kind, q t_ns, W raw word
+    OUTPUT   B kind, q t_ns, W word
+    PROGRAM  B kind, q t_ns, I seed, d now_ms, W stable word, W raw word,
+             B name length, B input bits (N), then the program name (ASCII),
+             N q press holds (ns), N q release holds (ns)
+
+Words are stored as ``W`` little-endian bytes, wide enough for the longer of
+the two register chains (2 on the original 16-bit box; see :mod:`src.ports`).
+
+A crash can leave a partial record at the end of a segment; readers drop it.
+"""
+import os
+import random
+import struct
+import time
+from . import clock, ports
+from .audio_utils import Mixer
+from .config import config
+from .event_loop import events
+from .game_loop import Game
+from .io_managers import Debouncer
+from .programs import State
+
+MAGIC = b'LBFR'
+VERSION = 3
+
+# record kinds
+FRAME = 1
+INPUT = 2
+OUTPUT = 3
+PROGRAM = 4
+
+_HEADER = struct.Struct('<4sBIIHB')
+_FRAME = struct.Struct('<Bqd')
+
+
+def _word_records(word_bytes):
+    """The INPUT/OUTPUT and PROGRAM record layouts for ``word_bytes``-byte words."""
+    return (struct.Struct(f'<Bq{word_bytes}s'),
+            struct.Struct(f'<BqId{word_bytes}s{word_bytes}sBB'))
+
+
+def _resolve(path):
+    """``path`` as-is if absolute, else relative to ``config.PROJECT_ROOT``."""
+    return path if os.path.isabs(path) else os.path.join(config.PROJECT_ROOT, path)
+
+
+class FlightRecorder:
+    """Writes the session log into a rotating ring of segment files.
+
+    Pass it to :class:`~src.game_loop.Game` as ``recorder``; the game, its
+    input/output managers and the state machine call :meth:`frame`,
+    :meth:`input`, :meth:`output` and :meth:`program_started`. Each call only
+    appends a packed record to a buffer; file writes happen once per flush.
+
+    Args:
+        directory: Ring directory (default ``config.RECORDER_DIR``; relative
+            paths resolve against ``config.PROJECT_ROOT``).
+        segments: Number of segment files in the ring.
+        segment_bytes: Size after which a segment is closed at the next switch.
+        flush_ms: How often buffered records are written out.
+        fps: Frame rate stored in the header (informational).
+
+    Attributes:
+        word_bytes (int): Bytes per stored word, from the register widths.
+
+    Class Attributes:
+        HARD_LIMIT (int): Multiple of ``segment_bytes`` at which a segment is
+            cut even without a program switch.
+    """
+    HARD_LIMIT = 4
+
+    def __init__(self, directory=None, segments=None, segment_bytes=None,
+                 flush_ms=None, fps=None):
+        self.directory = _resolve(directory or config.RECORDER_DIR)
+        self.segments = segments or config.RECORDER_SEGMENTS
+        self.segment_bytes = segment_bytes or config.RECORDER_SEGMENT_BYTES
+        if flush_ms is None:
+            flush_ms = config.RECORDER_FLUSH_MS
+        self.flush_ns = int(flush_ms * 1_000_000)
+        self.fps = fps or config.FPS
+        self.word_bytes = max(ports.input_chain(), ports.output_chain()) // 8
+        self._word, self._program = _word_records(self.word_bytes)
+        os.makedirs(self.directory, exist_ok=True)
+        self._seeds = random.SystemRandom()
+        self.session = self._seeds.getrandbits(32)
+        self.seq = self._last_seq() + 1
+        self.buf = bytearray()
+        self.file = None
+        self.written = 0
+        self.flushed_ns = clock.monotonic_ns()
+        self._open_segment()
+
+    def segment_path(self, seq):
+        """Path of the ring slot that segment ``seq`` is written to."""
+        return os.path.join(self.directory, f'flight-{seq % self.segments:02d}.lbr')
+
+    def _last_seq(self):
+        """Highest sequence number already in the ring (-1 if empty)."""
+        last = -1
+        for _, seq, _, _ in _headers(self.directory):
+            last = max(last, seq)
+        return last
+
+    def _open_segment(self):
+        """Close the current segment (if any) and start the next ring slot."""
+        if self.file is not None:
+            self._write()
+            self.file.close()
+            self.seq += 1
+        self.file = open(self.segment_path(self.seq), 'wb')
+        self.file.write(_HEADER.pack(MAGIC, VERSION, self.session, self.seq, self.fps,
+                                     self.word_bytes))
+        self.written = _HEADER.size
+
+    def _write(self):
+        """Write out the buffered records."""
+        if self.buf:
+            self.file.write(self.buf)
+            self.file.flush()
+            self.written += len(self.buf)
+            self.buf = bytearray()
+
+    def frame(self, t_ns, dt):
+        """Log the start of a frame of ``dt`` ms; flushes when one is due."""
+        self.buf += _FRAME.pack(FRAME, t_ns, dt)
+        if t_ns - self.flushed_ns >= self.flush_ns:
+            self.flush(t_ns)
+
+    def input(self, t_ns, word):
+        """Log a change of the raw input word."""
+        self.buf += self._word.pack(INPUT, t_ns, word.to_bytes(self.word_bytes, 'little'))
+
+    def output(self, t_ns, word):
+        """Log a word pushed to the output register."""
+        self.buf += self._word.pack(OUTPUT, t_ns, word.to_bytes(self.word_bytes, 'little'))
+
+    def program_started(self, name, game):
+        """Reseed :mod:`random` for program ``name`` and log the switch.
+
+        Called by the state machine just before the program's ``start``. Rotates
+        to a new segment first if the current one is full, so the new segment
+        begins at this replay point.
+        """
+        if self.written + len(self.buf) >= self.segment_bytes:
+            self._open_segment()
+        seed = self._seeds.getrandbits(32)
+        random.seed(seed)
+        debouncer = game.input_manager.debouncer
+        data = name.encode('ascii')
+        n = self.word_bytes
+        bits = len(debouncer.press_ns)
+        self.buf += self._program.pack(PROGRAM, clock.monotonic_ns(), seed, game.now_ms,
+                                       debouncer.stable.to_bytes(n, 'little'),
+                                       debouncer.raw.to_bytes(n, 'little'), len(data), bits)
+        self.buf += data
+        self.buf += struct.pack(f'<{2 * bits}q', *debouncer.press_ns, *debouncer.release_ns)
+
+    def flush(self, t_ns=None):
+        """Write buffered records; cut the segment if it ran far past its size."""
+        self._write()
+        if self.written >= self.HARD_LIMIT * self.segment_bytes:
+            self._open_segment()
+        self.flushed_ns = t_ns if t_ns is not None else clock.monotonic_ns()
+
+    def close(self):
+        """Flush and close the current segment (idempotent)."""
+        if self.file is not None:
+            self._write()
+            self.file.close()
+            self.file = None
+
+
+def _headers(directory):
+    """Yield ``(path, seq, session, fps)`` for each segment file in ``directory``."""
+    if not os.path.isdir(directory):
+        return
+    for name in sorted(os.listdir(directory)):
+        if not (name.startswith('flight-') and name.endswith('.lbr')):
+            continue
+        path = os.path.join(directory, name)
+        with open(path, 'rb') as f:
+            head = f.read(_HEADER.size)
+        if len(head) < _HEADER.size:
+            continue
+        magic, version, session, seq, fps, _ = _HEADER.unpack(head)
+        if magic == MAGIC and version == VERSION:
+            yield path, seq, session, fps
+
+
+def read_records(data, offset=0, word_bytes=2):
+    """Decode the records in ``data`` (from ``offset``) into tuples.
+
+    ``word_bytes`` is the word width from the segment's header.
+
+    Yields ``(FRAME, t_ns, dt)``, ``(INPUT, t_ns, word)``,
+    ``(OUTPUT, t_ns, word)`` or
+    ``(PROGRAM, t_ns, name, seed, now_ms, stable, raw, press_ns, release_ns)``
+    (the holds as per-bit tuples). Stops quietly at a truncated trailing
+    record.
+    """
+    word_rec, program_rec = _word_records(word_bytes)
+    end = len(data)
+    while offset < end:
+        kind = data[offset]
+        if kind == FRAME:
+            if offset + _FRAME.size > end:
+                return
+            yield _FRAME.unpack_from(data, offset)
+            offset += _FRAME.size
+        elif kind == INPUT or kind == OUTPUT:
+            if offset + word_rec.size > end:
+                return
+            _, t_ns, word = word_rec.unpack_from(data, offset)
+            yield (kind, t_ns, int.from_bytes(word, 'little'))
+            offset += word_rec.size
+        elif kind == PROGRAM:
+            if offset + program_rec.size > end:
+                return
+            _, t_ns, seed, now_ms, stable, raw, n, bits = program_rec.unpack_from(data, offset)
+            stable, raw = int.from_bytes(stable, 'little'), int.from_bytes(raw, 'little')
+            offset += program_rec.size
+            holds = struct.Struct(f'<{2 * bits}q')
+            if offset + n + holds.size > end:
+                return
+            name = bytes(data[offset:offset + n]).decode('ascii')
+            offset += n
+            hold_ns = holds.unpack_from(data, offset)
+            offset += holds.size
+            yield (PROGRAM, t_ns, name, seed, now_ms, stable, raw,
+                   hold_ns[:bits], hold_ns[bits:])
+        else:
+            raise ValueError(f'flight recorder: bad record kind {kind} at byte {offset}')
+
+
+def read_segment(path):
+    """Return the header fields and records of one segment file.
+
+    Returns:
+        ``(session, seq, fps, records)``.
+
+    Raises:
+        ValueError: If ``path`` is not a flight recorder segment.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < _HEADER.size:
+        raise ValueError(f'{path}: not a flight recorder segment')
+    magic, version, session, seq, fps, word_bytes = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f'{path}: not a flight recorder segment (version {VERSION})')
+    return session, seq, fps, list(read_records(data, _HEADER.size, word_bytes))
+
+
+def load_session(directory=None, session=None):
+    """The records of one session still in the ring, oldest first.
+
+    Args:
+        directory: Ring directory (default ``config.RECORDER_DIR``).
+        session: Session id; default is the session of the newest segment.
+
+    Raises:
+        FileNotFoundError: If the ring holds no segment of that session.
+    """
+    directory = _resolve(directory or config.RECORDER_DIR)
+    found = list(_headers(directory))
+    if session is None and found:
+        session = max(found, key=lambda h: h[1])[2]
+    paths = [path for path, seq, sess, _ in sorted(found, key=lambda h: h[1]) if sess == session]
+    if not paths:
+        raise FileNotFoundError(f'no flight recorder segments in {directory}')
+    records = []
+    for path in paths:
+        records.extend(read_segment(path)[3])
+    return records
+
+
+class ReplayRegister:
+    """Input register stand-in that plays back recorded raw-word changes.
+
+    Has ``drain()``, so :class:`~src.io_managers.InputManager` consumes its
+    changes with their recorded timestamps, exactly like an
+    :class:`~src.input_sampler.InputSampler`'s.
+
+    Args:
+        word: The raw word before the first change.
+    """
+    def __init__(self, word=0):
+        self.word = word
+        self.changes = []
+
+    def read_word(self):
+        return self.word
+
+    def drain(self):
+        changes, self.changes = self.changes, []
+        if changes:
+            self.word = changes[-1][1]
+        return changes
+
+
+class _NullRegister:
+    """Output register stand-in: the replay only needs what was pushed."""
+    def push_word(self, word):
+        pass
+
+
+class _ReplayTap:
+    """The replayed game's ``recorder``: collects outputs and replays seeds.
+
+    Args:
+        programs: The recorded PROGRAM records, in order.
+    """
+    def __init__(self, programs):
+        self.programs = iter(programs)
+        self.booting = True
+        self.frame_no = 0
+        self.outputs = []
+        self.switches = []
+
+    def frame(self, t_ns, dt):
+        pass
+
+    def input(self, t_ns, word):
+        pass
+
+    def output(self, t_ns, word):
+        self.outputs.append((self.frame_no, word))
+
+    def program_started(self, name, game):
+        if self.booting:  # Game.__init__'s own boot program; replaced at the start record
+            return
+        self.switches.append((self.frame_no, name))
+        rec = next(self.programs, None)
+        if rec is not None and rec[2] == name:
+            random.seed(rec[3])
+
+    def close(self):
+        pass
+
+
+class ReplayResult:
+    """Outcome of a :meth:`Replay.run`.
+
+    Attributes:
+        frames (int): Frames replayed.
+        expected (list): Recorded ``(frame, word)`` output pushes.
+        got (list): Replayed ``(frame, word)`` output pushes.
+        expected_switches (list): Recorded ``(frame, program)`` switches.
+        switches (list): Replayed ``(frame, program)`` switches.
+        recorded_s (float): Session time covered by the replayed frames.
+        wall_s (float): Real time the replay took.
+    """
+    def __init__(self, frames, expected, got, expected_switches, switches, recorded_s, wall_s):
+        self.frames = frames
+        self.expected = expected
+        self.got = got
+        self.expected_switches = expected_switches
+        self.switches = switches
+        self.recorded_s = recorded_s
+        self.wall_s = wall_s
+
+    @property
+    def ok(self):
+        """True if the replay pushed exactly the recorded words and switches."""
+        return self.got == self.expected and self.switches == self.expected_switches
+
+    def first_divergence(self):
+        """The first differing ``(expected, got)`` output pushes, or None."""
+        for i in range(max(len(self.expected), len(self.got))):
+            want = self.expected[i] if i < len(self.expected) else None
+            have = self.got[i] if i < len(self.got) else None
+            if want != have:
+                return want, have
+        return None
+
+    def speedup(self):
+        """Recorded time over replay time (how much faster than real time)."""
+        return self.recorded_s / self.wall_s if self.wall_s > 0 else float('inf')
+
+    def report(self):
+        """One line: frames, speed and the verdict."""
+        line = (f'{self.frames} frames ({self.recorded_s:.1f}s recorded) in '
+                f'{self.wall_s:.2f}s ({self.speedup():.0f}x real time): ')
+        if self.ok:
+            return line + f'{len(self.got)} output words match'
+        diverged = self.first_divergence()
+        if diverged is None:
+            return line + f'program switches differ: {self.expected_switches} vs {self.switches}'
+        want, have = diverged
+        return line + f'outputs diverge: recorded {want}, replayed {have} (frame, word)'
+
+
+class Replay:
+    """Re-runs a recording through a real :class:`~src.game_loop.Game`.
+
+    Replay starts at the first program switch in ``records`` (the boot program
+    of a whole session, or the first switch of a segment) and rebuilds the
+    game there: ``now_ms``, the input word and debounce holds, the RNG seed and
+    the program.
+    Every recorded frame is then run with the clock set to its timestamp and
+    the raw input changes it saw; the clock never moves by itself, so the game
+    runs as fast as it can.
+
+    Outputs are compared from the first frame after the start: the start
+    frame's own push depends on what was shown before it. A start in the
+    middle of a multi-program context (a Composer) is relaunched as a single
+    program, so the replay is exact until that program ends.
+
+    Args:
+        records: Records as from :func:`load_session` or :func:`read_segment`.
+
+    Raises:
+        ValueError: If ``records`` contains no program switch.
+    """
+    def __init__(self, records):
+        self.records = records
+        self.start = next((i for i, r in enumerate(records) if r[0] == PROGRAM), None)
+        if self.start is None:
+            raise ValueError('flight recorder: no program switch to replay from')
+        self.now_ns = records[self.start][1]
+
+    @classmethod
+    def from_dir(cls, directory=None, session=None):
+        """A replay of the newest (or given) session in a ring directory."""
+        return cls(load_session(directory, session))
+
+    def _monotonic(self):
+        return self.now_ns / 1e9
+
+    def run(self, mixer=None):
+        """Replay the recording; returns a :class:`ReplayResult`."""
+        records = self.records
+        first = records[self.start]
+        _, t_ns, name, seed, now_ms, stable, raw, press_ns, release_ns = first
+        expected, expected_switches, programs = [], [], [first]
+        frame_no = 0
+        shown = None
+        for rec in records[:self.start + 1]:
+            if rec[0] == OUTPUT:
+                shown = rec[2]
+        for rec in records[self.start + 1:]:
+            kind = rec[0]
+            if kind == FRAME:
+                frame_no += 1
+            elif kind == OUTPUT:
+                if frame_no == 0:
+                    shown = rec[2]
+                else:
+                    expected.append((frame_no, rec[2]))
+            elif kind == PROGRAM:
+                expected_switches.append((frame_no, rec[2]))
+                programs.append(rec)
+
+        tap = _ReplayTap(programs)
+        register = ReplayRegister(raw)
+        restore = clock.set_source(self._monotonic, lambda secs: None)
+        started = time.perf_counter()  # real time: the clock module is faked here
+        try:
+            self.now_ns = t_ns
+            events.clear()
+            game = Game(PISOreg=register, SIPOreg=_NullRegister(),
+                        mixer=mixer if mixer is not None else Mixer(),
+                        events=events, recorder=tap)
+            tap.booting = False
+            game.now_ms = now_ms
+            game.frame_t_ns = t_ns
+            _restore_inputs(game.input_manager, stable, raw, t_ns, press_ns, release_ns)
+            machine = game.state_machine
+            if name == 'GameSelect':
+                machine.enter_game_select()
+            else:
+                machine.launch_single_program(name)
+            tap.switches.clear()  # the start switch itself is not compared
+            game.outputs.prev_word = shown
+
+            frames = 0
+            pending = None
+            inputs = []
+            for rec in records[self.start + 1:]:
+                kind = rec[0]
+                if kind == FRAME:
+                    if pending is not None:
+                        frames += 1
+                        self._run_frame(game, tap, frames, pending, inputs)
+                        inputs = []
+                    pending = rec
+                elif kind == INPUT:
+                    inputs.append((rec[1], rec[2]))
+            if pending is not None:
+                frames += 1
+                self._run_frame(game, tap, frames, pending, inputs)
+        finally:
+            restore()
+        wall_s = time.perf_counter() - started
+        recorded_s = (self.now_ns - t_ns) / 1e9
+        return ReplayResult(frames, expected, tap.outputs, expected_switches,
+                            tap.switches, recorded_s, wall_s)
+
+    def _run_frame(self, game, tap, frame_no, rec, inputs):
+        """One recorded frame: set the clock, queue its inputs, update, render."""
+        self.now_ns = rec[1]
+        tap.frame_no = frame_no
+        game.input_manager.register.changes.extend(inputs)
+        game.update(rec[2])
+        game.render()
+
+
+def _restore_inputs(input_manager, stable, raw, t_ns, press_ns, release_ns):
+    """Put the input manager in a recorded input state, with the recorded holds.
+
+    The holds come from the recording, not this process's ``config``: a
+    cabinet session replays with the cabinet's debounce wherever it runs.
+    """
+    debouncer = Debouncer(press_ns, release_ns, stable)
+    debouncer.raw = raw
+    debouncer.unsettled = stable ^ raw
+    debouncer.since_ns = [t_ns] * len(debouncer.since_ns)
+    input_manager.debouncer = debouncer
+    input_manager.state = input_manager.prev_state = State(stable)
+    input_manager.register.word = raw
@@ -0,0 +1,161 @@
+"""Fixed-memory frame-timing telemetry for the main loop.
+
+The loop used to append every frame's ``dt`` to a plain list for the life of the
+process -- 8.6M floats a day at 100 FPS -- only to print one average at
+shutdown. :class:`FrameStats` replaces that with constant memory: a ring buffer
+of the most recent frames plus a streaming :class:`Histogram` over the whole
+session, so percentiles, overruns and resyncs can be read at any time while the
+box is running (``kill -USR1 <pid>`` prints a report) and are dumped on
+shutdown.
+
+Both classes are pure bookkeeping (no pygame, no GPIO), so they are cheap enough
+to feed every frame and easy to test.
+"""
+from array import array
+
+
+class Histogram:
+    """Streaming fixed-bucket histogram of millisecond durations.
+
+    Memory is fixed at construction: ``max_ms / bucket_ms`` counters plus one
+    overflow bucket. Percentiles are resolved to a bucket's upper edge (never
+    above the largest sample actually seen), which is plenty for jitter work at
+    the default 0.25 ms resolution.
+
+    Args:
+        bucket_ms: Width of each bucket in ms.
+        max_ms: Upper edge of the last regular bucket; larger samples land in
+            the overflow bucket.
+    """
+    def __init__(self, bucket_ms=0.25, max_ms=100.0):
+        self.bucket_ms = bucket_ms
+        self.max_ms = max_ms
+        self.n_buckets = int(max_ms / bucket_ms)
+        self.counts = array('L', bytes(array('L').itemsize * (self.n_buckets + 1)))
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_seen = 0.0
+
+    def add(self, ms):
+        """Record one sample (in ms)."""
+        i = int(ms / self.bucket_ms)
+        if i > self.n_buckets:
+            i = self.n_buckets
+        elif i < 0:
+            i = 0
+        self.counts[i] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_seen:
+            self.max_seen = ms
+
+    def percentile(self, p):
+        """Return the ``p``-th percentile (``p`` in 0..100), or 0.0 when empty."""
+        if not self.count:
+            return 0.0
+        rank = p / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                if i == self.n_buckets:
+                    return self.max_seen
+                return min((i + 1) * self.bucket_ms, self.max_seen)
+        return self.max_seen
+
+    def mean(self):
+        """Mean sample in ms (0.0 when empty)."""
+        return self.total_ms / self.count if self.count else 0.0
+
+    def reset(self):
+        """Forget every sample (memory stays allocated)."""
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_seen = 0.0
+
+
+class FrameStats:
+    """Bounded frame-timing collector fed once per frame by the main loop.
+
+    Keeps the last ``window`` frame times in a ring buffer (for "what is it
+    doing right now") and a session-long :class:`Histogram` (for p50/p95/p99).
+    A frame is an *overrun* when its ``dt`` exceeds the clock's budget by more
+    than ``OVERRUN_TOLERANCE`` (sleep granularity alone puts most frames a hair
+    over the exact target). Resyncs are read live from the
+    :class:`~src.game_loop.GameClock`, which counts every time it dropped a
+    ``MAX_FRAME_SKIP`` backlog.
+
+    Args:
+        game_clock: The loop's :class:`~src.game_loop.GameClock`.
+        window: Number of recent frames kept in the ring buffer.
+
+    Class Attributes:
+        WINDOW (int): Default ring-buffer length (~10 s at 100 FPS).
+        OVERRUN_TOLERANCE (float): Fraction over budget before a frame counts
+            as an overrun.
+    """
+    WINDOW = 1024
+    OVERRUN_TOLERANCE = 0.10
+
+    def __init__(self, game_clock, window=WINDOW):
+        self.clock = game_clock
+        self.target_ms = game_clock.target_dt * 1000.0
+        self.window = window
+        self.recent = array('d', bytes(8 * window))
+        self.head = 0
+        self.histogram = Histogram()
+        self.overruns = 0
+
+    @property
+    def frames(self):
+        """Total frames recorded this session."""
+        return self.histogram.count
+
+    @property
+    def resyncs(self):
+        """How many times the clock dropped its backlog and resynced."""
+        return self.clock.resyncs
+
+    def record(self, dt_ms, budget_ms=None):
+        """Record one frame's ``dt`` (ms) against ``budget_ms`` (default: target)."""
+        self.recent[self.head] = dt_ms
+        self.head = (self.head + 1) % self.window
+        self.histogram.add(dt_ms)
+        if budget_ms is None:
+            budget_ms = self.target_ms
+        if dt_ms > budget_ms * (1.0 + self.OVERRUN_TOLERANCE):
+            self.overruns += 1
+
+    def recent_dts(self):
+        """The buffered frame times, oldest first (a copy; for inspection only)."""
+        n = min(self.frames, self.window)
+        if n < self.window:
+            return list(self.recent[:n])
+        return list(self.recent[self.head:]) + list(self.recent[:self.head])
+
+    def summary(self):
+        """Return a dict snapshot of the session's frame timing."""
+        h = self.histogram
+        recent = self.recent_dts()
+        return {
+            'frames': h.count,
+            'target_ms': self.target_ms,
+            'mean_ms': h.mean(),
+            'p50_ms': h.percentile(50),
+            'p95_ms': h.percentile(95),
+            'p99_ms': h.percentile(99),
+            'max_ms': h.max_seen,
+            'recent_max_ms': max(recent) if recent else 0.0,
+            'overruns': self.overruns,
+            'resyncs': self.resyncs,
+        }
+
+    def report(self):
+        """Return a one-line human-readable summary (what the loop prints)."""
+        s = self.summary()
+        return ('frames: {frames}  target {target_ms:.2f}ms  mean {mean_ms:.2f}  '
+                'p50 {p50_ms:.2f}  p95 {p95_ms:.2f}  p99 {p99_ms:.2f}  '
+                'max {max_ms:.2f} (recent {recent_max_ms:.2f})  '
+                'overruns {overruns}  resyncs {resyncs}').format(**s)
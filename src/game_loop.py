@@ -3,12 +3,13 @@
 :class:`Game` wires the subsystems together and runs the fixed-timestep loop:
 poll input -> advance animations -> update the active program -> push the laser
 word to the output register. :class:`GameClock` paces the loop to a target FPS.
-:class:`LaserBay` is the laser-output model programs write to (collapsed into a
-single 16-bit word each frame). On the desktop this class is subclassed by
-:class:`~src.simulator.simulator.Simulator`.
+:class:`LaserBay` is the laser-output model programs write to (a single
+``config.N_PORTS``-bit bitmask, pushed each frame). On the desktop this class
+is subclassed by :class:`~src.simulator.simulator.Simulator`.
 """
 import sys
 import signal
+from collections import deque
 import pygame
 from . import clock
 from .audio_utils import Mixer
@@ -17,8 +18,9 @@ from .config import config
 from .system_volume import VolumeController
 from .programs import State, StateSequence, StateMachine
 from .event_loop import *
-from .animation import Animation
+from .animation import Animation, Compositor
 from .io_managers import InputManager, OutputManager
+from .frame_stats import FrameStats, Histogram
 if sys.platform == 'linux' and '-s' not in sys.argv:
   import RPi.GPIO as GPIO
 
@@ -40,7 +42,8 @@ class GameClock:
   every frame-counted timeout. Here, if the loop falls more than
   ``MAX_FRAME_SKIP`` frames behind, the backlog is dropped and the schedule
   resyncs to *now*; the returned ``dt`` is clamped the same way, so a one-off
-  hiccup can never inject a huge time step into game logic.
+  hiccup can never inject a huge time step into game logic. Each such resync is
+  counted in ``resyncs`` (reported by :class:`~src.frame_stats.FrameStats`).
 
   Args:
       fps: Target frames per second.
@@ -54,91 +57,252 @@ class GameClock:
     now = clock.monotonic()
     self.prev = now
     self.next_frame = now + self.target_dt
+    self.resyncs = 0
 
-  def tick(self):
-    """Sleep until the next frame is due; return the elapsed ``dt`` in ms."""
+  def tick(self, frames=1):
+    """Sleep until the next frame is due; return the elapsed ``dt`` in ms.
+
+    Args:
+        frames: Frame slots this tick covers. ``1`` is the normal fixed step;
+            adaptive pacing passes more to sleep through idle frames. The wake
+            time stays on the same ``target_dt`` grid either way, so a deadline
+            is first seen on exactly the frame it would have been at full rate.
+    """
+    period = frames * self.target_dt
+    due = self.next_frame + (frames - 1) * self.target_dt
     now = clock.monotonic()
-    wait = self.next_frame - now
+    wait = due - now
     if wait > 0:
       clock.sleep(wait)
       now = clock.monotonic()
 
-    # Real frame period, clamped so a stall can't spike dt for game logic.
+    # Real frame period, clamped so a stall can't spike dt for game logic. Lag
+    # is measured past the intended wake, so a deliberate idle sleep isn't a stall.
     dt = now - self.prev
-    if dt > self.max_lag:
-      dt = self.target_dt
+    if dt > self.max_lag + period - self.target_dt:
+      dt = period
     self.prev = now
 
     # Schedule the next frame. If we've fallen too far behind (long stall or any
     # clock anomaly), drop the backlog and resync rather than free-run to catch up.
-    self.next_frame += self.target_dt
+    self.next_frame = due + self.target_dt
     if self.next_frame < now - self.max_lag:
       self.next_frame = now + self.target_dt
+      self.resyncs += 1
 
     return dt * 1000.0
 
-class LaserPort:
-  """One laser's on/off state. Should only be accessed through :class:`LaserBay`.
+def callable_label(func):
+  """A short human-readable name for a callable (for profiler reports)."""
+  name = getattr(func, '__qualname__', None)
+  if name is None:
+    inner = getattr(func, 'func', None)  # functools.partial
+    name = getattr(inner, '__qualname__', None) or repr(func)
+  return name
 
-  Args:
-      id: The laser's index (0..13).
-  """
-  def __init__(self, id):
-    self.id = id
-    self.on = False
-    self.brightness = 1 # not used for now, but possibly implement PWM brightness
+class FrameProfiler:
+  """Opt-in per-phase frame profiler (``config.PROFILE_FRAMES``).
 
-  def _turn_on(self):
-    self.on = True
+  Times each phase of every frame with :func:`src.clock.monotonic` -- ``poll``
+  (:meth:`InputManager.poll`), ``animations`` (:meth:`Animation.update_all`),
+  ``program`` (:meth:`StateMachine.update`, including scheduled callbacks) and
+  ``push`` (:meth:`OutputManager.push_word`) -- into one
+  :class:`~src.frame_stats.Histogram` per phase.
+
+  Scheduled callbacks and animations report their own cost through
+  :meth:`call` / :meth:`note`, and the slowest item of each frame is
+  remembered. When a frame goes over budget, a record naming that culprit is
+  kept in ``slow_frames`` (bounded), so a report says *what* blew the 10 ms, not
+  just that something did.
+
+  When profiling is off :attr:`Game.profiler` is ``None`` and none of this runs.
+
+  Args:
+      budget_ms: The frame budget (normally ``1000 / FPS``).
 
-  def _turn_off(self):
-    self.on = False
+  Class Attributes:
+      PHASES (tuple): Phase names, in frame order.
+      SLOW_LOG (int): Number of over-budget frame records kept.
+  """
+  PHASES = ('poll', 'animations', 'program', 'push')
+  SLOW_LOG = 32
+
+  def __init__(self, budget_ms):
+    self.budget_ms = budget_ms
+    self.phases = {name: Histogram() for name in self.PHASES}
+    self.frame = Histogram()
+    self.over_budget = 0
+    self.slow_frames = deque(maxlen=self.SLOW_LOG)
+    self._times = dict.fromkeys(self.PHASES, 0.0)
+    self._lap = clock.monotonic()
+    self._culprit = None
+    self._culprit_ms = 0.0
+
+  def begin(self):
+    """Start timing a new frame's first phase."""
+    self._lap = clock.monotonic()
+
+  def lap(self, phase):
+    """Close ``phase``: charge it the time since the previous lap."""
+    now = clock.monotonic()
+    ms = (now - self._lap) * 1000.0
+    self._lap = now
+    self._times[phase] = ms
+    self.phases[phase].add(ms)
+
+  def note(self, label, ms):
+    """Report that ``label`` took ``ms`` this frame (slowest one is kept)."""
+    if ms > self._culprit_ms:
+      self._culprit, self._culprit_ms = label, ms
+
+  def call(self, func, *args, **kwargs):
+    """Run ``func(*args, **kwargs)``, timing it as a possible culprit."""
+    t0 = clock.monotonic()
+    try:
+      return func(*args, **kwargs)
+    finally:
+      self.note(callable_label(func), (clock.monotonic() - t0) * 1000.0)
+
+  def end_frame(self, now_ms):
+    """Close the frame started by :meth:`begin`; log it if it was over budget."""
+    total = sum(self._times.values())
+    self.frame.add(total)
+    if total > self.budget_ms:
+      self.over_budget += 1
+      self.slow_frames.append({
+        'now_ms': now_ms,
+        'total_ms': total,
+        'phases': dict(self._times),
+        'culprit': self._culprit,
+        'culprit_ms': self._culprit_ms,
+      })
+    for phase in self.PHASES:
+      self._times[phase] = 0.0
+    self._culprit, self._culprit_ms = None, 0.0
+
+  def report(self):
+    """Return a multi-line report: per-phase percentiles plus recent slow frames."""
+    lines = [f'frame work: p50 {self.frame.percentile(50):.2f}ms  '
+             f'p99 {self.frame.percentile(99):.2f}ms  max {self.frame.max_seen:.2f}ms  '
+             f'over budget {self.over_budget}/{self.frame.count}']
+    for name, h in self.phases.items():
+      lines.append(f'  {name:<10} mean {h.mean():.3f}  p95 {h.percentile(95):.2f}  '
+                   f'p99 {h.percentile(99):.2f}  max {h.max_seen:.2f}')
+    for rec in self.slow_frames:
+      worst = max(rec['phases'], key=rec['phases'].get)
+      culprit = f"  culprit {rec['culprit']} ({rec['culprit_ms']:.2f}ms)" if rec['culprit'] else ''
+      lines.append(f"  slow @{rec['now_ms']:.0f}ms: {rec['total_ms']:.2f}ms, "
+                   f"mostly {worst}{culprit}")
+    return '\n'.join(lines)
 
 class LaserBay:
   """The laser-output model programs write to.
 
-  Holds an array of :class:`LaserPort` objects and collapses them into a single
-  16-bit word for the output register. A ``clean`` flag caches the last word so
-  :meth:`to_word` only recomputes when something changed.
+  The whole field is one integer bitmask, ``word`` (bit i = laser i), and it
+  is the only on/off state there is. Every setter is an O(1) mask operation
+  on it, and :meth:`to_word` just returns it, so per-port writes and
+  :meth:`set_word` can never disagree.
+
+  Each port also has a brightness level, ``0 .. max_level`` (full by default),
+  set directly or faded over time. Levels only change how bright a lit laser
+  looks, and only with the BAM engine (:mod:`src.bam`); ``levels_dirty`` tells
+  :meth:`Game.render` to forward them.
 
   Args:
-      n: Number of lasers (default 14).
+      n: Number of lasers (default ``config.N_PORTS``).
   """
-  def __init__(self, n=14):
+  def __init__(self, n=None):
+    n = config.N_PORTS if n is None else n
     self.n = n
-    self.lasers = [LaserPort(i) for i in range(self.n)]
+    self.max_level = (1 << config.BAM_BITS) - 1
     self.word = 0
-    self.clean = True
+    self._levels = [self.max_level] * n
+    self.fades = {}  # laser_id -> [from_level, to_level, ms, elapsed_ms]
+    self.levels_dirty = False
 
   def turn_on(self, laser_id):
     """Convenience: turn a single laser on by id."""
-    self.set_value(laser_id, 1)
+    self.word |= 1 << laser_id
 
   def turn_off(self, laser_id):
     """Convenience: turn a single laser off by id."""
-    self.set_value(laser_id, 0)
+    self.word &= ~(1 << laser_id)
 
   def set_value(self, laser_id, value):
     """Set a single laser on (1) or off (0) by its id."""
-    self.clean = False
-    if value == 1:
-      self.lasers[laser_id]._turn_on()
-    elif value == 0:
-      self.lasers[laser_id]._turn_off()
+    if value:
+      self.word |= 1 << laser_id
+    else:
+      self.word &= ~(1 << laser_id)
+
+  def set_mask(self, mask):
+    """Turn on every laser whose bit is set in ``mask``."""
+    self.word |= mask
+
+  def clear_mask(self, mask):
+    """Turn off every laser whose bit is set in ``mask``."""
+    self.word &= ~mask
+
+  def toggle_mask(self, mask):
+    """Flip every laser whose bit is set in ``mask``."""
+    self.word ^= mask
+
+  def apply(self, on_mask, off_mask):
+    """Turn ``off_mask`` off and ``on_mask`` on in one step (on wins where both are set)."""
+    self.word = (self.word & ~off_mask) | on_mask
+
+  def is_on(self, laser_id):
+    """Whether laser ``laser_id`` is on."""
+    return self.word >> laser_id & 1 == 1
 
   def set_word(self, word):
-    """Set the entire laser word directly (bypasses per-laser objects)."""
+    """Set the entire laser word directly."""
     self.word = word
-    self.clean = True
 
   def to_word(self):
-    """Return the current 16-bit laser word, using the cache when unchanged."""
-    if self.clean:
-      return self.word
-    self.word = sum(self.lasers[i].on << i for i in range(self.n))
-    self.clean = True
+    """Return the current laser word."""
     return self.word
 
+  def set_level(self, laser_id, level):
+    """Set one laser's brightness (``0 .. max_level``), cancelling any fade on it."""
+    self.fades.pop(laser_id, None)
+    self._put_level(laser_id, level)
+
+  def set_levels(self, level):
+    """Set every laser to the same brightness, cancelling all fades."""
+    self.fades.clear()
+    for laser_id in range(self.n):
+      self._put_level(laser_id, level)
+
+  def level(self, laser_id):
+    """One laser's current brightness level."""
+    return self._levels[laser_id]
+
+  def levels(self):
+    """Every laser's brightness level, by id."""
+    return list(self._levels)
+
+  def fade(self, laser_id, level, ms):
+    """Ramp one laser's brightness linearly from its current level to ``level`` over ``ms``."""
+    if ms <= 0:
+      return self.set_level(laser_id, level)
+    self.fades[laser_id] = [self._levels[laser_id], level, ms, 0.0]
+
+  def step_fades(self, dt):
+    """Advance every running fade by ``dt`` ms (called once a frame by :class:`Game`)."""
+    for laser_id, fade in list(self.fades.items()):
+      start, end, ms, elapsed = fade
+      elapsed = fade[3] = min(ms, elapsed + dt)
+      self._put_level(laser_id, round(start + (end - start) * elapsed / ms))
+      if elapsed >= ms:
+        del self.fades[laser_id]
+
+  def _put_level(self, laser_id, level):
+    level = max(0, min(self.max_level, int(level)))
+    if self._levels[laser_id] != level:
+      self._levels[laser_id] = level
+      self.levels_dirty = True
+
 class Game:
   """Top-level object: owns the subsystems and runs the main loop.
 
@@ -147,25 +311,46 @@ class Game:
       SIPOreg: Output shift register (or dummy) with ``push_word()``.
       mixer: A :class:`~src.audio_utils.Mixer`.
       events: The global event loop singleton.
+      recorder: Optional :class:`~src.flight_recorder.FlightRecorder` (or a
+          replay's stand-in) told about every frame, raw input change, output
+          push and program switch.
+      debouncer: Optional :class:`~src.io_managers.Debouncer` for the inputs
+          (default: built from the ``config.DEBOUNCE_*`` holds).
 
   On construction it boots into GameSelect, unless launched with ``-p
   [Program]`` (which launches that single program directly).
   """
-  def __init__(self, PISOreg, SIPOreg, mixer, events):
+  def __init__(self, PISOreg, SIPOreg, mixer, events, recorder=None, debouncer=None):
     self.FPS = config.FPS
+    State.set_shape(config.N_PORTS, config.N_TOGGLES)  # a no-op unless the config changed
     # Monotonic game-loop time in ms since the loop started: the sum of every
     # frame's real dt. The single timeline programs read (via ``self.now_ms``)
     # to set and check deadlines -- immune to wall-clock jumps by construction.
     self.now_ms = 0.0
-    self.input_manager = InputManager(register=PISOreg)
+    # clock.monotonic_ns() at the start of the current frame, i.e. the instant
+    # ``now_ms`` stands for; maps event/output timestamps onto that timeline.
+    self.frame_t_ns = clock.monotonic_ns()
+    self.input_manager = InputManager(register=PISOreg, debouncer=debouncer)
     self.outputs = OutputManager(register=SIPOreg)
-    self.lasers = LaserBay(14) # users interact with this to drive laser output
+    # Flight recorder (None = off): attached before the boot program starts so
+    # the recording opens on a program switch.
+    self.recorder = recorder
+    self.input_manager.recorder = recorder
+    self.outputs.recorder = recorder
+    self.lasers = LaserBay(config.N_PORTS) # users interact with this to drive laser output
+    # Layers (animations, program overlays) blended over ``lasers`` at render.
+    self.compositor = Compositor()
     self.mixer = mixer
     # OS-level master volume: restore the persisted level at boot. GameSelect
     # drives this via buttons 10/11; a no-op under the simulator.
     self.volume = VolumeController()
     self.volume.apply()
     self.events = events # event loop reference (redundant as it is global singleton imported in this module)
+    # Per-phase frame profiler: None (zero work) unless config.PROFILE_FRAMES.
+    self.profiler = FrameProfiler(1000 / self.FPS) if config.PROFILE_FRAMES else None
+    # Adaptive pacing (see :meth:`frames_until_wake`): stay at full rate until
+    # this ``now_ms`` (pushed out by IDLE_AFTER_MS on every input edge).
+    self.busy_until_ms = 0.0
     Animation.game = self # hack to get game reference from animation instances (todo: make cleaner reference link)
     self.state_machine = StateMachine(self)
     if '-p' in sys.argv:
@@ -179,21 +364,95 @@ class Game:
     # advance the monotonic game-loop clock by this frame's elapsed time first,
     # so every deadline set or checked this frame sees a consistent ``now_ms``.
     self.now_ms += dt
+    self.frame_t_ns = clock.monotonic_ns()
+    if self.recorder is not None:
+      self.recorder.frame(self.frame_t_ns, dt)
+    prof = self.profiler
+    if prof is not None: prof.begin()
     # read input
     self.input_manager.poll()
-    changed_state = self.input_manager.changed_state
+    if prof is not None: prof.lap('poll')
 
     # play any ongoing animations
     Animation.update_all(dt)
+    if self.lasers.fades:
+      self.lasers.step_fades(dt)
+    self.mixer.update(dt)  # music ducks and fades, sound ends
+    if prof is not None: prof.lap('animations')
 
     # update currently running program
     self.state_machine.update(dt)
+    if prof is not None: prof.lap('program')
+
+  def next_deadline_ms(self):
+    """The earliest ``now_ms`` at which a frame has work to do.
+
+    Combines the next animation frame boundary and the mixer's next expected
+    sound end (:meth:`Mixer.next_deadline_ms`) with the active program's own
+    deadlines (:meth:`Program.next_deadline_ms`). Returns ``None`` when nothing
+    at all is pending, and ``now_ms`` when every frame matters.
+    """
+    deadline = self.state_machine.program.next_deadline_ms()
+    for pending in (Animation.next_deadline_ms(self.now_ms), self.mixer.next_deadline_ms(self.now_ms)):
+      if pending is not None and (deadline is None or pending < deadline):
+        deadline = pending
+    return deadline
+
+  def frames_until_wake(self):
+    """How many frame slots the next :meth:`GameClock.tick` may sleep through.
+
+    ``1`` (full rate) unless ``config.ADAPTIVE_PACING`` is on and the loop is
+    idle. Any input edge (or a raw change still being debounced) keeps it at
+    full rate for ``config.IDLE_AFTER_MS``.
+    Otherwise the loop wakes on the first frame strictly after the next
+    deadline -- the very frame that would have seen it at full rate, since
+    deadlines fire on ``now_ms > deadline`` -- but at least ``IDLE_POLL_HZ``
+    times a second so input is still polled.
+    """
+    if not config.ADAPTIVE_PACING:
+      return 1
+    if self.input_manager.changed_state or self.input_manager.settling:
+      self.busy_until_ms = self.now_ms + config.IDLE_AFTER_MS
+    if self.now_ms < self.busy_until_ms:
+      return 1
+    max_frames = max(1, self.FPS // config.IDLE_POLL_HZ)
+    deadline = self.next_deadline_ms()
+    if deadline is None:
+      return max_frames
+    frame_ms = 1000.0 / self.FPS
+    frames = int((deadline - self.now_ms) // frame_ms) + 1
+    return max(1, min(frames, max_frames))
+
+  def laser_word(self):
+    """The word the lasers show: the program's bay with every layer over it."""
+    return self.compositor.compose(self.lasers.to_word())
 
   def render(self):
-    """Push the current laser word to the output register."""
+    """Push the current laser word to the output register.
+
+    The word is composed once here, as in :meth:`laser_word`. With an output
+    scheduler, also hand it the program's upcoming words up to its lead time,
+    each under the current layers, mapped from ``now_ms`` onto monotonic ns
+    via ``frame_t_ns`` (the frame's word applies from ``frame_t_ns`` too).
+    """
     # push output
-    laser_state_word = self.lasers.to_word()
-    self.outputs.push_word(laser_state_word)
+    if self.lasers.levels_dirty:
+      self.outputs.set_levels(self.lasers.levels())
+      self.lasers.levels_dirty = False
+    compositor = self.compositor
+    laser_state_word = compositor.compose(self.lasers.to_word())
+    if self.outputs.scheduled:
+      t0_ns, now_ms = self.frame_t_ns, self.now_ms
+      ahead = self.state_machine.program.upcoming_words(now_ms + self.outputs.register.lead_ms)
+      self.outputs.push_word(laser_state_word, t0_ns,
+                             [(t0_ns + int((at_ms - now_ms) * 1_000_000), compositor.compose(word))
+                              for at_ms, word in ahead])
+    else:
+      self.outputs.push_word(laser_state_word)
+    prof = self.profiler
+    if prof is not None:
+      prof.lap('push')
+      prof.end_frame(self.now_ms)
 
   def run(self):
     """Run the main loop until a stop signal, KeyboardInterrupt, or an error.
@@ -203,39 +462,59 @@ class Game:
     promptly. That is what lets ``systemctl stop`` shut the box down in well
     under a second instead of waiting out systemd's kill timeout. Whatever the
     exit path, the ``finally`` clears the lasers and releases GPIO/pygame.
+
+    Every frame's ``dt`` feeds ``self.frame_stats`` (fixed memory); its report
+    (and the sound cache's) is printed on exit and on ``SIGUSR1`` while
+    running. With adaptive pacing a tick may cover several frame slots (see
+    :meth:`frames_until_wake`).
     """
     self._running = True
     self.t_game_start = clock.monotonic()
     self.clock = GameClock(self.FPS)
+    self.frame_stats = FrameStats(self.clock)
     self._install_signal_handlers()
     self.lasers.set_word(0)  # begin with every laser off
     self.render()
-    dts = []
     dt = 1000/self.FPS
     try:
         while self._running:
           self.update(dt)
           self.render()
-          dt = self.clock.tick()
-          dts.append(dt)
+          frames = self.frames_until_wake()
+          dt = self.clock.tick(frames)
+          self.frame_stats.record(dt, frames * self.frame_stats.target_ms)
     except KeyboardInterrupt:
         print('goodbye.')
     finally:
-        if dts:
-          print('avg dt:', sum(dts)/len(dts))
+        self.print_frame_stats()
         self.cleanup()
 
+  def print_frame_stats(self):
+    """Print the frame-timing report, plus the profiler's when it is on.
+
+    The mixer's sound-cache report follows it.
+    """
+    stats = getattr(self, 'frame_stats', None)
+    if stats is not None and stats.frames:
+        print('frame stats:', stats.report())
+    print('sound cache:', self.mixer.effects.report())
+    if self.profiler is not None and self.profiler.frame.count:
+        print(self.profiler.report())
+
   def _install_signal_handlers(self):
     """Stop the loop cleanly on SIGTERM/SIGINT (e.g. ``systemctl stop``).
 
     Installed from :meth:`run` (after pygame init) so it overrides any signal
     handler SDL set up -- otherwise SIGTERM is swallowed and shutdown stalls.
+    ``SIGUSR1`` prints the frame-timing report without stopping anything.
     """
     def _handle(signum, _frame):
         print(f'received signal {signum}; shutting down.')
         self._running = False
     for sig in (signal.SIGINT, signal.SIGTERM):
         signal.signal(sig, _handle)
+    if hasattr(signal, 'SIGUSR1'):
+        signal.signal(signal.SIGUSR1, lambda _signum, _frame: self.print_frame_stats())
 
   def cleanup(self):
     """Turn off the lasers, silence audio, and release GPIO + pygame.
@@ -247,14 +526,32 @@ class Game:
         return
     self._cleaned_up = True
     self._running = False
+    if self.recorder is not None:
+      # Close the recording before the laser-off push: a replay never runs
+      # cleanup, so that push must not be logged as an expected output.
+      self.input_manager.recorder = self.outputs.recorder = None
+      try:
+        self.recorder.close()
+      except Exception as e:
+        print('flight recorder close failed:', e)
     try:
         self.outputs.push_word(0)  # physically clear all lasers
     except Exception as e:
         print('laser-off on shutdown failed:', e)
     try:
         self.mixer.stop_all()
+        self.mixer.loader.shutdown()
     except Exception as e:
         print('audio stop on shutdown failed:', e)
+    stop_input = getattr(self.input_manager.register, 'stop', None)
+    if stop_input is not None:
+        stop_input()  # threaded input backend: stop bit-banging before GPIO.cleanup
+    register = self.outputs.register
+    while register is not None:  # output scheduler / BAM engine threads, outermost first
+        stop_output = getattr(register, 'stop', None)
+        if stop_output is not None:
+            stop_output()  # lasers already cleared above
+        register = getattr(register, 'register', None)
     if sys.platform == 'linux' and '-s' not in sys.argv:
         GPIO.cleanup()
     pygame.quit()
@@ -0,0 +1,158 @@
+"""Direct, memory-mapped access to the Pi's GPIO registers.
+
+``RPi.GPIO`` costs a Python-level call per pin edge: about 50 of them for every
+16-bit word the shift-register drivers move, which on the Pi Zero's single
+ARMv6 core is the largest fixed cost of a frame. :class:`GpioMem` instead maps
+the BCM283x GPIO register block through ``/dev/gpiomem`` (no root needed) and
+exposes it as ``regs``, a ``memoryview`` of 32-bit registers. A pin edge is
+then one store into ``regs``: ``regs[GPSET0] = mask`` drives the pins in
+``mask`` high, ``regs[GPCLR0] = mask`` drives them low, and ``regs[GPLEV0]``
+reads every pin's level at once. The drivers built on it are
+:class:`~src.shift_register.MmapOutputShiftRegister` and
+:class:`~src.shift_register.MmapInputShiftRegister`
+(``config.REGISTER_BACKEND = "mmap"``).
+
+:class:`FakeGpioMem` maps an ordinary file instead and puts a
+:class:`~src.fake_gpio.FakeGPIO` board behind the set/clear/level registers,
+so the same driver code can be run, and its bit sequence checked, off the Pi.
+"""
+import mmap
+import os
+import tempfile
+from .fake_gpio import FakeGPIO
+
+GPIOMEM = '/dev/gpiomem'
+PAGE_SIZE = 4096
+
+# BCM283x GPIO register offsets, in 32-bit words (BCM2835 peripherals, ch. 6).
+GPFSEL0 = 0x00 // 4   # function select: 3 bits per pin, 10 pins per register
+GPSET0 = 0x1C // 4    # write 1s: drive those pins (0..31) high
+GPCLR0 = 0x28 // 4    # write 1s: drive those pins low
+GPLEV0 = 0x34 // 4    # read: current level of pins 0..31
+
+FSEL_INPUT = 0b000
+FSEL_OUTPUT = 0b001
+
+
+class GpioMem:
+    """The GPIO register block, mmapped.
+
+    Args:
+        path: Device (or file) to map; ``/dev/gpiomem`` on the Pi.
+        size: Bytes to map (one page covers the whole block).
+
+    Attributes:
+        regs (memoryview): The block as unsigned 32-bit registers.
+    """
+    def __init__(self, path=GPIOMEM, size=PAGE_SIZE):
+        fd = os.open(path, os.O_RDWR | os.O_SYNC)
+        try:
+            self.mem = mmap.mmap(fd, size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        finally:
+            os.close(fd)
+        self.regs = memoryview(self.mem).cast('I')
+
+    def set_function(self, pin, function):
+        """Set ``pin``'s function bits (``FSEL_INPUT`` / ``FSEL_OUTPUT``)."""
+        reg, shift = GPFSEL0 + pin // 10, (pin % 10) * 3
+        self.regs[reg] = (self.regs[reg] & ~(0b111 << shift)) | (function << shift)
+
+    def setup_output(self, pin, level=0):
+        """Make ``pin`` an output driven to ``level``."""
+        self.regs[GPSET0 if level else GPCLR0] = 1 << pin
+        self.set_function(pin, FSEL_OUTPUT)
+
+    def setup_input(self, pin):
+        """Make ``pin`` an input."""
+        self.set_function(pin, FSEL_INPUT)
+
+    def close(self):
+        """Unmap the block (the drivers must not be used afterwards)."""
+        self.regs.release()
+        self.mem.close()
+
+
+class _WatchedRegisters:
+    """Register view for :class:`FakeGpioMem`: a real page plus a simulated board.
+
+    Stores land in the mapped page as usual. Stores to ``GPSET0`` / ``GPCLR0``
+    are also applied to the board as pin edges and logged, and loads of
+    ``GPLEV0`` are refreshed from the board first.
+    """
+    def __init__(self, page, board, writes):
+        self.page = page
+        self.board = board
+        self.writes = writes
+
+    def __getitem__(self, i):
+        if i == GPLEV0:
+            self.page[i] = self._levels()
+        return self.page[i]
+
+    def __setitem__(self, i, value):
+        self.page[i] = value
+        if i == GPSET0 or i == GPCLR0:
+            self.writes.append((i, value))
+            level = 1 if i == GPSET0 else 0
+            while value:
+                low = value & -value
+                self.board.output(low.bit_length() - 1, level)
+                value ^= low
+
+    def _levels(self):
+        board = self.board
+        word = 0
+        for pin, level in board.levels.items():
+            if level and pin < 32:
+                word |= 1 << pin
+        if board.piso is not None:
+            qh = board.piso[2]
+            word = (word & ~(1 << qh)) | (board.input(qh) << qh)
+        return word
+
+
+class FakeGpioMem(GpioMem):
+    """A :class:`GpioMem` over a plain file, with the board simulated behind it.
+
+    The page is a real ``mmap`` of a zero-filled file, so register stores and
+    function-select bits land in memory just as on the Pi. ``regs`` routes the
+    set/clear/level registers through a :class:`~src.fake_gpio.FakeGPIO`,
+    whose 165/595 models turn the edges into words (``board.latched``,
+    ``board.inputs``).
+
+    Args:
+        board: The simulated board (default: a fresh ``FakeGPIO()``).
+        path: File to map (default: a new temporary file, removed on close).
+
+    Attributes:
+        writes (list): Every ``(GPSET0 | GPCLR0, mask)`` store, in order.
+    """
+    def __init__(self, board=None, path=None):
+        self._tmp = None
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix='gpiomem-')
+            os.close(fd)
+            self._tmp = path
+        if os.path.getsize(path) < PAGE_SIZE:
+            with open(path, 'r+b') as f:
+                f.truncate(PAGE_SIZE)
+        super().__init__(path)
+        self.page = self.regs
+        self.board = board if board is not None else FakeGPIO()
+        self.writes = []
+        self.regs = _WatchedRegisters(self.page, self.board, self.writes)
+
+    def function(self, pin):
+        """The function bits currently selected for ``pin``."""
+        return (self.page[GPFSEL0 + pin // 10] >> ((pin % 10) * 3)) & 0b111
+
+    def set_function(self, pin, function):
+        reg, shift = GPFSEL0 + pin // 10, (pin % 10) * 3
+        self.page[reg] = (self.page[reg] & ~(0b111 << shift)) | (function << shift)
+
+    def close(self):
+        self.page.release()
+        self.mem.close()
+        if self._tmp is not None:
+            os.remove(self._tmp)
+            self._tmp = None
@@ -0,0 +1,119 @@
+"""Threaded input backend: samples the input register off the game loop.
+
+Polled once per frame, a press can wait up to a whole frame (10 ms at 100 FPS)
+before it is seen, and its time is only known to frame resolution.
+:class:`InputSampler` wraps any register with ``read_word()`` (normally the
+74HC165 :class:`~src.shift_register.InputShiftRegister`). It reads the register
+on its own daemon thread at ``config.INPUT_SAMPLE_HZ`` and queues every change
+as a ``(t_ns, word)`` pair stamped with :func:`src.clock.monotonic_ns`.
+:class:`~src.io_managers.InputManager` drains that queue each frame instead of
+reading the register, and turns each change into events in order.
+
+Edge wake: the 74HC165 has no interrupt output. If the board has an extra
+line that changes on any press (``config.INPUT_EDGE_PIN``), the thread also
+wakes on that GPIO edge, so it can sample at a relaxed rate and still catch
+presses immediately.
+
+The queue is a bounded ``collections.deque``. ``append`` and ``popleft`` are
+atomic in CPython, so no lock is needed. Each entry carries the whole word, so
+if the game ever stalls long enough to overflow it, only intermediate
+transitions are lost; the latest state always survives.
+
+Select it with ``config.INPUT_BACKEND = "thread"`` (see ``src/__main__.py``).
+"""
+import threading
+from collections import deque
+from . import clock
+from .config import config
+
+
+class InputSampler:
+    """Samples ``register`` on a background thread and queues timestamped changes.
+
+    Drop-in for the register it wraps: :meth:`read_word` returns the latest
+    sampled word, and :meth:`drain` hands the queued changes to the
+    :class:`~src.io_managers.InputManager`.
+
+    Args:
+        register: Object with ``read_word()`` (bit-banged on the sampler thread
+            only, once started).
+        rate_hz: Sampling rate of the thread.
+        edge_pin: Optional BCM pin that changes on any input change; the thread
+            wakes on its edges as well as on the sampling period.
+        gpio: GPIO module used for ``edge_pin`` (default: the register's).
+
+    Class Attributes:
+        QUEUE_SIZE (int): Maximum queued changes before the oldest are dropped.
+    """
+    QUEUE_SIZE = 256
+
+    def __init__(self, register, rate_hz=None, edge_pin=None, gpio=None):
+        self.register = register
+        self.rate_hz = rate_hz or config.INPUT_SAMPLE_HZ
+        self.period = 1.0 / self.rate_hz
+        self.changes = deque(maxlen=self.QUEUE_SIZE)
+        self.word = register.read_word()
+        self.t_ns = clock.monotonic_ns()
+        self.samples = 0
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self.edge_pin = edge_pin
+        if edge_pin is not None:
+            gpio = gpio if gpio is not None else register.GPIO
+            gpio.setup(edge_pin, gpio.IN)
+            gpio.add_event_detect(edge_pin, gpio.BOTH, callback=self._on_edge)
+
+    def start(self):
+        """Start the sampler thread. Returns ``self`` for chaining."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='input-sampler', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=0.5):
+        """Stop the sampler thread (idempotent)."""
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    @property
+    def running(self):
+        """True while the sampler thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def _on_edge(self, channel):
+        self._wake.set()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self.sample()
+            self._wake.wait(self.period)
+            self._wake.clear()
+
+    def sample(self):
+        """Read the register once; queue ``(t_ns, word)`` if it changed.
+
+        Called by the thread; tests call it directly for deterministic timing.
+        """
+        t_ns = clock.monotonic_ns()  # the 165 latches its inputs at the start of the read
+        word = self.register.read_word()
+        self.samples += 1
+        if word != self.word:
+            self.word = word
+            self.t_ns = t_ns
+            self.changes.append((t_ns, word))
+
+    def drain(self):
+        """Remove and return every queued change, oldest first."""
+        changes = self.changes
+        out = []
+        while changes:
+            out.append(changes.popleft())
+        return out
+
+    def read_word(self):
+        """The most recently sampled word (register-compatible)."""
+        return self.word
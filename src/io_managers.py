@@ -1,60 +1,204 @@
 """Input/output managers that sit between the shift registers and the game.
 
-:class:`InputManager` polls the input register each frame, diffs against the
-previous read, and turns bit changes into events on the global event queue.
+:class:`InputManager` polls the input register each frame (or drains the
+timestamped change queue of a threaded :class:`~src.input_sampler.InputSampler`),
+debounces the raw word (:class:`Debouncer`), and turns bit changes into events
+on the global event queue. Every event carries ``t_ns``, the monotonic-ns time
+the input changed.
 :class:`OutputManager` pushes the laser word to the output register, skipping
-the write when the word is unchanged.
+the write when the word is unchanged (or hands an
+:class:`~src.output_scheduler.OutputScheduler` the frame's plan), and keeps a
+short timestamped history of pushed words so a press can be judged against
+what the lasers showed at the instant it happened (:meth:`OutputManager.shown_at`).
 """
 from collections import deque
+from . import clock
 from .event_loop import *
 from .programs import State, StateSequence
 from .config import config
+from . import ports
+
+def _hold_ns(default_ms, by_bit):
+  """Per-bit hold times in ns from a default and ``{bit: ms}`` overrides."""
+  return [int(by_bit.get(bit, default_ms) * 1_000_000) for bit in range(ports.input_bits())]
+
+
+class Debouncer:
+  """Time-based debounce of every input bit, driven by word-wide bit masks.
+
+  A raw bit that differs from the debounced (``stable``) word is accepted once
+  it has held its new level for that bit's press or release hold time; any
+  change of the raw bit in between restarts its wait. Bits with a zero hold
+  are accepted in the same sample, by mask, and a sample in which nothing is
+  changing or settling costs two word operations, at any word width. Per-bit
+  timestamps are only touched for bits whose raw level actually changed.
+
+  Holds are measured in real time (``t_ns``), not in samples, so they mean the
+  same at the per-frame poll rate, under adaptive pacing, and at the sampler
+  thread's 1 kHz. Raw bits above the word (the unused inputs of the last
+  chip in the chain) are masked off.
+
+  Args:
+      press_ns: Per-bit hold times (ns) before a 0 -> 1 change is accepted,
+          one per input bit; the list's length sets the word width.
+      release_ns: Per-bit hold times (ns) before a 1 -> 0 change is accepted.
+      word: Initial raw and stable word.
+
+  Attributes:
+      stable (int): The debounced word.
+      raw (int): The last raw word fed in.
+      unsettled (int): Mask of bits whose raw level is still waiting out a hold.
+      mask (int): The bits of the word.
+  """
+  def __init__(self, press_ns, release_ns, word=0):
+    self.press_ns = list(press_ns)
+    self.release_ns = list(release_ns)
+    n_bits = len(self.press_ns)
+    self.mask = (1 << n_bits) - 1
+    self.instant_press = sum(1 << b for b in range(n_bits) if self.press_ns[b] <= 0)
+    self.instant_release = sum(1 << b for b in range(n_bits) if self.release_ns[b] <= 0)
+    self.stable = word
+    self.raw = word
+    self.unsettled = 0
+    self.since_ns = [0] * n_bits
+
+  @classmethod
+  def from_config(cls, word=0):
+    """A debouncer with the ``config.DEBOUNCE_*`` hold times."""
+    return cls(_hold_ns(config.DEBOUNCE_PRESS_MS, config.DEBOUNCE_PRESS_MS_BY_BIT),
+               _hold_ns(config.DEBOUNCE_RELEASE_MS, config.DEBOUNCE_RELEASE_MS_BY_BIT),
+               word)
+
+  def feed(self, raw, t_ns):
+    """Feed one raw sample taken at ``t_ns``.
+
+    Returns:
+        ``(stable, changed_ns)`` if the debounced word changed, where
+        ``changed_ns`` is when the accepted raw change happened (the earliest,
+        if several bits were accepted at once); otherwise None.
+    """
+    raw &= self.mask
+    changed = raw ^ self.raw
+    if changed:
+      self.raw = raw
+      since = self.since_ns
+      while changed:
+        low = changed & -changed
+        since[low.bit_length() - 1] = t_ns
+        changed ^= low
+    unsettled = raw ^ self.stable
+    if not unsettled:
+      self.unsettled = 0
+      return None
+    accept = (unsettled & raw & self.instant_press) | (unsettled & ~raw & self.instant_release)
+    changed_ns = t_ns if accept else None
+    waiting = unsettled & ~accept
+    while waiting:  # only bits still inside a non-zero hold
+      low = waiting & -waiting
+      waiting ^= low
+      bit = low.bit_length() - 1
+      since = self.since_ns[bit]
+      hold = self.press_ns[bit] if raw & low else self.release_ns[bit]
+      if t_ns - since >= hold:
+        accept |= low
+        if changed_ns is None or since < changed_ns:
+          changed_ns = since
+    self.unsettled = unsettled & ~accept
+    if not accept:
+      return None
+    self.stable ^= accept
+    return self.stable, changed_ns
+
 
 class InputManager:
   """Polls the input register and emits button/toggle events on change.
 
-  Each :meth:`poll` reads a fresh :class:`~src.programs.base.State`, sets
-  ``changed_state``, records history, and (on change) emits ButtonDown/Up and
-  ToggleOn/Off events.
+  Each :meth:`poll` reads the raw word and feeds it through a
+  :class:`Debouncer`. When the debounced :class:`~src.programs.base.State`
+  changes, it sets ``changed_state``, records history, and emits ButtonDown/Up
+  and ToggleOn/Off events. Bounces inside a hold time never become events.
+
+  If the register also has ``drain()`` (an
+  :class:`~src.input_sampler.InputSampler`), :meth:`poll` consumes its queued
+  ``(t_ns, word)`` changes instead of reading, applying each one in order, so a
+  press and release inside one frame both reach the queue. If it has
+  ``read_stamped()`` (a :class:`~src.shift_register.DuplexShiftRegister`), the
+  word comes with the time it was actually sampled. Either way, every event
+  carries the time of the (raw) change as ``t_ns``.
 
   Args:
       register: An object with a ``read_word()`` method (the real
-          :class:`~src.shift_register.InputShiftRegister` or a dummy).
+          :class:`~src.shift_register.InputShiftRegister` or a dummy), and
+          optionally ``drain()`` or ``read_stamped()``.
+      debouncer: A :class:`Debouncer` (default: built from ``config``).
   """
   HISTORY_SIZE = 100
 
-  def __init__(self, register: 'InputShiftRegister'):
+  def __init__(self, register: 'InputShiftRegister', debouncer=None):
     self.register = register
     self.history = deque(maxlen=self.HISTORY_SIZE)
     self.state = State(0)
     self.prev_state = State(0)
     self.changed_state = False
+    self.debouncer = debouncer if debouncer is not None else Debouncer.from_config()
+    self.recorder = None  # set by Game: logs raw word changes
+    self._drain = getattr(register, 'drain', None)
+    self._read_stamped = getattr(register, 'read_stamped', None)
+
+  @property
+  def settling(self):
+    """True while some input bit is waiting out its debounce hold."""
+    return bool(self.debouncer.unsettled)
 
   def poll(self):
-    """Read the register; if the state changed, record it and emit events."""
-    self.state = State(self.register.read_word())
+    """Read the register, debounce it, and emit events for accepted changes."""
+    self.changed_state = False
+    if self._drain is not None:
+      return self._consume(self._drain())
+    if self._read_stamped is not None:  # sampled earlier, e.g. by a duplex exchange
+      t_ns, word = self._read_stamped()
+      return self._sample(word, t_ns)
+    t_ns = clock.monotonic_ns()  # the 165 latches its inputs at the start of the read
+    self._sample(self.register.read_word(), t_ns)
+
+  def _consume(self, changes):
+    """Apply a sampler's queued ``(t_ns, word)`` changes in order."""
+    for t_ns, word in changes:
+      self._sample(word, t_ns)
+    if self.debouncer.unsettled:  # no new samples, but a hold may have run out
+      self._sample(self.debouncer.raw, clock.monotonic_ns())
+
+  def _sample(self, word, t_ns):
+    """Debounce one raw sample; on an accepted change, record it and emit events."""
+    if self.recorder is not None and word != self.debouncer.raw:
+      self.recorder.input(t_ns, word)
+    accepted = self.debouncer.feed(word, t_ns)
+    if accepted is None:
+      return
+    stable, t_ns = accepted
+    self.state = State(stable)
     if self.state == self.prev_state:
-      self.changed_state = False
       return
 
     # state has changed, process new input...
     self.changed_state = True
     self.history.append(self.state)
-    self.generate_events()
+    self.generate_events(t_ns)
 
     # process system wide triggers...TODO
     # process program specific triggers...TODO
 
     self.prev_state = self.state
 
-  def generate_events(self):
+  def generate_events(self, t_ns=None):
       """Diff against the previous state and emit one event per changed bit.
 
       Computes the bits that flipped on/off since the last poll and pushes a
       :class:`~src.event_loop.ButtonDownEvent` /
       :class:`~src.event_loop.ButtonUpEvent` /
       :class:`~src.event_loop.ToggleOnEvent` /
-      :class:`~src.event_loop.ToggleOffEvent` for each, carrying the full state.
+      :class:`~src.event_loop.ToggleOffEvent` for each, carrying the full state
+      and ``t_ns``, the time the change was sampled.
       """
       #events.put(StateChangeEvent(state=self.state))  # todo: should this event be an event ?
 
@@ -67,17 +211,19 @@ class InputManager:
           #print('FLIPPED ON:', self.flipped_on)
           #print('FLIPPED OFF:', self.flipped_off)
 
-      for button_id in self.flipped_on.get_buttons_on():
-          events.put(ButtonDownEvent(key=button_id, state=self.state))
+      if t_ns is None:
+          t_ns = clock.monotonic_ns()
+      for button_id in self.flipped_on.buttons_on:
+          events.put(ButtonDownEvent(key=button_id, state=self.state, t_ns=t_ns))
 
-      for toggle_id in self.flipped_on.get_toggles_on():
-          events.put(ToggleOnEvent(key=toggle_id, state=self.state))
+      for toggle_id in self.flipped_on.toggles_on:
+          events.put(ToggleOnEvent(key=toggle_id, state=self.state, t_ns=t_ns))
 
-      for button_id in self.flipped_off.get_buttons_on():
-          events.put(ButtonUpEvent(key=button_id, state=self.state))
+      for button_id in self.flipped_off.buttons_on:
+          events.put(ButtonUpEvent(key=button_id, state=self.state, t_ns=t_ns))
 
-      for toggle_id in self.flipped_off.get_toggles_on():
-          events.put(ToggleOffEvent(key=toggle_id, state=self.state))
+      for toggle_id in self.flipped_off.toggles_on:
+          events.put(ToggleOffEvent(key=toggle_id, state=self.state, t_ns=t_ns))
 
 
   def get_history_sequence(self, n):
@@ -88,17 +234,51 @@ class InputManager:
 class OutputManager:
   """Pushes the laser word to the output register, de-duplicating writes.
 
+  Each real write is recorded as ``(t_ns, word)`` in ``pushes`` (stamped once
+  the word is latched), so :meth:`shown_at` can say what the lasers showed at
+  any recent instant.
+
+  A :class:`~src.shift_register.DuplexShiftRegister` also reads the inputs on
+  every pass, so it is pushed every frame, changed or not: the render push is
+  then the frame's only register pass, and the next :meth:`InputManager.poll`
+  uses the input word it read.
+
+  An :class:`~src.output_scheduler.OutputScheduler` register (``scheduled``)
+  is handed a plan instead: the frame's word plus the changes already known
+  to be coming, each latched by the scheduler's thread at its own time. Its
+  pushes are collected into ``pushes`` as they are drained. ``prev_word``
+  still de-duplicates the frame words, and only those reach the recorder, so
+  a recording replays the same with or without the scheduler.
+
   Args:
       register: An object with a ``push_word(word)`` method (the real
-          :class:`~src.shift_register.OutputShiftRegister` or a dummy).
+          :class:`~src.shift_register.OutputShiftRegister` or a dummy), or
+          an :class:`~src.output_scheduler.OutputScheduler`.
+
+  Class Attributes:
+      HISTORY_SIZE (int): Pushed words remembered (only *changes* are pushed,
+          so this spans well over a second of even the busiest animation).
   """
+  HISTORY_SIZE = 64
+
   def __init__(self, register: 'OutputShiftRegister'):
     self.register = register
-    self.laser_mask = 2**14 - 1 # first 14 bits for laser state
-    self.extra_mask = 3 << 14 # last 2 bits for extra state
+    self.pushes = deque(maxlen=self.HISTORY_SIZE)
+    self.laser_mask = ports.laser_mask() # first N_PORTS bits for laser state
+    self.extra_mask = ((1 << ports.output_bits()) - 1) & ~self.laser_mask # spare bits above
     self.word = 0x00
     self.prev_word = None
+    self.recorder = None  # set by Game: logs every real write
+    self._duplex = hasattr(register, 'read_stamped')
+    self.scheduled = hasattr(register, 'plan')
+    # a BAM engine, possibly under an OutputScheduler
+    self._set_levels = getattr(register, 'set_levels', None) or \
+        getattr(getattr(register, 'register', None), 'set_levels', None)
+    self._ahead = False  # the last plan had future entries
     self.register.push_word(0)
+    self.pushes.append((clock.monotonic_ns(), 0))
+    if self.scheduled:
+      self.register.drain()  # that push, already recorded
 
   def set_bit(self, index, value): # maybe defunct
     """Set or clear a single output bit on the cached word."""
@@ -111,9 +291,62 @@ class OutputManager:
     """Replace the cached word wholesale."""
     self.word = word
 
-  def push_word(self, word):
-    """Push ``word`` to the register unless it equals the last pushed word."""
+  def push_word(self, word, t_ns=None, ahead=()):
+    """Push ``word`` to the register unless it equals the last pushed word.
+
+    A duplex register is re-pushed anyway (unrecorded), to sample the inputs.
+
+    Args:
+        word: The word to show.
+        t_ns: When ``word`` applies, for a scheduler (default: now).
+        ahead: Later ``(t_ns, word)`` changes, ascending, for a scheduler
+            (ignored by a plain register).
+    """
+    if self.scheduled:
+      return self._plan(word, t_ns, ahead)
     if word == self.prev_word:
+      if self._duplex:
+        self.register.push_word(word)  # same word, but samples the inputs
       return
     self.register.push_word(word)
+    t_ns = clock.monotonic_ns()
+    self.pushes.append((t_ns, word))
     self.prev_word = word
+    if self.recorder is not None:
+      self.recorder.output(t_ns, word)
+
+  def set_levels(self, levels):
+    """Forward per-laser brightness levels to a BAM engine (ignored without one)."""
+    if self._set_levels is not None:
+      self._set_levels(levels)
+
+  def _plan(self, word, t_ns, ahead):
+    """Hand the scheduler ``word`` (shown from ``t_ns``) and the ``ahead`` changes."""
+    if word == self.prev_word and not ahead and not self._ahead:
+      return  # nothing new, and no earlier plan left to replace
+    self._ahead = bool(ahead)
+    if t_ns is None:
+      t_ns = clock.monotonic_ns()
+    self.register.plan([(t_ns, word), *ahead])
+    self._collect()
+    if word != self.prev_word:
+      self.prev_word = word
+      if self.recorder is not None:
+        self.recorder.output(t_ns, word)
+
+  def _collect(self):
+    """Move the scheduler's pushes so far into ``pushes``."""
+    self.pushes.extend(self.register.drain())
+
+  def shown_at(self, t_ns):
+    """What the lasers showed at ``t_ns``, as ``(since_ns, word)``.
+
+    ``since_ns`` is when that word was latched. Returns None if ``t_ns`` is
+    older than the remembered history.
+    """
+    if self.scheduled:
+      self._collect()
+    for entry in reversed(self.pushes):
+      if entry[0] <= t_ns:
+        return entry
+    return None
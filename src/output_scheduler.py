@@ -0,0 +1,138 @@
+"""Threaded output backend: pushes timestamped laser words at their exact times.
+
+Pushed once per frame, a laser change lands wherever the frame happens to
+fall, so a blink is only as even as the loop's frame timing: a slow program
+update shows up as a long flash. :class:`OutputScheduler` wraps the output
+register (normally the 74HC595
+:class:`~src.shift_register.OutputShiftRegister`) and owns it on a daemon
+thread. Each frame, :class:`~src.io_managers.OutputManager` hands it a *plan*:
+the frame's word plus the ``(t_ns, word)`` changes the program already knows
+are coming (:meth:`Program.upcoming_words
+<src.programs.base.Program.upcoming_words>`), up to ``config.OUTPUT_LEAD_MS``
+ahead. The thread sleeps until the next entry is due and latches it then,
+whatever the game loop is doing.
+
+Each plan replaces the previous one, so the newest program state always wins.
+When several entries are due at once (the thread was late, or a plan arrives
+with entries already in the past), only the newest is latched. A word equal
+to the one already latched is never pushed again. Every real push is logged
+as ``(t_ns, word)``, stamped once latched, for the ``OutputManager`` to drain.
+
+Select it with ``config.OUTPUT_SCHEDULER = True`` (see ``src/__main__.py``).
+"""
+import threading
+from collections import deque
+from . import clock
+from .config import config
+
+
+class OutputScheduler:
+    """Latches planned ``(t_ns, word)`` entries onto ``register`` on a background thread.
+
+    Drop-in for the register it wraps: :meth:`push_word` latches a word now.
+    :meth:`plan` queues future words and :meth:`drain` hands the real pushes
+    to the :class:`~src.io_managers.OutputManager`.
+
+    Args:
+        register: Object with ``push_word(word)`` (bit-banged on the scheduler
+            thread and, for due entries, by the planning thread, always under
+            one lock).
+        lead_ms: How far ahead the game loop plans (default
+            ``config.OUTPUT_LEAD_MS``).
+
+    Class Attributes:
+        HISTORY_SIZE (int): Undrained pushes kept before the oldest are dropped.
+        IDLE_S (float): Longest the thread sleeps with nothing planned.
+    """
+    HISTORY_SIZE = 256
+    IDLE_S = 0.1
+
+    def __init__(self, register, lead_ms=None):
+        self.register = register
+        self.lead_ms = config.OUTPUT_LEAD_MS if lead_ms is None else lead_ms
+        self.pending = []  # [(t_ns, word)], ascending
+        self.word = None
+        self.pushed = deque(maxlen=self.HISTORY_SIZE)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the scheduler thread. Returns ``self`` for chaining."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='output-scheduler', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=0.5):
+        """Stop the scheduler thread (idempotent). Pending entries are dropped."""
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        with self._lock:
+            self.pending = []
+
+    @property
+    def running(self):
+        """True while the scheduler thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            wait_ns = self.run_due()
+            self._wake.wait(self.IDLE_S if wait_ns is None else wait_ns / 1e9)
+            self._wake.clear()
+
+    def plan(self, entries):
+        """Replace the pending words with ``entries`` and latch any already due.
+
+        Args:
+            entries: ``(t_ns, word)`` pairs in ascending time. Entries at or
+                before now are due at once (the newest of them is latched).
+        """
+        with self._lock:
+            self.pending = list(entries)
+        self.run_due()
+        self._wake.set()
+
+    def run_due(self, now_ns=None):
+        """Latch the newest due entry, if it changes the outputs.
+
+        Called by the thread; tests call it directly for deterministic timing.
+
+        Returns:
+            Nanoseconds until the next pending entry is due, or None if none is.
+        """
+        with self._lock:
+            now = clock.monotonic_ns() if now_ns is None else now_ns
+            pending = self.pending
+            due = 0
+            while due < len(pending) and pending[due][0] <= now:
+                due += 1
+            if due:
+                word = pending[due - 1][1]
+                del pending[:due]
+                if word != self.word:
+                    self.register.push_word(word)
+                    self.word = word
+                    self.pushed.append((clock.monotonic_ns(), word))
+            return pending[0][0] - now if pending else None
+
+    def drain(self):
+        """Remove and return every logged push, oldest first."""
+        pushed = self.pushed
+        out = []
+        while pushed:
+            out.append(pushed.popleft())
+        return out
+
+    def push_word(self, word):
+        """Latch ``word`` now, dropping anything pending (register-compatible)."""
+        self.plan([(clock.monotonic_ns(), word)])
+
+    def clear(self):
+        """Set all outputs low."""
+        self.push_word(0)
@@ -0,0 +1,40 @@
+"""Word widths of the cabinet, derived from ``config.N_PORTS`` and friends.
+
+The input word is ``N_PORTS`` buttons with ``N_TOGGLES`` toggle bits above
+them; the output word is ``N_PORTS`` lasers with ``N_SPARE_OUTPUTS`` spare bits
+above them. The 74HC165/74HC595 chains are whole 8-bit chips, so each chain is
+its word rounded up to a multiple of 8; the unused top bits read as 0 and are
+never driven. These are functions rather than constants so a test (or the
+benchmarks) can change the config and build registers of the new width.
+"""
+from .config import config
+
+
+def chain_bits(n_bits):
+    """``n_bits`` rounded up to whole 8-bit register chips."""
+    return -(-n_bits // 8) * 8
+
+
+def input_bits():
+    """Width of the input word: buttons, then toggles."""
+    return config.N_PORTS + config.N_TOGGLES
+
+
+def output_bits():
+    """Width of the output word: lasers, then spare outputs."""
+    return config.N_PORTS + config.N_SPARE_OUTPUTS
+
+
+def input_chain():
+    """Bits in the 74HC165 chain that carries the input word."""
+    return chain_bits(input_bits())
+
+
+def output_chain():
+    """Bits in the 74HC595 chain that carries the output word."""
+    return chain_bits(output_bits())
+
+
+def laser_mask():
+    """Mask of the laser bits of the output word."""
+    return (1 << config.N_PORTS) - 1
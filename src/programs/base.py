@@ -2,8 +2,9 @@
 
 This module is the heart of laserbox's control flow. It defines:
 
-* :class:`State` / :class:`StateSequence` -- value types wrapping the 16-bit
-  input word (14 buttons + 2 toggles) and ordered sequences of them.
+* :class:`State` / :class:`StateSequence` -- value types wrapping the input
+  word (14 buttons + 2 toggles on the original box) and ordered sequences of
+  them.
 * :class:`GestureDetector` -- the non-consuming detector for the global
   GameSelect entry gesture.
 * :class:`StateMachine` -- owns the active :class:`Program` and the current
@@ -19,74 +20,162 @@ guide for the full walkthrough.
 
 __all__ = ['State', 'StateSequence', 'StateMachine', 'Program']
 
-from heapq import heappush, heappop
 from .. import clock
 from ..config import config
 from ..animation import hold_pattern, Animation
 from ..event_loop import events
+from ..timer_wheel import TimerWheel
+from ..coroutines import TaskRunner, Wait
 
 ###########################
 ###    STATE MACHINE    ###
 #                         #
 
 class State:
-  """A snapshot of the 16-bit input word.
+  """A snapshot of the input word.
 
-  The low 14 bits are buttons; the top 2 bits are toggles. Construct from a raw
-  16-bit integer, or from a list of "on" bit indices via :meth:`from_list`.
+  The low ``config.N_PORTS`` bits are buttons (14 on the original box); the
+  ``config.N_TOGGLES`` bits above them are toggles (2). Construct from a raw
+  integer, or from a list of "on" bit indices via :meth:`from_list`.
   Supports the bitwise operators (``|``, ``&``, ``^``, ``<<``, ``>>``) and
   compares equal to any object whose ``int()`` matches its word.
 
+  States are interned: ``State(word)`` for a word within the input width
+  returns the one shared instance for that word (created on first use), so
+  polling and the bitwise operators allocate nothing in steady state. The
+  table is a dict, so a lookup costs the same at 16 bits as at 64; it stops
+  growing at ``INTERN_LIMIT`` words. Treat instances as immutable. Each
+  instance decodes its on-bits once, on first request, and caches them.
+
   Args:
-      word: The raw 16-bit input word (anything convertible with ``int()``).
+      word: The raw input word (anything convertible with ``int()``).
 
   Attributes:
-      word (int): The full 16-bit value.
-      buttons (int): The low 14 bits (button state).
-      toggles (int): The top 2 bits, shifted down to 0..3 (toggle state).
+      word (int): The full value.
+      buttons (int): The button bits.
+      toggles (int): The toggle bits, shifted down to bit 0 (0..3 on the
+          original box).
+      buttons_on (tuple): Cached :meth:`get_buttons_on`, as a tuple.
+      toggles_on (tuple): Cached :meth:`get_toggles_on`, as a tuple.
+
+  Class Attributes:
+      N_BUTTONS (int): Button bits in the word (see :meth:`set_shape`).
+      N_TOGGLES (int): Toggle bits above the buttons.
+      WIDTH (int): ``N_BUTTONS + N_TOGGLES``.
+      INTERN_LIMIT (int): Most distinct words kept interned.
   """
-  def __init__(self, word:int):
-    self.buttons = int(word) & (2**14-1)
-    self.toggles = (int(word) & (3 << 14)) >> 14
-    self.word = int(word)
+  __slots__ = ('word', 'buttons', 'toggles', '_buttons_on', '_toggles_on', '_bits')
+  N_BUTTONS = config.N_PORTS
+  N_TOGGLES = config.N_TOGGLES
+  WIDTH = N_BUTTONS + N_TOGGLES
+  _BUTTON_MASK = (1 << N_BUTTONS) - 1
+  _TOGGLE_MASK = (1 << N_TOGGLES) - 1
+  _LIMIT = 1 << WIDTH
+  INTERN_LIMIT = 1 << 16
+  _interned = {}
+
+  def __new__(cls, word:int):
+    word = int(word)
+    internable = cls is State and 0 <= word < State._LIMIT
+    if internable:
+      self = State._interned.get(word)
+      if self is not None:
+        return self
+    self = object.__new__(cls)
+    self.buttons = word & State._BUTTON_MASK
+    self.toggles = (word >> State.N_BUTTONS) & State._TOGGLE_MASK
+    self.word = word
+    self._buttons_on = None
+    self._toggles_on = None
+    self._bits = None
+    if internable and len(State._interned) < State.INTERN_LIMIT:
+      State._interned[word] = self
+    return self
+
+  @classmethod
+  def set_shape(cls, n_buttons, n_toggles):
+    """Change the word layout (and drop every interned State).
+
+    Called by :class:`~src.game_loop.Game` with ``config.N_PORTS`` /
+    ``config.N_TOGGLES``; a no-op when the shape is unchanged. States made
+    under the old shape keep their old decoding.
+    """
+    if (n_buttons, n_toggles) == (State.N_BUTTONS, State.N_TOGGLES):
+      return
+    State.N_BUTTONS = n_buttons
+    State.N_TOGGLES = n_toggles
+    State.WIDTH = n_buttons + n_toggles
+    State._BUTTON_MASK = (1 << n_buttons) - 1
+    State._TOGGLE_MASK = (1 << n_toggles) - 1
+    State._LIMIT = 1 << State.WIDTH
+    State._interned = {}
+
+  @staticmethod
+  def _set_bits(mask):
+    """Indices of the set bits of ``mask``, lowest first (one step per set bit)."""
+    on = []
+    while mask:
+      low = mask & -mask
+      on.append(low.bit_length() - 1)
+      mask ^= low
+    return tuple(on)
+
+  @property
+  def buttons_on(self):
+    """Indices of the pressed buttons, as a cached tuple."""
+    on = self._buttons_on
+    if on is None:
+      on = self._buttons_on = self._set_bits(self.buttons)
+    return on
+
+  @property
+  def toggles_on(self):
+    """Indices of the toggles that are on, as a cached tuple."""
+    on = self._toggles_on
+    if on is None:
+      on = self._toggles_on = self._set_bits(self.toggles)
+    return on
 
   def get_on(self):
-    """Return the indices (0..15) of every bit that is set."""
-    return [i for i in range(16) if ((self.word & (1 << i)) >> i)]
+    """Return the indices of every bit of the input word that is set."""
+    return [i for i, bit in enumerate(self._bit_values()) if bit]
 
   def get_buttons_on(self):
-    """Return the indices (0..13) of buttons that are currently pressed."""
-    return [i for i in range(14) if ((self.buttons & (1 << i)) >> i)]
+    """Return the indices of buttons that are currently pressed."""
+    return list(self.buttons_on)
 
   def get_toggles_on(self):
-    """Return the indices (0..1) of toggles that are currently on."""
-    return [i for i in range(2) if ((self.toggles & (1 << i)) >> i)]
+    """Return the indices of toggles that are currently on."""
+    return list(self.toggles_on)
 
   def to_list(self):
-    """Return the word as a list of 16 bit values (index 0 = bit 0)."""
-    state_list = [0]*16
-    for bit_index in range(16):
-      value = (self.word & (1 << bit_index)) >> bit_index
-      state_list[bit_index] = value
-    return state_list
+    """Return the word as a list of ``WIDTH`` bit values (index 0 = bit 0)."""
+    return list(self._bit_values())
+
+  def _bit_values(self):
+    bits = self._bits
+    if bits is None:
+      bits = self._bits = tuple((self.word >> i) & 1 for i in range(State.WIDTH))
+    return bits
 
   @classmethod
   def from_list(cls, buttons, toggles=(0,0)):
     """Build a State from button indices and toggle values.
 
     Args:
-        buttons: Iterable of button indices (0..13) that should be on.
-        toggles: ``(toggle0, toggle1)`` values (0 or 1 each). Defaults to off.
+        buttons: Iterable of button indices (``0 .. N_BUTTONS-1``) that should
+            be on.
+        toggles: Toggle values (0 or 1 each), toggle 0 first. Defaults to off.
 
     Returns:
         State: The corresponding state.
     """
-    # convert list of integer indices to 16 bit words
+    # convert list of integer indices to an input word
     word = 0x00
     for bit_index in buttons:
       word |= (1 << bit_index)
-    word |= (toggles[0] << 14)
-    word |= (toggles[1] << 15)
+    for i, value in enumerate(toggles):
+      word |= (value << (State.N_BUTTONS + i))
     return cls(word)
 
   def __int__(self):
@@ -290,13 +379,14 @@ class StateMachine:
     """Forcibly stop the active program's side effects.
 
     Ensures nothing leaks into the next program: clears the program's pending
-    callbacks/cooldowns, stops all audio, kills running animations, and clears
-    the lasers.
+    callbacks/cooldowns, stops all audio (and unpins its cached sounds), kills
+    running animations, and clears the lasers.
     """
     if self.program is None:
       return
     self.program.teardown()
     self.game.mixer.stop_all()
+    self.game.mixer.release_program_sounds()
     Animation.kill_all()
     self.game.lasers.set_word(0)
 
@@ -312,6 +402,9 @@ class StateMachine:
     self.gesture.reset()  # don't let still-held trigger buttons re-fire
     self.program = self.PROGRAMS[name]
     self.program.make_active_program(self.game)
+    recorder = getattr(self.game, 'recorder', None)
+    if recorder is not None:
+      recorder.program_started(name, self.game)  # reseeds random: a replay point
     self.program.start(**kwargs)
     if config.DEBUG:
       print('loaded program:', name)
@@ -366,8 +459,9 @@ class StateMachine:
       if self.gesture.feed(self.input_manager.state):
         self.gesture.reset()
         return self.enter_game_select()
-    # update currently running program
+    # update currently running program, then resume its coroutines
     self.program.update(dt)
+    self.program.run_tasks()
 
 ##-- END STATE MACHINE --##
 ##-----------------------##
@@ -473,7 +567,8 @@ class Program:
     Subclass this, put the module in the ``programs`` directory, and instantiate
     it once at the bottom of the module so it registers itself. Override
     :meth:`start` (setup) and :meth:`update` (per-frame logic); call
-    ``super().update(dt)`` so cooldown/scheduler bookkeeping runs.
+    ``super().update(dt)`` so cooldown/scheduler bookkeeping runs. A flow with
+    several timed steps can instead be one coroutine (:meth:`spawn`).
 
     The state machine sets ``self.game`` and ``self.input_manager`` via
     :meth:`make_active_program` before :meth:`start` is called.
@@ -481,9 +576,13 @@ class Program:
     Class Attributes:
         system_triggers (dict): Reserved for system-wide triggers (TODO).
         triggers (dict): Optional single-state -> action map.
+        IDLE_PACING (bool): Opt in to adaptive pacing: the loop may sleep
+            between this program's deadlines (:meth:`next_deadline_ms`). Leave
+            False for anything that changes state every frame.
     """
     system_triggers = { } # TODO .. enter SystemSettings, enter GameSelect modes
     triggers = { }
+    IDLE_PACING = False
 
     def __init__(self):
         self.MODE_SWITCH_SEQ = StateSequence([
@@ -493,10 +592,10 @@ class Program:
                                     maxlen=6)
         StateMachine.register_program(self)
         self._tick = 0
-        # per-instance scheduler/cooldowns (must NOT be shared across programs)
-        self.scheduler = []   # heap of (deadline_ms, schedule_id, fn)
-        self.cooldowns = {}   # button_id -> deadline_ms
-        self.schedule_id = 0
+        # per-instance timers/cooldowns (must NOT be shared across programs)
+        self.timers = TimerWheel()  # after() callbacks and cooldown expiries
+        self.cooldowns = {}   # button_id -> Timer ending the cooldown
+        self.tasks = TaskRunner()  # spawn()ed coroutines
 
     @property
     def tick(self):
@@ -518,17 +617,41 @@ class Program:
       """
       return self.game.now_ms
 
+    def event_ms(self, event):
+        """When an input ``event`` actually happened, on the :attr:`now_ms` timeline.
+
+        Events are stamped (``t_ns``) when the input is sampled, which may be
+        well before the frame that handles them; this maps that stamp onto
+        ``now_ms`` so it can be compared with deadlines. Unstamped events count
+        as happening now.
+        """
+        if event.t_ns is None:
+            return self.now_ms
+        return self.now_ms - (self.game.frame_t_ns - event.t_ns) / 1e6
+
+    def lasers_at(self, t_ns):
+        """What the lasers showed at ``t_ns`` (e.g. a press's ``event.t_ns``).
+
+        Returns ``(since_ns, word)`` -- the output word the player was looking
+        at and when it was latched -- or None when ``t_ns`` is unknown or older
+        than the output history. Judge close calls against this rather than the
+        program's current state, which may already have moved on by the time
+        the frame handling the press runs.
+        """
+        if t_ns is None:
+            return None
+        return self.game.outputs.shown_at(t_ns)
+
     def update(self, dt):
         """Per-frame update. **Override in subclass** (and call ``super()``).
 
-        The base implementation runs cooldown and scheduler bookkeeping and
-        advances the tick counter.
+        The base implementation runs the callbacks and cooldown expiries that
+        are due and advances the tick counter.
 
         Args:
             dt: Milliseconds since the previous frame.
         """
         #TODO process system_triggers here (subclass should call super())
-        self.check_cooldowns()
         self.check_schedule()
         if self.input_manager.changed_state:
             pass
@@ -551,13 +674,14 @@ class Program:
       self.game.state_machine.swap_program()
 
     def teardown(self):
-      """Drop this program's pending callbacks and cooldowns.
+      """Cancel this program's coroutines and drop its pending callbacks and cooldowns.
 
       Called by the state machine when switching away (which also stops audio,
       kills animations, and clears the lasers). Override to release anything
       unusual you started, but call ``super().teardown()``.
       """
-      self.scheduler = []
+      self.tasks.cancel_all()
+      self.timers.clear()
       self.cooldowns = {}
 
     def make_active_program(self, game):
@@ -571,51 +695,139 @@ class Program:
     def after(self, ms, func, *args, **kwargs):
         """Schedule ``func(*args, **kwargs)`` to run ``ms`` milliseconds from now.
 
-        Callbacks run from :meth:`check_schedule` during :meth:`update`. Pending
-        callbacks are dropped on :meth:`teardown`.
+        Callbacks run from :meth:`check_schedule` during :meth:`update`, on the
+        first frame after their deadline. Pending callbacks are dropped on
+        :meth:`teardown`.
 
         Args:
             ms: Delay in milliseconds.
             func: Callable to invoke.
             *args: Positional args for ``func``.
             **kwargs: Keyword args for ``func``.
+
+        Returns:
+            The :class:`~src.timer_wheel.Timer`; ``cancel()`` it to drop the
+            callback if it has not run yet.
         """
-        deadline = self.now_ms + ms
-        f = lambda: func(*args, **kwargs)
-        heappush(self.scheduler, (deadline, self.schedule_id, f))
-        self.schedule_id += 1
+        return self.timers.call_at(self.now_ms + ms, func, *args, **kwargs)
 
     def check_schedule(self):
-        """Run any scheduled callbacks whose deadline has passed."""
-        if self.scheduler:
-            now = self.now_ms
-            while self.scheduler:
-                nearest_deadline, sched_id, func = heappop(self.scheduler)
-                if now - nearest_deadline > 0:
-                    # deadline has past, call func
-                    print('calling scheduled func with id #', sched_id)
-                    func()
-                else:
-                    # no func is ready to be called
-                    heappush(self.scheduler, (nearest_deadline, sched_id, func))
-                    break
+        """Run the scheduled callbacks (and end the cooldowns) whose deadline has passed.
+
+        With the frame profiler on, each callback is timed so an over-budget
+        frame can name it.
+        """
+        if self.timers.count:
+            prof = self.game.profiler
+            self.timers.run_due(self.now_ms, None if prof is None else prof.call)
+
+    def next_deadline_ms(self):
+        """The earliest ``now_ms`` this program needs a frame at (adaptive pacing).
+
+        ``now_ms`` (i.e. every frame) unless the program sets
+        :attr:`IDLE_PACING`; then the earliest scheduled callback or cooldown
+        expiry, or None when neither is pending. Programs with their own
+        deadlines override this and fold them in.
+        """
+        if not self.IDLE_PACING or self.tasks.ready:
+            return self.now_ms
+        deadline = self.timers.next_deadline_ms()
+        press = self.tasks.next_deadline_ms()
+        if press is not None and (deadline is None or press < deadline):
+            deadline = press
+        return deadline
+
+    def spawn(self, coro):
+        """Run the coroutine ``coro`` as part of this program.
+
+        It starts at the end of the current frame and is resumed, after
+        :meth:`update`, on each frame its awaited :meth:`sleep`, :meth:`press`
+        or :meth:`signal` resolves (see :mod:`src.coroutines`). Teardown cancels
+        it at whatever it is awaiting.
+
+        Returns:
+            The :class:`~src.coroutines.Task`; ``cancel()`` it to stop the coroutine.
+        """
+        return self.tasks.spawn(coro)
+
+    def sleep(self, ms):
+        """Awaitable: resume ``ms`` milliseconds from now (``await self.sleep(500)``).
+
+        Built on :meth:`after`, so it ends on the frame an ``after`` callback
+        would run.
+        """
+        wait = Wait()
+        wait.timer = self.after(ms, wait)
+        return wait
+
+    def press(self, buttons=None, timeout_ms=None):
+        """Awaitable: the next press of one of ``buttons`` (default: any button).
+
+        Resolves with its ``ButtonDownEvent``, or None when ``timeout_ms`` runs
+        out first. Only presses handed to :meth:`feed_press` count, so a program
+        that awaits presses passes its ``BUTTON_DOWN`` events on. A press judged
+        by when it happened (:meth:`event_ms`) beats a timeout that a stalled
+        frame only noticed later.
+        """
+        deadline_ms = None if timeout_ms is None else self.now_ms + timeout_ms
+        return self.tasks.press(buttons, deadline_ms)
+
+    def feed_press(self, event):
+        """Hand a ``BUTTON_DOWN`` event to any coroutine awaiting :meth:`press`.
+
+        Returns:
+            True if one took it.
+        """
+        if not self.tasks.presses:
+            return False
+        return self.tasks.feed(event, self.event_ms(event))
+
+    def signal(self):
+        """Awaitable: resolved by calling it, so it can be passed as a callback.
+
+        E.g. ``done = self.signal(); voice.say_line(key, on_done=done); await done``.
+        """
+        return Wait()
+
+    def run_tasks(self):
+        """Resume the coroutines whose wait resolved.
+
+        Called by the state machine once per frame, after :meth:`update`.
+        """
+        tasks = self.tasks
+        if tasks.ready or tasks.presses:
+            tasks.run(self.now_ms)
+
+    def upcoming_words(self, until_ms):
+        """Laser words this program already knows it will show before ``until_ms``.
+
+        Called after each frame's update when the output scheduler is on
+        (``config.OUTPUT_SCHEDULER``), which latches each word at its exact
+        time instead of on the next frame. Programs whose lasers change on
+        their own clock (a blink, a moving blip) override this; the words
+        must match what their per-frame rendering will set at those times.
+
+        Returns:
+            ``(at_ms, word)`` pairs on the :attr:`now_ms` timeline, with
+            ``now_ms < at_ms <= until_ms``, ascending. Default: none.
+        """
+        return []
 
     def start_cooldown(self, button_id, ms=250):
         """Mark ``button_id`` as on cooldown for ``ms`` milliseconds.
 
-        Use with ``if button_id not in self.cooldowns`` to debounce/rate-limit
-        actions on held or bouncing buttons.
+        Use with ``if button_id not in self.cooldowns`` to rate-limit an action
+        (contact bounce is already filtered out by the InputManager). Restarting
+        a running cooldown moves its end.
         """
-        self.cooldowns[button_id] = self.now_ms + ms  # default: quarter-second
-
-    def check_cooldowns(self):
-        """Expire any cooldowns whose deadline has passed."""
-        to_free = []
-        for button_id, deadline_ms in self.cooldowns.items():
-            if self.now_ms - deadline_ms > 0:
-                to_free.append(button_id)
-        for button_id in to_free:
-            self.cooldowns.pop(button_id)
+        running = self.cooldowns.get(button_id)
+        if running is not None:
+            running.cancel()
+        # default: quarter-second
+        self.cooldowns[button_id] = self.after(ms, self._end_cooldown, button_id)
+
+    def _end_cooldown(self, button_id):
+        self.cooldowns.pop(button_id, None)
 
     def match_triggers(self, state):
         """Return the action mapped to ``state``, or :meth:`default_action`."""
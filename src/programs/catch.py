@@ -35,6 +35,7 @@ the operator menu (GameSelect slot 7) or via ``python -m src -s -p Catch``.
 import random
 
 from .base import *
+from .. import clock
 from ..event_loop import *
 from ..config import config
 from ..animation import random_k_dance
@@ -79,18 +80,19 @@ class Catch(Program):
         self.blink_half_period_ms = 1000 / (2 * cfg.BLINK_HZ)
 
         # Load effects in start() (not __init__) so they stay valid against the
-        # current mixer, which other programs may have re-initialised. The win
+        # current mixer, which other programs may have re-initialised. The intro
+        # plays at once; the rest decode in the background meanwhile. The win
         # sound matches Golf's celebration volume.
-        for name in (self.intro_sound, self.zap_sound, self.miss_sound, *self.level_sounds):
-            self.game.mixer.load_effect(name)
-        self.game.mixer.load_effect(self.win_sound, volume=config.CONGRATS_VOL)
+        self.game.mixer.load_effect(self.intro_sound)
+        self.game.mixer.prefetch([self.zap_sound, self.miss_sound, *self.level_sounds])
+        self.game.mixer.prefetch([self.win_sound], volume=config.CONGRATS_VOL)
 
         self._start_music()
 
         self.level_index = 0
-        intro_ms = self.game.mixer.effects[self.intro_sound].get_length() * 1000
-        self.game.mixer.play_effect(self.intro_sound)
-        self._begin_ready(intro_ms)
+        self.blip, self.blip_dir = 0, 1  # placed for real by _start_chase
+        self._chase_start_ns = 0
+        self._begin_ready()
 
     def _start_music(self):
         """Start the looping backing track if one is configured and present.
@@ -129,13 +131,14 @@ class Catch(Program):
                                        restore_vol=self.music_vol)
 
     # -- phase transitions --------------------------------------------------
-    def _begin_ready(self, delay_ms):
-        """Blink the target through the intro, then drop straight into level 1."""
+    def _begin_ready(self):
+        """Play the intro and blink the target through it, then drop straight into level 1."""
         self.state = self.READY
         self._clock_ms = 0.0  # restart the blink so it begins on a lit flash
         self.game.lasers.set_word(0)
-        # Auto-start level 1 when the intro finishes; a press skips to it sooner.
-        self.after(delay_ms, self._enter_level, 0)
+        # Auto-start level 1 when the intro stops playing; a press skips to it sooner.
+        self._intro = self.game.mixer.play_effect(self.intro_sound,
+                                                  on_end=lambda: self._enter_level(0))
 
     def _enter_level(self, level_index, announce=True):
         """Optionally announce ``level_index`` (the level-up = "nice catch" cue), hold, chase.
@@ -161,6 +164,7 @@ class Catch(Program):
         self.blip = 0
         self.blip_dir = 1
         self._blip_accum_ms = 0.0
+        self._chase_start_ns = clock.monotonic_ns()  # older output is no chase frame
 
     def _catch(self):
         """A successful catch: hold to show the hit then climb, or win on the last."""
@@ -212,11 +216,12 @@ class Catch(Program):
         self.state = self.PAUSE
         dur = self.game.mixer.effects[self.win_sound].get_length()
         # End of the game: fade the bed out under the celebration rather than
-        # ducking, so no restore thread outlives teardown to stomp the next
-        # program's music. (No-op if the bed never started.)
+        # ducking; the fade drops any running duck, so its restore cannot ride
+        # the bed back up. (No-op if the bed never started.)
         if self._music_on:
             self.game.mixer.fade_music(fade_ms=1000)
         self.game.mixer.play_effect(self.win_sound)
+        self.game.lasers.set_word(0)  # dark under the dance, and after it
         random_k_dance(k=3, fps=8, dur=max(0, dur - 1.2)).start()
         self.after(dur * 1000, self.quit)
 
@@ -226,11 +231,11 @@ class Catch(Program):
         super().update(dt)
         self._clock_ms += dt
 
-        # Handle input first so a press is judged against the blip position the
-        # player is actually looking at (this frame's render), not next step's.
+        # Handle input first, before the blip steps again. Each press is judged
+        # against the blip the lasers were showing when it was sampled.
         for event in events.get():
             if event.type == EventType.BUTTON_DOWN:
-                self._on_button_down(event.key)
+                self._on_button_down(event.key, event.t_ns)
 
         if self.state == self.CHASE:
             self._advance_blip(dt)
@@ -248,36 +253,60 @@ class Catch(Program):
 
     def _step_blip(self):
         """Move the blip one port, reflecting at either end."""
-        self.blip += self.blip_dir
-        if self.blip >= self.last_port:
-            self.blip = self.last_port
-            self.blip_dir = -1
-        elif self.blip <= 0:
-            self.blip = 0
-            self.blip_dir = 1
+        self.blip, self.blip_dir = self._stepped(self.blip, self.blip_dir)
+
+    def _stepped(self, blip, blip_dir):
+        """The blip position and direction one step on from ``blip``/``blip_dir``."""
+        blip += blip_dir
+        if blip >= self.last_port:
+            return self.last_port, -1
+        if blip <= 0:
+            return 0, 1
+        return blip, blip_dir
 
     # -- input --------------------------------------------------------------
-    def _on_button_down(self, button_id):
+    def _on_button_down(self, button_id, t_ns=None):
         """Resolve a press: skip the intro in READY, judge the blip in CHASE.
 
         Any button counts -- the player just has to stop the blip on the target,
         not hit the target's own button -- so a press is a catch whenever the
-        blip is on the target and a miss anywhere else. Presses in the between-
-        level pauses are ignored.
+        blip was on the target *when the button went down* (``t_ns``) and a miss
+        anywhere else. Presses in the between-level pauses are ignored.
         """
         if self.state == self.READY:
             return self._skip_intro()
         if self.state != self.CHASE:
             return
+        self.blip = self._blip_shown_at(t_ns)  # a miss holds where they pressed
         if self.blip == self.target:
             self._catch()
         else:
             self._miss()
 
+    def _blip_shown_at(self, t_ns):
+        """The blip position the lasers showed at ``t_ns``.
+
+        Read back from the output history: the blip is the lit bit other than
+        the target, or the target itself when that is the only bit lit. Falls
+        back to the current ``self.blip`` when the press predates this chase's
+        first frame (or the history).
+        """
+        shown = self.lasers_at(t_ns)
+        if shown is None or shown[0] < self._chase_start_ns:
+            return self.blip
+        word = shown[1]
+        others = word & ~(1 << self.target)
+        if others:
+            return others.bit_length() - 1
+        if word:
+            return self.target
+        return self.blip
+
     def _skip_intro(self):
         """A press during the intro: cut the narration short and start level 1 now."""
-        self.scheduler = []  # drop the pending intro -> level-1 transition
-        self.game.mixer.effects[self.intro_sound].stop()
+        if self._intro is not None:
+            self._intro.stop()
+            self._intro.cancel()  # drop the pending intro -> level-1 transition
         self._enter_level(0)
 
     # -- rendering ----------------------------------------------------------
@@ -292,10 +321,46 @@ class Catch(Program):
         while chasing and while held at a miss (so the missed press stays visible
         against the still-blinking target).
         """
-        word = self._blink_on() << self.target
+        self.game.lasers.set_word(self._compose(self._blink_on(), self.blip))
+
+    def _compose(self, lit, blip):
+        """The laser word for a target blink phase ``lit`` and a blip at ``blip``."""
+        word = lit << self.target
         if self.state in (self.CHASE, self.MISS_HOLD):
-            word |= 1 << self.blip
-        self.game.lasers.set_word(word)
+            word |= 1 << blip
+        return word
+
+    def upcoming_words(self, until_ms):
+        """The target's blink edges and the blip's steps up to ``until_ms``.
+
+        The same arithmetic as :meth:`update` run forward on ``_clock_ms`` and
+        the blip accumulator, so the output scheduler can latch each change on
+        time (see :meth:`Program.upcoming_words`).
+        """
+        if self.state not in (self.READY, self.CHASE, self.MISS_HOLD):
+            return []
+        half = self.blink_half_period_ms
+        blink_k = int(self._clock_ms // half) + 1
+        next_blink = self.now_ms + blink_k * half - self._clock_ms
+        next_step = float('inf')
+        if self.state == self.CHASE:
+            step_ms = self.level_step_ms[self.level_index]
+            next_step = self.now_ms + step_ms - self._blip_accum_ms
+        lit = self._blink_on()
+        blip, blip_dir = self.blip, self.blip_dir
+        words = []
+        while True:
+            at = min(next_blink, next_step)
+            if at > until_ms:
+                return words
+            if at == next_blink:
+                lit = blink_k % 2 == 0
+                blink_k += 1
+                next_blink = self.now_ms + blink_k * half - self._clock_ms
+            if at == next_step:
+                blip, blip_dir = self._stepped(blip, blip_dir)
+                next_step += step_ms
+            words.append((at, self._compose(lit, blip)))
 
 
 # Instantiate once at import so it registers with the StateMachine.
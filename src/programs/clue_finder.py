@@ -45,6 +45,9 @@ class ClueFinder(Program):
     def celebrate(self):
         """Play the win sound + animation, then quit after it finishes."""
         self.game.mixer.play_effect(self.congrats_sound)
+        self.game.lasers.set_word(0)  # dark once the dance ends
+        self.win_dur = self.game.mixer.effect_length(self.congrats_sound) or 3.0
+        self.success_anim = random_k_dance(k=3, fps=6, dur=self.win_dur - 1.2)
         self.success_anim.start()
         self.after(self.win_dur*1000, self.quit)
 
@@ -58,7 +61,7 @@ class ClueFinder(Program):
         print('seq:', clue_phrase_length, max_sequence_length)
         current_clue = self.clues[self.clue_idx]
         phrase_word_index = 0
-        for e in events.get_filtered_history(EventType.BUTTON_DOWN, n=max_sequence_length):
+        for e in events.history.last(max_sequence_length, EventType.BUTTON_DOWN):
             candidate_phrase_word = (e.key, e.state.toggles)
             target_phrase_word = current_clue[phrase_word_index]
             print('candidate:', candidate_phrase_word, 'target:', target_phrase_word)
@@ -77,14 +80,15 @@ class ClueFinder(Program):
         """Select the initial word bank, loop ambience, and load win assets."""
         initial_toggle_state = self.game.input_manager.state.toggles
         self.game.mixer.use_patch(self.patch_map[initial_toggle_state])
+        # The other banks decode in the background, ready for a toggle flip.
+        for patch_name in self.patch_map.values():
+            self.game.mixer.prefetch_patch(patch_name)
         self.game.mixer.load_music('ocean_sounds22050.wav', loops=-1)
         self.game.mixer.set_music_volume(1)
         self.game.mixer.VOL_HIGH = 1
 
         self.congrats_sound = os.path.join('positive', 'congrats_extended.wav')
-        self.game.mixer.load_effect(self.congrats_sound, volume=config.CONGRATS_VOL)
-        self.win_dur = self.game.mixer.effects[self.congrats_sound].get_length()
-        self.success_anim = random_k_dance(k=3, fps=6, dur=self.win_dur - 1.2)
+        self.game.mixer.prefetch([self.congrats_sound], volume=config.CONGRATS_VOL)
 
         self.playing = True
         self.clue_idx = 0
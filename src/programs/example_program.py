@@ -87,7 +87,7 @@ class ExampleProgram(Program):
         if button_id == self.QUIT_BUTTON:
             return self.quit()
         self.game.lasers.turn_on(button_id)
-        # Rate-limit speaking so a held/bouncing button doesn't retrigger.
+        # Rate-limit speaking so quick re-presses don't retrigger the clip.
         if button_id not in self.cooldowns:
             self.game.mixer.play_by_id(button_id)
             self.start_cooldown(button_id, ms=self.SPEAK_COOLDOWN_MS)
@@ -101,7 +101,8 @@ class ExampleProgram(Program):
         toggles = self.game.input_manager.state.toggles
         print("toggles now:", toggles)
         # Animations are fire-and-forget: build one and call .start(). The global
-        # Animation manager drives it each frame and clears the lasers when done.
+        # Animation manager drives it each frame on its own layer, over this
+        # program's lasers, which show again when it is done.
         random_k_dance(k=3, fps=8, dur=1.5).start()
         # Example of deferring work: speak "one" half a second from now.
         self.after(500, self.game.mixer.play_by_id, 0)
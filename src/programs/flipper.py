@@ -62,6 +62,9 @@ class Flipper(Program):
 
     def victory_dance(self):
         """Play the win animation + sound, then quit after it finishes."""
+        self.game.lasers.set_word(0)  # the solved board stays dark once the dance ends
+        self.win_dur = self.game.mixer.effect_length(self.congrats_sound) or 3.0
+        self.win_animation = random_k_dance(k=3, fps=6, dur=self.win_dur - 1.2)
         self.win_animation.start()
         self.game.mixer.play_effect(self.congrats_sound)
         self.after(self.win_dur*1000, self.quit)
@@ -85,9 +88,7 @@ class Flipper(Program):
         self.game.mixer.VOL_HIGH = 1
 
         self.congrats_sound = os.path.join('positive', 'congrats_extended.wav')
-        self.game.mixer.load_effect(self.congrats_sound, volume=config.CONGRATS_VOL)
-        self.win_dur = self.game.mixer.effects[self.congrats_sound].get_length()
-        self.win_animation = random_k_dance(k=3, fps=6, dur=self.win_dur - 1.2)
+        self.game.mixer.prefetch([self.congrats_sound], volume=config.CONGRATS_VOL)
         self.board = self.create_board()
         self.create_board_pattern()  # fresh random deal each entry
         self.won = False
@@ -1,6 +1,7 @@
 from .base import *
 from ..event_loop import *
 from ..config import config
+from ..animation import Layer
 import os
 import sys
 import subprocess
@@ -39,18 +40,23 @@ class GameSelect(Program):
     **Volume slots** (``config.GameSelect.VOLUME_MENU``, buttons 10/11) are the
     other half of the system-control group. Each press is an instant ±10% step of
     the OS master volume (no arm/confirm): it lights a laser bar of the new level
-    for a moment and speaks a live-preview confirmation *at the new level*, so the
+    for a moment -- an overlay :class:`~src.animation.Layer` above the menu's own
+    lasers, so the armed display shows again underneath -- and speaks a live-preview confirmation *at the new level*, so the
     loudness itself previews the change. They act independently of any armed
     selection. (Volume is menu-only; during a game buttons 10/11 are ordinary
     game inputs.)
 
     Unassigned buttons are ignored.
+
+    The menu is idle most of the time, so it opts in to adaptive pacing: between
+    presses the loop only wakes for the arm and volume-bar deadlines.
     """
+    IDLE_PACING = True
     EFFECT_DIR = 'menu'
     STD_FREQ = 22050
     STD_FORMAT = -16
     STD_CHANNELS = 1
-    ALL_LASERS = (1 << 14) - 1  # every laser on -- the "armed to fire" signal
+    ALL_LASERS = (1 << config.N_PORTS) - 1  # every laser on -- the "armed to fire" signal
 
     def __init__(self):
         super().__init__()
@@ -66,6 +72,7 @@ class GameSelect(Program):
         self.vol_down = config.GameSelect.VOLUME_DOWN
         self.vol_max = config.GameSelect.VOLUME_MAX
         self.vol_muted = config.GameSelect.VOLUME_MUTED
+        self.bar_layer = Layer(z=1)  # the volume bar, over the arm display
 
     def start(self):
         self._ensure_standard_mixer()
@@ -75,6 +82,7 @@ class GameSelect(Program):
         self.power_committed = False  # a reboot/shutdown has been issued
         self.arm_timeout_ms = config.GameSelect.ARM_TIMEOUT_MS
         self.bar_deadline = None  # now_ms at which the volume bar clears, or None
+        self.game.compositor.remove(self.bar_layer)
         self.game.lasers.set_word(0)
         self._load_effects()
         self._play(self.choose_sound)
@@ -91,8 +99,7 @@ class GameSelect(Program):
             pygame.mixer.quit()
             pygame.mixer.init(self.STD_FREQ, self.STD_FORMAT,
                               self.STD_CHANNELS, config.AUDIO_BUFFER)
-            self.game.mixer.effects = {}
-            self.game.mixer.patches = {}
+            self.game.mixer.clear_sounds()
 
     def _effect_path(self, filename):
         return os.path.join(self.EFFECT_DIR, filename)
@@ -100,16 +107,15 @@ class GameSelect(Program):
     def _load_effects(self):
         # (re)load fresh so the Sounds are valid against the current mixer.
         # Tolerant of missing files: a missing announcement must never stop the
-        # menu (the box's home screen) from starting.
+        # menu (the box's home screen) from starting. The prompt plays at once;
+        # the announcements decode in the background (a missing one is logged).
         self._load(self.choose_sound)
-        for target, announce in self.menu.values():
-            self._load(self._effect_path(announce))
+        paths = [self._effect_path(announce) for target, announce in self.menu.values()]
         for spec in self.system_menu.values():
-            self._load(self._effect_path(spec['announce']))
-            self._load(self._effect_path(spec['confirm']))
-            self._load(self._effect_path(spec['execute']))
-        for name in (self.vol_up, self.vol_down, self.vol_max, self.vol_muted):
-            self._load(self._effect_path(name))
+            paths += [self._effect_path(spec[key]) for key in ('announce', 'confirm', 'execute')]
+        paths += [self._effect_path(name)
+                  for name in (self.vol_up, self.vol_down, self.vol_max, self.vol_muted)]
+        self.game.mixer.prefetch(paths)
 
     def _load(self, path):
         try:
@@ -117,11 +123,13 @@ class GameSelect(Program):
         except Exception as e:
             print(f'[GameSelect] could not load effect {path!r}: {e}')
 
-    def _play(self, path):
+    def _play(self, path, on_end=None):
+        """Play a menu effect; returns its ``Playback``, or None if it could not play."""
         try:
-            self.game.mixer.play_effect(path)
+            return self.game.mixer.play_effect(path, on_end=on_end)
         except Exception as e:
             print(f'[GameSelect] could not play effect {path!r}: {e}')
+            return None
 
     def _stop_voice(self):
         """Cut any in-progress announcement short.
@@ -149,6 +157,7 @@ class GameSelect(Program):
         self.armed = button_id
         self.press_count = 1
         self.arm_deadline = self.now_ms + self.arm_timeout_ms
+        self._hide_volume_bar()  # a fresh press takes the display back
         self.game.lasers.set_word(1 << button_id)  # light the armed slot
         self._play(self._effect_path(self._announce_file(button_id)))
 
@@ -166,6 +175,7 @@ class GameSelect(Program):
         """
         self.press_count += 1
         self.arm_deadline = self.now_ms + self.arm_timeout_ms  # keep alive
+        self._hide_volume_bar()
 
         if button_id not in self.system_menu:
             self._launch(button_id)            # game slot: second press launches
@@ -191,17 +201,22 @@ class GameSelect(Program):
         # Audible "rebooting/shutting down now" confirmation. The caller has
         # already cut the confirm prompt short, so this won't overlap.
         execute_file = self._effect_path(spec['execute'])
-        self._play(execute_file)
-
         if '-s' in sys.argv:
+            self._play(execute_file)
             print(f'[GameSelect] SIMULATED system action {action!r}: {argv}')
             return
         print(f'[GameSelect] executing system action {action!r}: {argv}')
+        # Let the spoken confirmation finish before we issue the command:
+        # systemd then SIGTERMs us and game_loop's handler silences audio,
+        # which would otherwise clip "rebooting/shutting down now" mid-word.
+        # The mixer calls back once the line stops playing (bounded, so a stuck
+        # channel can't hang the box); the loop keeps running until then.
+        issue = lambda: self._issue_system_action(action, argv)
+        if self._play(execute_file, on_end=issue) is None:
+            issue()
+
+    def _issue_system_action(self, action, argv):
         try:
-            # Let the spoken confirmation finish before we issue the command:
-            # systemd then SIGTERMs us and game_loop's handler silences audio,
-            # which would otherwise clip "rebooting/shutting down now" mid-word.
-            self._wait_for_effect(execute_file)
             # Fire-and-forget. (Verified: passwordless sudo on the box.)
             subprocess.Popen(argv)
         except Exception as e:
@@ -209,24 +224,7 @@ class GameSelect(Program):
             self.power_committed = False
             self._disarm()
 
-    def _wait_for_effect(self, path):
-        """Block until a just-played effect finishes (best effort).
-
-        Used only on the real box, right before issuing a power command, so the
-        spoken confirmation is heard in full before audio is torn down. Bounded
-        by the clip's own length so a stuck channel can't hang the box.
-        """
-        sound = self.game.mixer.effects.get(path)
-        if sound is None:
-            return
-        pygame.time.wait(int(sound.get_length() * 1000) + 100)
-
     # -- volume -------------------------------------------------------------
-    def _effect_len(self, filename):
-        """Length (s) of a loaded menu effect, or 0 if it never loaded."""
-        sound = self.game.mixer.effects.get(self._effect_path(filename))
-        return sound.get_length() if sound else 0.0
-
     def _volume_bar_word(self):
         """Laser word for the current volume, as a left->right bar.
 
@@ -238,17 +236,10 @@ class GameSelect(Program):
         lit = round(self.game.volume.fraction * len(ports))
         return sum(1 << ports[i] for i in range(lit))
 
-    def _base_laser_word(self):
-        """The laser word to restore once the volume bar's dwell time is up.
-
-        Re-derives what the lasers *should* show from the current arm state, so
-        the temporary bar doesn't clobber an armed slot's lit laser.
-        """
-        if self.armed is None:
-            return 0
-        if self.armed in self.system_menu and self.press_count >= 2:
-            return self.ALL_LASERS  # a power slot mid-confirm lights everything
-        return 1 << self.armed
+    def _hide_volume_bar(self):
+        """Drop the volume bar layer, uncovering the arm display beneath it."""
+        self.bar_deadline = None
+        self.game.compositor.remove(self.bar_layer)
 
     def _adjust_volume(self, button_id):
         """Step the OS master volume and give bar + spoken-preview feedback.
@@ -268,27 +259,35 @@ class GameSelect(Program):
             self._play(self._effect_path(clip))
         elif vol.peek_down() <= vol.min:
             # stepping to mute: announce audibly now, silence the OS after the line
-            self._play(self._effect_path(self.vol_muted))
             vol.step_down(apply_os=False)  # record/show 0 now; OS muted shortly
-            self.after(int(self._effect_len(self.vol_muted) * 1000) + 50, vol.apply)
+            mute = lambda: self.after(50, vol.apply)  # let the device drain the tail
+            if self._play(self._effect_path(self.vol_muted), on_end=mute) is None:
+                mute()
         else:
             vol.step_down()
             self._play(self._effect_path(self.vol_down))
 
-        # Flash the new level as a laser bar for a moment, then restore the base.
-        self.game.lasers.set_word(self._volume_bar_word())
+        # Flash the new level as a laser bar over the menu's lasers for a moment.
+        self.bar_layer.word = self._volume_bar_word()
+        self.game.compositor.add(self.bar_layer)
         self.bar_deadline = self.now_ms + self.volume_bar_ms
 
+    def next_deadline_ms(self):
+        deadline = super().next_deadline_ms()
+        for pending in (self.arm_deadline, self.bar_deadline):
+            if pending is not None and (deadline is None or pending < deadline):
+                deadline = pending
+        return deadline
+
     def update(self, dt):
         super().update(dt)
 
         if self.power_committed:
             return  # committed to reboot/shutdown; ignore input until we're stopped
 
-        # clear the volume bar once its dwell time is up, restoring the base display
+        # clear the volume bar once its dwell time is up; the arm display is beneath
         if self.bar_deadline is not None and self.now_ms > self.bar_deadline:
-            self.bar_deadline = None
-            self.game.lasers.set_word(self._base_laser_word())
+            self._hide_volume_bar()
 
         # expire a stale armed selection
         if self.armed is not None and self.now_ms > self.arm_deadline:
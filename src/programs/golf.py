@@ -61,21 +61,19 @@ class Golf(Program):
         self.blink_on = True
         self.word = 0
         self.prev_word = None
-        self.release_pending = { } # used for anti-jitter protection on physical button release
         self.last_blink_toggle = 0
         self.goals_scored = 0
         self.goals_to_complete = config.Golf.GOALS_TO_COMPLETE #3
         pygame.mixer.music.set_volume(1)
         self.game.mixer.load_music(self.music, fade_ms=2000)
-        self.game.mixer.load_effect(self.fall_off_sound, volume=0.5)
-        self.game.mixer.load_effect(self.win_sound, volume=0.4)
-        self.game.mixer.load_effect(self.advance_port_sound, volume=0.3)
-        self.game.mixer.load_effect(self.congrats_sound, volume=config.CONGRATS_VOL)
-        for feedback in self.voice_feedback:
-            self.game.mixer.load_effect(feedback)
+        # None of these play before the first swing lands: they decode in the
+        # background meanwhile.
+        self.game.mixer.prefetch([self.fall_off_sound], volume=0.5)
+        self.game.mixer.prefetch([self.win_sound], volume=0.4)
+        self.game.mixer.prefetch([self.advance_port_sound], volume=0.3)
+        self.game.mixer.prefetch(self.voice_feedback)
+        self.game.mixer.prefetch([self.congrats_sound], volume=config.CONGRATS_VOL)
         self.game.mixer.use_patch(self.patch)
-        self.congrats_dur = self.game.mixer.effects[self.congrats_sound].get_length()
-        self.win_animation = random_k_dance(k=3, fps=8, dur=max(0,self.congrats_dur-1.2))
         self.reset()
 
     def reset(self, goal=13, tries_left=3):
@@ -93,11 +91,20 @@ class Golf(Program):
         self.set_word(0)
 
     def update_blink_animation(self):
-        """Toggle the blinking target hole at the configured duty cycle."""
-        elapsed = self.program_t - self.last_blink_toggle
-        if elapsed >= self.blink_ms_to_wait[self.blink_on]:
+        """Toggle the blinking target hole at the configured duty cycle.
+
+        Each toggle is anchored to when the previous one was due, not to the
+        frame that noticed it, so the blink keeps its period instead of
+        stretching by up to a frame per half-cycle (after a long stall it
+        re-anchors on the current frame).
+        """
+        due = self.last_blink_toggle + self.blink_ms_to_wait[self.blink_on]
+        if self.program_t >= due:
             self.blink_on = not self.blink_on
-            self.last_blink_toggle = self.program_t
+            if self.program_t - due < self.blink_ms_to_wait[self.blink_on]:
+                self.last_blink_toggle = due
+            else:
+                self.last_blink_toggle = self.program_t
             #if not (self.swinging or self.rolling):
             #    self.set_word(0)
             self.refresh_word() # blink even if no one is calling set_word (e.g. in waiting state)
@@ -169,6 +176,20 @@ class Golf(Program):
         """Re-apply the cached word (used to keep the target blinking)."""
         self.set_word(self.prev_word)
 
+    def upcoming_words(self, until_ms):
+        """The target hole's blink toggles up to ``until_ms``, over the cached word."""
+        if self.prev_word is None:
+            return []
+        words = []
+        on, toggle = self.blink_on, self.last_blink_toggle
+        while True:
+            toggle += self.blink_ms_to_wait[on]
+            at = self.now_ms + toggle - self.program_t
+            if at > until_ms:
+                return words
+            on = not on
+            words.append((at, self.prev_word | on << self.goal))
+
     def fall_off(self):
         """Handle the ball rolling off the end: clear lasers, play the splash."""
         print(inspect.stack()[0][3])
@@ -189,6 +210,8 @@ class Golf(Program):
 
     def complete(self):
         """Play the final celebration, then quit after it finishes."""
+        self.congrats_dur = self.game.mixer.effect_length(self.congrats_sound) or 3.0
+        self.win_animation = random_k_dance(k=3, fps=8, dur=max(0,self.congrats_dur-1.2))
         self.game.mixer.play_effect(self.congrats_sound)
         self.win_animation.start()
         print('golf game complete...')
@@ -260,29 +283,11 @@ class Golf(Program):
             print('You lost this round. Starting new round.')
             self.after(1000, self.reset, random.randint(8,13))
 
-    def release_pending_buttons(self):
-        """Anti-jitter: after a short delay, treat a button release as a swing.
-
-        Adds a small delay before acting on a physical release so contact
-        bounce doesn't trigger a premature swing.
-        """
-        to_release = []
-        for key, deadline in self.release_pending.items():
-            if self.now_ms - deadline > 0:
-                # deadline has passed, trigger action
-                to_release.append(key)
-                self.stop_swinging()
-                self.start_rolling()
-        for key in to_release:
-            print('realeasing', key)
-            self.release_pending.pop(key)
-
-
     def update(self, dt):
         """Per-frame: drive blink/charge/roll, and handle button & toggle events."""
         super().update(dt)
-        self.update_blink_animation()
         self.program_t += dt
+        self.update_blink_animation()
 
         if self.swinging:
             self.get_velocity((self.now_ms - self.swing_start) / 1000)  # seconds
@@ -294,29 +299,18 @@ class Golf(Program):
         for event in events.get():
             if event.type == EventType.BUTTON_DOWN:
                 print('button down fired')
-                if self.release_pending.get(event.key):
-                    # button re-engaged in release anti-jitter interval; cancel pending swing release
-                    print('*cancelled pending swing release*')
-                    self.release_pending.pop(event.key)
                 if event.key in self.buttons and not (self.swinging or self.rolling or self.grading):
                     self.start_swinging()
 
             elif event.type == EventType.BUTTON_UP:
                 print('button up fired')
-                # anti-jitter protection
+                # releases arrive debounced (InputManager), so a release is the swing
                 if event.key in self.buttons and self.swinging and not (self.rolling or self.grading):
-                    # make sure no release is currently pending
-                    if self.release_pending:
-                        continue
-                    else:
-                        self.release_pending[event.key] = (
-                            self.now_ms + config.ANTI_JITTER_DELAY * 1000)
+                    self.stop_swinging()
+                    self.start_rolling()
 
             elif isinstance(event, ToggleEvent):
                 toggle_state = self.game.input_manager.state.toggles
                 self.reset(random.randint(8,13))
 
-        # anti-jitter protection
-        self.release_pending_buttons()
-
 Golf()
@@ -43,14 +43,12 @@ class MusicMaker(Program):
         pass
 
     def update(self, dt):
-        """Play a note on button-down (rate-limited); fade it on button-up."""
+        """Play a note on button-down; fade it on button-up."""
         super().update(dt)
         # check event loop for input changes
         for event in events.get():
             if event.type == EventType.BUTTON_DOWN:
-                if event.key not in self.cooldowns:
-                    self.game.mixer.play_by_id(event.key, duck=False)
-                    self.start_cooldown(event.key, ms=100)
+                self.game.mixer.play_by_id(event.key, duck=False)
             elif event.type == EventType.BUTTON_UP:
                 self.game.mixer.fadeout_by_id(event.key, ms=200)
 
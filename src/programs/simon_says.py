@@ -38,8 +38,6 @@ class SimonSays(Program):
     AFFIRM_VOICES = [os.path.join("simon", f"{w}.wav")
                      for w in ("good", "nice", "swell")]
 
-    ECHO_COOLDOWN_MS = 120   # debounce so a bouncing button doesn't double-fire
-
     def __init__(self):
         super().__init__()
 
@@ -55,12 +53,12 @@ class SimonSays(Program):
         self.cheer_ms = cfg.CHEER_MS
 
         # Audio: ascending kicks per step, plus spoken/buzzer feedback. Loaded in
-        # start() (not __init__) so it is valid against the current mixer.
+        # start() (not __init__) so it is valid against the current mixer. The
+        # welcome plays at once; the rest decode in the background during it.
         self.game.mixer.use_patch(cfg.PATCH)
-        for name in (self.WELCOME, self.WIN_VOICE, self.GAMEOVER_VOICE,
-                     self.BUZZ, self.HOORAY, *self.MISTAKE_VOICE.values(),
-                     *self.AFFIRM_VOICES):
-            self.game.mixer.load_effect(name)
+        self.game.mixer.load_effect(self.WELCOME)
+        self.game.mixer.prefetch([*self.AFFIRM_VOICES, self.BUZZ, *self.MISTAKE_VOICE.values(),
+                                  self.GAMEOVER_VOICE, self.HOORAY, self.WIN_VOICE])
 
         # Run state: reset everything since start() may run more than once.
         self.pattern = []
@@ -72,9 +70,7 @@ class SimonSays(Program):
         self.game.lasers.set_word(0)
         # Play the welcome line, then start on our own once it finishes; a press
         # during it skips the rest and starts immediately (see _on_button_down).
-        welcome_ms = self.game.mixer.effects[self.WELCOME].get_length() * 1000
-        self.game.mixer.play_effect(self.WELCOME)
-        self.after(welcome_ms, self._auto_begin)
+        self._welcome = self.game.mixer.play_effect(self.WELCOME, on_end=self._auto_begin)
 
     def quit(self):
         """Clear the lasers and hand control back to the state machine."""
@@ -113,22 +109,22 @@ class SimonSays(Program):
             self.game.lasers.turn_off(button_id)
 
     def _echo(self, button_id):
-        """Light + sound the pressed laser (rate-limited against bounce)."""
+        """Light + sound the pressed laser (presses arrive already debounced)."""
         self.game.lasers.turn_on(button_id)
-        if button_id not in self.cooldowns:
-            self.game.mixer.play_by_id(button_id, duck=False)
-            self.start_cooldown(button_id, ms=self.ECHO_COOLDOWN_MS)
+        self.game.mixer.play_by_id(button_id, duck=False)
 
     # -- game flow ----------------------------------------------------------
     def _auto_begin(self):
         """Welcome finished on its own: start the game, no press needed."""
+        if not self.awaiting_start:
+            return  # already begun
         self.awaiting_start = False
         self.begin_game()
 
     def _skip_welcome(self):
         """A press during the welcome: cut it short and start the game now."""
-        self.scheduler = []  # drop the pending auto-start
-        self.game.mixer.effects[self.WELCOME].stop()
+        self._welcome.stop()
+        self._welcome.cancel()  # drop the pending auto-start
         self._auto_begin()
 
     def begin_game(self):
@@ -202,6 +198,7 @@ class SimonSays(Program):
         """Reached WIN_LENGTH: celebrate, then quit back to the menu."""
         self.game.mixer.play_effect(self.HOORAY)
         self.after(300, self.game.mixer.play_effect, self.WIN_VOICE)
+        self._clear_play_lasers()  # dark once the dance ends
         random_k_dance(k=3, fps=8, dur=2.5).start()
         self.after(3200, self.quit)
 
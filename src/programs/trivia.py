@@ -93,11 +93,12 @@ class Trivia(Program):
         self._enter_ready()
 
     def _setup_thinking_song(self):
-        """Resolve the thinking song and measure its length (the answer clock).
+        """Resolve the thinking song and start measuring its length (the answer clock).
 
-        The song's length becomes each answer window, so measure it once up
-        front. A missing/unreadable asset leaves ``_song_len_ms`` None and the
-        answer window falls back to ``ANSWER_TIMEOUT_MS`` -- the game still runs.
+        The song's length becomes each answer window, so it is measured in the
+        background from the start and read when the first window opens. A
+        missing/unreadable asset leaves ``_song_len_ms`` None and the answer
+        window falls back to ``ANSWER_TIMEOUT_MS`` -- the game still runs.
         """
         self.thinking_song = self.cfg.THINKING_SONG
         self.thinking_song_vol = self.cfg.THINKING_SONG_VOL
@@ -105,9 +106,7 @@ class Trivia(Program):
         self._song_playing = False
         self._song_len_ms = None
         if self.thinking_song:
-            secs = self.game.mixer.music_length(self.thinking_song)
-            if secs:
-                self._song_len_ms = int(secs * 1000)
+            self.game.mixer.measure_music(self.thinking_song)
 
     def teardown(self):
         """Stop any voice-over and release the reserved VO channel, then base."""
@@ -145,7 +144,7 @@ class Trivia(Program):
         self.first_team = None      # who buzzed first this question (steal routing)
         self.armed_slot = None      # choice slot armed but not yet locked in
         self.answer_deadline = None
-        self._answer_gen = 0        # per-turn token guarding a deferred song start
+        self._answer_timer = None   # a deferred song start, cancelled when a new turn begins
         self.buzz_deadline = None
         self.ready_deadline = None
         self.ready = {"black": False, "white": False}
@@ -176,15 +175,26 @@ class Trivia(Program):
 
     # -- per-frame update ---------------------------------------------------
     def update(self, dt):
-        """Service timers, then dispatch input by phase."""
+        """Dispatch input by phase in press order, then service timers.
+
+        Presses are replayed in the order they were sampled (``t_ns``), each
+        after checking the timers *as of that press*. So the team that pressed
+        first wins a buzz race even when both presses land in one frame, and a
+        press made before a window closed still counts when a stalled frame
+        only gets to it after the deadline.
+        """
         super().update(dt)
+        presses = [e for e in events.get() if e.type == EventType.BUTTON_DOWN]
+        presses.sort(key=self.event_ms)
+        for event in presses:
+            self._check_timers(self.event_ms(event))
+            self._on_button_down(event.key)
         self._check_timers()
-        for event in events.get():
-            if event.type == EventType.BUTTON_DOWN:
-                self._on_button_down(event.key)
 
-    def _check_timers(self):
-        now = self.now_ms
+    def _check_timers(self, now=None):
+        """Fire any buzz/answer/ready timeout due at ``now`` (default ``now_ms``)."""
+        if now is None:
+            now = self.now_ms
         if self.phase is _Phase.ASKING and self.buzz_deadline is not None:
             # short buzz-in window, no warning (the window itself is the warning)
             if now > self.buzz_deadline:
@@ -228,15 +238,15 @@ class Trivia(Program):
         self.game.mixer.play_effect(self.BUZZ_IN)
         if all(self.ready.values()):
             self.ready_deadline = None
-            self.after(self.READY_BEAT_MS, self._begin_match)
+            self.spawn(self._begin_match())
 
-    def _begin_match(self):
+    async def _begin_match(self):
+        await self.sleep(self.READY_BEAT_MS)
         self._all_off()
         # announce the win condition ("first team to N wins"), then kick off
-        self.voice.say_first_to(
-            self.cfg.TARGET_SCORE,
-            on_done=lambda: self.voice.say_line("lets_begin",
-                                                on_done=self._next_question))
+        await self._speak(self.voice.say_first_to, self.cfg.TARGET_SCORE)
+        await self._speak(self.voice.say_line, "lets_begin")
+        self._next_question()
 
     # -- question flow ------------------------------------------------------
     def _next_question(self):
@@ -294,21 +304,24 @@ class Trivia(Program):
         self.current_stakes = stakes
         self.armed_slot = None
         self.answer_deadline = None     # opens when the clock (song) starts
-        self._answer_gen += 1
+        if self._answer_timer is not None:
+            self._answer_timer.cancel()  # an earlier turn's start must not fire in this one
+            self._answer_timer = None
         if delay_ms > 0:
             # let the "<team> team" confirmation finish before the song/clock
-            self.after(delay_ms, self._start_answer_clock, self._answer_gen)
+            self._answer_timer = self.after(delay_ms, self._start_answer_clock)
         else:
-            self._start_answer_clock(self._answer_gen)
+            self._start_answer_clock()
 
-    def _start_answer_clock(self, gen):
+    def _start_answer_clock(self):
         """Start the thinking song and open the answer window (= its length).
 
-        The token ``gen`` (and the phase) guard a *deferred* start: if the turn
-        already resolved or a new one began before this fires, it is a no-op, so a
-        stale delayed start never plays a stray song or sets a phantom deadline.
+        A *deferred* start is cancelled when a new turn begins, and the phase
+        check drops it if the turn already resolved, so a stale delayed start
+        never plays a stray song or sets a phantom deadline.
         """
-        if gen != self._answer_gen or self.phase is not _Phase.ANSWERING:
+        self._answer_timer = None
+        if self.phase is not _Phase.ANSWERING:
             return
         # the thinking song doubles as the timer: the window is its length
         window_ms = self._start_thinking_song()
@@ -325,6 +338,10 @@ class Trivia(Program):
         to ``ANSWER_TIMEOUT_MS`` when the asset is absent so the game still runs.
         """
         self._song_playing = False
+        if self.thinking_song and self._song_len_ms is None:
+            secs = self.game.mixer.music_length(self.thinking_song, wait_ms=config.LOAD_WAIT_MS)
+            if secs:
+                self._song_len_ms = int(secs * 1000)
         if self.thinking_song and self._song_len_ms:
             try:
                 self.game.mixer.load_music(self.thinking_song, loops=0)
@@ -450,7 +467,13 @@ class Trivia(Program):
         if key != "tie":
             self.game.mixer.play_effect(self.CONGRATS)   # fanfare under the dance
             random_k_dance(k=3, fps=8, dur=2.5).start()
-        self.voice.say_line(key, on_done=lambda: self.after(self.END_BEAT_MS, self.quit))
+        self.spawn(self._sign_off(key))
+
+    async def _sign_off(self, key):
+        """Announce the result, let the winner line + dance play, then quit."""
+        await self._speak(self.voice.say_line, key)
+        await self.sleep(self.END_BEAT_MS)
+        self.quit()
 
     # -- feedback -----------------------------------------------------------
     def _feedback_correct(self):
@@ -473,14 +496,20 @@ class Trivia(Program):
             self.game.lasers.set_value(button, 1 if on else 0)
 
     # -- helpers ------------------------------------------------------------
+    def _speak(self, say, *args):
+        """Start a voice line; the returned signal resolves when it finishes.
+
+        ``await self._speak(self.voice.say_line, key)``. Like ``on_done``, it
+        only resolves on natural completion: an interrupted line leaves the
+        awaiting coroutine parked until teardown cancels it.
+        """
+        done = self.signal()
+        say(*args, on_done=done)
+        return done
+
     def _all_off(self):
-        """Clear every laser via per-port writes. Plain ``set_word(0)`` leaves
-        LaserBay's per-port state stale, so a later ``turn_on`` recomputes the
-        word from ports and can re-light a laser that was 'cleared' (e.g. the
-        first team's endcap lingering into a steal when they never armed a
-        choice). Per-port turn_off keeps word and ports consistent."""
-        for laser_id in range(14):
-            self.game.lasers.turn_off(laser_id)
+        """Clear every laser."""
+        self.game.lasers.set_word(0)
 
     def _ordinal(self):
         """Question number for the intro clip ("vo/question_<n>.wav").
@@ -13,13 +13,20 @@ talks only to the :class:`Voice` interface, so the concrete backend is swappable
 
 **Interruptibility** is the delicate part and lives in :class:`_VoSequencer`.
 Voice-over plays on a *dedicated reserved channel* so it can be cut without
-touching one-shot sound effects (the buzz tone keeps playing). A monotonic
-generation token guards every scheduled clip advance, so a buzz mid-question
-cancels the whole remaining clip sequence atomically -- a stale, already-queued
-callback can never resurrect cancelled audio.
+touching one-shot sound effects (the buzz tone keeps playing). Each clip starts
+once the mixer reports the one before it has stopped playing (plus the gap).
+Only one step is ever in flight -- the clip's playback or the advance scheduled
+after it -- and an interrupt cancels both, so a buzz mid-question cancels the
+whole remaining clip sequence atomically -- a stale, already-queued callback can
+never resurrect cancelled audio.
+
+Clips are decoded in the background: an utterance starts loading all of its
+clips at once, and each is only fetched (waiting briefly if need be) when its
+turn to play comes, so the clips before it cover the load.
 """
 from __future__ import annotations
 
+import functools
 import os
 import socket
 import sys
@@ -32,56 +39,73 @@ from .trivia_stats import AskCounts
 
 
 class _VoSequencer:
-    """Plays an ordered list of Sounds gaplessly on one channel, interruptibly.
+    """Plays an ordered list of Sounds back to back on one channel, interruptibly.
 
     Args:
+        mixer: The game :class:`~src.audio_utils.Mixer`; it watches the channel
+            and reports when each clip stops playing.
         channel: A reserved ``pygame.mixer.Channel`` (or ``None`` to no-op the
             audio, e.g. when the mixer isn't initialised).
-        schedule: The owning program's ``after(ms, fn, *args)`` scheduler.
+        schedule: The owning program's ``after(ms, fn, *args)`` scheduler; the
+            handle it returns is cancelled to stop the sequence.
         gap_ms: Silence inserted between consecutive clips.
     """
 
-    def __init__(self, channel, schedule, gap_ms=120):
+    def __init__(self, mixer, channel, schedule, gap_ms=120):
+        self._mixer = mixer
         self._channel = channel
         self._schedule = schedule
         self._gap_ms = gap_ms
-        self._gen = 0           # bumped on every play()/interrupt()
+        self._playing = None    # the clip's Playback, cancelled on interrupt()
+        self._pending = None    # the scheduled _advance, cancelled on interrupt()
         self._queue: list = []
         self._on_done = None
 
     def play(self, sounds, on_done=None):
         """Interrupt anything in flight, then play ``sounds`` in order.
 
+        Each item is a Sound, or a callable returning one (or None to skip it)
+        that is called when its turn comes.
+
         ``on_done`` (if given) is called once, only on *natural* completion of
         the whole sequence -- never when interrupted.
         """
         self.interrupt()
-        self._gen += 1
         self._queue = [s for s in sounds if s is not None]
         self._on_done = on_done
-        self._advance(self._gen)
+        self._advance()
 
-    def _advance(self, gen):
-        if gen != self._gen:
-            return  # a newer play()/interrupt() superseded this scheduled call
+    def _advance(self):
+        self._pending = None
         if not self._queue:
             cb, self._on_done = self._on_done, None
             if cb:
                 cb()
             return
         sound = self._queue.pop(0)
-        dur_ms = self._gap_ms
+        if callable(sound):
+            sound = sound()
         if self._channel is not None and sound is not None:
             try:
-                self._channel.play(sound)
-                dur_ms = int(sound.get_length() * 1000) + self._gap_ms
+                self._playing = self._mixer.play(sound, channel=self._channel,
+                                                 on_end=self._clip_ended)
+                return
             except Exception as e:  # pragma: no cover - audio backend dependent
                 print(f"[Trivia] VO clip play failed: {e}")
-        self._schedule(dur_ms, self._advance, gen)
+        self._clip_ended()
+
+    def _clip_ended(self):
+        self._playing = None
+        self._pending = self._schedule(self._gap_ms, self._advance)
 
     def interrupt(self):
         """Stop the current clip and drop the rest of the sequence."""
-        self._gen += 1          # invalidate any in-flight _advance(gen)
+        if self._playing is not None:
+            self._playing.cancel()  # its end must not advance the sequence
+            self._playing = None
+        if self._pending is not None:
+            self._pending.cancel()  # drop the in-flight _advance
+            self._pending = None
         self._queue = []
         self._on_done = None
         if self._channel is not None:
@@ -173,7 +197,8 @@ class PrebakedVoice(Voice):
         self.mixer = mixer
         self.dir = config.Trivia.EFFECT_DIR
         gap = config.Trivia.VO_GAP_MS if gap_ms is None else gap_ms
-        self.seq = _VoSequencer(self._acquire_channel(), schedule, gap)
+        self.seq = _VoSequencer(mixer, self._acquire_channel(), schedule, gap)
+        self._prefetch(self.STATIC.values())  # decodes while the teams buzz in
 
     def _acquire_channel(self):
         """Reserve a channel for VO so interrupting it never cuts sfx."""
@@ -189,17 +214,25 @@ class PrebakedVoice(Voice):
         return os.path.join(self.dir, rel)
 
     def _sound(self, rel):
-        """Load (tolerantly) and return the Sound for ``rel`` under EFFECT_DIR."""
-        path = self._rel(rel)
-        try:
-            self.mixer.load_effect(path)
-            return self.mixer.effects[path]
-        except Exception as e:
-            print(f"[Trivia] missing VO clip {path!r}: {e}")
-            return None
+        """Return the Sound for ``rel`` under EFFECT_DIR, or None (tolerantly).
+
+        A clip that is not cached is waited for at most ``config.LOAD_WAIT_MS``;
+        one still loading, or missing, is None (the mixer logs it). Clips are
+        cached unpinned: a question's lines are evicted first once the mixer's
+        sound budget fills.
+        """
+        return self.mixer.get_effect(self._rel(rel))
+
+    def _prefetch(self, rels):
+        self.mixer.prefetch([self._rel(r) for r in rels], pin=False)
 
     def _sounds(self, rels):
-        return [self._sound(r) for r in rels]
+        """Start loading ``rels`` and return a clip per rel for the sequencer.
+
+        Each is resolved by :meth:`_sound` when its turn to play comes.
+        """
+        self._prefetch(rels)
+        return [functools.partial(self._sound, r) for r in rels]
 
     def _number_clips(self, n):
         """Clip(s) that voice an integer score (handles negatives)."""
@@ -214,11 +247,11 @@ class PrebakedVoice(Voice):
 
     # -- speech -------------------------------------------------------------
     def preload(self, questions):
-        """Warm the Sound cache for a match's questions (best effort)."""
+        """Start loading a match's questions into the Sound cache (never blocks)."""
         for q in questions:
             rels = [self._q_clip(q, "question")]
             rels += [self._q_clip(q, f"choice{i}") for i in range(len(q.choices))]
-            self._sounds(rels)
+            self._prefetch(rels)
 
     def say_line(self, key, on_done=None):
         self.seq.play(self._sounds([self.STATIC[key]]), on_done)
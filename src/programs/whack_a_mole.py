@@ -102,13 +102,15 @@ class WhackAMole(Program):
         # Sound effects, loaded in start() (not __init__) so the Sounds are valid
         # against the current mixer, which other programs may have re-initialised.
         # ``hammer`` fires on every press (the mallet swing), ``mole_hit`` only on a
-        # successful whack, ``popup`` on each spawn. The spoken stubs + shared
-        # celebration load defensively -- a missing wav is simply skipped at play.
-        self._safe_load_effect(self.popup, volume=0.6)
-        self._safe_load_effect(self.hammer, volume=0.7)
-        self._safe_load_effect(self.mole_hit, volume=0.9)
-        for name in (
-            self.welcome,
+        # successful whack, ``popup`` on each spawn. Only the welcome plays at
+        # once and loads here; the game sounds, the spoken stubs, the number bank
+        # and the celebration decode in the background, in the order they are
+        # needed. A missing wav is logged then and simply skipped at play.
+        self._safe_load_effect(self.welcome)
+        self.game.mixer.prefetch([self.hammer], volume=0.7)
+        self.game.mixer.prefetch([self.popup], volume=0.6)
+        self.game.mixer.prefetch([self.mole_hit], volume=0.9)
+        spoken = [
             self.result_single,
             self.p1_wins,
             self.p2_wins,
@@ -124,18 +126,14 @@ class WhackAMole(Program):
             self.and_got,
             self.miss_word,
             self.misses_word,
-        ):
-            self._safe_load_effect(name)
+        ]
         # Number bank for the spoken score: ones/teens 0-19 + tens 20..90 + hundreds
         # 100/200, from which any 0-299 is composed (see _number_clips).
         for value in list(range(20)) + [20, 30, 40, 50, 60, 70, 80, 90, 100, 200]:
-            self._safe_load_effect(self._num_clip(value))
-        self._safe_load_effect(self.congrats, volume=config.CONGRATS_VOL)
-        self._congrats_dur = (
-            self.game.mixer.effects[self.congrats].get_length()
-            if self.congrats in self.game.mixer.effects
-            else 3.0
-        )
+            spoken.append(self._num_clip(value))
+        self.game.mixer.prefetch(spoken)
+        self.game.mixer.prefetch([self.congrats], volume=config.CONGRATS_VOL)
+        self._congrats_dur = None  # read from the clip when first celebrated
         # Fallback bonk if the hit folder is empty.
         try:
             self.game.mixer.use_patch(self.fallback_patch)
@@ -150,6 +148,7 @@ class WhackAMole(Program):
         self.misses = {}  # side name -> moles that timed out unwhacked
         self.spawn_count = {}  # side name -> total moles spawned (for balance)
         self.moles = {}  # port -> remaining lifetime (ms)
+        self._aged_ms = self.now_ms  # now_ms the lifetimes above were last aged to
         self._clock_ms = 0.0  # free-running clock for blink/prompt phases
         self._elapsed_ms = 0.0  # time into the current round
         self._spawn_accum = 0.0  # accumulator that triggers spawns
@@ -172,7 +171,7 @@ class WhackAMole(Program):
 
         for event in events.get():
             if event.type == EventType.BUTTON_DOWN:
-                self._on_button_down(event.key)
+                self._on_button_down(event.key, self.event_ms(event))
 
         if self.phase == self.PLAY:
             self._elapsed_ms += dt
@@ -182,15 +181,22 @@ class WhackAMole(Program):
         self._render()
 
     # -- input --------------------------------------------------------------
-    def _on_button_down(self, button_id):
-        """Pick the mode in READY; whack in PLAY; ignore presses in RESULT."""
+    def _on_button_down(self, button_id, press_ms=None):
+        """Pick the mode in READY; whack in PLAY; ignore presses in RESULT.
+
+        A whack is judged at ``press_ms`` (when the button actually went down,
+        see :meth:`Program.event_ms`), not when the frame handles it: a mole whose
+        lifetime ran out before the press is not hit, even if a late frame has
+        not aged it off the board yet.
+        """
         if self.phase == self.READY:
             return self._select_mode(button_id)
         if self.phase != self.PLAY:
             return
         self._safe_play_effect(self.hammer)  # the mallet swings on *every* press
         if button_id in self.moles:
-            self._hit(button_id)
+            if press_ms is None or press_ms <= self._aged_ms + self.moles[button_id]:
+                self._hit(button_id)
         # An empty hole still swings the hammer but scores nothing (you can flail).
 
     def _select_mode(self, button_id):
@@ -227,6 +233,7 @@ class WhackAMole(Program):
         self.misses = {name: 0 for name, _ in self.sides}
         self.spawn_count = {name: 0 for name, _ in self.sides}
         self.moles = {}
+        self._aged_ms = self.now_ms
         self._elapsed_ms = 0.0
         self._spawn_accum = 0.0
         self.phase = self.PLAY
@@ -237,6 +244,7 @@ class WhackAMole(Program):
 
     def _age_moles(self, dt):
         """Count down every mole; one that reaches zero has been missed (despawns)."""
+        self._aged_ms = self.now_ms
         for port in list(self.moles):
             self.moles[port] -= dt
             if self.moles[port] <= 0:
@@ -352,15 +360,22 @@ class WhackAMole(Program):
             if self._record_broken("versus_best", max(left, right)):
                 lines.append(self.new_record_vo)
 
-        # Speak the lines in order (skipping any unrecorded), then fire the
-        # celebration so the jingle never talks over an announcement.
-        delay = 0
+        self.spawn(self._announce(lines))
+
+    async def _announce(self, lines):
+        """Speak ``lines`` in order (skipping any unrecorded), celebrate, then quit.
+
+        Each line starts once the one before has stopped playing, and the
+        celebration only after the last, so the jingle never talks over an
+        announcement.
+        """
         for name in lines:
-            if name in self.game.mixer.effects:
-                self.after(delay, self._safe_play_effect, name)
-                delay += int(self.game.mixer.effects[name].get_length() * 1000) + 150
-        self.after(delay, self._celebrate)
-        self.after(delay + int(self._congrats_dur * 1000) + 400, self.quit)
+            if self.game.mixer.has_effect(name):
+                await self._play_through(name)
+                await self.sleep(150)
+        await self._celebrate()
+        await self.sleep(400)
+        self.quit()
 
     def _record_broken(self, key, value):
         """Update + persist saved record ``key`` if ``value`` beats it; return True if so.
@@ -380,11 +395,14 @@ class WhackAMole(Program):
         """Flash a celebratory k-dance (bigger on a new record) under the jingle.
 
         Used for both modes -- the winner is conveyed by the spoken result line, so
-        the dance can own the laser bay in 2-player too.
+        the dance can own the laser bay in 2-player too. Returns a signal that
+        resolves when the jingle stops.
         """
         k = 4 if self._broke_record else 3
+        if self._congrats_dur is None:
+            self._congrats_dur = self.game.mixer.effect_length(self.congrats) or 3.0
         random_k_dance(k=k, fps=8, dur=max(0.0, self._congrats_dur - 1.2)).start()
-        self._safe_play_effect(self.congrats)
+        return self._play_through(self.congrats)
 
     # -- rendering ----------------------------------------------------------
     def _render(self):
@@ -396,19 +414,55 @@ class WhackAMole(Program):
 
     def _render_prompt(self):
         """Alternately light the black and white halves to invite a mode choice."""
-        show_left = int(self._clock_ms // self.prompt_half_ms) % 2 == 0
-        ports = self.left_ports if show_left else self.right_ports
-        self.game.lasers.set_word(self._word(ports))
+        self.game.lasers.set_word(self._prompt_word(0.0))
+
+    def _prompt_word(self, ahead_ms):
+        """The mode prompt's laser word ``ahead_ms`` from now."""
+        show_left = int((self._clock_ms + ahead_ms) // self.prompt_half_ms) % 2 == 0
+        return self._word(self.left_ports if show_left else self.right_ports)
 
     def _render_moles(self):
         """Light every live mole; blink any in the final WARN_MS as a "leaving" cue."""
+        self.game.lasers.set_word(self._moles_word(0.0))
+
+    def _moles_word(self, ahead_ms):
+        """The moles' laser word ``ahead_ms`` from now, if none is whacked or spawned."""
         word = 0
-        blink_on = int(self._clock_ms // self.blink_half_ms) % 2 == 0
+        blink_on = int((self._clock_ms + ahead_ms) // self.blink_half_ms) % 2 == 0
         for port, remaining in self.moles.items():
-            if remaining < self.warn_ms and not blink_on:
+            remaining -= ahead_ms
+            if remaining <= 0 or (remaining < self.warn_ms and not blink_on):
                 continue
             word |= 1 << port
-        self.game.lasers.set_word(word)
+        return word
+
+    def upcoming_words(self, until_ms):
+        """The prompt's flips, or the moles' blinks and expiries, up to ``until_ms``.
+
+        Spawns and whacks are not known ahead; the next frame's plan picks them
+        up (see :meth:`Program.upcoming_words`).
+        """
+        if self.phase == self.READY:
+            half, word_at = self.prompt_half_ms, self._prompt_word
+        elif self.phase == self.PLAY:
+            half, word_at = self.blink_half_ms, self._moles_word
+        else:
+            return []
+        horizon = until_ms - self.now_ms
+        edges = [k * half - self._clock_ms
+                 for k in range(int(self._clock_ms // half) + 1,
+                                int((self._clock_ms + horizon) // half) + 1)]
+        if self.phase == self.PLAY:
+            for remaining in self.moles.values():
+                edges += [remaining - self.warn_ms, remaining]  # warn starts, expiry
+        words = []
+        prev = word_at(0.0)
+        for ahead in sorted(a for a in edges if 0 < a <= horizon):
+            word = word_at(ahead + 1e-6)  # just past the edge: no float ties
+            if word != prev:
+                words.append((self.now_ms + ahead, word))
+                prev = word
+        return words
 
     # -- helpers ------------------------------------------------------------
     def _side_of(self, port):
@@ -507,13 +561,28 @@ class WhackAMole(Program):
             print(f"[WhackAMole] missing effect {name!r}: {e}")
             return False
 
-    def _safe_play_effect(self, name):
-        """Play a previously loaded effect; a no-op if it never loaded."""
-        if name in self.game.mixer.effects:
+    def _safe_play_effect(self, name, on_end=None):
+        """Play a loaded (or still loading) effect; a no-op if it never loaded.
+
+        Returns:
+            The mixer's ``Playback``, or None if nothing played.
+        """
+        if self.game.mixer.has_effect(name):
             try:
-                self.game.mixer.play_effect(name)
+                return self.game.mixer.play_effect(name, on_end=on_end)
             except Exception as e:
                 print(f"[WhackAMole] could not play {name!r}: {e}")
+        return None
+
+    def _play_through(self, name):
+        """Play effect ``name``; returns a signal that resolves once it stops.
+
+        It resolves at once if the effect could not play.
+        """
+        done = self.signal()
+        if self._safe_play_effect(name, on_end=done) is None:
+            done()
+        return done
 
     def _safe_load_music(self, name):
         """Start a non-looping backing track if present; quietly skip if it is missing."""
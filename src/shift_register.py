@@ -2,19 +2,25 @@
 
 laserbox reads 16 inputs (14 buttons + 2 toggles) through a 74HC165 PISO
 register and drives 16 outputs (14 lasers + 2 spare) through a 74HC595 SIPO
-register, both bit-banged over the Raspberry Pi's GPIO (BCM numbering).
+register, both bit-banged over the Raspberry Pi's GPIO (BCM numbering). A
+larger cabinet cascades more chips; the drivers' default widths follow
+``config.N_PORTS`` (see :mod:`src.ports`).
 
 ``RPi.GPIO`` only exists on the Pi, so the import is guarded: it is skipped on
 non-Linux platforms and when running the simulator (``-s``). The desktop
 simulator substitutes dummy register classes (see
 :mod:`src.simulator.simulator`) that satisfy the same ``read_word`` /
-``push_word`` interface.
+``push_word`` interface. Tests and benchmarks pass a
+:class:`~src.fake_gpio.FakeGPIO` as ``gpio`` to run the real drivers off the Pi.
 """
 import time
 import sys
+from . import clock, ports
 from .config import config
 if sys.platform == 'linux' and '-s' not in sys.argv:
     import RPi.GPIO as GPIO
+else:
+    GPIO = None
 
 
 class OutputShiftRegister:
@@ -27,26 +33,30 @@ class OutputShiftRegister:
         RCLK: BCM pin for the storage-register (latch) clock.
         SRCLK: BCM pin for the shift-register clock.
         SER: BCM pin for serial data in.
-        n_outputs: Number of output bits (across cascaded chips).
+        n_outputs: Number of output bits (across cascaded chips; default
+            :func:`ports.output_chain() <src.ports.output_chain>`).
+        gpio: GPIO module to drive (default ``RPi.GPIO``; a
+            :class:`~src.fake_gpio.FakeGPIO` in tests).
     """
     DELAY = config.REGISTER_DELAY #1e-4 # 100us
-    def __init__(self, RCLK=3, SRCLK=4, SER=2, n_outputs=16):
+    def __init__(self, RCLK=3, SRCLK=4, SER=2, n_outputs=None, gpio=None):
         self.RCLK = RCLK    # output
         self.SRCLK = SRCLK  # output
         self.SER = SER      # output
-        self.n_outputs = n_outputs
+        self.n_outputs = n_outputs if n_outputs is not None else ports.output_chain()
+        self.GPIO = gpio if gpio is not None else GPIO
         self._init()
 
     def _init(self):
         """Configure the GPIO pins as outputs and clear the register."""
-        GPIO.setmode(GPIO.BCM)
+        self.GPIO.setmode(self.GPIO.BCM)
         chan_list = [self.RCLK, self.SRCLK, self.SER]
-        GPIO.setup(chan_list, GPIO.OUT, initial=GPIO.LOW)
+        self.GPIO.setup(chan_list, self.GPIO.OUT, initial=self.GPIO.LOW)
         self.clear()
 
     def push_bit(self, bit):
         """Shift a single bit in on ``SER`` and pulse the shift clock."""
-        GPIO.output(self.SER, bit)
+        self.GPIO.output(self.SER, bit)
         self.pulse(self.SRCLK)
 
     def push_word(self, word):
@@ -62,9 +72,9 @@ class OutputShiftRegister:
 
     def pulse(self, pin):
         """Pulse ``pin`` high then low (a clock edge)."""
-        GPIO.output(pin, 1)
+        self.GPIO.output(pin, 1)
         #time.sleep(self.DELAY)
-        GPIO.output(pin, 0)
+        self.GPIO.output(pin, 0)
 
 
 
@@ -78,35 +88,40 @@ class InputShiftRegister:
         SH_LD: BCM pin for shift/load (IC pin 1).
         CLK: BCM pin for the clock (IC pin 2).
         QH: BCM pin reading serial data out of the cascaded IC (pin 10).
-        n_outputs: Number of input bits (across cascaded chips).
+        n_outputs: Number of input bits (across cascaded chips; default
+            :func:`ports.input_chain() <src.ports.input_chain>`).
+        gpio: GPIO module to drive (default ``RPi.GPIO``; a
+            :class:`~src.fake_gpio.FakeGPIO` in tests).
     """
     DELAY = config.REGISTER_DELAY #1e-4 # 100us
     def __init__(self, SH_LD=21, # to IC pin # 1
                         CLK=20,  # to IC pin # 2
                         QH=16,  # from cascaded IC pin # 10
-                        n_outputs=16):
+                        n_outputs=None,
+                        gpio=None):
         self.SH_LD = SH_LD  # output
         self.CLK = CLK      # output
         self.QH = QH      # input
-        self.n_outputs = n_outputs
+        self.n_outputs = n_outputs if n_outputs is not None else ports.input_chain()
+        self.GPIO = gpio if gpio is not None else GPIO
         self._init()
 
     def _init(self):
         """Configure SH_LD/CLK as outputs and QH as input."""
-        GPIO.setmode(GPIO.BCM)
-        GPIO.setup(self.SH_LD, GPIO.OUT, initial=GPIO.HIGH)
-        GPIO.setup(self.CLK, GPIO.OUT, initial=GPIO.LOW)
-        GPIO.setup(self.QH, GPIO.IN)
+        self.GPIO.setmode(self.GPIO.BCM)
+        self.GPIO.setup(self.SH_LD, self.GPIO.OUT, initial=self.GPIO.HIGH)
+        self.GPIO.setup(self.CLK, self.GPIO.OUT, initial=self.GPIO.LOW)
+        self.GPIO.setup(self.QH, self.GPIO.IN)
 
     def read_word(self):
-        """Latch the inputs and clock them in, returning the 16-bit word."""
-        GPIO.output(self.SH_LD, 0)
+        """Latch the inputs and clock them in, returning the input word."""
+        self.GPIO.output(self.SH_LD, 0)
         #time.sleep(self.DELAY)    # Take snapshot of button state
-        GPIO.output(self.SH_LD, 1)
+        self.GPIO.output(self.SH_LD, 1)
 
         word = 0x00
         for i in reversed(range(self.n_outputs)):
-            bit = GPIO.input(self.QH)
+            bit = self.GPIO.input(self.QH)
             word |= (bit << i)
             self.pulse(self.CLK)
             #time.sleep(self.DELAY)
@@ -114,6 +129,212 @@ class InputShiftRegister:
 
     def pulse(self, pin):
         """Pulse ``pin`` high then low (a clock edge)."""
-        GPIO.output(pin, 1)
+        self.GPIO.output(pin, 1)
         #time.sleep(self.DELAY)
-        GPIO.output(pin, 0)
+        self.GPIO.output(pin, 0)
+
+
+class MmapOutputShiftRegister(OutputShiftRegister):
+    """:class:`OutputShiftRegister` driven through the mmapped GPIO registers.
+
+    Same pins, same bit order and the same ``push_word`` interface, but each
+    edge is a single store into :attr:`GpioMem.regs <src.gpio_mmap.GpioMem>`
+    instead of an ``RPi.GPIO.output`` call (``config.REGISTER_BACKEND =
+    "mmap"``): data, rising shift edge, falling shift edge per bit.
+
+    Args:
+        RCLK: BCM pin for the storage-register (latch) clock.
+        SRCLK: BCM pin for the shift-register clock.
+        SER: BCM pin for serial data in.
+        n_outputs: Number of output bits (across cascaded chips).
+        mem: A :class:`~src.gpio_mmap.GpioMem` (default: map ``/dev/gpiomem``;
+            a :class:`~src.gpio_mmap.FakeGpioMem` in tests).
+    """
+    def __init__(self, RCLK=3, SRCLK=4, SER=2, n_outputs=None, mem=None):
+        from .gpio_mmap import GpioMem
+        self.mem = mem if mem is not None else GpioMem()
+        super().__init__(RCLK, SRCLK, SER, n_outputs, gpio=GPIO)
+
+    def _init(self):
+        """Configure the pins as low outputs and clear the register."""
+        from .gpio_mmap import GPSET0, GPCLR0
+        for pin in (self.RCLK, self.SRCLK, self.SER):
+            self.mem.setup_output(pin, 0)
+        self._set, self._clr = GPSET0, GPCLR0
+        self._bits = [1 << i for i in reversed(range(self.n_outputs))]
+        self.clear()
+
+    def push_word(self, word):
+        """Shift ``word`` out MSB-first, then latch it to the outputs."""
+        regs, SET, CLR = self.mem.regs, self._set, self._clr
+        ser, clk, rclk = 1 << self.SER, 1 << self.SRCLK, 1 << self.RCLK
+        for bit in self._bits:
+            regs[SET if word & bit else CLR] = ser
+            regs[SET] = clk
+            regs[CLR] = clk
+        regs[SET] = rclk
+        regs[CLR] = rclk
+
+    def pulse(self, pin):
+        """Pulse ``pin`` high then low (a clock edge)."""
+        self.mem.regs[self._set] = 1 << pin
+        self.mem.regs[self._clr] = 1 << pin
+
+
+class MmapInputShiftRegister(InputShiftRegister):
+    """:class:`InputShiftRegister` driven through the mmapped GPIO registers.
+
+    Each edge is one register store and each ``QH`` read one load of
+    ``GPLEV0`` (``config.REGISTER_BACKEND = "mmap"``). ``GPIO`` still names the
+    ``RPi.GPIO`` module, for the sampler's optional edge-wake pin.
+
+    Args:
+        SH_LD: BCM pin for shift/load (IC pin 1).
+        CLK: BCM pin for the clock (IC pin 2).
+        QH: BCM pin reading serial data out of the cascaded IC (pin 10).
+        n_outputs: Number of input bits (across cascaded chips).
+        mem: A :class:`~src.gpio_mmap.GpioMem` (default: map ``/dev/gpiomem``;
+            a :class:`~src.gpio_mmap.FakeGpioMem` in tests).
+    """
+    def __init__(self, SH_LD=21, CLK=20, QH=16, n_outputs=None, mem=None):
+        from .gpio_mmap import GpioMem
+        self.mem = mem if mem is not None else GpioMem()
+        super().__init__(SH_LD, CLK, QH, n_outputs, gpio=GPIO)
+
+    def _init(self):
+        """Configure SH_LD (high) and CLK (low) as outputs and QH as input."""
+        from .gpio_mmap import GPSET0, GPCLR0, GPLEV0
+        self.mem.setup_output(self.SH_LD, 1)
+        self.mem.setup_output(self.CLK, 0)
+        self.mem.setup_input(self.QH)
+        self._set, self._clr, self._lev = GPSET0, GPCLR0, GPLEV0
+        self._bits = [1 << i for i in reversed(range(self.n_outputs))]
+
+    def read_word(self):
+        """Latch the inputs and clock them in, returning the input word."""
+        regs, SET, CLR, LEV = self.mem.regs, self._set, self._clr, self._lev
+        sh_ld, clk, qh = 1 << self.SH_LD, 1 << self.CLK, 1 << self.QH
+        regs[CLR] = sh_ld   # take snapshot of button state
+        regs[SET] = sh_ld
+        word = 0
+        for bit in self._bits:
+            if regs[LEV] & qh:
+                word |= bit
+            regs[SET] = clk
+            regs[CLR] = clk
+        return word
+
+    def pulse(self, pin):
+        """Pulse ``pin`` high then low (a clock edge)."""
+        self.mem.regs[self._set] = 1 << pin
+        self.mem.regs[self._clr] = 1 << pin
+
+
+class DuplexShiftRegister:
+    """74HC595 + 74HC165 driven together: one interleaved pass moves both words.
+
+    :meth:`exchange` latches the inputs, then for each bit slot of the chain reads
+    ``QH``, sets ``SER`` (with both shift clocks low) and raises both shift
+    clocks in a single multi-pin ``output`` call, and finally latches the new
+    output word. That is about half the GPIO calls of a separate
+    ``read_word`` + ``push_word`` (``config.REGISTER_DUPLEX``).
+
+    It is both managers' register, with a single call site per frame:
+    :class:`~src.io_managers.OutputManager` pushes it on every
+    :meth:`Game.render <src.game_loop.Game.render>`, changed word or not, and
+    :meth:`push_word` keeps the input word the exchange read.
+    :meth:`read_stamped` (from :meth:`InputManager.poll
+    <src.io_managers.InputManager.poll>` in the next frame) hands that word
+    back once, with the time it was sampled. A read runs its own exchange
+    (re-latching the unchanged output word) only when there is no unread
+    sample or it is older than ``max_age_ms`` -- after an idle-paced sleep.
+
+    Args:
+        pins: ``(RCLK, SRCLK, SER)`` of the 595 chain.
+        in_pins: ``(SH_LD, CLK, QH)`` of the 165 chain.
+        n_bits: Bit slots clocked per pass (default: the longer of the two
+            chains, ``in_bits`` and :func:`~src.ports.output_chain`).
+        in_bits: Bits in the 165 chain (default
+            :func:`~src.ports.input_chain`). When the 595 chain is longer, the
+            samples past them are the 165's serial-in and are dropped.
+        max_age_ms: Oldest input sample :meth:`read_stamped` reuses (default:
+            two frames at ``config.FPS``, so a late frame still reuses it).
+        gpio: GPIO module to drive (default ``RPi.GPIO``; a
+            :class:`~src.fake_gpio.FakeGPIO` in tests).
+    """
+    def __init__(self, pins=(3, 4, 2), in_pins=(21, 20, 16), n_bits=None, max_age_ms=None,
+                 gpio=None, in_bits=None):
+        self.RCLK, self.SRCLK, self.SER = pins
+        self.SH_LD, self.CLK, self.QH = in_pins
+        if in_bits is None:
+            in_bits = ports.input_chain()
+        if n_bits is None:
+            n_bits = max(in_bits, ports.output_chain())
+        self.n_bits = n_bits
+        self.in_bits = in_bits
+        if max_age_ms is None:
+            max_age_ms = 2000 / config.FPS
+        self.max_age_ns = int(max_age_ms * 1_000_000)
+        self.GPIO = gpio if gpio is not None else GPIO
+        self.word = 0
+        self.inputs = 0
+        self.t_ns = 0
+        self.unread = False
+        self._init()
+
+    def _init(self):
+        """Configure the pins, clear the outputs and take a first input sample."""
+        G = self.GPIO
+        G.setmode(G.BCM)
+        G.setup([self.RCLK, self.SRCLK, self.SER, self.CLK], G.OUT, initial=G.LOW)
+        G.setup(self.SH_LD, G.OUT, initial=G.HIGH)
+        G.setup(self.QH, G.IN)
+        self._clocks = [self.SRCLK, self.CLK]
+        self._data_low = [self.SER, self.SRCLK, self.CLK]
+        self._bits = [1 << i for i in reversed(range(self.n_bits))]
+        self.exchange(0)
+
+    def exchange(self, word):
+        """Latch ``word`` onto the outputs and read the inputs, in one pass.
+
+        Returns:
+            The input word, sampled when the 165 was latched at the start.
+        """
+        G, QH = self.GPIO, self.QH
+        out, inp = G.output, G.input
+        clocks, data_low = self._clocks, self._data_low
+        t_ns = clock.monotonic_ns()  # the 165 latches its inputs here
+        out(self.SH_LD, 0)
+        out(self.SH_LD, 1)
+        inputs = 0
+        for bit in self._bits:
+            if inp(QH):
+                inputs |= bit
+            out(data_low, [1 if word & bit else 0, 0, 0])
+            out(clocks, 1)  # 595 samples SER, 165 shifts its next bit to QH
+        out(clocks, 0)
+        out(self.RCLK, 1)
+        out(self.RCLK, 0)
+        inputs >>= self.n_bits - self.in_bits  # the 165's word came out first
+        self.word, self.inputs, self.t_ns = word, inputs, t_ns
+        return inputs
+
+    def push_word(self, word):
+        """Latch ``word`` onto the outputs, keeping the inputs read on the way."""
+        self.exchange(word)
+        self.unread = True
+
+    def read_stamped(self):
+        """A fresh input word as ``(t_ns, word)``, from the last push if unread."""
+        if not self.unread or clock.monotonic_ns() - self.t_ns > self.max_age_ns:
+            self.exchange(self.word)
+        self.unread = False
+        return self.t_ns, self.inputs
+
+    def read_word(self):
+        """The latest input word (see :meth:`read_stamped`)."""
+        return self.read_stamped()[1]
+
+    def clear(self):
+        """Set all outputs low."""
+        self.exchange(0)
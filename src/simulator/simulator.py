@@ -6,8 +6,9 @@ screen-backed dummies so the whole game can run without the physical box:
 
 * :class:`DummyInputShiftRegister` maps keys ``0``-``9`` and ``a``-``f`` to the
   16 input bits (``e`` = toggle 0, ``f`` = toggle 1; toggles flip on keydown).
+  A larger ``config.N_PORTS`` continues the buttons on ``g``-``z``.
 * :class:`DummyOutputShiftRegister` drives :class:`LaserPort` view objects.
-* :class:`DummyLaserBay` lays the 14 ports out as the physical floor.
+* :class:`DummyLaserBay` lays the ports out as the physical floor.
 """
 import sys
 import time
@@ -16,9 +17,12 @@ from pygame import Surface
 from pygame.locals import *
 from .. import config
 from ..game_loop import Game, LaserBay, GameClock
+from ..frame_stats import FrameStats
 from ..audio_utils import Mixer
 from ..event_loop import events
+from ..io_managers import Debouncer
 from ..config import config
+from .. import ports
 import numpy as np
 from math import sin, cos, pi
 
@@ -47,7 +51,7 @@ class LaserPort(GameObject):
     """A drawn laser emitter: a triangle plus a beam line when on.
 
     Args:
-        port_id: The laser index (0..13) this view represents.
+        port_id: The laser index (``0 .. N_PORTS-1``) this view represents.
         pos: ``(x, y)`` screen position of the emitter.
         laser_length: Beam length in pixels.
         direction: Unit ``(dx, dy)`` the beam points along.
@@ -67,6 +71,7 @@ class LaserPort(GameObject):
         self.laser_length = laser_length
         self.direction = np.array(direction)
         self.on = False
+        self.shown_level = 1.0  # fraction of full brightness drawn (set by the register)
 
     def get_image(self):
         surf = Surface()
@@ -83,54 +88,73 @@ class LaserPort(GameObject):
     def render(self, surf):
         """Draw the emitter triangle and, if on, the red beam line."""
         pygame.draw.polygon(surf, WHITE, self.verts)
-        if self.on:
+        if self.on and self.shown_level > 0:
             start = self.pos
             end = self.pos + self.direction*self.laser_length
-            pygame.draw.line(surf, RED, start, end, width=3)
+            color = (int(RED[0] * self.shown_level), 0, 0)
+            pygame.draw.line(surf, color, start, end, width=3)
 
 
 class DummyLaserBay(LaserBay):
-    """A :class:`~src.game_loop.LaserBay` whose lasers are drawn :class:`LaserPort` views.
+    """A :class:`~src.game_loop.LaserBay` that also lays out the drawn :class:`LaserPort` views.
+
+    The on/off state is still the base class's bitmask; ``lasers`` maps each
+    port id to its view, which :class:`DummyOutputShiftRegister` lights.
 
     Args:
-        n: Number of lasers (default 14).
+        n: Number of lasers (default ``config.N_PORTS``).
     """
-    def __init__(self, n=14):
-        self.n = n
-        self.word = 0
-        self.clean = True
+    def __init__(self, n=None):
+        super().__init__(n)
         self.lasers = { }
         self._init_objects()
 
     def _init_objects(self):
-        """Lay out the 14 ports as the physical floor (two rows + two sides)."""
-        OFFSET = LaserPort.W/2 + LaserPort.PAD/2
+        """Lay out the ports as the physical floor (two rows + two sides).
+
+        The two rows share ``n - 2`` ports (the top row takes an odd one), and
+        the pitch shrinks when a row would not fit the window.
+        """
+        n_top, n_bottom = (self.n - 1) // 2, (self.n - 2) // 2
+        pitch = min(LaserPort.W + LaserPort.PAD,
+                    (config.SIM_SCREEN_WH[0] - 2*LaserPort.PAD) / (n_top + 1))
+        OFFSET = pitch/2
         FLOOR_W = LaserPort.W*2 + LaserPort.PAD*3
-        FLOOR_H = LaserPort.W*6 + LaserPort.PAD*7
+        FLOOR_H = pitch*n_top + LaserPort.PAD
         top, left = 100, (config.SIM_SCREEN_WH[0] - FLOOR_H) // 2
-        PORT_IDS = [6,7,5,4,3,2,1,0,8,9,10,11,12,13]#[7,6,8,9,10,11,12,13,5,4,3,2,1,0]
-        # numbering starts at 0 being bottom left, and wraps around counter-clockwise to 13
-        for i in range(2):
-            for j in range(6):
-                x = left + (LaserPort.W + LaserPort.PAD)*j - i*OFFSET
+        # numbering starts at 0 being bottom left, and wraps around counter-clockwise
+        # to n-1 at top left: bottom row, then the two sides going up, then the top row
+        rows = ((0, [self.n - 1 - j for j in range(n_top)]),
+                (1, list(range(n_bottom))))
+        for i, port_ids in rows:
+            for j, port_id in enumerate(port_ids):
+                x = left + pitch*j - i*OFFSET
                 y = top + FLOOR_W*i
                 direction = (0, (-1)**(i))
-                port_id = PORT_IDS.pop()
                 laser = LaserPort(pos=(x,y), direction=direction, laser_length=FLOOR_W, port_id=port_id)
                 self.lasers[port_id] = laser
         for k in range(2):
             x1 = x + LaserPort.PAD*2
             y = top + (FLOOR_W - 2*LaserPort.H)/2*(k+1)
             direction = (-1, 0)
-            port_id = PORT_IDS.pop()
+            port_id = n_bottom + 1 - k
             laser = LaserPort(pos=(x1,y), direction=direction, laser_length=FLOOR_H, port_id=port_id)
             self.lasers[port_id] = laser
 
 class DummyOutputShiftRegister:
-    """Stand-in output register: maps a pushed word onto the drawn lasers."""
+    """Stand-in output register: maps a pushed word onto the drawn lasers.
+
+    It also takes brightness levels like a BAM engine
+    (:meth:`~src.bam.BamEngine.set_levels`) and draws each beam that bright.
+    """
     def __init__(self):
         print('init DummyOutputShiftRegister')
-        pass
+        self.max_level = (1 << config.BAM_BITS) - 1
+
+    def set_levels(self, levels):
+        """Draw each laser's beam at ``level / max_level`` of full red."""
+        for laser in LaserPort.group:
+            laser.shown_level = levels[laser.port_id] / self.max_level
 
     def push_word(self, word):
         """Turn each :class:`LaserPort` on/off per the bit at its ``port_id``."""
@@ -143,26 +167,41 @@ class DummyOutputShiftRegister:
 class DummyInputShiftRegister():
     """Stand-in input register driven by the keyboard.
 
-    Keys ``0``-``9`` and ``a``-``f`` map (hex) to the 16 input bits. ``e`` and
-    ``f`` are the two toggles (they flip state on keydown); all other keys are
-    momentary buttons (down while held).
+    Keys ``0``-``9`` and ``a``-``d`` are buttons 0-13, then ``g``-``z`` any
+    further buttons (``config.N_PORTS`` > 14; buttons past ``z`` have no key).
+    ``e`` and ``f`` are the two toggles (they flip state on keydown); all other
+    keys are momentary buttons (down while held). On the original box that is
+    the hex digit of each of the 16 input bits.
+
+    Class Attributes:
+        BUTTON_KEYS (str): Keys of buttons 0, 1, 2, ... in order.
+        TOGGLE_KEYS (str): Keys of toggles 0, 1, ... in order.
     """
+    BUTTON_KEYS = '0123456789abcd' + 'ghijklmnopqrstuvwxyz'
+    TOGGLE_KEYS = 'ef'
+
     def __init__(self):
-        self.bitmap = {getattr(pygame,f'K_{c}'): i for i,c in enumerate('0123456789abcdef')}
-        self.state = [0]*16
+        n_ports = config.N_PORTS
+        self.bitmap = {getattr(pygame,f'K_{c}'): i
+                       for i,c in enumerate(self.BUTTON_KEYS[:n_ports])}
+        self.toggle_keys = set()
+        for i,c in enumerate(self.TOGGLE_KEYS[:config.N_TOGGLES]):
+            key = getattr(pygame,f'K_{c}')
+            self.bitmap[key] = n_ports + i
+            self.toggle_keys.add(key)
+        self.state = [0]*ports.input_bits()
 
     def read_word(self):
-        """Pump pygame events into ``self.state`` and return the 16-bit word."""
+        """Pump pygame events into ``self.state`` and return the input word."""
         word = 0x00
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                print(sum(dts)/len(dts))
                 pygame.quit()
                 sys.exit()
             if event.type == pygame.KEYDOWN:
                 bit = self.bitmap.get(event.key)
                 if bit is not None:
-                    if event.key in [pygame.K_e, pygame.K_f]: # toggles
+                    if event.key in self.toggle_keys:
                         if self.state[bit] == 1:
                             self.state[bit] = 0
                         else:
@@ -172,28 +211,38 @@ class DummyInputShiftRegister():
             if event.type == pygame.KEYUP:
                 bit = self.bitmap.get(event.key)
                 if bit is not None:
-                    if event.key in [pygame.K_e, pygame.K_f]: # toggles
+                    if event.key in self.toggle_keys:
                         continue
                     else:
                         self.state[bit] = 0
 
-        for i in range(16):
-            word |= (self.state[i] << i)
+        for i, bit in enumerate(self.state):
+            word |= (bit << i)
         return word
-dts=[]
+
 class Simulator(Game):
-    """A :class:`~src.game_loop.Game` wired to the dummy registers + pygame view."""
-    def __init__(self):
+    """A :class:`~src.game_loop.Game` wired to the dummy registers + pygame view.
+
+    Keyboard keys do not bounce, so its inputs are debounced with no holds.
+
+    Args:
+        recorder: Optional :class:`~src.flight_recorder.FlightRecorder`.
+    """
+    def __init__(self, recorder=None):
+        no_hold = [0] * ports.input_bits()
         super().__init__(PISOreg=DummyInputShiftRegister(),
                          SIPOreg=DummyOutputShiftRegister(),
                          mixer=Mixer(),
-                         events=events)
+                         events=events,
+                         recorder=recorder,
+                         debouncer=Debouncer(no_hold, no_hold))
         self.W, self.H = config.SIM_SCREEN_WH
         pygame.init()
         self.clock = GameClock(config.FPS) # pygame.time.Clock()
+        self.frame_stats = FrameStats(self.clock)
         self.screen = pygame.display.set_mode((self.W,self.H))
         self.frame = 0
-        self.lasers = DummyLaserBay(14)
+        self.lasers = DummyLaserBay(config.N_PORTS)
 
     def render(self):
         """Push the laser word, then redraw the floor."""
@@ -211,11 +260,16 @@ class Simulator(Game):
             laser.update(dt)
 
     def run(self):
-        """Run the simulator main loop."""
+        """Run the simulator main loop (until the window is closed)."""
         self.dt = 1000/self.FPS  # ms, matching GameClock.tick()'s units
-        print('hiell')
-        while True:
-          self.update(self.dt)
-          self.render()
-          self.dt = self.clock.tick()
-          dts.append(self.dt)
+        try:
+            while True:
+              self.update(self.dt)
+              self.render()
+              frames = self.frames_until_wake()
+              self.dt = self.clock.tick(frames)
+              self.frame_stats.record(self.dt, frames * self.frame_stats.target_ms)
+        finally:
+            self.print_frame_stats()
+            if self.recorder is not None:
+                self.recorder.close()
@@ -0,0 +1,162 @@
+"""A memory-budgeted LRU cache for decoded sounds.
+
+The mixer used to keep every ``Sound`` it ever decoded in plain dicts, so a box
+that runs for weeks -- Trivia alone touches a clip per question and choice --
+grew until the Pi Zero's 512 MB ran out. :class:`SoundCache` holds them against
+a byte budget (``config.SOUND_CACHE_BYTES``) instead: when a new sound pushes it
+over, the least recently used ones are dropped and decoded again if they are
+ever needed.
+
+Entries can be **pinned** so eviction never touches them: the
+:class:`~src.audio_utils.Mixer` pins what the active program loaded in its
+``start()`` and the active patch, and unpins the program's set on the next
+program switch. A sound that is evicted while it plays keeps playing -- its
+channel holds a reference -- and is freed when it ends.
+
+Sizes come from the sample count (length x rate x sample width x channels at
+the current mixer format), not ``Sound.get_raw()``, which would copy the whole
+buffer. Hit, miss and eviction counts and the resident bytes are kept for the
+report the game loop prints next to its frame stats.
+"""
+from collections import OrderedDict
+
+import pygame
+
+
+def sound_bytes(value):
+    """Decoded size in bytes of a ``Sound``, or of a list of them (a patch)."""
+    if isinstance(value, (list, tuple)):
+        return sum(sound_bytes(sound) for sound in value)
+    init = pygame.mixer.get_init()
+    if init is None:
+        return 0
+    freq, fmt, channels = init[:3]
+    return round(value.get_length() * freq) * (abs(fmt) // 8) * channels
+
+
+class SoundCache:
+    """Decoded sounds by key within a byte budget, least recently used evicted first.
+
+    Reads as a mapping (``key in cache``, ``cache[key]``, ``cache.get(key)``);
+    reading an entry marks it recently used. The mixer goes through
+    :meth:`lookup`, which also counts hits and misses.
+
+    Args:
+        budget_bytes: Resident bytes to stay within. Pinned entries and the
+            entry just added may still take it over.
+        size_of: Returns an entry's size in bytes (default :func:`sound_bytes`).
+
+    Attributes:
+        budget_bytes (int): The byte budget.
+        resident_bytes (int): Bytes held now.
+        pinned (set): Keys eviction skips.
+        hits / misses / evictions (int): Running counts.
+    """
+    def __init__(self, budget_bytes, size_of=sound_bytes):
+        self.budget_bytes = budget_bytes
+        self.size_of = size_of
+        self.entries = OrderedDict()  # key -> (value, nbytes), least recent first
+        self.pinned = set()
+        self.resident_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __getitem__(self, key):
+        value = self.entries[key][0]
+        self.entries.move_to_end(key)
+        return value
+
+    def get(self, key, default=None):
+        """``cache[key]``, or ``default`` if it is not resident."""
+        if key not in self.entries:
+            return default
+        return self[key]
+
+    def lookup(self, key):
+        """The entry for ``key`` (marked recently used), or None; counted as a hit or miss."""
+        if key in self.entries:
+            self.hits += 1
+            return self[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value, pin=False):
+        """Add (or replace) ``key``, then evict down to the budget.
+
+        Args:
+            key: The entry's key.
+            value: A ``Sound`` (or what ``size_of`` can measure).
+            pin: Also pin it.
+
+        Returns:
+            ``value``.
+        """
+        self.discard(key)
+        nbytes = self.size_of(value)
+        self.entries[key] = (value, nbytes)
+        self.resident_bytes += nbytes
+        if pin:
+            self.pinned.add(key)
+        self._evict(keep=key)
+        return value
+
+    def discard(self, key):
+        """Drop ``key`` if resident (its pin stays)."""
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.resident_bytes -= entry[1]
+
+    def pin(self, key):
+        """Keep ``key`` resident until :meth:`unpin` (it may be added later)."""
+        self.pinned.add(key)
+
+    def unpin(self, key):
+        """Let ``key`` be evicted again; evicts at once if over the budget."""
+        self.pinned.discard(key)
+        self._evict()
+
+    def clear(self):
+        """Drop every entry and pin (e.g. after the mixer is re-initialised)."""
+        self.entries.clear()
+        self.pinned.clear()
+        self.resident_bytes = 0
+
+    def _evict(self, keep=None):
+        if self.resident_bytes <= self.budget_bytes:
+            return
+        for key in list(self.entries):
+            if key in self.pinned or key == keep:
+                continue
+            self.resident_bytes -= self.entries.pop(key)[1]
+            self.evictions += 1
+            if self.resident_bytes <= self.budget_bytes:
+                return
+
+    def summary(self):
+        """Return a dict snapshot of the cache's counts and size."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'pinned': sum(1 for key in self.pinned if key in self.entries),
+            'resident_bytes': self.resident_bytes,
+            'budget_bytes': self.budget_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+        }
+
+    def report(self):
+        """Return a one-line human-readable summary (what the loop prints)."""
+        s = self.summary()
+        return ('{entries} sounds ({pinned} pinned)  {mb:.1f} / {budget_mb:.1f} MB  '
+                'hits {hits}  misses {misses} ({pct:.0f}% hit)  evictions {evictions}').format(
+                    mb=s['resident_bytes'] / 2**20, budget_mb=s['budget_bytes'] / 2**20,
+                    pct=100 * s['hit_rate'], **s)
@@ -0,0 +1,114 @@
+"""Shift-register drivers that use the Pi's SPI peripheral instead of bit-banging.
+
+The 74HC595 and 74HC165 are plain clock-and-data devices, so SPI0 can clock a
+whole word through them in one ``spidev`` transfer. That is one syscall, where
+bit-banging takes dozens of Python-level GPIO calls. Select with
+``config.REGISTER_BACKEND = "spi"``.
+
+Wiring (SPI0, mode 0, MSB first -- the same bit order as the bit-banged
+drivers, so words are unchanged):
+
+* 74HC595: ``SER`` <- MOSI (BCM 10), ``SRCLK`` <- SCLK (BCM 11), ``RCLK`` <- CE0
+  (BCM 8). Chip-select is held low for the transfer and rises after the last
+  clock, and that rising edge latches the word. Alternatively, pass
+  ``latch_pin`` to pulse ``RCLK`` on a GPIO after the transfer.
+* 74HC165: ``QH`` -> MISO (BCM 9), ``CLK`` <- SCLK (shared), ``SH_LD`` <- a GPIO
+  (BCM 21, as before), pulsed low to load before each transfer. Reads go out
+  on device 1 (CE1), so CE0 -- the 595's latch -- never moves during a read.
+  The zeros shifted into the 595 while reading are never latched.
+
+``spidev`` is imported lazily, only when a driver is built without an ``spi``
+object: it exists only on Linux boards. Tests pass a
+:class:`~src.fake_spidev.FakeSpiBoard`'s devices and pins instead.
+"""
+from . import ports
+from .config import config
+from .shift_register import GPIO
+
+
+def _open_spi(spi, bus, device, speed_hz):
+    """Open ``spi`` (or a new ``spidev.SpiDev``) on ``bus``/``device``, mode 0."""
+    if spi is None:
+        import spidev
+        spi = spidev.SpiDev()
+    spi.open(bus, device)
+    spi.max_speed_hz = speed_hz
+    spi.mode = 0
+    return spi
+
+
+class SpiOutputShiftRegister:
+    """74HC595 chain written by one SPI transfer per word.
+
+    Args:
+        bus: SPI bus (0 = SPI0).
+        device: Chip select whose line drives ``RCLK`` (0 = CE0).
+        n_outputs: Number of output bits (a multiple of 8; default
+            :func:`ports.output_chain() <src.ports.output_chain>`).
+        speed_hz: SPI clock rate (default ``config.SPI_SPEED_HZ``).
+        latch_pin: BCM pin wired to ``RCLK``, pulsed after each transfer, if
+            the latch is not on the chip-select line.
+        spi: An open-able ``spidev.SpiDev``-like object (default: a new one).
+        gpio: GPIO module for ``latch_pin`` (default ``RPi.GPIO``).
+    """
+    def __init__(self, bus=0, device=0, n_outputs=None, speed_hz=None, latch_pin=None,
+                 spi=None, gpio=None):
+        self.n_outputs = n_outputs if n_outputs is not None else ports.output_chain()
+        self.nbytes = self.n_outputs // 8
+        self.latch_pin = latch_pin
+        self.GPIO = gpio if gpio is not None else GPIO
+        self.spi = _open_spi(spi, bus, device, speed_hz or config.SPI_SPEED_HZ)
+        if latch_pin is not None:
+            self.GPIO.setmode(self.GPIO.BCM)
+            self.GPIO.setup(latch_pin, self.GPIO.OUT, initial=self.GPIO.LOW)
+        self.clear()
+
+    def push_word(self, word):
+        """Shift ``word`` out MSB-first and latch it, in one transfer."""
+        self.spi.writebytes(list(word.to_bytes(self.nbytes, 'big')))
+        if self.latch_pin is not None:
+            self.GPIO.output(self.latch_pin, 1)
+            self.GPIO.output(self.latch_pin, 0)
+
+    def clear(self):
+        """Set all outputs low."""
+        self.push_word(0)
+
+    def close(self):
+        """Release the SPI device."""
+        self.spi.close()
+
+
+class SpiInputShiftRegister:
+    """74HC165 chain read by one SPI transfer per word.
+
+    Args:
+        bus: SPI bus (0 = SPI0).
+        device: Chip select used for reads (1 = CE1; keep it off the 595's
+            latch line).
+        SH_LD: BCM pin for shift/load (IC pin 1), pulsed low before each read.
+        n_outputs: Number of input bits (a multiple of 8; default
+            :func:`ports.input_chain() <src.ports.input_chain>`).
+        speed_hz: SPI clock rate (default ``config.SPI_SPEED_HZ``).
+        spi: An open-able ``spidev.SpiDev``-like object (default: a new one).
+        gpio: GPIO module for ``SH_LD`` (default ``RPi.GPIO``).
+    """
+    def __init__(self, bus=0, device=1, SH_LD=21, n_outputs=None, speed_hz=None,
+                 spi=None, gpio=None):
+        self.SH_LD = SH_LD
+        self.n_outputs = n_outputs if n_outputs is not None else ports.input_chain()
+        self.nbytes = self.n_outputs // 8
+        self.GPIO = gpio if gpio is not None else GPIO
+        self.GPIO.setmode(self.GPIO.BCM)
+        self.GPIO.setup(SH_LD, self.GPIO.OUT, initial=self.GPIO.HIGH)
+        self.spi = _open_spi(spi, bus, device, speed_hz or config.SPI_SPEED_HZ)
+
+    def read_word(self):
+        """Latch the inputs, then clock all of them in with one transfer."""
+        self.GPIO.output(self.SH_LD, 0)  # take snapshot of button state
+        self.GPIO.output(self.SH_LD, 1)
+        return int.from_bytes(bytes(self.spi.readbytes(self.nbytes)), 'big')
+
+    def close(self):
+        """Release the SPI device."""
+        self.spi.close()
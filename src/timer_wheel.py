@@ -0,0 +1,266 @@
+"""A hierarchical timer wheel on the ``now_ms`` timeline.
+
+Every deadline a program sets (:meth:`Program.after
+<src.programs.base.Program.after>`, cooldowns) and every animation frame
+boundary is a :class:`Timer` on a :class:`TimerWheel`. Scheduling and
+cancelling are O(1), and advancing the wheel touches only the slots the clock
+has moved through, so a frame with nothing due costs the same with ten pending
+timers or ten thousand (``scratch/bench_timer_wheel.py``).
+
+Time is cut into slots of ``config.TIMER_SLOT_MS``. The first level has 256
+slots, one per slot of time, covering the next 256 slots. Each further level
+has 64 slots, each as long as the whole level below: the second covers
+``256 * 64`` slots, the third ``256 * 64**2``, the fourth ``256 * 64**3``
+(a week at 10 ms). A timer is filed in the finest level that reaches it; each
+time the first level wraps, the next level's slot for the coming stretch is
+cascaded down into it. Timers further out than the top level are filed in its
+farthest slot and re-filed when it cascades.
+
+A timer fires on the first :meth:`TimerWheel.run_due` whose ``now_ms`` is
+strictly after its deadline, the same rule the programs' own deadline checks
+use. Timers due in the same call fire in deadline order, ties in the order
+they were scheduled.
+"""
+from operator import attrgetter
+
+from .config import config
+
+
+L0_BITS = 8
+LN_BITS = 6
+L0_SIZE = 1 << L0_BITS
+LN_SIZE = 1 << LN_BITS
+N_LEVELS = 4
+
+
+class Timer:
+    """A pending call on a :class:`TimerWheel`; the handle :meth:`TimerWheel.call_at` returns.
+
+    Attributes:
+        deadline_ms (float): When it is due, on the wheel's timeline.
+        func: The callable; ``args``/``kwargs`` are passed to it.
+    """
+    __slots__ = ('deadline_ms', 'seq', 'func', 'args', 'kwargs', 'wheel', 'bucket', 'level')
+
+    def __init__(self, wheel, deadline_ms, seq, func, args, kwargs):
+        self.deadline_ms = deadline_ms
+        self.seq = seq
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.wheel = wheel
+        self.bucket = None
+        self.level = 0
+
+    @property
+    def active(self):
+        """True until the timer fires or is cancelled."""
+        return self.bucket is not None
+
+    def cancel(self):
+        """Drop the timer if it has not fired yet. Safe to call more than once."""
+        bucket = self.bucket
+        if bucket is not None:
+            del bucket[self]
+            self.bucket = None
+            wheel = self.wheel
+            wheel.count -= 1
+            wheel.counts[self.level] -= 1
+
+    def __repr__(self):
+        state = 'pending' if self.active else 'done'
+        return f'Timer({getattr(self.func, "__qualname__", self.func)} @ {self.deadline_ms:.1f} ms, {state})'
+
+
+_PAST = float('inf')  # ``now_ms`` for a slot the clock has already left
+
+
+_order = attrgetter('deadline_ms', 'seq')  # firing order within one slot
+
+
+class TimerWheel:
+    """Pending timers, filed by deadline in a hierarchy of slot rings.
+
+    Args:
+        slot_ms: Length of one first-level slot (default
+            ``config.TIMER_SLOT_MS``).
+
+    Attributes:
+        count (int): Pending timers.
+        counts (list): Pending timers filed in each level.
+    """
+    def __init__(self, slot_ms=None):
+        self.slot_ms = slot_ms or config.TIMER_SLOT_MS
+        # each slot is a dict used as an ordered set: O(1) add and cancel
+        self.levels = [[{} for _ in range(L0_SIZE)]]
+        self.levels += [[{} for _ in range(LN_SIZE)] for _ in range(N_LEVELS - 1)]
+        self.base = 0   # the slot the clock is in; every earlier one has run
+        self.count = 0
+        self.counts = [0] * N_LEVELS
+        self.seq = 0
+
+    def __len__(self):
+        return self.count
+
+    def call_at(self, deadline_ms, func, *args, **kwargs):
+        """Schedule ``func(*args, **kwargs)`` for ``deadline_ms``.
+
+        Returns:
+            The :class:`Timer`; call its ``cancel()`` to drop it.
+        """
+        timer = Timer(self, deadline_ms, self.seq, func, args, kwargs)
+        self.seq += 1
+        self.count += 1
+        self._file(timer)
+        return timer
+
+    def reset(self, timer, deadline_ms):
+        """Re-arm ``timer`` (pending, fired or cancelled) for ``deadline_ms``.
+
+        The same as cancelling it and scheduling its call again, without a new
+        handle: a timer that fires over and over reuses one.
+        """
+        if timer.bucket is not None:
+            timer.cancel()
+        timer.deadline_ms = deadline_ms
+        timer.seq = self.seq
+        self.seq += 1
+        self.count += 1
+        self._file(timer)
+
+    def _file(self, timer):
+        """Put ``timer`` in the finest slot that reaches its deadline."""
+        tick = int(timer.deadline_ms // self.slot_ms)
+        delta = tick - self.base
+        if delta < L0_SIZE:
+            level = 0
+            if delta < 0:
+                tick = self.base  # already due: the current slot
+            bucket = self.levels[0][tick & (L0_SIZE - 1)]
+        else:
+            shift, span = L0_BITS, L0_SIZE << LN_BITS
+            for level in range(1, N_LEVELS):
+                if delta < span or level == N_LEVELS - 1:
+                    if delta >= span:  # beyond the wheel: the farthest slot, re-filed later
+                        tick = self.base + span - 1
+                    bucket = self.levels[level][(tick >> shift) & (LN_SIZE - 1)]
+                    break
+                shift += LN_BITS
+                span <<= LN_BITS
+        bucket[timer] = None
+        timer.bucket = bucket
+        timer.level = level
+        self.counts[level] += 1
+
+    def _cascade(self):
+        """The first level wrapped: refile the next stretch of each coarser level."""
+        shift = L0_BITS
+        for level in range(1, N_LEVELS):
+            index = (self.base >> shift) & (LN_SIZE - 1)
+            bucket = self.levels[level][index]
+            if bucket:
+                self.levels[level][index] = {}
+                self.counts[level] -= len(bucket)
+                for timer in bucket:
+                    self._file(timer)
+            if index:
+                break
+            shift += LN_BITS
+
+    def run_due(self, now_ms, call=None):
+        """Fire every timer due at ``now_ms`` (deadline strictly before it).
+
+        Args:
+            now_ms: The current time on the wheel's timeline.
+            call: Optional ``call(func, *args, **kwargs)`` to run each timer
+                through (e.g. the frame profiler's); default calls it directly.
+        """
+        level0, counts = self.levels[0], self.counts
+        target = int(now_ms // self.slot_ms)
+        while self.count:
+            if counts[0]:
+                bucket = level0[self.base & (L0_SIZE - 1)]
+                if bucket:
+                    # a slot the clock has left is wholly due; only the current one is checked
+                    self._expire(bucket, now_ms if self.base >= target else _PAST, call)
+                if self.base >= target:
+                    break
+                self.base += 1
+                if not self.base & (L0_SIZE - 1):
+                    self._cascade()
+            else:
+                # the first level is empty: skip to where the first filled level cascades
+                bits = L0_BITS
+                for level in range(1, N_LEVELS - 1):
+                    if counts[level]:
+                        break
+                    bits += LN_BITS
+                nxt = ((self.base >> bits) + 1) << bits
+                if nxt > target:
+                    break
+                self.base = nxt
+                self._cascade()
+        if target > self.base:
+            self.base = target  # nothing filed in the slots skipped
+
+    def _expire(self, bucket, now_ms, call):
+        """Fire the due timers in ``bucket``, including any due ones they add."""
+        counts = self.counts
+        while bucket:
+            if now_ms is _PAST:
+                due = list(bucket)
+            else:
+                due = [timer for timer in bucket if timer.deadline_ms < now_ms]
+                if not due:
+                    return
+            if len(due) > 1:
+                due.sort(key=_order)
+            for timer in due:
+                if timer.bucket is not bucket:
+                    continue  # cancelled by an earlier callback
+                del bucket[timer]
+                timer.bucket = None
+                self.count -= 1
+                counts[0] -= 1
+                if call is not None:
+                    call(timer.func, *timer.args, **timer.kwargs)
+                elif timer.kwargs:
+                    timer.func(*timer.args, **timer.kwargs)
+                else:
+                    timer.func(*timer.args)
+
+    def next_deadline_ms(self):
+        """The earliest pending deadline, or None when nothing is pending."""
+        if not self.count:
+            return None
+        best = None
+        level0 = self.levels[0]
+        for i in range(L0_SIZE):
+            bucket = level0[(self.base + i) & (L0_SIZE - 1)]
+            if bucket:
+                best = min(timer.deadline_ms for timer in bucket)
+                break
+        # a coarser slot not cascaded yet can still hold something sooner
+        shift = L0_BITS
+        for level in range(1, N_LEVELS):
+            slots = self.levels[level]
+            index = (self.base >> shift) & (LN_SIZE - 1)
+            for i in range(1, LN_SIZE + 1):
+                bucket = slots[(index + i) & (LN_SIZE - 1)]
+                if bucket:
+                    first = min(timer.deadline_ms for timer in bucket)
+                    if best is None or first < best:
+                        best = first
+                    break
+            shift += LN_BITS
+        return best
+
+    def clear(self):
+        """Cancel every pending timer."""
+        for slots in self.levels:
+            for bucket in slots:
+                for timer in bucket:
+                    timer.bucket = None
+                bucket.clear()
+        self.count = 0
+        self.counts[:] = [0] * N_LEVELS  # in place: a run_due in progress holds the list